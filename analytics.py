@@ -0,0 +1,284 @@
+"""서버 통계: 게임별 분 / 시간 / 일 단위 집계 (analytics.bin)
+
+게임 결과가 나올 때마다 record() 로 현재 시각이 속한 버킷에 더한다 (판마다 O(1)).
+해상도마다 버킷 수가 고정된 링 버퍼라 오래된 버킷은 새 버킷이 덮어쓴다.
+유저 수는 버킷마다 작은 HyperLogLog 로 세므로 여러 버킷을 합쳐도 중복 없이 추정된다.
+
+    헤더    magic "GBSTATS1", 레지스터 수 u16, 게임 수 u16
+    게임    이름 길이 u8, 이름 UTF-8, 해상도마다 (버킷 수 u32, 버킷 × 버킷 수)
+    버킷    번호 i64, 판 수 i64, 배팅 i64, 지급 i64, HLL 레지스터 u8 × 레지스터 수
+
+정수는 모두 little-endian. 비어 있는 버킷은 저장하지 않는다.
+"""
+import array
+import asyncio
+import math
+import os
+import struct
+import time
+from typing import Optional
+
+from persistence import atomic_write
+
+MAGIC = b"GBSTATS1"
+
+# 해상도: 이름 → (버킷 폭 초, 버킷 수)
+RESOLUTIONS = {
+    "minute": (60, 60),
+    "hour": (3600, 48),
+    "day": (86400, 30),
+}
+
+# HyperLogLog 레지스터 수 (2^8, 표준 오차 약 6.5%, 적은 인원은 거의 정확)
+HLL_BITS = 8
+HLL_REGISTERS = 1 << HLL_BITS
+
+_HEADER = struct.Struct("<8sHH")
+_BUCKET = struct.Struct("<qqqq")
+_MASK64 = (1 << 64) - 1
+
+
+# ========================
+# HyperLogLog (유저 수 추정)
+# ========================
+
+def _hash64(value: int) -> int:
+    """splitmix64 (연속된 유저 ID 도 고르게 섞음)"""
+    z = (value + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def hll_position(user_id: int) -> tuple[int, int]:
+    """(레지스터 번호, 남은 비트의 선행 0 개수 + 1)"""
+    h = _hash64(user_id)
+    rest = h & ((1 << (64 - HLL_BITS)) - 1)
+    return h >> (64 - HLL_BITS), (64 - HLL_BITS) - rest.bit_length() + 1
+
+
+def hll_add(registers: bytearray, user_id: int) -> None:
+    index, rank = hll_position(user_id)
+    if rank > registers[index]:
+        registers[index] = rank
+
+
+def hll_count(registers: bytes) -> int:
+    m = len(registers)
+    zeros = registers.count(0)
+    if zeros == m:
+        return 0
+    estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in registers)
+    # 적은 인원은 빈 레지스터 비율로 계산 (linear counting)
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)
+    return round(estimate)
+
+
+# ========================
+# 링 버퍼
+# ========================
+
+class RollupRing:
+    """폭 width 초짜리 버킷 size 개의 링 버퍼 (버킷 번호 = 시각 // width)"""
+
+    def __init__(self, width: int, size: int):
+        self.width = width
+        self.size = size
+        self.epochs = array.array("q", [-1]) * size
+        self.rounds = array.array("q", [0]) * size
+        self.wagered = array.array("q", [0]) * size
+        self.paid = array.array("q", [0]) * size
+        self.players: list[Optional[bytearray]] = [None] * size
+
+    def _slot(self, epoch: int) -> int:
+        slot = epoch % self.size
+        if self.epochs[slot] != epoch:
+            # 한 바퀴 전 버킷을 덮어씀
+            self.epochs[slot] = epoch
+            self.rounds[slot] = self.wagered[slot] = self.paid[slot] = 0
+            self.players[slot] = bytearray(HLL_REGISTERS)
+        return slot
+
+    def add(self, now: float, player: tuple[int, int], rounds: int, wagered: int, paid: int) -> None:
+        """player 는 hll_position(user_id)"""
+        slot = self._slot(int(now // self.width))
+        self.rounds[slot] += rounds
+        self.wagered[slot] += wagered
+        self.paid[slot] += paid
+        registers = self.players[slot]
+        index, rank = player
+        if rank > registers[index]:
+            registers[index] = rank
+
+    def buckets(self, now: float, count: int) -> list[Optional[int]]:
+        """now 가 속한 버킷부터 과거 count 개의 칸 (오래된 순, 기록이 없으면 None)"""
+        current = int(now // self.width)
+        slots = []
+        for epoch in range(current - min(count, self.size) + 1, current + 1):
+            slot = epoch % self.size
+            slots.append(slot if self.epochs[slot] == epoch else None)
+        return slots
+
+    def merge_players(self, now: float, count: int, players: bytearray) -> bytearray:
+        """최근 count 개 버킷의 HLL 레지스터를 players 에 합친다"""
+        for slot in self.buckets(now, count):
+            if slot is not None:
+                players = bytearray(map(max, players, self.players[slot]))
+        return players
+
+    def summary(self, now: float, count: int) -> dict:
+        rounds = wagered = paid = 0
+        series = []
+        for slot in self.buckets(now, count):
+            if slot is None:
+                series.append(0)
+                continue
+            rounds += self.rounds[slot]
+            wagered += self.wagered[slot]
+            paid += self.paid[slot]
+            series.append(self.rounds[slot])
+        return {
+            "rounds": rounds,
+            "wagered": wagered,
+            "paid": paid,
+            "house": wagered - paid,
+            "players": hll_count(self.merge_players(now, count, bytearray(HLL_REGISTERS))),
+            "series": series,
+        }
+
+    # ---------- 저장 ----------
+
+    def encode(self) -> bytes:
+        used = [slot for slot in range(self.size) if self.epochs[slot] >= 0]
+        parts = [struct.pack("<I", len(used))]
+        for slot in used:
+            parts.append(_BUCKET.pack(self.epochs[slot], self.rounds[slot], self.wagered[slot], self.paid[slot]))
+            parts.append(bytes(self.players[slot]))
+        return b"".join(parts)
+
+    def decode(self, buf, offset: int, registers: int) -> int:
+        (count,) = struct.unpack_from("<I", buf, offset)
+        offset += 4
+        for _ in range(count):
+            epoch, rounds, wagered, paid = _BUCKET.unpack_from(buf, offset)
+            offset += _BUCKET.size
+            players = bytes(buf[offset:offset + registers])
+            if len(players) != registers:
+                raise ValueError("파일이 중간에 잘림")
+            offset += registers
+            # 레지스터 수가 바뀐 파일이면 유저 수만 버림
+            if registers != HLL_REGISTERS:
+                players = bytes(HLL_REGISTERS)
+            slot = epoch % self.size
+            if epoch > self.epochs[slot]:
+                self.epochs[slot] = epoch
+                self.rounds[slot] = rounds
+                self.wagered[slot] = wagered
+                self.paid[slot] = paid
+                self.players[slot] = bytearray(players)
+        return offset
+
+
+# ========================
+# 서버 통계
+# ========================
+
+class ServerAnalytics:
+    """한 서버의 게임별 집계 (유저 레코드와 별개로 저장)
+
+    시각은 utc_offset 초만큼 옮겨서 나누므로 일 단위 버킷은 그 시간대의 자정에 바뀐다.
+    path 가 None 이면 저장하지 않는다.
+    """
+
+    def __init__(self, path: Optional[str] = None, utc_offset: int = 0):
+        self.path = path
+        self.utc_offset = utc_offset
+        self.games: dict[str, dict[str, RollupRing]] = {}
+        self.dirty = False
+
+        # 통계
+        self.records = 0
+        self.saves = 0
+
+    def _rings(self, game: str) -> dict[str, RollupRing]:
+        rings = self.games.get(game)
+        if rings is None:
+            rings = self.games[game] = {
+                name: RollupRing(width, size) for name, (width, size) in RESOLUTIONS.items()
+            }
+        return rings
+
+    def _now(self, now: Optional[float]) -> float:
+        return (time.time() if now is None else now) + self.utc_offset
+
+    def record(self, game: str, user_id: int, wagered: int, paid: int, rounds: int = 1,
+               now: Optional[float] = None) -> None:
+        """게임 결과 반영 (paid 는 배팅금을 포함해 돌려준 금액)"""
+        now = self._now(now)
+        player = hll_position(user_id)
+        for ring in self._rings(game).values():
+            ring.add(now, player, rounds, wagered, paid)
+        self.records += 1
+        self.dirty = True
+
+    def summary(self, resolution: str, count: int, now: Optional[float] = None) -> dict[str, dict]:
+        """게임별 최근 count 개 버킷 합계 {rounds, wagered, paid, house, players, series}"""
+        now = self._now(now)
+        return {game: rings[resolution].summary(now, count) for game, rings in self.games.items()}
+
+    def players(self, resolution: str, count: int, now: Optional[float] = None) -> int:
+        """최근 count 개 버킷 동안 한 게임이라도 한 유저 수 (추정)"""
+        now = self._now(now)
+        players = bytearray(HLL_REGISTERS)
+        for rings in self.games.values():
+            players = rings[resolution].merge_players(now, count, players)
+        return hll_count(players)
+
+    # ---------- 저장 ----------
+
+    def encode(self) -> bytes:
+        parts = [_HEADER.pack(MAGIC, HLL_REGISTERS, len(self.games))]
+        for game, rings in self.games.items():
+            name = game.encode("utf-8")
+            parts.append(struct.pack("<B", len(name)) + name)
+            for resolution in RESOLUTIONS:
+                parts.append(rings[resolution].encode())
+        return b"".join(parts)
+
+    def load(self) -> None:
+        if self.path is None or not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            buf = f.read()
+        try:
+            magic, registers, games = _HEADER.unpack_from(buf, 0)
+            if magic != MAGIC:
+                raise ValueError("magic 불일치")
+            offset = _HEADER.size
+            for _ in range(games):
+                length = buf[offset]
+                game = buf[offset + 1:offset + 1 + length].decode("utf-8")
+                offset += 1 + length
+                rings = self._rings(game)
+                for resolution in RESOLUTIONS:
+                    offset = rings[resolution].decode(buf, offset, registers)
+        except (struct.error, ValueError, IndexError) as e:
+            print(f"⚠️ 서버 통계 파일을 읽지 못해 새로 시작합니다 ({self.path}): {e}")
+            self.games.clear()
+
+    async def save(self) -> None:
+        """바뀐 내용이 있으면 executor 에서 파일에 쓴다 (직렬화는 이벤트 루프에서)"""
+        if self.path is None or not self.dirty:
+            return
+        payload = self.encode()
+        self.dirty = False
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, atomic_write, self.path, payload)
+        except Exception:
+            self.dirty = True
+            raise
+        self.saves += 1
+
+    def stats(self) -> dict:
+        return {"games": len(self.games), "records": self.records, "saves": self.saves, "dirty": self.dirty}
@@ -0,0 +1,344 @@
+"""경제 / 게임 핫패스 마이크로 벤치마크
+
+사용법:
+    python benchmarks/bench_hotpaths.py [--users 1000,100000,1000000] [--backend json|sqlite]
+                                        [--only snapshot,leaderboard] [--json result.json]
+                                        [--baseline baseline.json] [--tolerance 0.25]
+
+유저 수별로 가짜 economy_data 를 만들어 임시 디렉터리에서 불러온 뒤 시나리오마다
+ops/sec, p50/p99 지연시간, 최대 메모리(tracemalloc)를 측정한다.
+게임 화면 시나리오는 index.py 의 슬래시 명령어와 버튼 콜백을 대역 Interaction 으로
+실행하므로 discord.py 가 설치되어 있어야 한다 (없으면 건너뜀).
+
+--baseline 으로 이전 --json 결과를 넘기면 ops/sec 가 tolerance 이상 떨어진 시나리오를
+출력하고 종료 코드 1 로 끝낸다.
+"""
+import argparse
+import asyncio
+import gc
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from config import DEFAULT_MULTIPLIERS, DEFAULT_START_BALANCE  # noqa: E402
+from fakes import FakeInteraction, FakeUser, run_command  # noqa: E402
+from persistence import atomic_write  # noqa: E402
+from records import UserRecord  # noqa: E402
+from shoe import Hand  # noqa: E402
+from storage import JsonBackend, SqliteBackend  # noqa: E402
+from guilds import GuildEconomy  # noqa: E402
+
+BASE_ID = 10**17
+BET = 10
+
+# 메모리 측정 패스에서 실행할 최대 횟수 (tracemalloc 은 느리므로 짧게)
+MEMORY_PASS = 200
+
+
+# ========================
+# 가짜 데이터
+# ========================
+
+def synthetic_records(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(n):
+        record = UserRecord(rng.randrange(10**5, 10**7))
+        for game in ("slot", "dice", "blackjack", "bet"):
+            played = rng.randrange(300)
+            record.set_stats(game, played, rng.randrange(played + 1))
+        yield BASE_ID + i, record
+
+
+def open_backend(kind: str, workdir: str, n: int):
+    """n 명의 가짜 유저가 들어 있는 저장소를 만들어 불러온다"""
+    if kind == "sqlite":
+        backend = SqliteBackend(os.path.join(workdir, f"bench_{n}.db"), DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS)
+        backend.load()
+        backend.import_users(((uid, r.to_dict()) for uid, r in synthetic_records(n)), DEFAULT_MULTIPLIERS)
+        return backend
+    path = os.path.join(workdir, f"bench_{n}.json")
+    items = list(synthetic_records(n))
+    atomic_write(path, JsonBackend._encode_snapshot((0, None, dict(items), DEFAULT_MULTIPLIERS, {})))
+    del items
+    backend = JsonBackend(path, path + ".journal", DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS)
+    backend.load()
+    return backend
+
+
+# ========================
+# 측정
+# ========================
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _call(op, i: int, is_async: bool):
+    if is_async:
+        await op(i)
+    else:
+        op(i)
+
+
+async def measure(op, iterations: int, batch: int = 1) -> dict:
+    """op(i) 를 iterations 번 실행 (batch 번씩 묶어 한 표본으로 재서 타이머 오차를 줄임)"""
+    is_async = asyncio.iscoroutinefunction(op)
+    for i in range(min(batch, iterations)):
+        await _call(op, -1 - i, is_async)
+
+    samples = []
+    counter = itertools.count()
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(max(1, iterations // batch)):
+        t0 = time.perf_counter_ns()
+        for _ in range(batch):
+            await _call(op, next(counter), is_async)
+        samples.append((time.perf_counter_ns() - t0) / batch)
+    elapsed = time.perf_counter() - start
+    done = next(counter)
+
+    # 메모리는 별도 패스에서 (tracemalloc 이 측정을 느리게 하므로)
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(min(done, MEMORY_PASS)):
+        await _call(op, next(counter), is_async)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "iterations": done,
+        "ops_per_sec": done / elapsed if elapsed > 0 else 0.0,
+        "p50_us": percentile(samples, 0.50) / 1000,
+        "p99_us": percentile(samples, 0.99) / 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+# ========================
+# 시나리오
+# ========================
+
+def economy_scenarios(backend, n: int) -> dict:
+    """시나리오 이름 → (op, 반복 횟수, 묶음 크기)"""
+    existing = [BASE_ID + i for i in random.Random(7).sample(range(n), min(n, 10000))]
+    fresh = itertools.count(BASE_ID + n)
+    new_ids = itertools.count(BASE_ID + 2 * n + 10**6)
+
+    async def snapshot(i):
+        # 기존 save_data() 에 해당: 전체 유저를 직렬화해 원자적으로 저장
+        if isinstance(backend, SqliteBackend):
+            await backend.record_game_result(existing[i % len(existing)], "slot", 1)
+            await backend.flush()
+        else:
+            backend.store.mark_dirty()
+            await backend.store.flush()
+
+    async def get_user_hit(i):
+        await backend.get_user(existing[i % len(existing)])
+
+    async def get_user_miss(i):
+        await backend.get_user(next(fresh))
+
+    async def create_user(i):
+        await backend.record_game_result(next(new_ids), "dice", 5, won=True)
+
+    async def record_result(i):
+        await backend.record_game_result(existing[i % len(existing)], "slot", -BET)
+
+    async def leaderboard(i):
+        await backend.top_balances(10)
+
+    async def rank(i):
+        await backend.rank(existing[i % len(existing)])
+
+    snapshot_iters = max(3, min(50, 2_000_000 // n))
+    return {
+        "snapshot": (snapshot, snapshot_iters, 1),
+        "get_user_hit": (get_user_hit, 20000, 100),
+        "get_user_miss": (get_user_miss, 20000, 100),
+        "create_user": (create_user, 20000, 100),
+        "record_result": (record_result, 20000, 100),
+        "leaderboard": (leaderboard, 5000, 10),
+        "rank": (rank, 20000, 100),
+    }
+
+
+def blackjack_scenarios() -> dict:
+    rng = random.Random(3)
+    hands = [[rng.choice([11, 10, 10, 10] + list(range(2, 10))) for _ in range(rng.randrange(2, 6))] for _ in range(1024)]
+
+    def build(i):
+        Hand(hands[i & 1023])
+
+    def hit(i):
+        # 게임에서처럼 두 장으로 시작해 한 장씩 받으며 합계 / 버스트 확인
+        cards = hands[i & 1023]
+        hand = Hand(cards[:2])
+        for card in cards[2:]:
+            if hand.add(card) > 21:
+                break
+        hand.is_blackjack
+
+    return {
+        "hand_build": (build, 200000, 1000),
+        "hand_hit": (hit, 200000, 1000),
+    }
+
+
+def load_index(workdir: str):
+    """게임 화면 시나리오용 index 모듈 (임시 디렉터리에서 불러와 실제 데이터 파일을 건드리지 않음)"""
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import index
+    except ImportError as e:
+        print(f"⚠️ 게임 화면 시나리오 건너뜀 ({e})")
+        return None
+    finally:
+        os.chdir(cwd)
+    return index
+
+
+def view_scenarios(index, backend, n: int) -> dict:
+    # DM (서버 없음) 경제를 벤치마크용 저장소로 교체
+    index.economies.adopt(GuildEconomy(None, backend))
+    players = [FakeUser(BASE_ID + i) for i in range(min(n, 1000))]
+
+    def game(command, button_name):
+        async def play(i):
+            interaction = FakeInteraction(players[i % len(players)], channel_id=i % 50)
+            await run_command(index, command, interaction, BET)
+            view = interaction.message.view
+            await getattr(view, button_name).callback(interaction.for_message())
+        return play
+
+    return {
+        "view_slot": (game(index.slot_cmd, "spin_button"), 5000, 10),
+        "view_dice": (game(index.dice_cmd, "roll_button"), 5000, 10),
+        "view_coinflip": (game(index.coinflip_cmd, "heads_button"), 5000, 10),
+        "view_blackjack": (game(index.blackjack_cmd, "stand_button"), 5000, 10),
+    }
+
+
+# ========================
+# 실행
+# ========================
+
+async def run_size(kind: str, workdir: str, n: int, only: set, index) -> list[dict]:
+    build_start = time.perf_counter()
+    backend = open_backend(kind, workdir, n)
+    build_s = time.perf_counter() - build_start
+    await backend.start()
+
+    scenarios = economy_scenarios(backend, n)
+    if index is not None:
+        scenarios.update(view_scenarios(index, backend, n))
+
+    results = []
+    try:
+        for name, (op, iterations, batch) in scenarios.items():
+            if only and name not in only:
+                continue
+            result = await measure(op, iterations, batch)
+            result.update(scenario=name, users=n, backend=kind, load_s=build_s)
+            results.append(result)
+            print(
+                f"{name:<18}{n:>10,}{result['ops_per_sec']:>14,.0f}{result['p50_us']:>11.1f}"
+                f"{result['p99_us']:>11.1f}{result['peak_kb']:>12,.0f}"
+            )
+    finally:
+        await backend.close()
+    return results
+
+
+async def run(args) -> list[dict]:
+    sizes = [int(v) for v in args.users.split(",") if v.strip()]
+    only = {v.strip() for v in args.only.split(",") if v.strip()}
+
+    print(f"{'시나리오':<16}{'유저 수':>10}{'ops/sec':>14}{'p50(µs)':>11}{'p99(µs)':>11}{'peak(KB)':>12}")
+    results = []
+    for name, (op, iterations, batch) in blackjack_scenarios().items():
+        if only and name not in only:
+            continue
+        result = await measure(op, iterations, batch)
+        result.update(scenario=name, users=0, backend="-")
+        results.append(result)
+        print(
+            f"{name:<18}{'-':>10}{result['ops_per_sec']:>14,.0f}{result['p50_us']:>11.3f}"
+            f"{result['p99_us']:>11.3f}{result['peak_kb']:>12,.0f}"
+        )
+
+    with tempfile.TemporaryDirectory(prefix="bench_hotpaths_") as workdir:
+        index = None if args.no_views else load_index(workdir)
+        for n in sizes:
+            results += await run_size(args.backend, workdir, n, only, index)
+    return results
+
+
+def compare(results: list[dict], baseline_path: str, tolerance: float) -> list[str]:
+    """기준 결과보다 ops/sec 가 tolerance 이상 떨어진 시나리오"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["scenario"], r["users"], r["backend"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        base = baseline.get((r["scenario"], r["users"], r["backend"]))
+        if base is None or base["ops_per_sec"] <= 0:
+            continue
+        ratio = r["ops_per_sec"] / base["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{r['scenario']} ({r['users']:,}명): {base['ops_per_sec']:,.0f} → {r['ops_per_sec']:,.0f} ops/sec ({ratio:.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경제 / 게임 핫패스 마이크로 벤치마크")
+    parser.add_argument("--users", default="1000,100000", help="쉼표로 구분한 유저 수 목록 (예: 1000,100000,1000000)")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--only", default="", help="실행할 시나리오 (쉼표로 구분)")
+    parser.add_argument("--no-views", action="store_true", help="게임 화면 시나리오 제외")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용하는 ops/sec 감소 비율")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.json:
+        payload = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": int(time.time()),
+            },
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.json}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ 성능 저하 {len(regressions)}건 (허용 {args.tolerance:.0%})")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n✅ 기준 대비 성능 저하 없음")
+
+
+if __name__ == "__main__":
+    main()
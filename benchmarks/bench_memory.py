@@ -0,0 +1,73 @@
+"""유저 데이터 메모리 사용량 비교: 기존 중첩 dict vs UserRecord (__slots__)
+
+사용법:
+    python benchmarks/bench_memory.py [--users 1000000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from records import UserRecord, new_stats  # noqa: E402
+
+
+def build_dict_layout(n: int, rng: random.Random) -> dict:
+    """기존 economy_data["users"] 형식 (문자열 키 + 중첩 dict)"""
+    users = {}
+    for user_id in range(n):
+        stats = new_stats()
+        stats["slot"]["played"] = rng.randrange(500)
+        stats["slot"]["won"] = rng.randrange(200)
+        users[str(10**17 + user_id)] = {"balance": rng.randrange(10**6), "stats": stats}
+    return users
+
+
+def build_record_layout(n: int, rng: random.Random) -> dict:
+    """UserRecord 형식 (int 키 + __slots__ 레코드)"""
+    users = {}
+    for user_id in range(n):
+        record = UserRecord(rng.randrange(10**6))
+        record.slot_played = rng.randrange(500)
+        record.slot_won = rng.randrange(200)
+        users[10**17 + user_id] = record
+    return users
+
+
+def measure(builder, n: int) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    users = builder(n, random.Random(42))
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del users
+    gc.collect()
+    return {"bytes": current, "peak": peak, "per_user": current / n, "build_s": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유저 데이터 레이아웃별 메모리 비교")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    results = {
+        "dict": measure(build_dict_layout, args.users),
+        "record": measure(build_record_layout, args.users),
+    }
+
+    print(f"유저 수: {args.users:,}")
+    print(f"{'레이아웃':<10}{'메모리(MB)':>14}{'유저당(B)':>12}{'생성(s)':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['bytes'] / 2**20:>14.1f}{r['per_user']:>12.0f}{r['build_s']:>10.2f}")
+    ratio = results["dict"]["bytes"] / results["record"]["bytes"]
+    print(f"\nUserRecord 가 기존 dict 대비 {ratio:.1f}배 작음")
+
+
+if __name__ == "__main__":
+    main()
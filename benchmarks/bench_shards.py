@@ -0,0 +1,237 @@
+"""샤드 프로세스 수에 따른 처리량: 경제 서비스 하나 + 봇 프로세스 N개
+
+사용법:
+    python benchmarks/bench_shards.py [--shards 1,2,4] [--players 200] [--duration 10] [--json result.json]
+
+임시 디렉터리에서 economy_service.py 를 띄우고, 샤드 수마다 그만큼의 워커 프로세스를 동시에 실행한다.
+워커는 ECONOMY_SERVICE 를 설정한 채 index.py 를 불러와, 자기 샤드의 서버들에서 가상 유저가
+게임 명령어 → 버튼 클릭을 쉬지 않고 반복하게 하고 판 수와 한 판 지연을 보고한다.
+비교용으로 서비스 없이 한 프로세스가 직접 저장하는 경우(local)도 잰다.
+
+워커마다 잔액 합계가 (시작 합계 - 배팅금 + 지급액) 과 같은지 서비스에서 다시 읽어 확인한다.
+처리량은 CPU 코어 수만큼까지만 늘어난다 (os.cpu_count() 를 함께 출력).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from fakes import FakeGuild, FakeInteraction, FakeUser, run_command  # noqa: E402
+
+BASE_ID = 10**17
+GUILD_BASE = 10**16
+
+# 게임 명령어와 결과를 내는 버튼
+GAMES = (("슬롯", "spin_button"), ("주사위", "roll_button"), ("동전던지기", "heads_button"), ("블랙잭", "stand_button"))
+START_BALANCE = 10**9
+
+
+# ========================
+# 워커 (샤드 프로세스 하나)
+# ========================
+
+def pick(samples: list, q: float) -> float:
+    return samples[min(len(samples) - 1, int(q * len(samples)))] if samples else 0.0
+
+
+async def run_worker(args) -> dict:
+    import index
+    from load_sim import AuditedWallet
+
+    wallets = []
+
+    def audit(economy):
+        economy.wallet = AuditedWallet(economy.backend, economy.wallet.owner)
+        wallets.append(economy.wallet)
+
+    index.economies.on_load = audit
+    await index.bot.setup_hook()
+
+    commands = {cmd.name: cmd for cmd in index.bot.tree.get_commands()}
+    rng = random.Random(args.shard)
+    guilds = [FakeGuild(GUILD_BASE + args.shard * args.guilds + i) for i in range(args.guilds)]
+    players = [
+        (FakeUser(BASE_ID + args.shard * args.players + i), guilds[i % len(guilds)])
+        for i in range(args.players)
+    ]
+
+    # 시작 잔액 맞추기
+    initial_total = 0
+    for user, guild in players:
+        economy = await index.economies.get(guild.id)
+        current = (await economy.get_user(user.id))["balance"]
+        initial_total += (await economy.adjust_balance(user.id, START_BALANCE - current))["balance"]
+
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    async def player(user: FakeUser, guild: FakeGuild) -> None:
+        while time.time() < deadline:
+            name, button = rng.choice(GAMES)
+            start = time.perf_counter()
+            try:
+                interaction = FakeInteraction(user, channel_id=guild.id, guild=guild)
+                await run_command(index, commands[name], interaction, rng.choice((10, 50, 100)))
+                view = interaction.message.view
+                await getattr(view, button).callback(interaction.for_message())
+            except Exception as e:
+                key = f"{name}: {type(e).__name__}"
+                errors[key] = errors.get(key, 0) + 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # 모든 워커가 같은 시각에 시작
+    await asyncio.sleep(max(0.0, args.start_at - time.time()))
+    deadline = time.time() + args.duration
+    started = time.perf_counter()
+    await asyncio.gather(*(player(user, guild) for user, guild in players))
+    elapsed = time.perf_counter() - started
+
+    final_total = 0
+    for user, guild in players:
+        economy = await index.economies.get(guild.id)
+        final_total += (await economy.get_user(user.id))["balance"]
+    staked = sum(wallet.staked for wallet in wallets)
+    returned = sum(wallet.returned for wallet in wallets)
+    service = index.service_client.stats() if index.service_client is not None else {}
+
+    await index.economies.close()
+    if index.service_client is not None:
+        await index.service_client.close()
+    await index.metrics.close()
+
+    latencies.sort()
+    return {
+        "shard": args.shard,
+        "rounds": len(latencies),
+        "elapsed_s": elapsed,
+        "p50_ms": pick(latencies, 0.50),
+        "p99_ms": pick(latencies, 0.99),
+        "conserved": final_total == initial_total - staked + returned,
+        "errors": errors,
+        "service": service,
+    }
+
+
+# ========================
+# 실행
+# ========================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("경제 서비스가 시작되지 않았습니다")
+
+
+def run_round(workdir: str, label: str, processes: int, service: str, args) -> dict:
+    env = dict(os.environ, METRICS_PORT="0", ECONOMY_SERVICE=service)
+    start_at = time.time() + args.warmup
+    workers = []
+    for shard in range(processes):
+        cwd = os.path.join(workdir, f"{label}-{shard}")
+        os.makedirs(cwd, exist_ok=True)
+        workers.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--worker",
+             "--shard", str(shard), "--players", str(args.players), "--guilds", str(args.guilds),
+             "--duration", str(args.duration), "--start-at", str(start_at)],
+            cwd=cwd, env=dict(env, ECONOMY_OWNER=f"{label}-{shard}"), stdout=subprocess.PIPE, text=True,
+        ))
+    results = []
+    for worker in workers:
+        out, _ = worker.communicate()
+        if worker.returncode != 0:
+            raise RuntimeError(f"워커 실패 (종료 코드 {worker.returncode})")
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    rounds = sum(r["rounds"] for r in results)
+    elapsed = max(r["elapsed_s"] for r in results)
+    requests = sum(r["service"].get("requests", 0) for r in results)
+    ops = sum(r["service"].get("ops", 0) for r in results)
+    return {
+        "mode": label,
+        "processes": processes,
+        "rounds": rounds,
+        "rounds_per_sec": rounds / elapsed if elapsed else 0.0,
+        "p50_ms": max(r["p50_ms"] for r in results),
+        "p99_ms": max(r["p99_ms"] for r in results),
+        "avg_batch": ops / requests if requests else 0.0,
+        "conserved": all(r["conserved"] for r in results),
+        "errors": sum(sum(r["errors"].values()) for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="샤드 프로세스 수별 처리량 (경제 서비스 공유)")
+    parser.add_argument("--shards", default="1,2,4", help="쉼표로 구분한 샤드 프로세스 수 목록")
+    parser.add_argument("--players", type=int, default=200, help="프로세스당 가상 유저 수")
+    parser.add_argument("--guilds", type=int, default=20, help="프로세스당 서버 수")
+    parser.add_argument("--duration", type=float, default=10.0, help="측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="워커가 index.py 를 불러올 시간 (초)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    # 워커 전용
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--shard", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--start-at", type=float, default=0.0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(run_worker(args)), ensure_ascii=False))
+        return
+
+    sizes = [int(v) for v in args.shards.split(",") if v.strip()]
+    results = []
+    print(f"CPU {os.cpu_count()}개, 프로세스당 유저 {args.players}명 / 서버 {args.guilds}개, {args.duration:.0f}초씩")
+    print(f"{'방식':<9}{'프로세스':>8}{'판 수':>10}{'판/초':>10}{'p50(ms)':>9}{'p99(ms)':>9}{'묶음':>7}  잔액 보존")
+    with tempfile.TemporaryDirectory(prefix="bench_shards_") as workdir:
+        rows = [("local", 1, "")]
+        port = free_port()
+        service = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "economy_service.py"), "--listen", f"127.0.0.1:{port}"],
+            cwd=workdir, stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(port)
+            rows += [("service", n, f"127.0.0.1:{port}") for n in sizes]
+            for label, processes, address in rows:
+                r = run_round(workdir, label, processes, address, args)
+                results.append(r)
+                note = f" (오류 {r['errors']:,}건)" if r["errors"] else ""
+                print(
+                    f"{label:<9}{processes:>8}{r['rounds']:>10,}{r['rounds_per_sec']:>10,.0f}"
+                    f"{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['avg_batch']:>7.1f}  "
+                    f"{'✅' if r['conserved'] else '❌'}{note}"
+                )
+        finally:
+            service.terminate()
+            service.wait()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"cpu_count": os.cpu_count(), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.json}")
+    if not all(r["conserved"] and not r["errors"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
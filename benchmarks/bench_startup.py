@@ -0,0 +1,132 @@
+"""시작 시간 / 메모리 비교: JSON 스냅샷 vs 이진 스냅샷 (mmap + 지연 디코딩)
+
+사용법:
+    python benchmarks/bench_startup.py [--users 100000,1000000] [--json result.json]
+
+유저 수별로 같은 가짜 데이터를 두 형식으로 저장한 뒤 각각
+파일 크기, load() 시간과 최대 메모리(tracemalloc, mmap 페이지는 제외),
+처음 조회하는 유저의 get_user 지연, 순위 인덱스 생성 시간, 1000명 변경 후 스냅샷 저장 시간을 잰다.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_hotpaths import BASE_ID, synthetic_records  # noqa: E402
+from config import DEFAULT_MULTIPLIERS, DEFAULT_START_BALANCE  # noqa: E402
+from persistence import atomic_write  # noqa: E402
+from snapshot import encode_snapshot  # noqa: E402
+from storage import JsonBackend  # noqa: E402
+
+FORMATS = ("json", "binary")
+
+# 처음 조회(콜드) 지연을 잴 유저 수
+COLD_LOOKUPS = 1000
+
+
+def write_files(workdir: str, n: int) -> dict[str, str]:
+    items = list(synthetic_records(n))
+    paths = {}
+    for fmt in FORMATS:
+        path = paths[fmt] = os.path.join(workdir, f"startup_{n}.{'bin' if fmt == 'binary' else 'json'}")
+        if fmt == "binary":
+            payload = encode_snapshot(None, items, DEFAULT_MULTIPLIERS, 0)
+        else:
+            payload = JsonBackend._encode_snapshot((0, None, dict(items), DEFAULT_MULTIPLIERS, {}))
+        atomic_write(path, payload)
+    return paths
+
+
+def open_backend(fmt: str, path: str) -> JsonBackend:
+    return JsonBackend(path, path + ".journal", DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS, snapshot_format=fmt)
+
+
+async def measure(fmt: str, path: str, n: int) -> dict:
+    # 메모리 패스 (tracemalloc 은 느리므로 시간은 따로 잰다)
+    gc.collect()
+    tracemalloc.start()
+    backend = open_backend(fmt, path)
+    backend.load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    backend.users.replace_base(None)
+    del backend
+    gc.collect()
+
+    start = time.perf_counter()
+    backend = open_backend(fmt, path)
+    backend.load()
+    load_s = time.perf_counter() - start
+
+    ids = [BASE_ID + i for i in random.Random(3).sample(range(n), min(n, COLD_LOOKUPS))]
+    start = time.perf_counter()
+    for user_id in ids:
+        await backend.get_user(user_id)
+    cold_us = (time.perf_counter() - start) / len(ids) * 1e6
+
+    start = time.perf_counter()
+    await backend.top_balances(10)
+    index_s = time.perf_counter() - start
+
+    for user_id in ids:
+        await backend.record_game_result(user_id, "slot", 5, won=True)
+    start = time.perf_counter()
+    backend.store.flush_sync()
+    snapshot_s = time.perf_counter() - start
+
+    backend.users.replace_base(None)
+    return {
+        "format": fmt,
+        "users": n,
+        "file_mb": os.path.getsize(path) / 2**20,
+        "load_s": load_s,
+        "load_peak_mb": peak / 2**20,
+        "cold_get_us": cold_us,
+        "index_s": index_s,
+        "snapshot_s": snapshot_s,
+    }
+
+
+async def run(sizes: list[int]) -> list[dict]:
+    results = []
+    print(f"{'형식':<8}{'유저 수':>11}{'파일(MB)':>10}{'load(s)':>9}{'peak(MB)':>10}"
+          f"{'첫 조회(µs)':>12}{'순위(s)':>9}{'저장(s)':>9}")
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as workdir:
+        for n in sizes:
+            paths = write_files(workdir, n)
+            for fmt in FORMATS:
+                r = await measure(fmt, paths[fmt], n)
+                results.append(r)
+                print(
+                    f"{fmt:<8}{n:>11,}{r['file_mb']:>10.1f}{r['load_s']:>9.3f}{r['load_peak_mb']:>10.1f}"
+                    f"{r['cold_get_us']:>12.1f}{r['index_s']:>9.3f}{r['snapshot_s']:>9.3f}"
+                )
+                gc.collect()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON / 이진 스냅샷 시작 시간 비교")
+    parser.add_argument("--users", default="100000,1000000", help="쉼표로 구분한 유저 수 목록")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    sizes = [int(v) for v in args.users.split(",") if v.strip()]
+    results = asyncio.run(run(sizes))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
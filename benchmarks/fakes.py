@@ -0,0 +1,136 @@
+"""Discord 게이트웨이 없이 명령어 / 버튼 콜백을 실행하기 위한 대역 객체
+
+게임 화면이 실제로 사용하는 속성과 메서드만 흉내낸다:
+    interaction.user / channel_id / guild(_id) / response.* / followup.send / original_response()
+응답은 호출 기록만 남기며, latency 인자로 Discord API 왕복 시간을 흉내낼 수 있다.
+"""
+import asyncio
+import itertools
+from typing import Optional
+
+_ids = itertools.count(1)
+
+
+class FakeUser:
+    def __init__(self, user_id: int, name: Optional[str] = None):
+        self.id = user_id
+        self.name = name or f"user{user_id}"
+        self.display_name = self.name
+        self.mention = f"<@{user_id}>"
+        self.bot = False
+
+    def __eq__(self, other) -> bool:
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+
+    def get_member(self, user_id: int):
+        return None
+
+
+class FakeMessage:
+    def __init__(self, content: Optional[str] = None, view=None, latency: float = 0.0):
+        self.id = next(_ids)
+        self.content = content
+        self.view = view
+        self.latency = latency
+        self.edits = 0
+
+    async def edit(self, content: Optional[str] = None, view=None, **kwargs) -> "FakeMessage":
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if content is not None:
+            self.content = content
+        self.view = view
+        self.edits += 1
+        return self
+
+
+class FakeResponse:
+    """discord.InteractionResponse 대역 (한 번만 응답 가능)"""
+
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self) -> None:
+        if self._done:
+            raise RuntimeError("이미 응답한 interaction 입니다")
+        self._done = True
+        if self._interaction.latency:
+            await asyncio.sleep(self._interaction.latency)
+
+    async def send_message(self, content: Optional[str] = None, view=None, ephemeral: bool = False, embed=None, **kwargs) -> None:
+        await self._respond()
+        self._interaction.message = FakeMessage(content, view, self._interaction.latency)
+        self._interaction.sent.append(content if content is not None else embed)
+
+    async def edit_message(self, content: Optional[str] = None, view=None, **kwargs) -> None:
+        await self._respond()
+        message = self._interaction.message
+        if message is not None:
+            if content is not None:
+                message.content = content
+            message.view = view
+        self._interaction.sent.append(content)
+
+    async def defer(self, ephemeral: bool = False, thinking: bool = False) -> None:
+        await self._respond()
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+
+    async def send(self, content: Optional[str] = None, view=None, ephemeral: bool = False, embed=None, **kwargs) -> FakeMessage:
+        if self._interaction.latency:
+            await asyncio.sleep(self._interaction.latency)
+        self._interaction.sent.append(content if content is not None else embed)
+        return FakeMessage(content, view, self._interaction.latency)
+
+
+class FakeInteraction:
+    """discord.Interaction 대역
+
+    버튼 클릭은 같은 message 를 가진 새 FakeInteraction 으로 흉내낸다 (for_message).
+    """
+
+    def __init__(self, user: FakeUser, channel_id: int = 1, guild=None, latency: float = 0.0,
+                 message: Optional[FakeMessage] = None):
+        self.id = next(_ids)
+        self.user = user
+        self.channel_id = channel_id
+        self.guild = guild
+        self.guild_id = getattr(guild, "id", None)
+        self.latency = latency
+        self.message = message
+        self.sent: list = []
+        self.extras: dict = {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+    async def original_response(self) -> FakeMessage:
+        if self.message is None:
+            raise RuntimeError("아직 응답하지 않은 interaction 입니다")
+        return self.message
+
+    def for_message(self, user: Optional[FakeUser] = None) -> "FakeInteraction":
+        """같은 메시지의 버튼을 누르는 다음 interaction"""
+        return FakeInteraction(user or self.user, self.channel_id, self.guild, self.latency, self.message)
+
+
+async def run_command(index, command, interaction: FakeInteraction, *args) -> None:
+    """CommandTree 처럼 슬래시 명령어를 실행하고, 끝나면 명령어가 붙잡은 서버 경제를 놓는다"""
+    try:
+        await command.callback(interaction, *args)
+    finally:
+        index.release_economy(interaction)
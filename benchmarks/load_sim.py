@@ -0,0 +1,371 @@
+"""동시 접속 부하 시뮬레이터 (Discord 게이트웨이 없이 실제 명령어 / 버튼 콜백 실행)
+
+사용법:
+    python benchmarks/load_sim.py [--players 2000] [--duration 60] [--think 3.0] [--time-scale 1.0]
+                                  [--api-latency 0.08] [--backend json|sqlite] [--json result.json]
+
+index.py 를 임시 디렉터리에서 불러와 bot.tree 에 등록된 슬래시 명령어와 게임 화면의 버튼 콜백을
+benchmarks/fakes.py 의 대역 Interaction 으로 호출한다. 가상 유저는 생각 시간(지수 분포)을 두고
+명령어를 입력하고 버튼을 누르며, 일부는 버튼을 두 번 누르거나(동시 클릭) 게임을 방치한다(시간 초과).
+
+측정 항목:
+    - 명령어 / 버튼별 응답 지연시간 (p50 / p95 / p99 / 최대)
+    - 이벤트 루프 지연 (주기적으로 sleep 해서 늦게 깨어난 시간)
+    - 저장소 통계 (스냅샷 / 저널 fsync / 커밋 최대 소요 시간)
+    - 잔액 불변식: 최종 잔액 합계 = 시작 합계 - 배팅금 + 지급액, 음수 잔액 없음,
+      남은 에스크로 없음, 재시작(디스크에서 다시 불러오기) 후 잔액 일치
+
+불변식이 하나라도 깨지면 종료 코드 1 로 끝난다. discord.py 가 필요하다.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import traceback
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fakes import FakeInteraction, FakeUser, run_command  # noqa: E402
+from wallet import Wallet  # noqa: E402
+
+BASE_ID = 10**17
+
+# 명령어별 선택 비중
+GAME_WEIGHTS = {"슬롯": 4, "주사위": 3, "동전던지기": 3, "블랙잭": 3}
+INFO_COMMANDS = ("잔액", "내순위", "리더보드")
+INFO_RATE = 0.08
+
+GAME_BUTTONS = {"슬롯": "spin_button", "주사위": "roll_button"}
+
+# 이벤트 루프 지연 측정 주기 (초)
+LAG_INTERVAL = 0.05
+
+
+class AuditedWallet(Wallet):
+    """배팅금 / 지급액을 따로 합산해 잔액 보존을 검증하기 위한 지갑"""
+
+    def __init__(self, backend, owner=""):
+        super().__init__(backend, owner)
+        self.staked = 0
+        self.returned = 0
+        self.duplicate_settles = 0
+
+    async def escrow(self, user_id, game, amount):
+        escrow = await super().escrow(user_id, game, amount)
+        self.staked += amount
+        return escrow
+
+    async def add_stake(self, escrow, amount):
+        await super().add_stake(escrow, amount)
+        self.staked += amount
+
+    async def settle(self, escrow, delta, won=0, rounds=1):
+        amount = escrow.amount
+        result = await super().settle(escrow, delta, won=won, rounds=rounds)
+        if result is None:
+            self.duplicate_settles += 1
+        else:
+            self.returned += amount + delta
+        return result
+
+    async def refund(self, escrow):
+        amount = escrow.amount
+        refunded = await super().refund(escrow)
+        if refunded:
+            self.returned += amount
+        return refunded
+
+
+def summarize(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {
+        "count": len(samples),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": samples[-1],
+    }
+
+
+class LoadSimulation:
+    def __init__(self, index, args):
+        self.index = index
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.commands = {cmd.name: cmd for cmd in index.bot.tree.get_commands()}
+        self.users = [FakeUser(BASE_ID + i) for i in range(args.players)]
+        self.economy = None  # run() 에서 기존 (None) 경제로 설정
+
+        self.latencies: dict[str, list] = collections.defaultdict(list)
+        self.loop_lag: list = []
+        self.errors: collections.Counter = collections.Counter()
+        self.error_samples: list = []
+        self.rejected = 0
+        self.rounds = 0
+        self.double_clicks = 0
+        self.abandoned = 0
+        self.expiries: list = []
+        self.deadline = 0.0
+
+    # ---------- 시간 ----------
+
+    def think(self, mean: float) -> float:
+        return self.rng.expovariate(1 / mean) * self.args.time_scale if mean > 0 else 0.0
+
+    async def timed(self, label: str, coro) -> None:
+        start = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            self.errors[f"{label}: {type(e).__name__}"] += 1
+            if len(self.error_samples) < 5:
+                self.error_samples.append(traceback.format_exc())
+            return
+        self.latencies[label].append((time.perf_counter() - start) * 1000)
+
+    async def monitor_loop_lag(self, stop: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            start = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.loop_lag.append((loop.time() - start - LAG_INTERVAL) * 1000)
+
+    # ---------- 가상 유저 ----------
+
+    def interaction(self, user: FakeUser) -> FakeInteraction:
+        return FakeInteraction(user, channel_id=self.rng.randrange(self.args.channels), latency=self.args.api_latency)
+
+    async def click(self, view, button_name: str, base: FakeInteraction) -> None:
+        button = getattr(view, button_name)
+        if view.is_finished() or button.disabled:
+            return
+        clicks = 1
+        if self.rng.random() < self.args.double_click:
+            clicks = 2
+            self.double_clicks += 1
+        label = f"click:{button_name}"
+        await asyncio.gather(*(self.timed(label, button.callback(base.for_message())) for _ in range(clicks)))
+
+    async def expire(self, view) -> None:
+        """방치된 게임의 시간 초과 (세션 레지스트리의 타이머 대신, time_scale 적용)"""
+        await asyncio.sleep(view.ttl * self.args.time_scale)
+        if not view.is_finished():
+            await self.timed("timeout", view.on_timeout())
+            view.stop()
+
+    async def play_blackjack(self, view, base: FakeInteraction) -> None:
+        while not view.is_finished() and time.perf_counter() < self.deadline + 30:
+            hand = view.player_hand
+            if len(hand) == 2 and hand.total in (10, 11) and not view.double_button.disabled and self.rng.random() < 0.5:
+                await self.click(view, "double_button", base)
+                return
+            if hand.total < 17:
+                await self.click(view, "hit_button", base)
+                await asyncio.sleep(self.think(self.args.think / 3))
+            else:
+                await self.click(view, "stand_button", base)
+                return
+
+    async def play(self, user: FakeUser, game: str) -> None:
+        interaction = self.interaction(user)
+        bet = self.rng.choice((10, 20, 50, 100, 200))
+        await self.timed(f"cmd:{game}", run_command(self.index, self.commands[game], interaction, bet))
+        view = getattr(interaction.message, "view", None)
+        if not isinstance(view, self.index.EscrowGameView):
+            self.rejected += 1
+            return
+        self.rounds += 1
+
+        if self.rng.random() < self.args.abandon:
+            self.abandoned += 1
+            self.expiries.append(asyncio.create_task(self.expire(view)))
+            return
+
+        await asyncio.sleep(self.think(self.args.think / 2))
+        if game == "블랙잭":
+            await self.play_blackjack(view, interaction)
+        elif game == "동전던지기":
+            await self.click(view, self.rng.choice(("heads_button", "tails_button")), interaction)
+        else:
+            await self.click(view, GAME_BUTTONS[game], interaction)
+
+    async def player(self, user: FakeUser) -> None:
+        # 접속 시점을 분산
+        await asyncio.sleep(self.rng.random() * self.think(self.args.think))
+        games = list(GAME_WEIGHTS)
+        weights = list(GAME_WEIGHTS.values())
+        while time.perf_counter() < self.deadline:
+            if self.rng.random() < INFO_RATE:
+                name = self.rng.choice(INFO_COMMANDS)
+                await self.timed(f"cmd:{name}", run_command(self.index, self.commands[name], self.interaction(user)))
+            else:
+                await self.play(user, self.rng.choices(games, weights)[0])
+            await asyncio.sleep(self.think(self.args.think))
+
+    # ---------- 실행 ----------
+
+    async def seed_players(self) -> int:
+        economy = self.economy.backend
+        names = {}
+        total = 0
+        for user in self.users:
+            current = (await economy.get_user(user.id))["balance"]
+            data = await economy.adjust_balance(user.id, self.args.start_balance - current)
+            total += data["balance"]
+            names[user.id] = (user.name, int(time.time()))
+        # 리더보드 이름은 저장소에 미리 기록해 REST 조회가 일어나지 않게 함
+        await economy.set_names(names)
+        return total
+
+    async def balances(self, economy) -> list[int]:
+        return [(await economy.get_user(user.id))["balance"] for user in self.users]
+
+    async def run(self) -> dict:
+        index = self.index
+        await index.bot.setup_hook()
+        # 가짜 interaction 은 서버가 없으므로 모두 기존 (None) 경제를 사용
+        self.economy = await index.economies.get(None)
+        self.economy.wallet = wallet = AuditedWallet(self.economy.backend, self.economy.wallet.owner)
+        initial_total = await self.seed_players()
+
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(self.monitor_loop_lag(stop))
+        started = time.perf_counter()
+        self.deadline = started + self.args.duration
+        await asyncio.gather(*(self.player(user) for user in self.users))
+        await asyncio.gather(*self.expiries)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+
+        final = await self.balances(self.economy.backend)
+        storage = self.economy.backend.stats()
+        # 지갑과 저장소 장부 모두에 남은 에스크로가 없어야 함
+        open_escrows = len(wallet.open) + len(await self.economy.backend.open_escrows())
+        await index.economies.close()
+
+        # 재시작 후에도 같은 잔액인지 (저널 / 스냅샷 / 커밋이 모두 반영되었는지)
+        reloaded = index.create_backend()
+        reloaded.load()
+        after_restart = await self.balances(reloaded)
+        open_escrows += len(await reloaded.open_escrows())
+        await reloaded.close()
+
+        expected_total = initial_total - wallet.staked + wallet.returned
+        invariants = {
+            "conservation": sum(final) == expected_total,
+            "no_negative_balance": min(final) >= 0,
+            "no_open_escrow": open_escrows == 0,
+            "durable_after_restart": after_restart == final,
+            "no_errors": not self.errors,
+        }
+        return {
+            "config": vars(self.args),
+            "elapsed_s": elapsed,
+            "rounds": self.rounds,
+            "rounds_per_sec": self.rounds / elapsed if elapsed else 0.0,
+            "rejected": self.rejected,
+            "double_clicks": self.double_clicks,
+            "duplicate_settles": wallet.duplicate_settles,
+            "abandoned": self.abandoned,
+            "latency": {label: summarize(v) for label, v in sorted(self.latencies.items())},
+            "loop_lag": summarize(self.loop_lag),
+            "storage": storage,
+            "wallet": wallet.stats(),
+            "coins": {
+                "initial_total": initial_total,
+                "staked": wallet.staked,
+                "returned": wallet.returned,
+                "expected_total": expected_total,
+                "final_total": sum(final),
+            },
+            "errors": dict(self.errors),
+            "invariants": invariants,
+        }
+
+
+def print_report(result: dict, error_samples: list) -> None:
+    print(
+        f"\n⏱️ {result['elapsed_s']:.1f}초 동안 {result['rounds']:,}판 "
+        f"({result['rounds_per_sec']:,.0f}판/초), 거절 {result['rejected']:,}건, "
+        f"동시 클릭 {result['double_clicks']:,}건, 방치 {result['abandoned']:,}건"
+    )
+    print(f"\n{'동작':<26}{'횟수':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'최대':>9}  (ms)")
+    for label, s in result["latency"].items():
+        print(f"{label:<28}{s['count']:>9,}{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{s['max_ms']:>9.1f}")
+    lag = result["loop_lag"]
+    if lag["count"]:
+        print(f"\n🔁 이벤트 루프 지연: p50 {lag['p50_ms']:.1f}ms / p99 {lag['p99_ms']:.1f}ms / 최대 {lag['max_ms']:.1f}ms")
+    print(f"💾 저장소: {json.dumps(result['storage'], ensure_ascii=False)}")
+
+    coins = result["coins"]
+    print(
+        f"🪙 시작 {coins['initial_total']:,} - 배팅 {coins['staked']:,} + 지급 {coins['returned']:,} "
+        f"= {coins['expected_total']:,} (실제 {coins['final_total']:,})"
+    )
+    if result["errors"]:
+        print(f"\n❌ 오류: {result['errors']}")
+        for sample in error_samples:
+            print(sample)
+    print()
+    for name, ok in result["invariants"].items():
+        print(f"{'✅' if ok else '❌'} {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 접속 부하 시뮬레이터")
+    parser.add_argument("--players", type=int, default=2000, help="가상 유저 수")
+    parser.add_argument("--duration", type=float, default=60.0, help="새 게임을 시작하는 시간 (초)")
+    parser.add_argument("--think", type=float, default=3.0, help="평균 생각 시간 (초)")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="생각 시간 / 화면 시간 초과 배율 (0.1 = 10배 빠르게)")
+    parser.add_argument("--api-latency", type=float, default=0.08, help="Discord API 응답 한 번에 걸리는 시간 (초)")
+    parser.add_argument("--channels", type=int, default=50, help="게임이 열리는 채널 수")
+    parser.add_argument("--double-click", type=float, default=0.03, help="버튼을 동시에 두 번 누르는 비율")
+    parser.add_argument("--abandon", type=float, default=0.02, help="게임을 방치하는 비율")
+    parser.add_argument("--start-balance", type=int, default=100_000)
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--save-interval", type=float, default=None, help="스냅샷 주기 (초, 기본은 config.py)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.json) if args.json else None
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="load_sim_") as workdir:
+        # 데이터 파일이 임시 디렉터리에 만들어지도록 실행 내내 작업 디렉터리를 옮겨둠
+        os.chdir(workdir)
+        os.environ["ECONOMY_BACKEND"] = args.backend
+        import config
+        if args.save_interval is not None:
+            config.SAVE_INTERVAL = args.save_interval
+        try:
+            import index
+        except ImportError as e:
+            print(f"❌ index.py 를 불러올 수 없습니다 ({e})")
+            sys.exit(1)
+
+        simulation = LoadSimulation(index, args)
+        try:
+            result = asyncio.run(simulation.run())
+        finally:
+            os.chdir(cwd)
+
+    print_report(result, simulation.error_samples)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {output}")
+    if not all(result["invariants"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
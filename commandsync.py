@@ -0,0 +1,64 @@
+import hashlib
+import json
+import time
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from persistence import atomic_write
+
+
+def tree_payload(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> list[dict]:
+    """Discord 에 업로드되는 형태 그대로의 명령어 목록 (이름 / 설명 / 매개변수 / 선택지 포함)"""
+    commands = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    return sorted(commands, key=lambda c: (c.get("type", 1), c["name"]))
+
+
+def tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    payload = json.dumps(tree_payload(tree, guild), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_hashes(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 명령어 동기화 기록을 읽지 못해 새로 만듭니다: {e}")
+        return {}
+
+
+async def sync_commands(
+    tree: app_commands.CommandTree,
+    application_id: int,
+    path: str,
+    guild_id: Optional[int] = None,
+    force: bool = False,
+) -> bool:
+    """명령어 트리가 마지막 동기화 이후 바뀐 경우에만 tree.sync() 호출
+
+    guild_id 를 주면 전역 명령어를 그 서버에 복사해 서버 단위로 동기화한다 (즉시 반영, 개발용).
+    해시는 (애플리케이션 ID, 대상) 별로 path 에 기록하므로 토큰을 바꾸면 다시 동기화된다.
+    동기화했으면 True.
+    """
+    start = time.perf_counter()
+    guild = discord.Object(id=guild_id) if guild_id else None
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+    scope = f"guild:{guild_id}" if guild is not None else "global"
+    key = f"{application_id}:{scope}"
+
+    digest = tree_hash(tree, guild)
+    hashes = _load_hashes(path)
+    if not force and hashes.get(key) == digest:
+        print(f"✅ 슬래시 커맨드 변경 없음 ({scope}, 확인 {(time.perf_counter() - start) * 1000:.1f}ms)")
+        return False
+
+    synced = await tree.sync(guild=guild)
+    hashes[key] = digest
+    atomic_write(path, json.dumps(hashes, indent=2).encode("utf-8"))
+    print(f"✅ 슬래시 커맨드 {len(synced)}개 동기화 완료 ({scope}, {(time.perf_counter() - start) * 1000:.0f}ms)")
+    return True
@@ -0,0 +1,238 @@
+import os
+
+# ========================
+# 저장소 설정
+# ========================
+
+# 저장소 종류: "json" (기본) 또는 "sqlite"
+STORAGE_BACKEND = os.getenv("ECONOMY_BACKEND", "json")
+
+# 데이터 파일 경로
+DATA_FILE = "economy_data.json"
+JOURNAL_FILE = "economy_journal.log"
+SQLITE_FILE = "economy.db"
+
+# 스냅샷 형식: "binary" (기본, 시작 시 헤더/인덱스만 읽고 유저는 필요할 때 디코딩) 또는 "json"
+# binary 인데 스냅샷 파일이 없으면 DATA_FILE (JSON) 을 불러온다
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "binary")
+BINARY_SNAPSHOT_FILE = "economy_data.bin"
+SNAPSHOT_FILE = BINARY_SNAPSHOT_FILE if SNAPSHOT_FORMAT == "binary" else DATA_FILE
+
+# 스냅샷(압축) 주기 (초) 및 즉시 압축을 유발하는 변경 횟수
+# 변경 사항은 저널에 먼저 기록되므로 스냅샷은 드물게 만들어도 된다
+SAVE_INTERVAL = 300.0
+SAVE_MAX_DIRTY = 10000
+
+# 저널 fsync 주기 (초)
+JOURNAL_FSYNC_INTERVAL = 0.2
+
+# SQLite 트랜잭션 커밋 주기 (초)
+SQLITE_COMMIT_INTERVAL = 0.5
+
+# ========================
+# 서버별 경제
+# ========================
+
+# 서버마다 GUILD_DATA_DIR/<서버 ID>/ 에 따로 저장 (위 파일 이름 그대로)
+GUILD_DATA_DIR = "guilds"
+
+# 기존 (서버 구분 전) 데이터를 계속 쓸 서버 ID. DM 에서의 명령어도 기존 데이터를 사용한다
+LEGACY_GUILD_ID = int(os.getenv("LEGACY_GUILD_ID", "0"))
+
+# 메모리에 올려둘 최대 서버 수와, 이 시간 (초) 동안 쓰지 않은 서버는 저장 후 내림
+GUILD_CACHE_SIZE = 100
+GUILD_IDLE_TTL = 1800.0
+
+# ========================
+# 서버 통계 (/서버통계)
+# ========================
+
+# 게임별 분 / 시간 / 일 단위 집계 파일 (서버 폴더마다 하나, 봇 프로세스가 직접 저장)
+ANALYTICS_FILE = "analytics.bin"
+
+# 일 단위 집계가 바뀌는 시간대 (UTC 기준 초, 한국 시간 자정)
+ANALYTICS_UTC_OFFSET = 9 * 3600
+
+# ========================
+# 배팅 기록 (/기록)
+# ========================
+
+# 서버 폴더 안에서 유저별 기록 파일을 둘 폴더
+HISTORY_DIR = "history"
+
+# 메모리에 둘 유저당 최근 기록 수와 유저 수 (서버마다, 넘치면 파일로 옮김)
+HISTORY_RING_SIZE = 20
+HISTORY_CACHE_USERS = 500
+
+# 유저당 파일에 남길 최대 기록 수와 /기록 한 페이지의 기록 수
+HISTORY_MAX_ENTRIES = 1000
+HISTORY_PAGE_SIZE = 10
+
+# ========================
+# 샤딩 / 경제 서비스
+# ========================
+
+# 전체 샤드 수 (0 이면 Discord 권장 값)와 이 프로세스가 맡을 샤드 ID 목록 (예: "0,1", 비우면 전부)
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))
+SHARD_IDS = [int(v) for v in os.getenv("SHARD_IDS", "").split(",") if v.strip()]
+
+# 여러 봇 프로세스가 함께 쓸 경제 서비스 주소 ("host:port", 비우면 이 프로세스가 직접 저장)
+ECONOMY_SERVICE = os.getenv("ECONOMY_SERVICE", "")
+
+# economy_service.py 가 기다릴 주소
+ECONOMY_SERVICE_LISTEN = os.getenv("ECONOMY_SERVICE_LISTEN", "127.0.0.1:7410")
+
+# 서비스 연결 수와 한 요청에 묶어 보낼 최대 연산 수
+ECONOMY_POOL_SIZE = 4
+ECONOMY_MAX_BATCH = 256
+
+# 이 봇 프로세스의 이름 (에스크로 장부에 남아, 재시작한 같은 프로세스만 자기 게임의 배팅금을 정리함)
+ECONOMY_OWNER = os.getenv(
+    "ECONOMY_OWNER", f"shards-{'-'.join(map(str, SHARD_IDS))}" if SHARD_IDS else "main"
+)
+
+# 봇 프로세스가 서비스에 살아 있음을 알리는 임대 시간(초). 이 시간 동안 갱신하지 않은
+# 프로세스의 에스크로는 다른 프로세스가 환불한다 (갱신은 1/3 간격)
+ECONOMY_LEASE_TTL = 120.0
+
+# ========================
+# 게임 세션 (재시작 후 복구)
+# ========================
+
+# 진행 중인 게임 화면의 상태 파일 (샤드 프로세스마다 따로, SESSION_FILE= 로 비우면 저장하지 않음)
+SESSION_FILE = os.getenv(
+    "SESSION_FILE", f"sessions-{'-'.join(map(str, SHARD_IDS))}.bin" if SHARD_IDS else "sessions.bin"
+)
+
+# 동시에 진행할 수 있는 최대 게임 수 (넘으면 가장 오래 쓰지 않은 게임부터 환불하고 종료)
+SESSION_MAX = 5000
+
+# 시간 초과 확인 / 바뀐 세션 저장 주기 (초)
+SESSION_SWEEP_INTERVAL = 1.0
+
+# ========================
+# 슬래시 커맨드 동기화
+# ========================
+
+# 마지막으로 동기화한 명령어 트리 해시 기록 (바뀌었을 때만 다시 업로드)
+COMMAND_SYNC_FILE = "command_sync.json"
+
+# 개발용 서버 ID (설정하면 전역 대신 이 서버에만 동기화, 즉시 반영됨)
+DEV_GUILD_ID = int(os.getenv("DEV_GUILD_ID", "0"))
+
+# "1" 이면 해시와 관계없이 시작할 때 한 번 동기화
+COMMAND_SYNC_FORCE = os.getenv("COMMAND_SYNC_FORCE", "0") == "1"
+
+# ========================
+# 유저 이름 캐시 (리더보드)
+# ========================
+
+NAME_CACHE_SIZE = 10000       # 최대 캐시 항목 수
+NAME_CACHE_TTL = 3600.0       # 이름 재조회 주기 (초)
+NAME_FETCH_CONCURRENCY = 4    # 동시에 보낼 REST 조회 수
+
+# ========================
+# 경제 설정
+# ========================
+
+# 기본 시작 잔액
+DEFAULT_START_BALANCE = 1000
+
+# 블랙잭 슈 설정 (덱 수, 다시 섞기 전까지 사용할 비율)
+BLACKJACK_DECKS = 6
+BLACKJACK_PENETRATION = 0.75
+
+# 블랙잭 화면에 기대값 기준 추천 행동(힌트) 버튼 표시
+BLACKJACK_HINTS = True
+
+# 힌트용 기대값 표를 메모리에 둘 최대 배율 조합 수 (배율이 같은 서버끼리는 표 하나를 같이 씀)
+BLACKJACK_SOLVER_CACHE_SIZE = 16
+
+# 블랙잭 테이블 (/블랙잭테이블): 좌석 수, 배팅 대기 시간 (초), 차례마다 자동 스탠드까지의 시간 (초)
+BLACKJACK_TABLE_SEATS = 5
+BLACKJACK_TABLE_JOIN_SECONDS = 15.0
+BLACKJACK_TABLE_TURN_SECONDS = 30.0
+
+# 테이블 메시지 수정을 모아 보낼 간격 (초, 클릭마다 수정하지 않음)
+BLACKJACK_TABLE_EDIT_DELAY = 1.0
+
+# /슬롯, /동전던지기 의 횟수 옵션으로 한 번에 진행할 수 있는 최대 판 수
+BATCH_MAX_ROUNDS = 100
+
+# 기본 배율 설정
+DEFAULT_MULTIPLIERS = {
+    "slot": {
+        "jackpot": 10,  # 3개 모두 일치
+        "two_match": 2  # 2개 일치
+    },
+    "dice": {
+        "win": 2  # 승리 시
+    },
+    "blackjack": {
+        "win": 2,  # 일반 승리
+        "blackjack": 2.5  # 블랙잭으로 승리 (21)
+    },
+    "coinflip": {
+        "win": 2  # 승리 시
+    }
+}
+
+# ========================
+# 관리자 일괄 명령어
+# ========================
+
+# 서버 멤버 인텐트 ("1" 이면 사용, 개발자 포털에서 Server Members Intent 도 켜야 함)
+# /일괄지급, /일괄초기화 의 역할 대상은 멤버 목록이 필요하므로 이 설정이 있어야 한다
+MEMBERS_INTENT = os.getenv("MEMBERS_INTENT", "0") == "1"
+
+# 결과 보고서(CSV)를 보낼 때 embed 에 직접 보여줄 최대 유저 수
+BULK_PREVIEW_USERS = 10
+
+# ========================
+# 속도 제한
+# ========================
+
+# 유저별 토큰 버킷 (초당 회복 횟수, 연속으로 쓸 수 있는 최대 횟수)
+# 슬래시 명령어는 이름으로, 게임 화면 버튼은 "button" 으로 찾고 없으면 기본값
+RATE_LIMITS_ENABLED = os.getenv("RATE_LIMITS", "1") == "1"
+RATE_LIMIT_DEFAULT = (1.0, 5)
+RATE_LIMITS = {
+    "블랙잭": (0.5, 3),
+    "button": (5.0, 10),
+}
+
+# True 면 같은 유저라도 서버마다 따로 제한
+RATE_LIMIT_PER_GUILD = False
+
+# 이 시간 (초) 동안 쓰지 않은 유저의 버킷은 지움
+RATE_LIMIT_IDLE_TTL = 300.0
+
+# ========================
+# RTP 시뮬레이션
+# ========================
+
+# /배율설정 미리보기에서 변경 전/후 각각 시뮬레이션할 판 수
+RTP_PREVIEW_ROUNDS = 2_000_000
+
+# ========================
+# 지표 (Prometheus)
+# ========================
+
+# /metrics 엔드포인트 주소 (METRICS_PORT=0 이면 끔)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# 이벤트 루프 지연 측정 주기 (초)
+METRICS_LAG_INTERVAL = 0.5
+
+# ========================
+# 프로파일러 (/프로파일)
+# ========================
+
+# 스택 샘플링 간격 (초)과 루프 블로킹으로 기록할 최소 시간 (초)
+PROFILE_INTERVAL = 0.005
+PROFILE_BLOCK_THRESHOLD = 0.1
+
+# 결과 파일(.folded / .txt)을 저장할 폴더와 한 번에 실행할 수 있는 최대 시간 (초)
+PROFILE_DIR = "profiles"
+PROFILE_MAX_SECONDS = 120
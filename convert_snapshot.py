@@ -0,0 +1,61 @@
+"""경제 데이터 스냅샷 형식 변환 도구 (JSON ↔ 이진)
+
+사용법:
+    python convert_snapshot.py --to binary [--input economy_data.json] [--output economy_data.bin]
+    python convert_snapshot.py --to json [--input economy_data.bin] [--output economy_data.json]
+
+원본 형식은 파일 내용으로 판별하며, 저널(--journal)의 변경 사항까지 반영해 저장한다.
+봇을 종료한 상태에서 실행할 것.
+"""
+import argparse
+import os
+import sys
+import time
+
+from config import BINARY_SNAPSHOT_FILE, DATA_FILE, DEFAULT_MULTIPLIERS, DEFAULT_START_BALANCE, JOURNAL_FILE
+from persistence import atomic_write
+from snapshot import encode_snapshot, is_binary
+from storage import JsonBackend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="경제 데이터 스냅샷 JSON ↔ 이진 변환")
+    parser.add_argument("--to", choices=("binary", "json"), required=True, help="저장할 형식")
+    parser.add_argument("--input", help="원본 스냅샷 경로 (기본: 반대 형식의 기본 파일)")
+    parser.add_argument("--output", help="대상 경로 (기본: 해당 형식의 기본 파일)")
+    parser.add_argument("--journal", default=JOURNAL_FILE, help="함께 적용할 저널 경로")
+    parser.add_argument("--force", action="store_true", help="대상 파일이 있어도 덮어쓰기")
+    args = parser.parse_args()
+
+    source_path = args.input or (DATA_FILE if args.to == "binary" else BINARY_SNAPSHOT_FILE)
+    target_path = args.output or (BINARY_SNAPSHOT_FILE if args.to == "binary" else DATA_FILE)
+    if not os.path.exists(source_path):
+        print(f"❌ 원본 데이터가 없습니다: {source_path}")
+        sys.exit(1)
+    if os.path.exists(target_path) and not args.force:
+        print(f"❌ 대상 파일이 이미 있습니다: {target_path} (--force 로 덮어쓰기)")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    source = JsonBackend(source_path, args.journal, DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS)
+    source.load()
+    loaded = time.perf_counter() - start
+
+    items = list(source.users.items())
+    multipliers = source.get_multipliers()
+    if args.to == "binary":
+        payload = encode_snapshot(None, items, multipliers, source.journal_seq, source.escrows)
+    else:
+        payload = JsonBackend._encode_snapshot((source.journal_seq, None, dict(items), multipliers, source.escrows))
+    atomic_write(target_path, payload)
+
+    elapsed = time.perf_counter() - start
+    kind = "이진" if is_binary(source_path) else "JSON"
+    print(
+        f"✅ 유저 {len(items):,}명: {source_path} ({kind}, {os.path.getsize(source_path) / 2**20:.1f}MB) → "
+        f"{target_path} ({len(payload) / 2**20:.1f}MB), 불러오기 {loaded:.2f}초 / 전체 {elapsed:.2f}초"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""여러 봇 프로세스(샤드)가 함께 쓰는 경제 서비스
+
+사용법:
+    python economy_service.py [--listen 127.0.0.1:7410]
+    ECONOMY_SERVICE=127.0.0.1:7410 SHARD_COUNT=4 SHARD_IDS=0,1 python index.py
+
+서비스 프로세스만 경제 데이터 파일을 열고, 봇 프로세스는 RemoteBackend 로 요청만 보낸다.
+프로토콜은 TCP 위의 줄 단위 JSON:
+    요청  {"id": 1, "ops": [[연산, 서버 ID 또는 null, [인자...]], ...]}
+    응답  {"id": 1, "results": [[true, 결과] 또는 [false, "오류"], ...]}
+
+한 요청의 연산은 순서대로 실행되며, 저장소의 각 연산(배팅금 차감 등)은 실행 중에
+다른 요청이 끼어들지 않으므로 원자적이다. 클라이언트는 같은 루프 차례에 나온 연산을
+한 요청으로 묶고, 연결 여러 개를 돌아가며 사용한다.
+
+배팅금 차감 / 정산에는 에스크로 ID (와 차감 번호) 가 함께 가고, 저장소의 에스크로 장부가
+이미 반영된 요청을 걸러낸다. 그래서 응답 전에 연결이 끊긴 요청은 다시 보내도 한 번만 반영된다.
+
+장부의 에스크로에는 연 봇 프로세스의 이름이 남는다. 봇 프로세스는 살아 있는 동안 임대를
+갱신하고 (renew_lease), 서버 경제를 불러올 때 다른 프로세스의 에스크로는 그 프로세스의
+임대가 끝났을 때만 환불한다 (live_owners). 그래서 여러 프로세스가 함께 쓰는 경제(DM 등)에서
+다른 샤드가 진행 중인 게임의 배팅금을 돌려주지 않는다.
+"""
+import argparse
+import asyncio
+import copy
+import itertools
+import json
+import signal
+import time
+from typing import Optional
+
+from persistence import BackgroundLoop
+from storage import EconomyBackend
+
+# 서비스가 실행하는 저장소 연산
+OPS = frozenset({
+    "get_user", "get_multipliers", "top_balances", "rank", "get_names", "set_names",
+    "record_game_result", "debit_stake", "open_escrows", "adjust_balance", "reset_user", "bulk_update",
+    "set_multiplier", "stats",
+})
+
+# 서버 경제와 상관없이 서비스가 직접 처리하는 연산 (봇 프로세스 임대)
+LEASE_OPS = frozenset({"renew_lease", "live_owners"})
+
+# 한 줄(요청 / 응답)의 최대 크기
+MAX_FRAME = 16 * 2**20
+
+
+class ServiceUnavailable(ConnectionError):
+    """경제 서비스에 연결할 수 없거나 응답 전에 연결이 끊김"""
+
+
+class ServiceError(RuntimeError):
+    """서비스에서 연산이 실패함"""
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+# ========================
+# 서버
+# ========================
+
+class EconomyService:
+    """GuildRegistry 의 저장소 연산을 소켓으로 제공"""
+
+    def __init__(self, registry, lease_ttl: float = 120.0):
+        self.registry = registry
+        self.lease_ttl = lease_ttl
+        # 봇 프로세스 이름 → 임대 만료 시각 (monotonic)
+        self.leases: dict[str, float] = {}
+        self.started = time.monotonic()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+        # 통계
+        self.connections = 0
+        self.requests = 0
+        self.ops = 0
+        self.errors = 0
+        self.max_batch = 0
+
+    async def start(self, host: str, port: int) -> None:
+        await self.registry.start()
+        self._server = await asyncio.start_server(self._handle, host, port, limit=MAX_FRAME)
+        print(f"🏦 경제 서비스 시작: {host}:{port}")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # 열려 있는 연결도 끊어야 저장 후에 요청이 들어오지 않음
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.registry.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                ops = request["ops"]
+                self.requests += 1
+                self.max_batch = max(self.max_batch, len(ops))
+                results = [await self._execute(*op) for op in ops]
+                writer.write(_encode({"id": request["id"], "results": results}))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ 경제 서비스 연결 종료: {type(e).__name__}: {e}")
+        finally:
+            self.connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _execute(self, method: str, guild_id: Optional[int], args: list) -> list:
+        self.ops += 1
+        if method in LEASE_OPS:
+            return [True, getattr(self, method)(*args)]
+        if method not in OPS:
+            self.errors += 1
+            return [False, f"알 수 없는 연산: {method}"]
+        try:
+            backend = (await self.registry.get(guild_id)).backend
+            if method == "get_multipliers":
+                result = backend.get_multipliers()
+            elif method == "stats":
+                result = {**backend.stats(), "service": self.stats()}
+            else:
+                if method == "set_names":
+                    # JSON 이라 키가 문자열로 바뀌어 옴
+                    args = [{int(user_id): tuple(entry) for user_id, entry in args[0].items()}]
+                result = await getattr(backend, method)(*args)
+            return [True, result]
+        except Exception as e:
+            self.errors += 1
+            return [False, f"{type(e).__name__}: {e}"]
+
+    # ---------- 임대 ----------
+
+    def renew_lease(self, owner: str) -> float:
+        self.leases[owner] = time.monotonic() + self.lease_ttl
+        return self.lease_ttl
+
+    def live_owners(self, owners: list[str]) -> list[str]:
+        """owners 중 임대가 남아 있는 프로세스
+
+        서비스가 재시작된 뒤 아직 갱신하지 않은 프로세스도 lease_ttl 동안은 살아 있다고 본다.
+        """
+        now = time.monotonic()
+        return [owner for owner in owners if self.leases.get(owner, self.started + self.lease_ttl) > now]
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "requests": self.requests,
+            "ops": self.ops,
+            "errors": self.errors,
+            "max_batch": self.max_batch,
+            "leases": sum(1 for expires in self.leases.values() if expires > time.monotonic()),
+            "guilds": self.registry.stats(),
+        }
+
+
+# ========================
+# 클라이언트
+# ========================
+
+class _Connection:
+    """서비스 연결 하나 (응답을 기다리지 않고 여러 요청을 이어서 보냄)"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.pending: dict[int, list[asyncio.Future]] = {}
+        self.closed = False
+        self.task = asyncio.create_task(self._read())
+
+    def send(self, request_id: int, ops: list, futures: list[asyncio.Future]) -> None:
+        self.pending[request_id] = futures
+        self.writer.write(_encode({"id": request_id, "ops": ops}))
+
+    async def _read(self) -> None:
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                futures = self.pending.pop(response["id"], [])
+                for future, (ok, value) in zip(futures, response["results"]):
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(ServiceError(value))
+        except (ConnectionError, ValueError, KeyError):
+            pass
+        finally:
+            self.closed = True
+            for futures in self.pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(ServiceUnavailable("경제 서비스 연결이 끊겼습니다"))
+            self.pending.clear()
+            self.writer.close()
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+class EconomyClient:
+    """연결 풀 + 자동 일괄 요청
+
+    call() 은 바로 Future 를 돌려주고, 같은 루프 차례에 쌓인 연산을 최대 max_batch 개씩
+    한 요청으로 묶어 풀의 연결에 번갈아 보낸다. 끊긴 연결은 다음 요청 때 다시 연결한다.
+    start_lease() 를 부르면 이 프로세스의 임대를 주기적으로 갱신한다.
+    """
+
+    def __init__(self, address: str, pool_size: int = 4, max_batch: int = 256):
+        self.address = address
+        self.host, self.port = parse_address(address)
+        self.max_batch = max_batch
+        self._pool: list[Optional[asyncio.Task]] = [None] * pool_size
+        self._next = 0
+        self._queue: list[tuple[list, asyncio.Future]] = []
+        self._scheduled = False
+        self._sending: set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+        self.owner: Optional[str] = None
+        self._lease = BackgroundLoop(self._renew_lease, 0.0, "⚠️ 경제 서비스 임대 갱신 실패")
+
+        # 통계
+        self.requests = 0
+        self.ops = 0
+        self.max_sent_batch = 0
+        self.connects = 0
+        self.failures = 0
+
+    def call(self, method: str, guild_id: Optional[int], *args) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append(([method, guild_id, list(args)], future))
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._flush)
+        return future
+
+    def _flush(self) -> None:
+        self._scheduled = False
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), self.max_batch):
+            task = asyncio.create_task(self._send(queue[start:start + self.max_batch]))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: list[tuple[list, asyncio.Future]]) -> None:
+        futures = [future for _, future in batch]
+        try:
+            connection = await self._connection()
+            connection.send(next(self._ids), [op for op, _ in batch], futures)
+            self.requests += 1
+            self.ops += len(batch)
+            self.max_sent_batch = max(self.max_sent_batch, len(batch))
+            await connection.writer.drain()
+        except OSError as e:
+            self.failures += 1
+            for future in futures:
+                if not future.done():
+                    future.set_exception(ServiceUnavailable(f"경제 서비스({self.address})에 연결할 수 없습니다: {e}"))
+
+    async def _connection(self) -> _Connection:
+        slot = self._next
+        self._next = (slot + 1) % len(self._pool)
+        task = self._pool[slot]
+        if task is not None and task.done():
+            if task.cancelled() or task.exception() is not None or task.result().closed:
+                task = None
+        if task is None:
+            task = self._pool[slot] = asyncio.ensure_future(self._open())
+        return await task
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_FRAME)
+        self.connects += 1
+        return _Connection(reader, writer)
+
+    # ---------- 임대 ----------
+
+    async def start_lease(self, owner: str, interval: float) -> None:
+        """임대를 한 번 갱신하고 (서비스에 연결할 수 없으면 ServiceUnavailable), 이후 interval 마다 갱신"""
+        self.owner = owner
+        await self._renew_lease()
+        self._lease.interval = interval
+        self._lease.start()
+
+    async def _renew_lease(self) -> None:
+        await self.call("renew_lease", None, self.owner)
+
+    async def live_owners(self, owners: list[str]) -> set[str]:
+        return set(await self.call("live_owners", None, owners))
+
+    async def close(self) -> None:
+        # 임대는 반납하지 않는다 (재시작하면 같은 이름으로 남은 게임을 이어받음)
+        await self._lease.stop()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        for task in self._pool:
+            if task is not None and task.done() and not task.cancelled() and task.exception() is None:
+                await task.result().close()
+        self._pool = [None] * len(self._pool)
+
+    def stats(self) -> dict:
+        connections = [
+            task.result() for task in self._pool
+            if task is not None and task.done() and not task.cancelled() and task.exception() is None
+        ]
+        return {
+            "connections": sum(1 for c in connections if not c.closed),
+            "in_flight": sum(len(futures) for c in connections for futures in c.pending.values()),
+            "requests": self.requests,
+            "ops": self.ops,
+            "avg_batch": round(self.ops / self.requests, 2) if self.requests else 0.0,
+            "max_batch": self.max_sent_batch,
+            "connects": self.connects,
+            "failures": self.failures,
+        }
+
+
+class RemoteBackend(EconomyBackend):
+    """경제 서비스에 있는 서버 하나의 저장소
+
+    배율은 start() 에서 받아와 보관하고 set_multiplier() 때 함께 갱신한다.
+    (한 서버의 명령어는 항상 같은 샤드로 오므로 다른 프로세스가 바꾸지 않는다)
+    """
+
+    def __init__(self, client: EconomyClient, guild_id: Optional[int],
+                 default_balance: int, default_multipliers: dict):
+        super().__init__(default_balance, default_multipliers)
+        self.client = client
+        self.guild_id = guild_id
+        self.multipliers = copy.deepcopy(default_multipliers)
+
+    async def _call(self, method: str, *args):
+        return await self.client.call(method, self.guild_id, *args)
+
+    async def _call_idempotent(self, method: str, *args):
+        """에스크로 ID 가 붙어 다시 보내도 한 번만 반영되는 연산 (연결이 끊겨 응답을 못 받으면 한 번 더 보냄)"""
+        try:
+            return await self._call(method, *args)
+        except ServiceUnavailable:
+            return await self._call(method, *args)
+
+    async def start(self) -> None:
+        self.multipliers = await self._call("get_multipliers")
+
+    async def get_user(self, user_id: int) -> dict:
+        return await self._call("get_user", user_id)
+
+    def get_multipliers(self) -> dict:
+        return self.multipliers
+
+    async def top_balances(self, limit: int) -> list[tuple[int, int]]:
+        return [tuple(entry) for entry in await self._call("top_balances", limit)]
+
+    async def rank(self, user_id: int) -> tuple[Optional[int], int]:
+        return tuple(await self._call("rank", user_id))
+
+    async def get_names(self, user_ids: list[int]) -> dict[int, tuple[str, int]]:
+        names = await self._call("get_names", user_ids)
+        return {int(user_id): tuple(entry) for user_id, entry in names.items()}
+
+    async def set_names(self, names: dict[int, tuple[str, int]]) -> None:
+        await self._call("set_names", names)
+
+    async def record_game_result(self, user_id: int, game: str, delta: int,
+                                 won: int = 0, played: int = 1, escrow: Optional[str] = None) -> dict:
+        if escrow is None:
+            return await self._call("record_game_result", user_id, game, delta, won, played)
+        return await self._call_idempotent("record_game_result", user_id, game, delta, won, played, escrow)
+
+    async def debit_stake(self, user_id: int, game: str, amount: int,
+                          escrow: Optional[str] = None, seq: int = 0, owner: str = "") -> Optional[int]:
+        if escrow is None:
+            return await self._call("debit_stake", user_id, game, amount)
+        return await self._call_idempotent("debit_stake", user_id, game, amount, escrow, seq, owner)
+
+    async def open_escrows(self) -> list[tuple[str, int, str, int, int, str]]:
+        return [tuple(entry) for entry in await self._call("open_escrows")]
+
+    async def adjust_balance(self, user_id: int, delta: int) -> dict:
+        return await self._call("adjust_balance", user_id, delta)
+
+    async def reset_user(self, user_id: int) -> dict:
+        return await self._call("reset_user", user_id)
+
+    async def bulk_update(self, user_ids: Optional[list[int]], delta: int = 0, reset: bool = False,
+                          dry_run: bool = False) -> list[tuple[int, int, int]]:
+        rows = await self._call("bulk_update", user_ids, delta, reset, dry_run)
+        return [tuple(row) for row in rows]
+
+    async def set_multiplier(self, game: str, kind: str, value: float) -> None:
+        await self._call("set_multiplier", game, kind, value)
+        self.multipliers.setdefault(game, {})[kind] = value
+
+    def stats(self) -> dict:
+        # 연결 / 요청 통계는 EconomyClient.stats() (모든 서버가 공유)
+        return {"backend": "remote"}
+
+
+# ========================
+# 실행
+# ========================
+
+async def serve(listen: str) -> None:
+    from config import ECONOMY_LEASE_TTL, GUILD_CACHE_SIZE, GUILD_IDLE_TTL
+    from guilds import GuildRegistry, create_backend
+
+    service = EconomyService(
+        GuildRegistry(create_backend, capacity=GUILD_CACHE_SIZE, ttl=GUILD_IDLE_TTL), lease_ttl=ECONOMY_LEASE_TTL
+    )
+    await service.start(*parse_address(listen))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C 는 KeyboardInterrupt 로 처리
+    try:
+        await stop.wait()
+    finally:
+        # 남은 변경 사항 저장
+        await service.close()
+        print("🏦 경제 서비스 종료")
+
+
+def main():
+    from config import ECONOMY_SERVICE_LISTEN
+
+    parser = argparse.ArgumentParser(description="샤드 프로세스들이 함께 쓰는 경제 서비스")
+    parser.add_argument("--listen", default=ECONOMY_SERVICE_LISTEN, help="기다릴 주소 (host:port)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.listen))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from analytics import ServerAnalytics
+from config import (
+    ANALYTICS_FILE, ANALYTICS_UTC_OFFSET, DATA_FILE, DEFAULT_MULTIPLIERS, DEFAULT_START_BALANCE, GUILD_DATA_DIR,
+    HISTORY_CACHE_USERS, HISTORY_DIR, HISTORY_MAX_ENTRIES, HISTORY_RING_SIZE, JOURNAL_FILE, JOURNAL_FSYNC_INTERVAL,
+    SAVE_INTERVAL, SAVE_MAX_DIRTY, SNAPSHOT_FILE, SNAPSHOT_FORMAT, SQLITE_COMMIT_INTERVAL, SQLITE_FILE,
+    STORAGE_BACKEND,
+)
+from history import BetHistory
+from persistence import BackgroundLoop
+from storage import EconomyBackend, JsonBackend, SqliteBackend
+from wallet import Wallet
+
+
+def guild_directory(guild_id: Optional[int]) -> str:
+    """서버 데이터 폴더 (guild_id 가 None 이면 기존 경로인 현재 폴더)"""
+    if guild_id is None:
+        return ""
+    directory = os.path.join(GUILD_DATA_DIR, str(guild_id))
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def create_backend(guild_id: Optional[int] = None) -> EconomyBackend:
+    """서버 전용 저장소 (guild_id 가 None 이면 기존 경로의 데이터)"""
+    directory = guild_directory(guild_id)
+    if STORAGE_BACKEND == "sqlite":
+        return SqliteBackend(
+            os.path.join(directory, SQLITE_FILE), DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS,
+            commit_interval=SQLITE_COMMIT_INTERVAL,
+        )
+    return JsonBackend(
+        os.path.join(directory, SNAPSHOT_FILE), os.path.join(directory, JOURNAL_FILE),
+        DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS,
+        save_interval=SAVE_INTERVAL, save_max_dirty=SAVE_MAX_DIRTY,
+        fsync_interval=JOURNAL_FSYNC_INTERVAL,
+        snapshot_format=SNAPSHOT_FORMAT, legacy_path=os.path.join(directory, DATA_FILE),
+    )
+
+
+def create_analytics(guild_id: Optional[int] = None) -> ServerAnalytics:
+    """서버 통계 (저장소와 같은 폴더)"""
+    return ServerAnalytics(os.path.join(guild_directory(guild_id), ANALYTICS_FILE), ANALYTICS_UTC_OFFSET)
+
+
+def create_history(guild_id: Optional[int] = None) -> BetHistory:
+    """유저별 배팅 기록 (저장소 폴더 안의 HISTORY_DIR)"""
+    return BetHistory(
+        os.path.join(guild_directory(guild_id), HISTORY_DIR),
+        ring_size=HISTORY_RING_SIZE, max_users=HISTORY_CACHE_USERS, max_entries=HISTORY_MAX_ENTRIES,
+    )
+
+
+class GuildEconomy:
+    """한 서버의 경제 (저장소 + 배팅금 에스크로 + 서버 통계 + 배팅 기록)
+
+    guild_id 가 None 이면 DM 등 서버 밖에서 쓰는 경제.
+    """
+
+    def __init__(self, guild_id: Optional[int], backend: EconomyBackend, wallet: Optional[Wallet] = None,
+                 analytics: Optional[ServerAnalytics] = None, history: Optional[BetHistory] = None,
+                 owner: str = ""):
+        self.guild_id = guild_id
+        self.backend = backend
+        self.wallet = wallet or Wallet(backend, owner)
+        self.analytics = analytics or ServerAnalytics()
+        self.history = history or BetHistory()
+        # 에스크로 말고도 이 경제를 붙잡고 있는 화면 / 실행 중인 명령어 수 (블랙잭 테이블은 빈자리만 있어도 유지)
+        self.pins = 0
+        self.loaded_at = time.monotonic()
+        self.last_used = self.loaded_at
+
+    @property
+    def busy(self) -> bool:
+        """정산되지 않은 게임이나 열린 테이블이 있으면 내리지 않는다 (배팅금을 차감하는 중인 게임 포함)"""
+        return bool(self.wallet.open or self.wallet.opening or self.pins)
+
+    def touch(self) -> None:
+        self.last_used = time.monotonic()
+
+    async def close(self) -> None:
+        """서버 통계, 배팅 기록과 남은 변경 사항 저장"""
+        try:
+            await self.analytics.save()
+            await self.history.flush(all_users=True)
+        finally:
+            await self.backend.close()
+
+    # ---------- 저장소 위임 ----------
+
+    async def get_user(self, user_id: int) -> dict:
+        return await self.backend.get_user(user_id)
+
+    def get_multipliers(self) -> dict:
+        return self.backend.get_multipliers()
+
+    async def adjust_balance(self, user_id: int, delta: int) -> dict:
+        """(관리자) 잔액 지급/차감 (0 미만으로 내려가지 않음)"""
+        return await self.backend.adjust_balance(user_id, delta)
+
+    async def reset_user(self, user_id: int) -> dict:
+        """(관리자) 잔액과 통계를 초기값으로 리셋"""
+        return await self.backend.reset_user(user_id)
+
+    async def bulk_update(self, user_ids: Optional[list[int]], delta: int = 0, reset: bool = False,
+                          dry_run: bool = False) -> list[tuple[int, int, int]]:
+        """(관리자) 여러 유저에게 한 번에 지급/차감 또는 초기화 (EconomyBackend.bulk_update)"""
+        return await self.backend.bulk_update(user_ids, delta, reset, dry_run)
+
+    async def set_multiplier(self, game: str, kind: str, value: float) -> None:
+        """(관리자) 이 서버의 배율 변경"""
+        await self.backend.set_multiplier(game, kind, value)
+
+
+class GuildRegistry:
+    """서버 ID → GuildEconomy (처음 사용할 때 불러오고, 오래 쓰지 않으면 내림)
+
+    - get(): 메모리에 없으면 factory(guild_id) 로 저장소를 만들어 load() / start()
+    - 백그라운드 태스크가 sweep_interval 마다 ttl 초 이상 쓰지 않은 서버를 내리고,
+      capacity 를 넘으면 가장 오래전에 쓴 서버부터 내린다 (close() 로 남은 변경 저장)
+    - 진행 중인 게임(에스크로)이 있는 서버는 내리지 않는다
+    - 내리는 중인 서버를 다시 요청하면 저장이 끝난 뒤에 새로 불러온다
+    - analytics_factory / history_factory 가 있으면 서버 통계 / 배팅 기록도 만들고,
+      sweep_interval 마다 바뀐 통계와 쓰기 대기 중인 기록을 저장한다
+    - owner 는 이 프로세스가 여는 에스크로에 남길 이름 (Wallet 참고)
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[Optional[int]], EconomyBackend],
+        capacity: int = 100,
+        ttl: float = 1800.0,
+        sweep_interval: float = 60.0,
+        analytics_factory: Optional[Callable[[Optional[int]], ServerAnalytics]] = None,
+        history_factory: Optional[Callable[[Optional[int]], BetHistory]] = None,
+        owner: str = "",
+    ):
+        self.factory = factory
+        self.owner = owner
+        self.analytics_factory = analytics_factory
+        self.history_factory = history_factory
+        self.capacity = capacity
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        # 새로 불러온 경제마다 호출 (지표 훅 연결 등)
+        self.on_load: Optional[Callable[[GuildEconomy], None]] = None
+        # 새로 불러온 경제를 돌려주기 전에 기다릴 작업 (남아 있던 배팅금 정리 등)
+        self.before_ready: Optional[Callable[[GuildEconomy], Awaitable[None]]] = None
+
+        self._guilds: OrderedDict[Optional[int], GuildEconomy] = OrderedDict()
+        self._loading: dict[Optional[int], asyncio.Future] = {}
+        self._closing: dict[Optional[int], asyncio.Future] = {}
+        self._background = BackgroundLoop(self._maintain, sweep_interval, "❌ 서버 경제 정리 실패")
+
+        # 통계
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.max_resident = 0
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def resident(self) -> list[GuildEconomy]:
+        return list(self._guilds.values())
+
+    def peek(self, guild_id: Optional[int]) -> Optional[GuildEconomy]:
+        return self._guilds.get(guild_id)
+
+    def adopt(self, economy: GuildEconomy) -> None:
+        """이미 준비된 경제를 등록 (벤치마크 등에서 저장소를 바꿔 끼울 때)"""
+        self._guilds[economy.guild_id] = economy
+        self._guilds.move_to_end(economy.guild_id)
+
+    async def get(self, guild_id: Optional[int]) -> GuildEconomy:
+        economy = self._guilds.get(guild_id)
+        if economy is not None:
+            self.hits += 1
+            economy.touch()
+            self._guilds.move_to_end(guild_id)
+            return economy
+
+        closing = self._closing.get(guild_id)
+        if closing is not None:
+            await asyncio.shield(closing)
+
+        loading = self._loading.get(guild_id)
+        if loading is None:
+            loading = self._loading[guild_id] = asyncio.ensure_future(self._load(guild_id))
+        try:
+            return await asyncio.shield(loading)
+        finally:
+            if loading.done():
+                self._loading.pop(guild_id, None)
+
+    async def _load(self, guild_id: Optional[int]) -> GuildEconomy:
+        # 스냅샷 / 저널 / 통계 파일 읽기는 executor 에서 (큰 서버를 불러오는 동안 루프가 멈추지 않도록)
+        loop = asyncio.get_running_loop()
+        backend = self.factory(guild_id)
+        await loop.run_in_executor(None, backend.load)
+        await backend.start()
+        analytics = None
+        if self.analytics_factory is not None:
+            analytics = self.analytics_factory(guild_id)
+            await loop.run_in_executor(None, analytics.load)
+        history = self.history_factory(guild_id) if self.history_factory is not None else None
+        economy = GuildEconomy(guild_id, backend, analytics=analytics, history=history, owner=self.owner)
+        if self.on_load is not None:
+            self.on_load(economy)
+        if self.before_ready is not None:
+            try:
+                await self.before_ready(economy)
+            except Exception as e:
+                print(f"❌ 서버 {guild_id} 경제 준비 실패: {e}")
+        self._guilds[guild_id] = economy
+        self.loads += 1
+        self.max_resident = max(self.max_resident, len(self._guilds))
+        if len(self._guilds) > self.capacity:
+            self._background.wake()
+        return economy
+
+    # ---------- 내리기 ----------
+
+    async def evict(self, guild_id: Optional[int]) -> bool:
+        economy = self._guilds.get(guild_id)
+        if economy is None or economy.busy:
+            return False
+        del self._guilds[guild_id]
+        closing = self._closing[guild_id] = asyncio.get_running_loop().create_future()
+        try:
+            await economy.close()
+        except Exception as e:
+            print(f"❌ 서버 {guild_id} 경제 데이터 저장 실패: {e}")
+        finally:
+            self._closing.pop(guild_id, None)
+            closing.set_result(None)
+        self.evictions += 1
+        return True
+
+    async def sweep(self) -> int:
+        """유휴 서버와 capacity 를 넘는 서버를 내리고, 내린 수를 돌려준다"""
+        now = time.monotonic()
+        evicted = 0
+        for economy in list(self._guilds.values()):
+            if now - economy.last_used >= self.ttl and await self.evict(economy.guild_id):
+                evicted += 1
+        # 오래전에 쓴 순서 (OrderedDict 앞쪽) 부터
+        for economy in list(self._guilds.values()):
+            if len(self._guilds) <= self.capacity:
+                break
+            if await self.evict(economy.guild_id):
+                evicted += 1
+        return evicted
+
+    # ---------- 수명 주기 ----------
+
+    async def start(self) -> None:
+        self._background.interval = self.sweep_interval
+        self._background.start()
+
+    async def _maintain(self) -> None:
+        await self.sweep()
+        await self.checkpoint()
+
+    async def checkpoint(self) -> None:
+        """메모리에 있는 서버들의 통계와 쓰기 대기 중인 배팅 기록 저장"""
+        for economy in list(self._guilds.values()):
+            try:
+                await economy.analytics.save()
+                await economy.history.flush()
+            except Exception as e:
+                print(f"❌ 서버 {economy.guild_id} 통계 / 기록 저장 실패: {e}")
+
+    async def close(self) -> None:
+        await self._background.stop()
+        for loading in list(self._loading.values()):
+            await asyncio.gather(loading, return_exceptions=True)
+        for economy in list(self._guilds.values()):
+            try:
+                await economy.close()
+            except Exception as e:
+                print(f"❌ 서버 {economy.guild_id} 경제 데이터 저장 실패: {e}")
+        self._guilds.clear()
+
+    def stats(self) -> dict:
+        return {
+            "resident": len(self._guilds),
+            "max_resident": self.max_resident,
+            "busy": sum(1 for economy in self._guilds.values() if economy.busy),
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions,
+        }
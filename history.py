@@ -0,0 +1,234 @@
+"""유저별 배팅 기록 (/기록)
+
+최근 기록은 유저마다 크기가 고정된 링 버퍼(bytearray)에 24바이트씩 묶어 보관하고,
+링에서 밀려난 기록은 서버 폴더의 history/<유저 ID>.bin 에 덧붙인다.
+메모리에 링을 둘 유저 수도 LRU 로 제한하며, 내려간 유저의 링은 파일로 옮긴다.
+
+    기록    시각 u32 (유닉스 초), 게임 u8, 결과 u8, 판 수 u16, 배팅 i64, 순손익 i64
+
+정수는 모두 little-endian. 파일은 오래된 기록부터, 링은 그보다 최근 기록만 담는다.
+(파일 → 쓰기 대기 → 링 순서가 곧 시간 순서)
+"""
+import asyncio
+import os
+import struct
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from persistence import atomic_write
+
+ENTRY = struct.Struct("<IBBHqq")
+
+# 코드 ↔ 이름 (순서를 바꾸면 저장된 기록을 잘못 읽으므로 뒤에만 추가)
+GAMES = ("slot", "dice", "blackjack", "bet")
+OUTCOMES = ("win", "push", "loss", "refund")
+
+
+class BetRecord(NamedTuple):
+    timestamp: int
+    game: str
+    outcome: str
+    rounds: int
+    stake: int
+    delta: int
+
+    @property
+    def multiplier(self) -> float:
+        """배팅 대비 순이익 배율 (게임 규칙의 승리 배율과 같음, 패배 / 무승부는 0)"""
+        return self.delta / self.stake if self.delta > 0 and self.stake else 0.0
+
+
+def pack(record: BetRecord) -> bytes:
+    return ENTRY.pack(
+        record.timestamp, GAMES.index(record.game), OUTCOMES.index(record.outcome),
+        min(record.rounds, 0xFFFF), record.stake, record.delta,
+    )
+
+
+def unpack(buf, offset: int = 0) -> BetRecord:
+    timestamp, game, outcome, rounds, stake, delta = ENTRY.unpack_from(buf, offset)
+    return BetRecord(timestamp, GAMES[game], OUTCOMES[outcome], rounds, stake, delta)
+
+
+class HistoryRing:
+    """기록 capacity 개짜리 링 버퍼 (가득 차면 가장 오래된 기록을 돌려주고 덮어씀)"""
+
+    __slots__ = ("capacity", "buf", "head", "count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buf = bytearray(capacity * ENTRY.size)
+        self.head = 0  # 다음에 쓸 칸
+        self.count = 0
+
+    def push(self, packed: bytes) -> Optional[bytes]:
+        offset = self.head * ENTRY.size
+        spilled = None
+        if self.count == self.capacity:
+            spilled = bytes(self.buf[offset:offset + ENTRY.size])
+        else:
+            self.count += 1
+        self.buf[offset:offset + ENTRY.size] = packed
+        self.head = (self.head + 1) % self.capacity
+        return spilled
+
+    def drain(self) -> bytes:
+        """전체 기록 (오래된 순) 을 꺼내고 비운다"""
+        start = (self.head - self.count) % self.capacity
+        size = ENTRY.size
+        data = b"".join(
+            bytes(self.buf[((start + i) % self.capacity) * size:((start + i) % self.capacity + 1) * size])
+            for i in range(self.count)
+        )
+        self.head = self.count = 0
+        return data
+
+    def newest(self, skip: int, limit: int) -> list[bytes]:
+        """최근 기록부터 skip 개를 건너뛰고 limit 개"""
+        entries = []
+        for i in range(skip, min(self.count, skip + limit)):
+            slot = (self.head - 1 - i) % self.capacity
+            entries.append(bytes(self.buf[slot * ENTRY.size:(slot + 1) * ENTRY.size]))
+        return entries
+
+
+class BetHistory:
+    """한 서버의 유저별 배팅 기록
+
+    - record(): 링에 넣고, 밀려난 기록은 쓰기 대기열에 (이벤트 루프에서 O(1))
+    - flush(): 쓰기 대기열을 executor 에서 유저별 파일에 덧붙임 (파일이 max_entries 의 두 배를 넘으면 잘라냄)
+    - page(): 해당 유저의 링 / 대기열 / 파일 끝부분만 읽음
+    directory 가 None 이면 파일에 쓰지 않고 링에 있는 기록만 유지한다.
+    """
+
+    def __init__(self, directory: Optional[str] = None, ring_size: int = 20,
+                 max_users: int = 500, max_entries: int = 1000):
+        self.directory = directory
+        self.ring_size = ring_size
+        self.max_users = max_users
+        self.max_entries = max_entries
+        self._rings: OrderedDict[int, HistoryRing] = OrderedDict()
+        self._pending: dict[int, bytearray] = {}
+        self._lock = asyncio.Lock()
+
+        # 통계
+        self.records = 0
+        self.spilled = 0
+        self.flushes = 0
+
+    def _path(self, user_id: int) -> str:
+        return os.path.join(self.directory, f"{user_id}.bin")
+
+    def record(self, user_id: int, game: str, stake: int, delta: int, outcome: str,
+               rounds: int = 1, timestamp: Optional[int] = None) -> None:
+        packed = pack(BetRecord(int(time.time()) if timestamp is None else timestamp, game, outcome, rounds, stake, delta))
+        ring = self._rings.get(user_id)
+        if ring is None:
+            ring = self._rings[user_id] = HistoryRing(self.ring_size)
+            if len(self._rings) > self.max_users:
+                old_user, old_ring = self._rings.popitem(last=False)
+                self._spill(old_user, old_ring.drain())
+        else:
+            self._rings.move_to_end(user_id)
+        spilled = ring.push(packed)
+        if spilled is not None:
+            self._spill(user_id, spilled)
+        self.records += 1
+
+    def _spill(self, user_id: int, data: bytes) -> None:
+        if self.directory is None or not data:
+            return
+        self._pending.setdefault(user_id, bytearray()).extend(data)
+        self.spilled += len(data) // ENTRY.size
+
+    # ---------- 파일 ----------
+
+    def _append(self, pending: dict[int, bytearray]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        limit = self.max_entries * ENTRY.size
+        for user_id, data in list(pending.items()):
+            path = self._path(user_id)
+            with open(path, "ab") as f:
+                f.write(data)
+                size = f.tell()
+            # 쓴 유저는 빼서, 중간에 실패해도 남은 유저만 다시 시도
+            del pending[user_id]
+            if size > 2 * limit:
+                # 최근 max_entries 개만 남김
+                with open(path, "rb") as f:
+                    f.seek(size - limit)
+                    tail = f.read(limit)
+                atomic_write(path, tail)
+
+    def _read_tail(self, user_id: int, skip: int, limit: int) -> tuple[list[bytes], int]:
+        """파일 끝에서 skip 개를 건너뛴 limit 개 (최근 순) 와 파일의 기록 수"""
+        try:
+            with open(self._path(user_id), "rb") as f:
+                count = os.fstat(f.fileno()).st_size // ENTRY.size
+                end = max(count - skip, 0)
+                start = max(end - limit, 0)
+                f.seek(start * ENTRY.size)
+                data = f.read((end - start) * ENTRY.size)
+        except FileNotFoundError:
+            return [], 0
+        entries = [data[i:i + ENTRY.size] for i in range(0, len(data) - ENTRY.size + 1, ENTRY.size)]
+        return entries[::-1], count
+
+    async def flush(self, all_users: bool = False) -> None:
+        """쓰기 대기열을 파일에 기록 (all_users 면 링에 있는 기록까지 전부)"""
+        if self.directory is None:
+            return
+        async with self._lock:
+            if all_users:
+                for user_id, ring in self._rings.items():
+                    self._spill(user_id, ring.drain())
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._append, pending)
+            except Exception:
+                # 다음 flush 때 다시 시도 (그 사이 쌓인 기록보다 앞에)
+                for user_id, data in self._pending.items():
+                    pending.setdefault(user_id, bytearray()).extend(data)
+                self._pending = pending
+                raise
+            self.flushes += 1
+
+    # ---------- 조회 ----------
+
+    async def page(self, user_id: int, page: int, per_page: int = 10) -> tuple[list[BetRecord], int]:
+        """최근 순 page 번째 (0부터) 페이지의 기록과 전체 기록 수"""
+        # flush 중에는 기다림 (대기열에서 빠졌지만 아직 파일에 없는 기록이 있음)
+        async with self._lock:
+            skip = page * per_page
+            ring = self._rings.get(user_id)
+            newest = ring.newest(skip, per_page) if ring is not None else []
+            in_ring = ring.count if ring is not None else 0
+
+            pending = self._pending.get(user_id, b"")
+            in_pending = len(pending) // ENTRY.size
+            skip = max(skip - in_ring, 0)
+            for i in range(skip, in_pending):
+                if len(newest) >= per_page:
+                    break
+                offset = (in_pending - 1 - i) * ENTRY.size
+                newest.append(bytes(pending[offset:offset + ENTRY.size]))
+
+            in_file = 0
+            if self.directory is not None:
+                older, in_file = await asyncio.get_running_loop().run_in_executor(
+                    None, self._read_tail, user_id, max(skip - in_pending, 0), per_page - len(newest)
+                )
+                newest.extend(older)
+        return [unpack(entry) for entry in newest], in_ring + in_pending + in_file
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._rings),
+            "records": self.records,
+            "spilled": self.spilled,
+            "pending": sum(len(data) for data in self._pending.values()) // ENTRY.size,
+            "flushes": self.flushes,
+        }
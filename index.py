@@ -1,86 +1,261 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
+import asyncio
+import copy
+import csv
+import io
 import random
+import re
+import time
 from typing import Optional
 
+from commandsync import sync_commands
+from config import (
+    BATCH_MAX_ROUNDS, BLACKJACK_DECKS, BLACKJACK_HINTS, BLACKJACK_PENETRATION, BLACKJACK_SOLVER_CACHE_SIZE,
+    BLACKJACK_TABLE_EDIT_DELAY, BLACKJACK_TABLE_JOIN_SECONDS, BLACKJACK_TABLE_SEATS, BLACKJACK_TABLE_TURN_SECONDS,
+    BULK_PREVIEW_USERS,
+    COMMAND_SYNC_FILE, COMMAND_SYNC_FORCE, DEFAULT_MULTIPLIERS, DEFAULT_START_BALANCE, DEV_GUILD_ID,
+    ECONOMY_LEASE_TTL, ECONOMY_MAX_BATCH, ECONOMY_OWNER, ECONOMY_POOL_SIZE, ECONOMY_SERVICE,
+    GUILD_CACHE_SIZE, GUILD_IDLE_TTL, HISTORY_PAGE_SIZE, LEGACY_GUILD_ID, MEMBERS_INTENT,
+    METRICS_HOST, METRICS_LAG_INTERVAL, METRICS_PORT,
+    NAME_CACHE_SIZE, NAME_CACHE_TTL, NAME_FETCH_CONCURRENCY,
+    PROFILE_BLOCK_THRESHOLD, PROFILE_DIR, PROFILE_INTERVAL, PROFILE_MAX_SECONDS,
+    RATE_LIMIT_DEFAULT, RATE_LIMIT_IDLE_TTL, RATE_LIMIT_PER_GUILD, RATE_LIMITS, RATE_LIMITS_ENABLED, RTP_PREVIEW_ROUNDS,
+    SESSION_FILE, SESSION_MAX, SESSION_SWEEP_INTERVAL, SHARD_COUNT, SHARD_IDS, STORAGE_BACKEND,
+)
+from economy_service import EconomyClient, RemoteBackend
+from guilds import GuildEconomy, GuildRegistry, create_analytics, create_backend, create_history
+from metrics import Metrics, flatten_stats
+from names import UserNameResolver
+from profiler import SamplingProfiler
+from ratelimit import RateLimited, RateLimits, cooldown_message
+from rules import (
+    BJ_BLACKJACK, BJ_BUST, COIN_SIDES, DEALER_STANDS_ON, DICE_FACES, SLOT_SYMBOLS,
+    batch_settlement, blackjack_outcome, blackjack_payout, coinflip_payout, dice_outcome, dice_payout,
+    slot_outcome, slot_payout,
+)
+from sessions import DROP, REFUND, GameSession, SavedSession, SessionRegistry, restore_action
+from shoe import Hand, Shoe, ShoeRegistry
+import simulator
+from solver import DOUBLE, HIT, STAND, BlackjackSolver
+from table import BETTING, CLOSED, PLAYING, BlackjackTable, DebouncedEditor
+from wallet import Escrow, InsufficientFunds
+
+# ========================
+# 경제 데이터 저장소
+# ========================
+
+# 경제 서비스를 쓰면 (샤드 프로세스 여러 개) 저장은 서비스가 맡고 여기서는 요청만 보냄
+service_client = (
+    EconomyClient(ECONOMY_SERVICE, pool_size=ECONOMY_POOL_SIZE, max_batch=ECONOMY_MAX_BATCH)
+    if ECONOMY_SERVICE else None
+)
+
+def open_backend(guild_id: Optional[int]):
+    if service_client is not None:
+        return RemoteBackend(service_client, guild_id, DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS)
+    return create_backend(guild_id)
+
+# 서버별 경제 (처음 명령어를 쓸 때 불러오고, 오래 쓰지 않으면 저장 후 내림)
+economies = GuildRegistry(
+    open_backend, capacity=GUILD_CACHE_SIZE, ttl=GUILD_IDLE_TTL,
+    analytics_factory=create_analytics, history_factory=create_history, owner=ECONOMY_OWNER,
+)
+
+# 진행 중인 게임 화면 (재시작하면 저장된 세션으로 같은 메시지에 다시 연결)
+sessions = SessionRegistry(SESSION_FILE or None, capacity=SESSION_MAX, sweep_interval=SESSION_SWEEP_INTERVAL)
+
+def economy_key(guild_id: Optional[int]) -> Optional[int]:
+    """기존 데이터를 쓰는 서버와 DM 은 같은 경제 (None)"""
+    if guild_id is None or guild_id == LEGACY_GUILD_ID:
+        return None
+    return guild_id
+
+async def get_economy(interaction: discord.Interaction) -> GuildEconomy:
+    """상호작용이 끝날 때까지 경제를 붙잡아 둔다 (그 사이 GuildRegistry.sweep 이 내리지 않도록)
+
+    슬래시 명령어는 완료 / 오류 처리에서, 버튼은 콜백 끝에서 release_economy 로 놓는다.
+    """
+    economy = await economies.get(economy_key(interaction.guild_id))
+    if "economy" not in interaction.extras:
+        economy.pins += 1
+        interaction.extras["economy"] = economy
+    return economy
+
+def release_economy(interaction: discord.Interaction) -> None:
+    economy = interaction.extras.pop("economy", None)
+    if economy is not None:
+        economy.pins -= 1
+        economy.touch()
+
+# 블랙잭 기대값 표 (배율 조합별로 한 번만 계산)
+_blackjack_solvers: dict[tuple, BlackjackSolver] = {}
+
+def get_blackjack_solver(multipliers: dict) -> BlackjackSolver:
+    key = tuple(sorted(multipliers["blackjack"].items()))
+    solver = _blackjack_solvers.get(key)
+    if solver is None:
+        if len(_blackjack_solvers) >= BLACKJACK_SOLVER_CACHE_SIZE:
+            _blackjack_solvers.pop(next(iter(_blackjack_solvers)))
+        solver = _blackjack_solvers[key] = BlackjackSolver(copy.deepcopy(multipliers))
+    return solver
+
+# ========================
+# 지표
+# ========================
+
+metrics = Metrics()
+metrics.describe("bot_command_seconds", "슬래시 명령어 처리 시간")
+metrics.describe("bot_button_seconds", "게임 화면 버튼 처리 시간")
+metrics.describe("bot_event_loop_lag_seconds", "이벤트 루프가 늦게 깨어난 시간")
+metrics.describe("game_rounds_total", "게임 결과별 판 수")
+metrics.describe("economy_flush_seconds", "스냅샷 저장 시간")
+
+def record_flush(seconds: float, written: int):
+    metrics.observe("economy_flush_seconds", seconds)
+    metrics.inc("economy_flush_bytes_total", written)
+
+def watch_economy(economy: GuildEconomy):
+    if getattr(economy.backend, "store", None) is not None:
+        economy.backend.store.on_flush = record_flush
+
+economies.on_load = watch_economy
+
+def collect_runtime_stats():
+    yield from flatten_stats("guilds", economies.stats())
+    # 메모리에 있는 서버만 (최대 GUILD_CACHE_SIZE 개)
+    wallet_totals: dict[str, float] = {}
+    for economy in economies.resident():
+        guild = str(economy.guild_id or 0)
+        yield from flatten_stats("economy", economy.backend.stats(), backend=STORAGE_BACKEND, guild=guild)
+        for key, value in economy.wallet.stats().items():
+            wallet_totals[key] = wallet_totals.get(key, 0) + value
+    yield from flatten_stats("wallet", wallet_totals)
+    if service_client is not None:
+        yield from flatten_stats("economy_service", service_client.stats())
+    yield from flatten_stats("name_cache", name_resolver.stats())
+    yield from flatten_stats("game_sessions", sessions.stats())
+    yield "blackjack_shoes", {}, len(shoes)
+    yield "blackjack_tables", {}, len(tables)
+    yield "blackjack_table_seats", {}, sum(len(view.table.seats) for view in tables.values())
+    for view in tables.values():
+        yield from flatten_stats("blackjack_table_edits", view.editor.stats(), channel=str(view.table.channel_id))
+    for name, stats in rate_limits.stats().items():
+        yield "rate_limit_active_buckets", {"limit": name}, stats["active"]
+        yield "rate_limit_allowed", {"limit": name}, stats["allowed"]
+        yield "rate_limit_shed", {"limit": name}, stats["shed"]
+
+metrics.add_collector(collect_runtime_stats)
+
+# 게임 명령어 / 버튼 연타 제한
+rate_limits = RateLimits(
+    RATE_LIMITS, RATE_LIMIT_DEFAULT,
+    idle_ttl=RATE_LIMIT_IDLE_TTL, per_guild=RATE_LIMIT_PER_GUILD, enabled=RATE_LIMITS_ENABLED,
+)
+
+# 관리자 요청 시에만 켜지는 샘플링 프로파일러
+profiler = SamplingProfiler(interval=PROFILE_INTERVAL, threshold=PROFILE_BLOCK_THRESHOLD)
+
+# ========================
+# 봇 설정
+# ========================
+
+class GameTree(app_commands.CommandTree):
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # 모든 슬래시 명령어 계측 (완료는 GameBot.on_app_command_completion, 오류는 on_app_command_error)
+        metrics.command_started(interaction)
+        return True
+
+class GameBot(commands.AutoShardedBot):
+    # 이번 실행에서 명령어 동기화 여부를 한 번이라도 확인했는지
+    commands_checked = False
+
+    async def setup_hook(self):
+        if service_client is not None:
+            # 경제를 불러오기 전에 임대부터 (다른 프로세스가 이 프로세스의 게임을 환불하지 않도록)
+            await service_client.start_lease(ECONOMY_OWNER, ECONOMY_LEASE_TTL / 3)
+        await economies.start()
+        await restore_sessions()
+        await sessions.start()
+        await metrics.start(METRICS_HOST, METRICS_PORT, METRICS_LAG_INTERVAL)
+        get_blackjack_solver(DEFAULT_MULTIPLIERS)
+
+    async def close(self):
+        # 종료 전 진행 중인 테이블 환불 후 남은 변경 사항 저장 (게임 세션은 다음 시작 때 복구)
+        try:
+            for view in list(tables.values()):
+                await view.close()
+            await sessions.close()
+            await economies.close()
+            if service_client is not None:
+                await service_client.close()
+        except Exception as e:
+            print(f"❌ 종료 중 데이터 저장 실패: {e}")
+        await metrics.close()
+        await super().close()
+
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        release_economy(interaction)
+        metrics.command_finished(interaction, "ok")
+
 # 봇 및 인텐트 설정
 intents = discord.Intents.default()
 intents.message_content = False  # 슬래시 커맨드만 사용하므로 메시지 내용은 불필요
 intents.guilds = True
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-# 데이터 파일 경로
-DATA_FILE = "economy_data.json"
-
-# 기본 배율 설정
-DEFAULT_MULTIPLIERS = {
-    "slot": {
-        "jackpot": 10,  # 3개 모두 일치
-        "two_match": 2  # 2개 일치
-    },
-    "dice": {
-        "win": 2  # 승리 시
-    },
-    "blackjack": {
-        "win": 2,  # 일반 승리
-        "blackjack": 2.5  # 블랙잭으로 승리 (21)
-    },
-    "coinflip": {
-        "win": 2  # 승리 시
-    }
-}
+intents.members = MEMBERS_INTENT  # 관리자 일괄 명령어의 역할 대상용
+# 샤드 설정 (SHARD_IDS 를 나눠 여러 프로세스로 실행할 때는 ECONOMY_SERVICE 도 설정)
+shard_options = {}
+if SHARD_COUNT:
+    shard_options["shard_count"] = SHARD_COUNT
+if SHARD_IDS:
+    shard_options["shard_ids"] = SHARD_IDS
+bot = GameBot(command_prefix="!", intents=intents, tree_cls=GameTree, **shard_options)
 
-# 경제 데이터 로드 또는 초기화
-if os.path.exists(DATA_FILE):
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        economy_data = json.load(f)
-    # 배율 설정이 없으면 추가
-    if "multipliers" not in economy_data:
-        economy_data["multipliers"] = DEFAULT_MULTIPLIERS
-else:
-    economy_data = {
-        "users": {},
-        "multipliers": DEFAULT_MULTIPLIERS
-    }
+# 리더보드용 유저 이름 조회기 (저장된 이름은 서버별 저장소에서 읽고 씀)
+async def load_names(user_ids: list[int], guild: Optional[discord.Guild]) -> dict[int, tuple[str, int]]:
+    economy = await economies.get(economy_key(guild.id if guild is not None else None))
+    economy.pins += 1
+    try:
+        return await economy.backend.get_names(user_ids)
+    finally:
+        economy.pins -= 1
+
+async def store_names(names: dict[int, tuple[str, int]], guild: Optional[discord.Guild]) -> None:
+    economy = await economies.get(economy_key(guild.id if guild is not None else None))
+    economy.pins += 1
+    try:
+        await economy.backend.set_names(names)
+    finally:
+        economy.pins -= 1
 
-# 기본 시작 잔액
-DEFAULT_START_BALANCE = 1000
-
-# 유저 데이터 가져오기 (없으면 초기화)
-def get_user_data(user_id: int) -> dict:
-    uid = str(user_id)
-    if uid not in economy_data["users"]:
-        economy_data["users"][uid] = {
-            "balance": DEFAULT_START_BALANCE,
-            "stats": {
-                "slot": {"played": 0, "won": 0},
-                "dice": {"played": 0, "won": 0},
-                "blackjack": {"played": 0, "won": 0},
-                "bet": {"played": 0, "won": 0}
-            }
-        }
-    return economy_data["users"][uid]
-
-# 배율 가져오기
-def get_multipliers():
-    return economy_data.get("multipliers", DEFAULT_MULTIPLIERS)
-
-# 데이터 저장 함수
-def save_data():
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(economy_data, f, indent=4, ensure_ascii=False)
+name_resolver = UserNameResolver(
+    bot,
+    load_names,
+    store_names,
+    capacity=NAME_CACHE_SIZE,
+    ttl=NAME_CACHE_TTL,
+    concurrency=NAME_FETCH_CONCURRENCY,
+)
 
 # 봇 준비 완료 이벤트
 @bot.event
 async def on_ready():
-    try:
-        await bot.tree.sync()
-        print(f"✅ 슬래시 커맨드 동기화 완료")
-    except Exception as e:
-        print(f"❌ 커맨드 동기화 실패: {e}")
+    # 재연결 / 재개 때마다 호출되므로 명령어 트리가 바뀐 경우에만 업로드
+    # (샤드 프로세스가 여러 개면 0번 샤드를 맡은 프로세스만)
+    if bot.shard_ids is None or 0 in bot.shard_ids:
+        try:
+            await sync_commands(
+                bot.tree,
+                bot.application_id,
+                COMMAND_SYNC_FILE,
+                guild_id=DEV_GUILD_ID or None,
+                force=COMMAND_SYNC_FORCE and not bot.commands_checked,
+            )
+            bot.commands_checked = True
+        except Exception as e:
+            print(f"❌ 커맨드 동기화 실패: {e}")
     print(f"🎰 {bot.user} 로그인 완료 (ID: {bot.user.id})")
 
 # ========================
@@ -90,216 +265,426 @@ async def on_ready():
 @bot.tree.command(name="잔액", description="내 코인 잔액 확인")
 async def balance_cmd(interaction: discord.Interaction):
     """유저의 현재 잔액을 확인합니다."""
-    user_data = get_user_data(interaction.user.id)
+    economy = await get_economy(interaction)
+    user_data = await economy.get_user(interaction.user.id)
     bal = user_data["balance"]
     await interaction.response.send_message(
         f"💰 **{interaction.user.display_name}**님의 잔액: **{bal:,}** 코인"
     )
 
 # ========================
-# 🎰 슬롯머신 게임
+# 게임 공통
 # ========================
 
-SLOT_SYMBOLS = ["🍒", "🍋", "🔔", "🍀", "⭐", "💎", "🍇"]
+async def settle_escrow(economy: GuildEconomy, escrow: Escrow, delta: int, won: bool = False) -> bool:
+    """배팅금 대비 순손익(delta)으로 정산하고 지표 / 서버 통계 / 기록에 반영. 이미 정산된 에스크로면 False"""
+    if await economy.wallet.settle(escrow, delta, won=int(won)) is None:
+        return False
+    game = escrow.game
+    outcome = "win" if won else "push" if delta == 0 else "loss"
+    metrics.inc("game_rounds_total", game=game, outcome=outcome)
+    metrics.inc("game_wagered_coins_total", escrow.amount, game=game)
+    metrics.inc("game_paid_coins_total", escrow.amount + delta, game=game)
+    economy.analytics.record(game, escrow.user_id, escrow.amount, escrow.amount + delta)
+    economy.history.record(escrow.user_id, game, escrow.amount, delta, outcome)
+    return True
+
+async def refund_escrow(economy: GuildEconomy, escrow: Escrow) -> bool:
+    """끝나지 않은 게임의 배팅금 환불 (이미 정산된 에스크로면 False)"""
+    if not await economy.wallet.refund(escrow):
+        return False
+    metrics.inc("game_rounds_total", game=escrow.game, outcome="refund")
+    economy.history.record(escrow.user_id, escrow.game, escrow.amount, 0, "refund")
+    return True
+
+class EscrowGameView(discord.ui.View):
+    """배팅금이 에스크로에 묶여 있는 게임 화면
 
-class SlotMachineView(discord.ui.View):
-    def __init__(self, player: discord.User, bet: int):
-        super().__init__(timeout=30)
+    - 게임 결과는 settle() 로 한 번만 정산
+    - 정산 전에 시간이 초과되면 배팅금 환불
+    - 메시지를 보낸 뒤에는 세션으로 등록되어 재시작 후에도 같은 버튼(custom_id)으로 이어서 진행
+      (시간 제한은 discord.py 대신 세션 레지스트리가 마지막으로 누른 시각부터 잰다)
+    """
+    not_owner_message = "❌ 다른 사람의 게임입니다!"
+
+    def __init__(self, player: discord.abc.Snowflake, economy: GuildEconomy, escrow: Escrow, timeout: float):
+        super().__init__(timeout=None)
+        self.ttl = timeout
         self.player = player
-        self.bet = bet
+        self.economy = economy
+        self.escrow = escrow
+        self.bet = escrow.amount
+        self.message: Optional[discord.Message | discord.PartialMessage] = None
+        self.session: Optional[GameSession] = None
+        metrics.instrument_view(self, escrow.game)
+
+    @classmethod
+    def restore(cls, saved: SavedSession, economy: GuildEconomy, escrow: Escrow) -> "EscrowGameView":
+        """저장된 세션으로 화면을 다시 만든다 (게임 상태가 있는 화면은 재정의)"""
+        return cls(discord.Object(id=saved.user_id), economy, escrow)
+
+    def session_state(self) -> bytes:
+        """세션에 저장할 게임 상태 (배팅금 말고는 상태가 없는 게임은 빈 값)"""
+        return b""
+
+    def save_session(self) -> None:
+        """바뀐 게임 상태를 세션에 반영 (파일은 백그라운드에서 저장)"""
+        if self.session is not None:
+            sessions.update(self.session, self.session_state())
+
+    def end_session(self) -> None:
+        """정산 / 환불이 끝난 세션을 뺌
+
+        파일에서 지워지기 전에 종료되어도 장부에서 닫힌 에스크로이므로 재시작 후 복구되지 않는다.
+        """
+        if self.session is not None:
+            sessions.remove(self.session)
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user != self.player:
+        # 남의 게임 버튼 연타도 응답을 보내므로 주인 확인보다 먼저 제한
+        retry_after = rate_limits.acquire("button", interaction)
+        if retry_after:
+            await interaction.response.send_message(cooldown_message(retry_after), ephemeral=True)
+            return False
+        if interaction.user.id != self.escrow.user_id:
             await interaction.response.send_message(
-                "❌ 다른 사람의 슬롯머신입니다!", ephemeral=True
+                self.not_owner_message, ephemeral=True
             )
             return False
+        if self.session is not None:
+            sessions.touch(self.session)
         return True
 
-    @discord.ui.button(label="🎲 돌리기", style=discord.ButtonStyle.primary)
+    async def settle(self, delta: int, won: bool = False) -> bool:
+        """배팅금 대비 순손익(delta)으로 정산. 이미 정산된 게임이면 False
+
+        정산에 실패하면 세션이 남아 있으므로 시간이 지나면 환불된다.
+        """
+        if not await settle_escrow(self.economy, self.escrow, delta, won=won):
+            return False
+        self.end_session()
+        self.stop()
+        return True
+
+    async def on_timeout(self):
+        if await refund_escrow(self.economy, self.escrow):
+            self.end_session()
+            await self.close_message(f"⌛ 시간이 초과되어 배팅금 **{self.escrow.amount:,}** 코인을 돌려드렸습니다.")
+
+    async def evict(self):
+        """진행 중인 게임이 SESSION_MAX 를 넘어 가장 오래 쓰지 않은 이 게임을 종료 (카드를 봤어도 환불)"""
+        self.stop()
+        if await refund_escrow(self.economy, self.escrow):
+            await self.close_message(
+                f"⚠️ 진행 중인 게임이 너무 많아 이 게임을 종료하고 배팅금 **{self.escrow.amount:,}** 코인을 돌려드렸습니다."
+            )
+
+    async def close_message(self, content: str):
+        """버튼을 모두 끄고 안내로 바꿈 (메시지가 없어졌으면 무시)"""
+        if self.message is None:
+            return
+        for item in self.children:
+            item.disabled = True
+        try:
+            await self.message.edit(content=content, view=self)
+        except discord.HTTPException:
+            pass
+
+async def expire_session(session: GameSession) -> None:
+    session.view.stop()
+    await session.view.on_timeout()
+
+async def evict_session(session: GameSession) -> None:
+    await session.view.evict()
+
+sessions.on_expire = expire_session
+sessions.on_evict = evict_session
+
+async def open_escrow(interaction: discord.Interaction, economy: GuildEconomy, game: str, bet: int) -> Optional[Escrow]:
+    """배팅금 확인 후 에스크로에 묶기 (실패 시 안내 메시지를 보내고 None)"""
+    if bet <= 0:
+        await interaction.response.send_message("❌ 배팅금액은 0보다 커야 합니다!", ephemeral=True)
+        return None
+    
+    try:
+        return await economy.wallet.escrow(interaction.user.id, game, bet)
+    except InsufficientFunds:
+        await interaction.response.send_message("❌ 잔액이 부족합니다!", ephemeral=True)
+        return None
+
+async def play_batch(
+    interaction: discord.Interaction, economy: GuildEconomy, game: str, bet: int, results: list
+) -> Optional[tuple[int, int, int, dict]]:
+    """미리 뽑아 둔 여러 판을 한 번에 정산 (실패 시 안내 메시지를 보내고 None)
+
+    배팅금은 한 번만 묶고 잔액 / 통계도 한 번만 기록한다.
+    (순손익, 진행한 판 수, 승리 수, 정산 후 유저 데이터) 를 반환
+    """
+    if bet <= 0:
+        await interaction.response.send_message("❌ 배팅금액은 0보다 커야 합니다!", ephemeral=True)
+        return None
+
+    balance = (await economy.get_user(interaction.user.id))["balance"]
+    delta, played, won, stake = batch_settlement(results, balance, bet)
+    if played == 0:
+        await interaction.response.send_message("❌ 잔액이 부족합니다!", ephemeral=True)
+        return None
+
+    escrow = await open_escrow(interaction, economy, game, stake)
+    if escrow is None:
+        return None
+    try:
+        user_data = await economy.wallet.settle(escrow, delta, won=won, rounds=played)
+    except Exception:
+        # 세션이 없으므로 여기서 돌려주지 않으면 재시작 때까지 에스크로가 열려 있음
+        await refund_escrow(economy, escrow)
+        raise
+
+    metrics.inc("game_rounds_total", won, game=game, outcome="win")
+    metrics.inc("game_rounds_total", played - won, game=game, outcome="loss")
+    metrics.inc("game_wagered_coins_total", bet * played, game=game)
+    metrics.inc("game_paid_coins_total", bet * played + delta, game=game)
+    economy.analytics.record(game, interaction.user.id, bet * played, bet * played + delta, rounds=played)
+    outcome = "win" if delta > 0 else "push" if delta == 0 else "loss"
+    economy.history.record(interaction.user.id, game, bet * played, delta, outcome, rounds=played)
+    return delta, played, won, user_data
+
+def batch_summary(title: str, bet: int, requested: int, delta: int, played: int, balance: int) -> discord.Embed:
+    """연속 플레이 결과 요약 (판별 결과 필드는 호출한 쪽에서 추가)"""
+    embed = discord.Embed(
+        title=f"{title} {played}회 연속",
+        color=discord.Color.green() if delta > 0 else discord.Color.red() if delta < 0 else discord.Color.light_grey()
+    )
+    embed.add_field(name="배팅", value=f"{bet:,} 코인 × {played}회", inline=True)
+    embed.add_field(name="손익", value=f"**{delta:+,}** 코인", inline=True)
+    embed.add_field(name="잔액", value=f"{balance:,} 코인", inline=True)
+    if played < requested:
+        embed.set_footer(text=f"⚠️ 잔액이 배팅금보다 적어져 {requested}회 중 {played}회에서 멈췄습니다.")
+    return embed
+
+async def send_game(interaction: discord.Interaction, view: EscrowGameView, content: str):
+    """게임 화면 전송 (전송에 실패하면 배팅금 환불)"""
+    try:
+        await interaction.response.send_message(content, view=view)
+        view.message = await interaction.original_response()
+    except Exception:
+        await view.economy.wallet.refund(view.escrow)
+        raise
+    view.session = GameSession(
+        view.message.id, interaction.channel_id or 0, economy_key(interaction.guild_id),
+        view.escrow, view.ttl, view.session_state(), view,
+    )
+    sessions.add(view.session)
+
+# ========================
+# 🎰 슬롯머신 게임
+# ========================
+
+class SlotMachineView(EscrowGameView):
+    not_owner_message = "❌ 다른 사람의 슬롯머신입니다!"
+
+    def __init__(self, player: discord.User, economy: GuildEconomy, escrow: Escrow):
+        super().__init__(player, economy, escrow, timeout=30)
+
+    @discord.ui.button(label="🎲 돌리기", style=discord.ButtonStyle.primary, custom_id="slot:spin")
     async def spin_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_data = get_user_data(self.player.id)
-        multipliers = get_multipliers()
+        multipliers = self.economy.get_multipliers()
         
         # 3개의 심볼 랜덤 선택
         result = [random.choice(SLOT_SYMBOLS) for _ in range(3)]
         
         # 결과 판정
-        if result[0] == result[1] == result[2]:
+        outcome = slot_outcome(result)
+        delta, won = slot_payout(outcome, self.bet, multipliers)
+        if outcome == "jackpot":
             # 잭팟! 3개 모두 일치
             mult = multipliers["slot"]["jackpot"]
-            payout = int(mult * self.bet)
-            user_data["balance"] += payout
-            user_data["stats"]["slot"]["won"] += 1
-            outcome_text = f"🎉 **잭팟!** {' '.join(result)}\n모두 일치! **{payout:,}** 코인 획득! (배율: {mult}x)"
-        elif result[0] == result[1] or result[1] == result[2] or result[0] == result[2]:
+            outcome_text = f"🎉 **잭팟!** {' '.join(result)}\n모두 일치! **{delta:,}** 코인 획득! (배율: {mult}x)"
+        elif outcome == "two_match":
             # 2개 일치
             mult = multipliers["slot"]["two_match"]
-            payout = int(mult * self.bet)
-            user_data["balance"] += payout
-            user_data["stats"]["slot"]["won"] += 1
-            outcome_text = f"✨ **승리!** {' '.join(result)}\n2개 일치! **{payout:,}** 코인 획득! (배율: {mult}x)"
+            outcome_text = f"✨ **승리!** {' '.join(result)}\n2개 일치! **{delta:,}** 코인 획득! (배율: {mult}x)"
         else:
             # 패배
-            user_data["balance"] -= self.bet
             outcome_text = f"💸 **패배** {' '.join(result)}\n일치하지 않음. **{self.bet:,}** 코인 잃음."
         
-        user_data["stats"]["slot"]["played"] += 1
-        save_data()
+        if not await self.settle(delta, won=won):
+            await interaction.response.defer()
+            return
         
         button.disabled = True
         await interaction.response.edit_message(content=outcome_text, view=self)
 
 @bot.tree.command(name="슬롯", description="슬롯머신 게임을 플레이합니다")
-@app_commands.describe(배팅금액="슬롯머신에 배팅할 코인 수")
-async def slot_cmd(interaction: discord.Interaction, 배팅금액: int):
-    user_data = get_user_data(interaction.user.id)
-    
-    if 배팅금액 <= 0:
-        await interaction.response.send_message("❌ 배팅금액은 0보다 커야 합니다!", ephemeral=True)
+@rate_limits.check()
+@app_commands.describe(
+    배팅금액="슬롯머신에 배팅할 코인 수",
+    횟수=f"한 번에 돌릴 횟수 (1~{BATCH_MAX_ROUNDS}, 잔액이 배팅금보다 적어지면 멈춤)"
+)
+async def slot_cmd(
+    interaction: discord.Interaction, 배팅금액: int, 횟수: app_commands.Range[int, 1, BATCH_MAX_ROUNDS] = 1
+):
+    economy = await get_economy(interaction)
+    if 횟수 > 1:
+        await slot_batch(interaction, economy, 배팅금액, 횟수)
         return
-    
-    if user_data["balance"] < 배팅금액:
-        await interaction.response.send_message("❌ 잔액이 부족합니다!", ephemeral=True)
+
+    escrow = await open_escrow(interaction, economy, "slot", 배팅금액)
+    if escrow is None:
         return
     
-    view = SlotMachineView(interaction.user, 배팅금액)
-    multipliers = get_multipliers()
+    view = SlotMachineView(interaction.user, economy, escrow)
+    multipliers = economy.get_multipliers()
     
-    await interaction.response.send_message(
+    await send_game(
+        interaction, view,
         f"🎰 **슬롯머신** - 배팅: **{배팅금액:,}** 코인\n"
         f"잭팟 배율: {multipliers['slot']['jackpot']}x | 2개 일치 배율: {multipliers['slot']['two_match']}x\n"
-        f"**돌리기** 버튼을 눌러주세요!",
-        view=view
+        f"**돌리기** 버튼을 눌러주세요!"
     )
 
+async def slot_batch(interaction: discord.Interaction, economy: GuildEconomy, bet: int, rounds: int):
+    multipliers = economy.get_multipliers()
+    reels = random.choices(SLOT_SYMBOLS, k=3 * rounds)
+    outcomes = [slot_outcome(reels[i:i + 3]) for i in range(0, 3 * rounds, 3)]
+    results = [slot_payout(outcome, bet, multipliers) for outcome in outcomes]
+
+    settled = await play_batch(interaction, economy, "slot", bet, results)
+    if settled is None:
+        return
+    delta, played, won, user_data = settled
+
+    jackpots = outcomes[:played].count("jackpot")
+    embed = batch_summary("🎰 슬롯머신", bet, rounds, delta, played, user_data["balance"])
+    embed.add_field(
+        name="결과",
+        value=(
+            f"🎉 잭팟: {jackpots}회 ({multipliers['slot']['jackpot']}x)\n"
+            f"✨ 2개 일치: {won - jackpots}회 ({multipliers['slot']['two_match']}x)\n"
+            f"💸 패배: {played - won}회"
+        ),
+        inline=False
+    )
+    await interaction.response.send_message(embed=embed)
+
 # ========================
 # 🎲 주사위 게임
 # ========================
 
-class DiceGameView(discord.ui.View):
-    def __init__(self, player: discord.User, bet: int):
-        super().__init__(timeout=20)
-        self.player = player
-        self.bet = bet
-
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user != self.player:
-            await interaction.response.send_message(
-                "❌ 다른 사람의 게임입니다!", ephemeral=True
-            )
-            return False
-        return True
+class DiceGameView(EscrowGameView):
+    def __init__(self, player: discord.User, economy: GuildEconomy, escrow: Escrow):
+        super().__init__(player, economy, escrow, timeout=20)
 
-    @discord.ui.button(label="🎲 주사위 굴리기", style=discord.ButtonStyle.success)
+    @discord.ui.button(label="🎲 주사위 굴리기", style=discord.ButtonStyle.success, custom_id="dice:roll")
     async def roll_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        user_data = get_user_data(self.player.id)
-        multipliers = get_multipliers()
+        multipliers = self.economy.get_multipliers()
         
-        player_roll = random.randint(1, 6)
-        bot_roll = random.randint(1, 6)
+        player_roll = random.randint(1, DICE_FACES)
+        bot_roll = random.randint(1, DICE_FACES)
         
         result_msg = f"🎲 당신: **{player_roll}** vs 봇: **{bot_roll}**\n"
         
-        if player_roll > bot_roll:
+        outcome = dice_outcome(player_roll, bot_roll)
+        delta, won = dice_payout(outcome, self.bet, multipliers)
+        if outcome > 0:
             mult = multipliers["dice"]["win"]
-            winnings = int((mult - 1) * self.bet)  # 배팅금액은 이미 차감되므로 순수익만 더함
-            user_data["balance"] += self.bet + winnings
-            user_data["stats"]["dice"]["won"] += 1
-            result_msg += f"✅ 승리! **{self.bet + winnings:,}** 코인 획득! (배율: {mult}x)"
-        elif player_roll < bot_roll:
-            user_data["balance"] -= self.bet
+            result_msg += f"✅ 승리! **{delta:,}** 코인 획득! (배율: {mult}x)"
+        elif outcome < 0:
             result_msg += f"❌ 패배! **{self.bet:,}** 코인 잃음."
         else:
             result_msg += "🤝 무승부! 코인 변동 없음."
         
-        user_data["stats"]["dice"]["played"] += 1
-        save_data()
+        if not await self.settle(delta, won=won):
+            await interaction.response.defer()
+            return
         
         button.disabled = True
         await interaction.response.edit_message(content=result_msg, view=self)
 
 @bot.tree.command(name="주사위", description="봇과 주사위 대결을 합니다")
+@rate_limits.check()
 @app_commands.describe(배팅금액="주사위 게임에 배팅할 코인 수")
 async def dice_cmd(interaction: discord.Interaction, 배팅금액: int):
-    user_data = get_user_data(interaction.user.id)
-    
-    if 배팅금액 <= 0:
-        await interaction.response.send_message("❌ 배팅금액은 0보다 커야 합니다!", ephemeral=True)
+    economy = await get_economy(interaction)
+    escrow = await open_escrow(interaction, economy, "dice", 배팅금액)
+    if escrow is None:
         return
     
-    if user_data["balance"] < 배팅금액:
-        await interaction.response.send_message("❌ 잔액이 부족합니다!", ephemeral=True)
-        return
+    view = DiceGameView(interaction.user, economy, escrow)
+    multipliers = economy.get_multipliers()
     
-    view = DiceGameView(interaction.user, 배팅금액)
-    multipliers = get_multipliers()
-    
-    await interaction.response.send_message(
+    await send_game(
+        interaction, view,
         f"🎲 **주사위 게임** - 배팅: **{배팅금액:,}** 코인\n"
         f"승리 배율: {multipliers['dice']['win']}x\n"
-        f"더 높은 숫자를 굴려 이기세요!",
-        view=view
+        f"더 높은 숫자를 굴려 이기세요!"
     )
 
 # ========================
 # 🃏 블랙잭 게임
 # ========================
 
-def calculate_total(cards: list[int]) -> int:
-    """블랙잭 카드 합계 계산 (에이스 조정 포함)"""
-    total = sum(cards)
-    aces = cards.count(11)
-    
-    while total > 21 and aces > 0:
-        total -= 10
-        aces -= 1
-    
-    return total
+# 채널별 카드 슈 (A=11, J/Q/K=10)
+shoes = ShoeRegistry(decks=BLACKJACK_DECKS, penetration=BLACKJACK_PENETRATION)
 
-class BlackjackView(discord.ui.View):
-    def __init__(self, player: discord.User, bet: int):
-        super().__init__(timeout=60)
-        self.player = player
-        self.bet = bet
+class BlackjackView(EscrowGameView):
+    not_owner_message = "❌ 다른 사람의 블랙잭 게임입니다!"
+
+    def __init__(self, player: discord.abc.Snowflake, economy: GuildEconomy, escrow: Escrow, balance: int, shoe: Shoe,
+                 hands: Optional[tuple[Hand, Hand]] = None):
+        super().__init__(player, economy, escrow, timeout=60)
         self.doubled = False
+        self.shoe = shoe
         
-        # 카드 뽑기 (A=11, J/Q/K=10)
-        draw_card = lambda: random.choice([11, 10, 10, 10] + list(range(2, 10)))
-        self.player_hand = [draw_card(), draw_card()]
-        self.dealer_hand = [draw_card(), draw_card()]
+        if hands is not None:
+            # 세션 복구 (이미 나눠 준 카드)
+            self.player_hand, self.dealer_hand = hands
+        else:
+            # 카드 뽑기 (컷 카드를 지났으면 새로 섞은 뒤)
+            shoe.begin_round()
+            self.player_hand = Hand([shoe.draw(), shoe.draw()])
+            self.dealer_hand = Hand([shoe.draw(), shoe.draw()])
         
-        # 더블 버튼 비활성화 (잔액 부족시)
-        if get_user_data(player.id)["balance"] < bet:
+        # 더블 버튼 비활성화 (남은 잔액 부족시)
+        if balance < self.bet:
             for item in self.children:
                 if isinstance(item, discord.ui.Button) and item.label == "더블":
                     item.disabled = True
+        
+        if not BLACKJACK_HINTS:
+            self.remove_item(self.hint_button)
 
-    async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user != self.player:
-            await interaction.response.send_message(
-                "❌ 다른 사람의 블랙잭 게임입니다!", ephemeral=True
-            )
-            return False
-        return True
+    @classmethod
+    def restore(cls, saved: SavedSession, economy: GuildEconomy, escrow: Escrow) -> "BlackjackView":
+        can_double, count = saved.state[0], saved.state[1]
+        hands = (Hand(saved.state[2:2 + count]), Hand(saved.state[2 + count:]))
+        shoe = shoes.get(saved.channel_id or saved.user_id)
+        view = cls(discord.Object(id=saved.user_id), economy, escrow, escrow.amount, shoe, hands)
+        view.double_button.disabled = not can_double
+        return view
 
-    @discord.ui.button(label="히트", style=discord.ButtonStyle.primary)
+    def session_state(self) -> bytes:
+        # 더블 가능 여부, 내 카드 수, 내 카드, 딜러 카드 (카드는 2~11 이라 한 장에 한 바이트)
+        return bytes((not self.double_button.disabled, len(self.player_hand), *self.player_hand, *self.dealer_hand))
+
+    @discord.ui.button(label="히트", style=discord.ButtonStyle.primary, custom_id="blackjack:hit")
     async def hit_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        card = random.choice([11, 10, 10, 10] + list(range(2, 10)))
-        self.player_hand.append(card)
-        player_total = calculate_total(self.player_hand)
+        # 더블은 카드 한 장 뒤 자동 스탠드이므로 진행 중이면 히트하지 않음
+        if self.doubled:
+            await interaction.response.defer()
+            return
+        player_total = self.player_hand.add(self.shoe.draw())
         
         content = f"**당신의 패:** {self.player_hand} (합계: {player_total})\n"
         content += f"**딜러의 패:** [{self.dealer_hand[0]}, ?]"
         
         if player_total > 21:
-            user_data = get_user_data(self.player.id)
-            loss = self.bet * (2 if self.doubled else 1)
-            user_data["balance"] -= loss
-            user_data["stats"]["blackjack"]["played"] += 1
-            save_data()
+            delta, won = blackjack_payout(BJ_BUST, self.escrow.amount, self.economy.get_multipliers())
+            if not await self.settle(delta, won=won):
+                await interaction.response.defer()
+                return
             
-            content += f"\n\n💥 **버스트!** 21을 초과했습니다. **{loss:,}** 코인 잃음."
+            content += f"\n\n💥 **버스트!** 21을 초과했습니다. **{-delta:,}** 코인 잃음."
             
             for item in self.children:
                 item.disabled = True
@@ -308,84 +693,116 @@ class BlackjackView(discord.ui.View):
             for item in self.children:
                 if isinstance(item, discord.ui.Button) and item.label == "더블":
                     item.disabled = True
+            # 받은 카드를 세션에 반영 (파일 저장은 기다리지 않음)
+            self.save_session()
         
         await interaction.response.edit_message(content=content, view=self)
 
-    @discord.ui.button(label="스탠드", style=discord.ButtonStyle.secondary)
-    async def stand_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        player_total = calculate_total(self.player_hand)
+    def play_dealer(self) -> tuple[str, int, bool]:
+        """딜러 패를 마저 진행하고 (결과 화면, 순손익, 승리 여부) 반환"""
+        player_total = self.player_hand.total
         
         # 딜러는 17 이상까지 카드를 뽑음
-        while calculate_total(self.dealer_hand) < 17:
-            card = random.choice([11, 10, 10, 10] + list(range(2, 10)))
-            self.dealer_hand.append(card)
+        while self.dealer_hand.total < DEALER_STANDS_ON:
+            self.dealer_hand.add(self.shoe.draw())
         
-        dealer_total = calculate_total(self.dealer_hand)
+        dealer_total = self.dealer_hand.total
         
-        user_data = get_user_data(self.player.id)
-        multipliers = get_multipliers()
-        base_bet = self.bet * (2 if self.doubled else 1)
+        multipliers = self.economy.get_multipliers()
+        base_bet = self.escrow.amount  # 더블 시 추가 배팅 포함
         
-        if dealer_total > 21 or player_total > dealer_total:
+        outcome = blackjack_outcome(player_total, dealer_total, self.player_hand.is_blackjack)
+        delta, won = blackjack_payout(outcome, base_bet, multipliers)
+        if won:
             # 블랙잭으로 이긴 경우 특별 배율
-            if player_total == 21 and len(self.player_hand) == 2:
-                mult = multipliers["blackjack"]["blackjack"]
-                winnings = int(base_bet * mult)
-                result = f"✅ **블랙잭!** {winnings:,} 코인 획득! (배율: {mult}x)"
-            else:
-                mult = multipliers["blackjack"]["win"]
-                winnings = int(base_bet * mult)
-                result = f"✅ **승리!** {winnings:,} 코인 획득! (배율: {mult}x)"
-            
-            user_data["balance"] += winnings
-            user_data["stats"]["blackjack"]["won"] += 1
-        elif dealer_total == player_total:
+            mult = multipliers["blackjack"][outcome]
+            title = "블랙잭!" if outcome == BJ_BLACKJACK else "승리!"
+            result = f"✅ **{title}** {delta:,} 코인 획득! (배율: {mult}x)"
+        elif delta == 0:
             result = "🤝 **푸시!** 무승부입니다."
         else:
-            user_data["balance"] -= base_bet
             result = f"❌ **패배!** {base_bet:,} 코인 잃음."
         
-        user_data["stats"]["blackjack"]["played"] += 1
-        save_data()
-        
         content = f"**당신의 패:** {self.player_hand} (합계: {player_total})\n"
         content += f"**딜러의 패:** {self.dealer_hand} (합계: {dealer_total})\n\n"
         content += result
+        return content, delta, won
+
+    @discord.ui.button(label="스탠드", style=discord.ButtonStyle.secondary, custom_id="blackjack:stand")
+    async def stand_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        content, delta, won = self.play_dealer()
+        
+        if not await self.settle(delta, won=won):
+            await interaction.response.defer()
+            return
         
         for item in self.children:
             item.disabled = True
         
         await interaction.response.edit_message(content=content, view=self)
 
-    @discord.ui.button(label="더블", style=discord.ButtonStyle.success)
+    @discord.ui.button(label="더블", style=discord.ButtonStyle.success, custom_id="blackjack:double")
     async def double_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # 연타로 두 번 들어온 클릭은 무시 (추가 배팅을 기다리기 전에 표시)
+        if self.doubled or self.escrow.settled:
+            await interaction.response.defer()
+            return
         self.doubled = True
-        user_data = get_user_data(self.player.id)
-        user_data["balance"] -= self.bet  # 추가 배팅 차감
+        # 추가 배팅 (잔액을 다시 확인)
+        try:
+            await self.economy.wallet.add_stake(self.escrow, self.bet)
+        except (InsufficientFunds, ValueError):
+            self.doubled = False
+            await interaction.response.send_message("❌ 잔액이 부족해 더블할 수 없습니다!", ephemeral=True)
+            return
         
-        card = random.choice([11, 10, 10, 10] + list(range(2, 10)))
-        self.player_hand.append(card)
+        self.player_hand.add(self.shoe.draw())
         
         # 자동으로 스탠드
-        await self.stand_button.callback(self, interaction, button=None)
+        await self.stand_button.callback(interaction)
+
+    @discord.ui.button(label="💡 힌트", style=discord.ButtonStyle.secondary, custom_id="blackjack:hint")
+    async def hint_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        solver = get_blackjack_solver(self.economy.get_multipliers())
+        upcard = self.dealer_hand[0]
+        can_double = not self.double_button.disabled
+        evs = solver.evs(self.player_hand, upcard, can_double)
+        action, _ = solver.best(self.player_hand, upcard, can_double)
+        
+        action_names = {STAND: "스탠드", HIT: "히트", DOUBLE: "더블"}
+        lines = [
+            f"{'👉 ' if name == action else ''}{action_names[name]}: {ev * 100:+.1f}%"
+            for name, ev in evs.items()
+        ]
+        await interaction.response.send_message(
+            f"💡 추천: **{action_names[action]}** (배팅금 대비 기대 손익)\n" + "\n".join(lines),
+            ephemeral=True
+        )
+
+    async def on_timeout(self):
+        # 이미 카드를 본 뒤이므로 환불하지 않고 스탠드로 처리
+        if self.escrow.settled:
+            return
+        content, delta, won = self.play_dealer()
+        if await self.settle(delta, won=won):
+            await self.close_message(f"⌛ 시간 초과로 자동 스탠드했습니다.\n{content}")
 
 @bot.tree.command(name="블랙잭", description="딜러와 블랙잭 게임을 합니다")
+@rate_limits.check()
 @app_commands.describe(배팅금액="블랙잭에 배팅할 코인 수")
 async def blackjack_cmd(interaction: discord.Interaction, 배팅금액: int):
-    user_data = get_user_data(interaction.user.id)
-    
-    if 배팅금액 <= 0:
-        await interaction.response.send_message("❌ 배팅금액은 0보다 커야 합니다!", ephemeral=True)
-        return
-    
-    if user_data["balance"] < 배팅금액:
-        await interaction.response.send_message("❌ 잔액이 부족합니다!", ephemeral=True)
+    economy = await get_economy(interaction)
+    escrow = await open_escrow(interaction, economy, "blackjack", 배팅금액)
+    if escrow is None:
         return
     
-    view = BlackjackView(interaction.user, 배팅금액)
-    multipliers = get_multipliers()
+    # 더블 가능 여부는 배팅금을 묶은 뒤의 잔액으로 판단
+    user_data = await economy.get_user(interaction.user.id)
+    shoe = shoes.get(interaction.channel_id or interaction.user.id)
+    view = BlackjackView(interaction.user, economy, escrow, user_data["balance"], shoe)
+    multipliers = economy.get_multipliers()
     
-    initial_player_total = calculate_total(view.player_hand)
+    initial_player_total = view.player_hand.total
     dealer_upcard = view.dealer_hand[0]
     
     content = f"🃏 **블랙잭** - 배팅: **{배팅금액:,}** 코인\n"
@@ -394,51 +811,369 @@ async def blackjack_cmd(interaction: discord.Interaction, 배팅금액: int):
     content += f"**딜러의 패:** [{dealer_upcard}, ?]\n\n"
     content += "**히트**, **스탠드**, 또는 **더블**을 선택하세요."
     
-    await interaction.response.send_message(content, view=view)
+    await send_game(interaction, view, content)
 
 # ========================
-# 🪙 동전 던지기
+# 🃏 블랙잭 테이블 (여러 명)
 # ========================
 
-class CoinFlipView(discord.ui.View):
-    def __init__(self, player: discord.User, bet: int):
-        super().__init__(timeout=15)
-        self.player = player
-        self.bet = bet
+# 채널 ID → 진행 중인 테이블 화면 (채널마다 하나)
+tables: dict[int, "BlackjackTableView"] = {}
+
+class BlackjackTableView(discord.ui.View):
+    """채널의 블랙잭 테이블 화면 (메시지 하나를 계속 수정)
+
+    - 배팅: 참가 버튼이나 /블랙잭테이블 로 착석, 시작 버튼 / 대기 시간 종료 / 만석이면 딜
+    - 진행: 좌석 순서대로 차례인 사람만 히트 / 스탠드 / 더블 (시간이 지나면 자동 스탠드)
+    - 모두 끝나면 딜러 진행 후 좌석별 정산, 다시 배팅 단계로 (아무도 앉지 않으면 테이블을 닫음)
+
+    버튼 클릭은 defer 로만 응답하고 메시지 수정은 DebouncedEditor 로 모아서 보낸다.
+    라운드가 끝나거나 테이블이 닫힐 때만 바로 수정한다.
+    """
+
+    def __init__(self, economy: GuildEconomy, table: BlackjackTable):
+        super().__init__(timeout=None)
+        # 테이블이 닫힐 때까지 서버 경제를 내리지 않음 (앉은 사람이 없어도 참가 버튼이 같은 경제를 씀)
+        self.economy = economy
+        economy.pins += 1
+        self.table = table
+        self.editor = DebouncedEditor(self.render, BLACKJACK_TABLE_EDIT_DELAY)
+        self.deadline = 0.0
+        self.last_dealer: Optional[Hand] = None
+        self.results: list[str] = []
+        self._lock = asyncio.Lock()
+        self._step = 0
+        self._timer: Optional[asyncio.Task] = None
+        self._flush = False
+        if not BLACKJACK_HINTS:
+            self.remove_item(self.hint_button)
+        metrics.instrument_view(self, "blackjack_table")
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user != self.player:
-            await interaction.response.send_message(
-                "❌ 다른 사람의 게임입니다!", ephemeral=True
-            )
+        retry_after = rate_limits.acquire("button", interaction)
+        if retry_after:
+            await interaction.response.send_message(cooldown_message(retry_after), ephemeral=True)
             return False
         return True
 
-    @discord.ui.button(label="앞면", style=discord.ButtonStyle.secondary)
+    # ---------- 화면 ----------
+
+    def render(self) -> dict:
+        table = self.table
+        multipliers = self.economy.get_multipliers()
+        embed = discord.Embed(title="🃏 블랙잭 테이블", color=discord.Color.dark_green())
+        if table.phase == BETTING:
+            embed.description = (
+                f"**참가** 버튼 (배팅 {table.bet:,} 코인) 이나 `/블랙잭테이블` 로 앉으세요. "
+                f"({len(table.seats)}/{table.max_seats}명)\n"
+                f"<t:{int(self.deadline)}:R> 에 시작합니다 (아무도 없으면 테이블을 닫음)"
+            )
+        elif table.phase == PLAYING:
+            seat = table.current
+            embed.description = (
+                f"👉 **{seat.player.display_name}**님 차례 - <t:{int(self.deadline)}:R> 자동 스탠드"
+                if seat is not None else "딜러 차례"
+            )
+        else:
+            embed.description = "테이블이 닫혔습니다."
+        embed.description += (
+            f"\n일반 승리: {multipliers['blackjack']['win']}x | 블랙잭: {multipliers['blackjack']['blackjack']}x"
+        )
+
+        if table.phase == PLAYING:
+            embed.add_field(name="딜러", value=f"[{table.dealer[0]}, ?]", inline=False)
+            lines = []
+            for index, seat in enumerate(table.seats):
+                marker = "👉" if index == table.turn else "⭐" if seat.hand.is_blackjack else "💥" if seat.hand.total > 21 else "✋" if seat.done else "⏳"
+                doubled = " (더블)" if seat.doubled else ""
+                lines.append(
+                    f"{marker} **{seat.player.display_name}** {seat.escrow.amount:,} 코인{doubled} · "
+                    f"{seat.hand} (합계: {seat.hand.total})"
+                )
+            embed.add_field(name="좌석", value="\n".join(lines), inline=False)
+        else:
+            if table.phase == BETTING and table.seats:
+                embed.add_field(
+                    name="다음 라운드",
+                    value="\n".join(f"🪑 **{seat.player.display_name}** {seat.escrow.amount:,} 코인" for seat in table.seats),
+                    inline=False
+                )
+            if self.results:
+                embed.add_field(
+                    name=f"지난 라운드 - 딜러 {self.last_dealer} (합계: {self.last_dealer.total})",
+                    value="\n".join(self.results),
+                    inline=False
+                )
+        embed.set_footer(text=f"라운드 {table.rounds + 1} · 좌석 {table.max_seats}개")
+
+        playing = table.phase == PLAYING
+        self.join_button.disabled = table.phase != BETTING or table.full
+        self.start_button.disabled = table.phase != BETTING or not table.seats
+        self.hit_button.disabled = self.stand_button.disabled = self.double_button.disabled = not playing
+        self.hint_button.disabled = not playing
+        return {"embed": embed, "view": self}
+
+    async def update(self) -> None:
+        """상태가 바뀐 뒤 호출 (라운드 종료 / 테이블 닫힘이면 바로, 아니면 모아서 수정)"""
+        if self._flush:
+            self._flush = False
+            await self.editor.flush()
+        else:
+            self.editor.request()
+
+    # ---------- 진행 (self._lock 안에서 호출) ----------
+
+    def schedule(self, seconds: float) -> None:
+        """seconds 초 뒤 마감 (배팅 단계면 딜 또는 테이블 닫기, 진행 중이면 자동 스탠드)"""
+        self._step += 1
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self.deadline = time.time() + seconds
+        self._timer = asyncio.ensure_future(self._expire(self._step, seconds))
+
+    async def _expire(self, step: int, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+        try:
+            async with self._lock:
+                # 기다리는 동안 다른 행동으로 마감이 바뀌었으면 무시
+                if step != self._step or self.table.phase == CLOSED:
+                    return
+                if self.table.phase == PLAYING:
+                    self.table.stand()
+                    await self.advance()
+                elif self.table.seats:
+                    await self.start_round()
+                else:
+                    await self.close_locked()
+            await self.update()
+        except Exception as e:
+            print(f"❌ 블랙잭 테이블 진행 실패 (채널 {self.table.channel_id}): {e}")
+
+    async def start_round(self) -> None:
+        self.table.deal()
+        await self.advance()
+
+    async def advance(self) -> None:
+        """다음 차례의 마감을 잡거나, 모두 끝났으면 정산"""
+        if self.table.finished:
+            await self.finish_round()
+        else:
+            self.schedule(BLACKJACK_TABLE_TURN_SECONDS)
+
+    async def finish_round(self) -> None:
+        table = self.table
+        table.play_dealer()
+        multipliers = self.economy.get_multipliers()
+        self.results = []
+        for seat, outcome in table.outcomes():
+            delta, won = blackjack_payout(outcome, seat.escrow.amount, multipliers)
+            await settle_escrow(self.economy, seat.escrow, delta, won=won)
+            if won:
+                title = "블랙잭!" if outcome == BJ_BLACKJACK else "승리!"
+                result = f"✅ {title} **{delta:+,}**"
+            elif delta == 0:
+                result = "🤝 푸시"
+            else:
+                result = f"{'💥 버스트' if outcome == BJ_BUST else '❌ 패배'} **{delta:+,}**"
+            self.results.append(f"**{seat.player.display_name}** {seat.hand} ({seat.hand.total}) {result}")
+        self.last_dealer = table.dealer
+        table.reset()
+        self.schedule(BLACKJACK_TABLE_JOIN_SECONDS)
+        self._flush = True
+
+    async def close_locked(self) -> None:
+        """테이블을 닫고 정산되지 않은 배팅금 환불"""
+        table = self.table
+        self._step += 1
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        table.phase = CLOSED
+        self.economy.pins -= 1
+        for seat in table.seats:
+            await refund_escrow(self.economy, seat.escrow)
+        if tables.get(table.channel_id) is self:
+            del tables[table.channel_id]
+        self.stop()
+        self._flush = True
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self.table.phase != CLOSED:
+                await self.close_locked()
+
+    async def seat(self, player: discord.abc.User, escrow: Escrow) -> Optional[str]:
+        """배팅금을 묶은 유저를 앉힌다 (실패하면 환불하고 이유를 반환)"""
+        async with self._lock:
+            try:
+                self.table.join(player, escrow)
+            except ValueError as e:
+                await self.economy.wallet.refund(escrow)
+                return str(e)
+            if self.table.full:
+                await self.start_round()
+        return None
+
+    # ---------- 버튼 ----------
+
+    @discord.ui.button(label="참가", style=discord.ButtonStyle.success, row=0)
+    async def join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.table.phase != BETTING or self.table.seat_of(interaction.user.id) is not None:
+            await interaction.response.send_message("❌ 지금은 앉을 수 없습니다!", ephemeral=True)
+            return
+        escrow = await open_escrow(interaction, self.economy, "blackjack", self.table.bet)
+        if escrow is None:
+            return
+        error = await self.seat(interaction.user, escrow)
+        if error is not None:
+            await interaction.response.send_message(f"❌ {error}", ephemeral=True)
+            return
+        await interaction.response.defer()
+        await self.update()
+
+    @discord.ui.button(label="시작", style=discord.ButtonStyle.primary, row=0)
+    async def start_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        async with self._lock:
+            started = self.table.phase == BETTING and self.table.seat_of(interaction.user.id) is not None
+            if started:
+                await self.start_round()
+        if not started:
+            await interaction.response.send_message("❌ 테이블에 앉은 사람만 시작할 수 있습니다!", ephemeral=True)
+            return
+        await interaction.response.defer()
+        await self.update()
+
+    async def play(self, interaction: discord.Interaction, action: str) -> None:
+        """현재 차례인 유저의 행동 (차례가 아니면 본인에게만 안내)"""
+        error = None
+        async with self._lock:
+            seat = self.table.current
+            if seat is None or seat.user_id != interaction.user.id:
+                error = "❌ 차례가 아닙니다!"
+            elif action == DOUBLE:
+                try:
+                    if seat.doubled or len(seat.hand) != 2:
+                        raise ValueError("처음 두 장에서만 더블할 수 있습니다")
+                    await self.economy.wallet.add_stake(seat.escrow, seat.escrow.amount)
+                except (InsufficientFunds, ValueError):
+                    error = "❌ 잔액이 부족하거나 더블할 수 없는 패입니다!"
+                else:
+                    self.table.double()
+            elif action == HIT:
+                self.table.hit()
+            else:
+                self.table.stand()
+            if error is None:
+                await self.advance()
+        if error is not None:
+            await interaction.response.send_message(error, ephemeral=True)
+            return
+        await interaction.response.defer()
+        await self.update()
+
+    @discord.ui.button(label="히트", style=discord.ButtonStyle.primary, row=1)
+    async def hit_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play(interaction, HIT)
+
+    @discord.ui.button(label="스탠드", style=discord.ButtonStyle.secondary, row=1)
+    async def stand_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play(interaction, STAND)
+
+    @discord.ui.button(label="더블", style=discord.ButtonStyle.success, row=1)
+    async def double_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.play(interaction, DOUBLE)
+
+    @discord.ui.button(label="💡 힌트", style=discord.ButtonStyle.secondary, row=1)
+    async def hint_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        seat = self.table.current
+        if seat is None or seat.user_id != interaction.user.id:
+            await interaction.response.send_message("❌ 차례가 아닙니다!", ephemeral=True)
+            return
+        solver = get_blackjack_solver(self.economy.get_multipliers())
+        upcard = self.table.dealer[0]
+        can_double = not seat.doubled and len(seat.hand) == 2
+        evs = solver.evs(seat.hand, upcard, can_double)
+        action, _ = solver.best(seat.hand, upcard, can_double)
+
+        action_names = {STAND: "스탠드", HIT: "히트", DOUBLE: "더블"}
+        lines = [
+            f"{'👉 ' if name == action else ''}{action_names[name]}: {ev * 100:+.1f}%"
+            for name, ev in evs.items()
+        ]
+        await interaction.response.send_message(
+            f"💡 추천: **{action_names[action]}** (배팅금 대비 기대 손익)\n" + "\n".join(lines),
+            ephemeral=True
+        )
+
+@bot.tree.command(name="블랙잭테이블", description="채널의 블랙잭 테이블에 앉습니다 (여러 명이 함께 딜러와 대결)")
+@rate_limits.check()
+@app_commands.describe(배팅금액="이번 라운드에 배팅할 코인 수 (테이블을 새로 열면 참가 버튼의 기본 배팅금)")
+async def blackjack_table_cmd(interaction: discord.Interaction, 배팅금액: int):
+    channel_id = interaction.channel_id or interaction.user.id
+    view = tables.get(channel_id)
+    if view is not None and view.table.phase != BETTING:
+        await interaction.response.send_message(
+            "❌ 이 채널의 테이블은 라운드를 진행 중입니다. 끝난 뒤 **참가** 버튼으로 앉으세요.", ephemeral=True
+        )
+        return
+
+    economy = await get_economy(interaction)
+    escrow = await open_escrow(interaction, economy, "blackjack", 배팅금액)
+    if escrow is None:
+        return
+
+    # 기존 테이블에 앉기 (배팅금을 묶는 사이에 생겼을 수도 있음)
+    view = tables.get(channel_id)
+    if view is not None:
+        error = await view.seat(interaction.user, escrow)
+        if error is not None:
+            await interaction.response.send_message(f"❌ {error}", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"🪑 테이블에 앉았습니다! (배팅 {배팅금액:,} 코인)", ephemeral=True)
+            await view.update()
+        return
+
+    table = BlackjackTable(channel_id, shoes.get(channel_id), 배팅금액, seats=BLACKJACK_TABLE_SEATS)
+    table.join(interaction.user, escrow)
+    view = BlackjackTableView(economy, table)
+    tables[channel_id] = view
+    view.schedule(BLACKJACK_TABLE_JOIN_SECONDS)
+    try:
+        await interaction.response.send_message(**view.render())
+        view.editor.message = await interaction.original_response()
+    except Exception:
+        await view.close()
+        raise
+
+# ========================
+# 🪙 동전 던지기
+# ========================
+
+class CoinFlipView(EscrowGameView):
+    def __init__(self, player: discord.User, economy: GuildEconomy, escrow: Escrow):
+        super().__init__(player, economy, escrow, timeout=15)
+
+    @discord.ui.button(label="앞면", style=discord.ButtonStyle.secondary, custom_id="coinflip:heads")
     async def heads_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.resolve_bet(interaction, guess="앞면")
 
-    @discord.ui.button(label="뒷면", style=discord.ButtonStyle.secondary)
+    @discord.ui.button(label="뒷면", style=discord.ButtonStyle.secondary, custom_id="coinflip:tails")
     async def tails_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.resolve_bet(interaction, guess="뒷면")
 
     async def resolve_bet(self, interaction: discord.Interaction, guess: str):
-        user_data = get_user_data(self.player.id)
-        multipliers = get_multipliers()
-        outcome = random.choice(["앞면", "뒷면"])
+        multipliers = self.economy.get_multipliers()
+        outcome = random.choice(COIN_SIDES)
         
-        if outcome == guess:
+        delta, won = coinflip_payout(outcome == guess, self.bet, multipliers)
+        if won:
             mult = multipliers["coinflip"]["win"]
-            winnings = int(self.bet * mult)
-            user_data["balance"] += winnings
-            user_data["stats"]["bet"]["won"] += 1
-            result = f"✅ **{outcome}**! 정답! **{winnings:,}** 코인 획득! (배율: {mult}x)"
+            result = f"✅ **{outcome}**! 정답! **{delta:,}** 코인 획득! (배율: {mult}x)"
         else:
-            user_data["balance"] -= self.bet
             result = f"❌ **{outcome}**. 틀렸습니다. **{self.bet:,}** 코인 잃음."
         
-        user_data["stats"]["bet"]["played"] += 1
-        save_data()
+        if not await self.settle(delta, won=won):
+            await interaction.response.defer()
+            return
         
         for item in self.children:
             item.disabled = True
@@ -446,34 +1181,210 @@ class CoinFlipView(discord.ui.View):
         await interaction.response.edit_message(content=result, view=self)
 
 @bot.tree.command(name="동전던지기", description="동전 던지기 게임 (앞면/뒷면)")
-@app_commands.describe(배팅금액="동전 던지기에 배팅할 코인 수")
-async def coinflip_cmd(interaction: discord.Interaction, 배팅금액: int):
-    user_data = get_user_data(interaction.user.id)
-    
-    if 배팅금액 <= 0:
-        await interaction.response.send_message("❌ 배팅금액은 0보다 커야 합니다!", ephemeral=True)
+@rate_limits.check()
+@app_commands.describe(
+    배팅금액="동전 던지기에 배팅할 코인 수",
+    횟수=f"한 번에 던질 횟수 (1~{BATCH_MAX_ROUNDS}, 잔액이 배팅금보다 적어지면 멈춤)",
+    선택="여러 번 던질 때 고를 면 (기본: 앞면)"
+)
+@app_commands.choices(선택=[app_commands.Choice(name=side, value=side) for side in COIN_SIDES])
+async def coinflip_cmd(
+    interaction: discord.Interaction, 배팅금액: int,
+    횟수: app_commands.Range[int, 1, BATCH_MAX_ROUNDS] = 1, 선택: Optional[str] = None
+):
+    economy = await get_economy(interaction)
+    if 횟수 > 1:
+        await coinflip_batch(interaction, economy, 배팅금액, 횟수, 선택 or COIN_SIDES[0])
         return
-    
-    if user_data["balance"] < 배팅금액:
-        await interaction.response.send_message("❌ 잔액이 부족합니다!", ephemeral=True)
+
+    escrow = await open_escrow(interaction, economy, "bet", 배팅금액)
+    if escrow is None:
         return
     
-    view = CoinFlipView(interaction.user, 배팅금액)
-    multipliers = get_multipliers()
+    view = CoinFlipView(interaction.user, economy, escrow)
+    multipliers = economy.get_multipliers()
     
-    await interaction.response.send_message(
+    await send_game(
+        interaction, view,
         f"🪙 **동전 던지기** - 배팅: **{배팅금액:,}** 코인\n"
         f"승리 배율: {multipliers['coinflip']['win']}x\n"
-        f"앞면 또는 뒷면을 선택하세요!",
-        view=view
+        f"앞면 또는 뒷면을 선택하세요!"
     )
 
+async def coinflip_batch(interaction: discord.Interaction, economy: GuildEconomy, bet: int, rounds: int, guess: str):
+    multipliers = economy.get_multipliers()
+    flips = random.choices(COIN_SIDES, k=rounds)
+    results = [coinflip_payout(flip == guess, bet, multipliers) for flip in flips]
+
+    settled = await play_batch(interaction, economy, "bet", bet, results)
+    if settled is None:
+        return
+    delta, played, won, user_data = settled
+
+    embed = batch_summary("🪙 동전 던지기", bet, rounds, delta, played, user_data["balance"])
+    embed.add_field(
+        name=f"결과 ({guess} 선택)",
+        value=(
+            f"✅ 정답: {won}회 ({multipliers['coinflip']['win']}x)\n"
+            f"❌ 틀림: {played - won}회\n"
+            f"{''.join('⚪' if flip == COIN_SIDES[0] else '⚫' for flip in flips[:played])} (⚪ 앞면 / ⚫ 뒷면)"
+        ),
+        inline=False
+    )
+    await interaction.response.send_message(embed=embed)
+
+# ========================
+# 게임 세션 복구
+# ========================
+
+# 에스크로 게임 이름 → 게임 화면 ("bet" 은 동전 던지기)
+GAME_VIEWS: dict[str, type[EscrowGameView]] = {
+    "slot": SlotMachineView,
+    "dice": DiceGameView,
+    "blackjack": BlackjackView,
+    "bet": CoinFlipView,
+}
+
+# 복구할 세션의 에스크로 ID (경제를 불러올 때 환불하지 않고 화면과 함께 다시 연결)
+restoring: set[str] = set()
+
+async def recover_escrows(economy: GuildEconomy) -> None:
+    """경제를 불러올 때 저장소 장부에 남아 있는 배팅금 정리
+
+    게임이 진행 중인 서버는 내리지 않으므로, 불러올 때 장부에 열려 있는 이 프로세스의 에스크로는
+    재시작이나 비정상 종료 전에 끝나지 않은 게임이다. 복구할 세션이 있는 것만 남기고 나머지는 환불한다.
+    경제 서비스를 함께 쓰는 다른 샤드 프로세스의 에스크로는 그 프로세스의 임대가 끝났을 때만 환불한다.
+    """
+    escrows = await economy.backend.open_escrows()
+    live: set[str] = set()
+    if service_client is not None:
+        others = {owner for *_, owner in escrows if owner and owner != ECONOMY_OWNER}
+        if others:
+            live = await service_client.live_owners(sorted(others))
+    for escrow_id, user_id, game, amount, debits, owner in escrows:
+        if owner in live:
+            # 다른 프로세스에서 아직 진행 중인 게임
+            continue
+        escrow = economy.wallet.restore(escrow_id, user_id, game, amount, debits)
+        if escrow_id not in restoring:
+            await refund_escrow(economy, escrow)
+
+economies.before_ready = recover_escrows
+
+async def restore_sessions() -> int:
+    """재시작 전에 진행 중이던 게임의 배팅금과 화면을 다시 연결 (시작할 때 한 번)
+
+    장부에 없는 세션은 이미 정산 / 환불된 게임이므로 버리고, 장부의 배팅금이 세션과 다르면
+    (더블 직후 세션이 저장되기 전에 종료) 저장된 게임 상태가 오래된 것이므로 환불한다.
+    시간이 이미 지난 세션도 일단 등록해 두면 첫 정리 때 평소처럼 환불 / 자동 스탠드된다.
+    """
+    saved_sessions = await asyncio.get_running_loop().run_in_executor(None, sessions.load)
+    restoring.update(saved.escrow_id for saved in saved_sessions)
+    restored = 0
+    try:
+        for saved in saved_sessions:
+            try:
+                economy = await economies.get(saved.guild_id)
+            except Exception as e:
+                print(f"❌ 게임 세션 복구 실패 (메시지 {saved.message_id}): {e}")
+                continue
+            escrow = economy.wallet.open.get(saved.escrow_id)
+            action = restore_action(saved, escrow, GAME_VIEWS)
+            if action == DROP:
+                continue
+            if action == REFUND:
+                print(f"⚠️ 이어서 할 수 없는 게임의 배팅금을 환불합니다 ({saved.game}, 메시지 {saved.message_id})")
+                await refund_escrow(economy, escrow)
+                continue
+            try:
+                view = GAME_VIEWS[saved.game].restore(saved, economy, escrow)
+            except Exception as e:
+                print(f"❌ 게임 세션 복구 실패, 배팅금을 환불합니다 (메시지 {saved.message_id}): {e}")
+                await refund_escrow(economy, escrow)
+                continue
+            view.message = bot.get_partial_messageable(saved.channel_id).get_partial_message(saved.message_id)
+            view.session = GameSession(
+                saved.message_id, saved.channel_id, saved.guild_id, escrow, saved.ttl, saved.state, view,
+                last_used=saved.last_used,
+            )
+            sessions.add(view.session, restored=True)
+            bot.add_view(view, message_id=saved.message_id)
+            restored += 1
+    finally:
+        restoring.clear()
+    if restored != len(saved_sessions):
+        # 버린 세션이 파일에 남지 않도록
+        sessions.mark_dirty()
+    if restored:
+        print(f"🔁 진행 중이던 게임 {restored}개를 복구했습니다")
+    return restored
+
 # ========================
 # 관리자 명령어
 # ========================
 
+# 관리자 명령어를 쓸 수 있는 역할 이름 (/기록 으로 다른 유저의 기록을 볼 때도 같은 역할)
+ADMIN_ROLES = ("관리자", "Admin", "Administrator")
+
+GAME_NAMES = {"slot": "슬롯머신", "dice": "주사위", "blackjack": "블랙잭", "coinflip": "동전던지기"}
+# 게임 기록 / 통계 표시용 (동전던지기는 에스크로 게임 이름이 "bet")
+GAME_LABELS = {"slot": "🎰 슬롯머신", "dice": "🎲 주사위", "blackjack": "🃏 블랙잭", "bet": "🪙 동전던지기"}
+MULTIPLIER_TYPE_NAMES = {
+    "jackpot": "잭팟", "two_match": "2개 일치", 
+    "win": "승리", "blackjack": "블랙잭(21)"
+}
+
+class MultiplierPreviewView(discord.ui.View):
+    """배율 변경 전 RTP 미리보기 (적용 버튼을 눌러야 실제로 변경)"""
+
+    def __init__(self, admin: discord.User, game: str, kind: str, value: float):
+        super().__init__(timeout=60)
+        self.admin = admin
+        self.game = game
+        self.kind = kind
+        self.value = value
+        metrics.instrument_view(self, "multiplier_preview")
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user != self.admin:
+            await interaction.response.send_message("❌ 다른 관리자의 설정 화면입니다!", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="적용", style=discord.ButtonStyle.danger)
+    async def apply_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        # 미리보기 이후 서버 경제가 내려갔을 수 있으므로 누를 때 다시 가져옴
+        try:
+            economy = await get_economy(interaction)
+            await economy.set_multiplier(self.game, self.kind, self.value)
+        finally:
+            release_economy(interaction)
+        self.stop()
+        await interaction.response.edit_message(
+            content=f"✅ **{GAME_NAMES[self.game]}**의 **{MULTIPLIER_TYPE_NAMES.get(self.kind, self.kind)}** 배율을 **{self.value}x**로 설정했습니다!",
+            view=None
+        )
+
+    @discord.ui.button(label="취소", style=discord.ButtonStyle.secondary)
+    async def cancel_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.edit_message(content="배율 변경을 취소했습니다.", view=None)
+
+def candidate_multipliers(current: dict, game: str, kind: str, value: float) -> dict:
+    candidate = copy.deepcopy(current)
+    candidate[game][kind] = value
+    return candidate
+
+async def preview_rtp(current: dict, game: str, kind: str, value: float) -> tuple[simulator.SimResult, simulator.SimResult]:
+    """현재 배율과 변경 후 배율의 RTP 를 별도 스레드에서 시뮬레이션"""
+    candidate = candidate_multipliers(current, game, kind, value)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, simulator.preview_change, game, current, candidate, RTP_PREVIEW_ROUNDS
+    )
+
 @bot.tree.command(name="배율설정", description="(관리자) 게임 배율 설정")
-@app_commands.checks.has_any_role("관리자", "Admin", "Administrator")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
 @app_commands.describe(
     게임="설정할 게임 선택",
     종류="배율 종류",
@@ -488,8 +1399,6 @@ async def coinflip_cmd(interaction: discord.Interaction, 배팅금액: int):
     ]
 )
 async def set_multiplier_cmd(interaction: discord.Interaction, 게임: str, 종류: str, 배율: float):
-    multipliers = get_multipliers()
-    
     # 유효한 종류인지 확인
     valid_types = {
         "slot": ["jackpot", "two_match"],
@@ -510,27 +1419,38 @@ async def set_multiplier_cmd(interaction: discord.Interaction, 게임: str, 종
         await interaction.response.send_message("❌ 배율은 0보다 커야 합니다!", ephemeral=True)
         return
     
-    # 배율 업데이트
-    if 게임 not in multipliers:
-        multipliers[게임] = {}
-    multipliers[게임][종류] = 배율
-    economy_data["multipliers"] = multipliers
-    save_data()
-    
-    game_names = {"slot": "슬롯머신", "dice": "주사위", "blackjack": "블랙잭", "coinflip": "동전던지기"}
-    type_names = {
-        "jackpot": "잭팟", "two_match": "2개 일치", 
-        "win": "승리", "blackjack": "블랙잭(21)"
-    }
+    label = f"**{GAME_NAMES[게임]}**의 **{MULTIPLIER_TYPE_NAMES.get(종류, 종류)}** 배율"
+    economy = await get_economy(interaction)
     
-    await interaction.response.send_message(
-        f"✅ **{game_names[게임]}**의 **{type_names.get(종류, 종류)}** 배율을 **{배율}x**로 설정했습니다!",
-        ephemeral=True
+    # numpy 가 없으면 미리보기 없이 바로 변경
+    if not simulator.AVAILABLE:
+        await economy.set_multiplier(게임, 종류, 배율)
+        await interaction.response.send_message(f"✅ {label}을 **{배율}x**로 설정했습니다!", ephemeral=True)
+        return
+    
+    # 시뮬레이션 동안 응답 대기
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    current = economy.get_multipliers()
+    before, after = await preview_rtp(current, 게임, 종류, 배율)
+    
+    note = " (플레이어가 17 이상에서 스탠드, 더블 없음 기준)" if 게임 == "blackjack" else ""
+    content = (
+        f"📊 {label}을 **{배율}x**로 바꾸면{note}\n"
+        f"RTP: **{before.rtp * 100:.2f}%** → **{after.rtp * 100:.2f}%** (±{after.ci95 * 100:.2f}%p, {after.rounds:,}판)\n"
+        f"한 판 손익 표준편차: {before.stdev:.2f} → {after.stdev:.2f} (배팅금 단위)\n"
     )
+    if 게임 == "blackjack":
+        # 최적 전략 기준의 정확한 값
+        exact_before = get_blackjack_solver(current).expected_value()
+        exact_after = BlackjackSolver(candidate_multipliers(current, 게임, 종류, 배율)).expected_value()
+        content += f"최적 전략 기대 손익: **{exact_before * 100:+.2f}%** → **{exact_after * 100:+.2f}%** (정확한 값)\n"
+    content += "\n**적용**을 눌러야 변경됩니다."
+    await interaction.followup.send(content, view=MultiplierPreviewView(interaction.user, 게임, 종류, 배율), ephemeral=True)
 
 @bot.tree.command(name="배율확인", description="현재 게임 배율 확인")
 async def check_multipliers_cmd(interaction: discord.Interaction):
-    multipliers = get_multipliers()
+    economy = await get_economy(interaction)
+    multipliers = economy.get_multipliers()
     
     embed = discord.Embed(
         title="🎮 현재 게임 배율",
@@ -568,18 +1488,11 @@ async def check_multipliers_cmd(interaction: discord.Interaction):
     await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="잔액초기화", description="(관리자) 유저의 잔액을 초기값으로 리셋")
-@app_commands.checks.has_any_role("관리자", "Admin", "Administrator")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
 @app_commands.describe(유저="잔액을 초기화할 유저")
 async def reset_balance_cmd(interaction: discord.Interaction, 유저: discord.Member):
-    user_data = get_user_data(유저.id)
-    user_data["balance"] = DEFAULT_START_BALANCE
-    user_data["stats"] = {
-        "slot": {"played": 0, "won": 0},
-        "dice": {"played": 0, "won": 0},
-        "blackjack": {"played": 0, "won": 0},
-        "bet": {"played": 0, "won": 0}
-    }
-    save_data()
+    economy = await get_economy(interaction)
+    await economy.reset_user(유저.id)
     
     await interaction.response.send_message(
         f"✅ **{유저.display_name}**님의 잔액을 {DEFAULT_START_BALANCE:,} 코인으로 초기화했습니다.",
@@ -587,19 +1500,14 @@ async def reset_balance_cmd(interaction: discord.Interaction, 유저: discord.Me
     )
 
 @bot.tree.command(name="코인지급", description="(관리자) 유저에게 코인 지급/차감")
-@app_commands.checks.has_any_role("관리자", "Admin", "Administrator")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
 @app_commands.describe(
     유저="코인을 지급/차감할 유저",
     금액="지급할 코인 수 (음수로 차감 가능)"
 )
 async def givecoins_cmd(interaction: discord.Interaction, 유저: discord.Member, 금액: int):
-    user_data = get_user_data(유저.id)
-    user_data["balance"] += 금액
-    
-    if user_data["balance"] < 0:
-        user_data["balance"] = 0
-    
-    save_data()
+    economy = await get_economy(interaction)
+    user_data = await economy.adjust_balance(유저.id, 금액)
     
     if 금액 >= 0:
         msg = f"**{유저.display_name}**님에게 {금액:,} 코인을 지급했습니다. 현재 잔액: {user_data['balance']:,}"
@@ -608,11 +1516,142 @@ async def givecoins_cmd(interaction: discord.Interaction, 유저: discord.Member
     
     await interaction.response.send_message(f"✅ {msg}", ephemeral=True)
 
+# ========================
+# 관리자 일괄 명령어
+# ========================
+
+# 유저 목록에서 멘션(<@123>) / ID 를 찾는 패턴
+USER_ID_PATTERN = re.compile(r"\d{15,21}")
+
+async def collect_bulk_targets(
+    guild: discord.Guild, role: Optional[discord.Role], users: Optional[str]
+) -> tuple[list[int], dict[int, str]]:
+    """역할 멤버와 유저 목록의 ID (중복 제거, 봇 제외) 와 알게 된 이름
+
+    멤버 목록을 받아두지 않은 서버는 REST 로 1000명씩 받아오며 역할을 확인한다.
+    """
+    user_ids = [int(value) for value in USER_ID_PATTERN.findall(users or "")]
+    names: dict[int, str] = {}
+    if role is not None:
+        if guild.chunked:
+            members = role.members
+        else:
+            members = [member async for member in guild.fetch_members(limit=None) if member.get_role(role.id)]
+        for member in members:
+            if not member.bot:
+                user_ids.append(member.id)
+                names[member.id] = member.display_name
+    return list(dict.fromkeys(user_ids)), names
+
+def bulk_report(rows: list[tuple[int, int, int]], names: dict[int, str]) -> discord.File:
+    """유저별 이전 / 이후 잔액 CSV"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["user_id", "name", "before", "after", "change"])
+    for user_id, before, after in rows:
+        writer.writerow([user_id, names.get(user_id, ""), before, after, after - before])
+    # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+    return discord.File(io.BytesIO(buffer.getvalue().encode("utf-8-sig")), filename="bulk_report.csv")
+
+async def run_bulk(
+    interaction: discord.Interaction, title: str, role: Optional[discord.Role], users: Optional[str],
+    everyone: bool, dry_run: bool, delta: int = 0, reset: bool = False
+):
+    """대상을 모아 한 번에 반영하고 요약 + 보고서를 보낸다"""
+    if not everyone and role is None and not users:
+        await interaction.response.send_message("❌ 역할, 유저목록, 전체 중 하나는 지정해야 합니다!", ephemeral=True)
+        return
+    if interaction.guild is None:
+        await interaction.response.send_message("❌ 서버에서만 사용할 수 있습니다!", ephemeral=True)
+        return
+    if role is not None and not everyone and not MEMBERS_INTENT:
+        await interaction.response.send_message(
+            "❌ 역할 대상은 멤버 인텐트가 필요합니다! (`MEMBERS_INTENT=1`)", ephemeral=True
+        )
+        return
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    economy = await get_economy(interaction)
+    names: dict[int, str] = {}
+    user_ids = None
+    if not everyone:
+        try:
+            user_ids, names = await collect_bulk_targets(interaction.guild, role, users)
+        except discord.HTTPException as e:
+            await interaction.followup.send(f"❌ 멤버 목록을 가져오지 못했습니다: {e}", ephemeral=True)
+            return
+    start = time.perf_counter()
+    rows = await economy.bulk_update(user_ids, delta, reset=reset, dry_run=dry_run)
+    elapsed = time.perf_counter() - start
+    if not rows:
+        await interaction.followup.send("❌ 대상 유저가 없습니다!", ephemeral=True)
+        return
+    if not dry_run:
+        metrics.inc("admin_bulk_users_total", len(rows), op="reset" if reset else "adjust")
+
+    total = sum(after - before for _, before, after in rows)
+    embed = discord.Embed(
+        title=f"{'🔍 미리보기 - ' if dry_run else '✅ '}{title}",
+        color=discord.Color.light_grey() if dry_run else discord.Color.green()
+    )
+    embed.add_field(name="대상", value=f"{len(rows):,}명", inline=True)
+    embed.add_field(name="잔액 변동 합계", value=f"{total:+,} 코인", inline=True)
+    if delta < 0:
+        clamped = sum(1 for _, before, _ in rows if before + delta < 0)
+        embed.add_field(name="0 코인으로 제한", value=f"{clamped:,}명", inline=True)
+    embed.add_field(
+        name=f"유저 (처음 {min(len(rows), BULK_PREVIEW_USERS)}명, 전체는 첨부 파일)",
+        value="\n".join(
+            f"{names.get(user_id) or f'<@{user_id}>'}: {before:,} → {after:,}"
+            for user_id, before, after in rows[:BULK_PREVIEW_USERS]
+        ),
+        inline=False
+    )
+    embed.set_footer(
+        text="미리보기라 저장하지 않았습니다." if dry_run else f"한 번에 저장 ({elapsed * 1000:.0f}ms)"
+    )
+    await interaction.followup.send(embed=embed, file=bulk_report(rows, names), ephemeral=True)
+
+@bot.tree.command(name="일괄지급", description="(관리자) 여러 유저에게 한 번에 코인 지급/차감")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
+@app_commands.describe(
+    금액="유저마다 지급할 코인 수 (음수로 차감 가능)",
+    역할="이 역할을 가진 멤버 전체",
+    유저목록="멘션 또는 유저 ID (공백/쉼표로 구분)",
+    전체="이 서버에 기록이 있는 모든 유저",
+    미리보기="저장하지 않고 결과만 확인"
+)
+async def bulk_givecoins_cmd(
+    interaction: discord.Interaction, 금액: int, 역할: Optional[discord.Role] = None,
+    유저목록: Optional[str] = None, 전체: bool = False, 미리보기: bool = False
+):
+    if 금액 == 0:
+        await interaction.response.send_message("❌ 금액은 0이 아니어야 합니다!", ephemeral=True)
+        return
+    title = f"일괄 {'지급' if 금액 > 0 else '차감'} ({abs(금액):,} 코인)"
+    await run_bulk(interaction, title, 역할, 유저목록, 전체, 미리보기, delta=금액)
+
+@bot.tree.command(name="일괄초기화", description="(관리자) 여러 유저의 잔액과 통계를 한 번에 초기화")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
+@app_commands.describe(
+    역할="이 역할을 가진 멤버 전체",
+    유저목록="멘션 또는 유저 ID (공백/쉼표로 구분)",
+    전체="이 서버에 기록이 있는 모든 유저",
+    미리보기="저장하지 않고 결과만 확인"
+)
+async def bulk_reset_cmd(
+    interaction: discord.Interaction, 역할: Optional[discord.Role] = None,
+    유저목록: Optional[str] = None, 전체: bool = False, 미리보기: bool = False
+):
+    title = f"일괄 초기화 ({DEFAULT_START_BALANCE:,} 코인)"
+    await run_bulk(interaction, title, 역할, 유저목록, 전체, 미리보기, reset=True)
+
 @bot.tree.command(name="통계", description="(관리자) 유저의 도박 통계 확인")
-@app_commands.checks.has_any_role("관리자", "Admin", "Administrator")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
 @app_commands.describe(유저="통계를 확인할 유저")
 async def stats_cmd(interaction: discord.Interaction, 유저: discord.Member):
-    user_data = get_user_data(유저.id)
+    economy = await get_economy(interaction)
+    user_data = await economy.get_user(유저.id)
     stats = user_data["stats"]
     
     embed = discord.Embed(
@@ -655,7 +1694,8 @@ async def stats_cmd(interaction: discord.Interaction, 유저: discord.Member):
 @bot.tree.command(name="내통계", description="내 도박 통계 확인")
 async def my_stats_cmd(interaction: discord.Interaction):
     """자신의 도박 통계를 확인합니다."""
-    user_data = get_user_data(interaction.user.id)
+    economy = await get_economy(interaction)
+    user_data = await economy.get_user(interaction.user.id)
     stats = user_data["stats"]
     
     embed = discord.Embed(
@@ -700,51 +1740,342 @@ async def my_stats_cmd(interaction: discord.Interaction):
     
     await interaction.response.send_message(embed=embed)
 
+# ========================
+# 배팅 기록
+# ========================
+
+def history_line(entry) -> str:
+    """기록 한 줄 (시각은 Discord 가 보는 사람의 시간대로 표시)"""
+    text = f"<t:{entry.timestamp}:R> {GAME_LABELS.get(entry.game, entry.game)} · 배팅 {entry.stake:,}"
+    if entry.rounds > 1:
+        text += f" ({entry.rounds}판)"
+    if entry.outcome == "refund":
+        return text + " → 환불"
+    text += f" → **{entry.delta:+,}**"
+    if entry.multiplier and entry.rounds == 1:
+        text += f" ({entry.multiplier:g}x)"
+    return text
+
+async def history_embed(economy: GuildEconomy, user: discord.abc.User, page: int) -> tuple[discord.Embed, int, int]:
+    """page 번째 (0부터, 마지막 페이지를 넘으면 마지막) 페이지 embed, 실제 페이지, 전체 페이지 수"""
+    entries, total = await economy.history.page(user.id, page, HISTORY_PAGE_SIZE)
+    pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+    if page >= pages:
+        page = pages - 1
+        entries, total = await economy.history.page(user.id, page, HISTORY_PAGE_SIZE)
+    embed = discord.Embed(title=f"📜 {user.display_name}님의 배팅 기록", color=discord.Color.blurple())
+    embed.description = "\n".join(history_line(entry) for entry in entries) or "기록이 없습니다."
+    embed.set_footer(text=f"{page + 1} / {pages} 페이지 · 전체 {total:,}건")
+    return embed, page, pages
+
+class HistoryView(discord.ui.View):
+    """/기록 페이지 넘기기 (누를 때마다 해당 페이지만 읽음)"""
+
+    def __init__(self, viewer: discord.abc.User, user: discord.abc.User, page: int, pages: int):
+        super().__init__(timeout=120)
+        self.viewer = viewer
+        self.user = user
+        self.page = page
+        self.pages = pages
+        self.update_buttons()
+        metrics.instrument_view(self, "history")
+
+    def update_buttons(self) -> None:
+        self.prev_button.disabled = self.page <= 0
+        self.next_button.disabled = self.page >= self.pages - 1
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        retry_after = rate_limits.acquire("button", interaction)
+        if retry_after:
+            await interaction.response.send_message(cooldown_message(retry_after), ephemeral=True)
+            return False
+        if interaction.user != self.viewer:
+            await interaction.response.send_message("❌ 다른 사람이 연 기록입니다!", ephemeral=True)
+            return False
+        return True
+
+    async def show(self, interaction: discord.Interaction, page: int) -> None:
+        # 서버 경제가 내려갔을 수 있으므로 누를 때 다시 가져옴
+        try:
+            economy = await get_economy(interaction)
+            embed, self.page, self.pages = await history_embed(economy, self.user, max(page, 0))
+        finally:
+            release_economy(interaction)
+        self.update_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀ 이전", style=discord.ButtonStyle.secondary)
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page - 1)
+
+    @discord.ui.button(label="다음 ▶", style=discord.ButtonStyle.secondary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1)
+
+@bot.tree.command(name="기록", description="최근 배팅 기록 확인")
+@app_commands.describe(유저="(관리자) 기록을 확인할 유저", 페이지="처음 보여줄 페이지")
+async def history_cmd(interaction: discord.Interaction, 유저: Optional[discord.Member] = None, 페이지: int = 1):
+    user = 유저 or interaction.user
+    if user != interaction.user and not any(
+        role.name in ADMIN_ROLES for role in getattr(interaction.user, "roles", [])
+    ):
+        await interaction.response.send_message("❌ 다른 유저의 기록은 관리자만 볼 수 있습니다!", ephemeral=True)
+        return
+    
+    economy = await get_economy(interaction)
+    embed, page, pages = await history_embed(economy, user, max(페이지, 1) - 1)
+    view = HistoryView(interaction.user, user, page, pages)
+    await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+
 @bot.tree.command(name="리더보드", description="코인 보유량 상위 10명")
 async def leaderboard_cmd(interaction: discord.Interaction):
     """서버 내 코인 보유량 상위 10명을 표시합니다."""
-    # 모든 유저 데이터를 잔액 기준으로 정렬
-    sorted_users = sorted(
-        economy_data["users"].items(),
-        key=lambda x: x[1]["balance"],
-        reverse=True
-    )[:10]
+    # 잔액 기준 상위 10명 (이 서버의 경제)
+    economy = await get_economy(interaction)
+    sorted_users = await economy.backend.top_balances(10)
     
     embed = discord.Embed(
         title="🏆 코인 리더보드 TOP 10",
         color=discord.Color.gold()
     )
     
+    # 이름은 캐시에서 먼저 찾고, 없는 것만 한 번에 조회
+    usernames = await name_resolver.resolve_many(
+        (user_id for user_id, _ in sorted_users), guild=interaction.guild
+    )
+    
     description = ""
-    for idx, (user_id, data) in enumerate(sorted_users, 1):
-        try:
-            user = await bot.fetch_user(int(user_id))
-            username = user.name
-        except:
-            username = f"Unknown User ({user_id})"
-        
+    for idx, (user_id, balance) in enumerate(sorted_users, 1):
+        username = usernames[user_id]
         medal = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉" if idx == 3 else f"{idx}."
-        description += f"{medal} **{username}** - {data['balance']:,} 코인\n"
+        description += f"{medal} **{username}** - {balance:,} 코인\n"
     
     embed.description = description or "아직 플레이한 유저가 없습니다."
     await interaction.response.send_message(embed=embed)
 
+@bot.tree.command(name="내순위", description="내 코인 보유량 순위 확인")
+async def my_rank_cmd(interaction: discord.Interaction):
+    """서버 유저 중 자신의 코인 보유량 순위를 확인합니다."""
+    economy = await get_economy(interaction)
+    rank, total = await economy.backend.rank(interaction.user.id)
+    
+    if rank is None:
+        await interaction.response.send_message("❌ 아직 순위가 없습니다. 게임을 먼저 플레이해 보세요!", ephemeral=True)
+        return
+    
+    user_data = await economy.get_user(interaction.user.id)
+    top_percent = rank / total * 100
+    await interaction.response.send_message(
+        f"🏅 **{interaction.user.display_name}**님의 순위: **{rank:,}위** / {total:,}명 "
+        f"(상위 {top_percent:.1f}%)\n💰 잔액: **{user_data['balance']:,}** 코인"
+    )
+
+# /서버통계 기간: 값 → (해상도, 버킷 수, 표시 이름, 버킷 단위)
+ANALYTICS_PERIODS = {
+    "1h": ("minute", 60, "최근 1시간", "분"),
+    "24h": ("hour", 24, "최근 24시간", "시간"),
+    "48h": ("hour", 48, "최근 48시간", "시간"),
+    "7d": ("day", 7, "최근 7일", "일"),
+    "30d": ("day", 30, "최근 30일", "일"),
+}
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+def sparkline(values: list[int]) -> str:
+    top = max(values, default=0)
+    if not top:
+        return SPARK_BLOCKS[0] * len(values)
+    return "".join(SPARK_BLOCKS[min(len(SPARK_BLOCKS) - 1, value * len(SPARK_BLOCKS) // top)] for value in values)
+
+def rollup_text(rollup: dict) -> str:
+    rtp = rollup["paid"] / rollup["wagered"] if rollup["wagered"] else 0.0
+    return (
+        f"{rollup['rounds']:,}판 · 유저 약 {rollup['players']:,}명\n"
+        f"배팅 {rollup['wagered']:,} / 지급 {rollup['paid']:,}\n"
+        f"하우스 손익 **{rollup['house']:+,}** (RTP {rtp:.1%})"
+    )
+
+@bot.tree.command(name="서버통계", description="(관리자) 이 서버의 게임별 판 수, 배팅/지급액, 하우스 손익")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
+@app_commands.describe(기간="집계할 기간")
+@app_commands.choices(기간=[
+    app_commands.Choice(name=label, value=key) for key, (_, _, label, _) in ANALYTICS_PERIODS.items()
+])
+async def server_stats_cmd(interaction: discord.Interaction, 기간: str = "24h"):
+    resolution, count, label, unit = ANALYTICS_PERIODS[기간]
+    economy = await get_economy(interaction)
+    rollups = economy.analytics.summary(resolution, count)
+    active = {game: rollup for game, rollup in rollups.items() if rollup["rounds"]}
+    
+    embed = discord.Embed(title=f"📈 서버 통계 ({label})", color=discord.Color.blurple())
+    if not active:
+        embed.description = "이 기간에 진행된 게임이 없습니다."
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+    
+    total = {
+        "rounds": sum(r["rounds"] for r in active.values()),
+        "wagered": sum(r["wagered"] for r in active.values()),
+        "paid": sum(r["paid"] for r in active.values()),
+        "house": sum(r["house"] for r in active.values()),
+        "players": economy.analytics.players(resolution, count),
+    }
+    series = [sum(values) for values in zip(*(r["series"] for r in active.values()))]
+    embed.description = f"{rollup_text(total)}\n\n{unit}별 판 수 (최대 {max(series):,})\n`{sparkline(series)}`"
+    for game, rollup in active.items():
+        embed.add_field(name=GAME_LABELS.get(game, game), value=rollup_text(rollup), inline=True)
+    embed.set_footer(text="유저 수는 추정치입니다 (표준 오차 약 6.5%).")
+    
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="봇상태", description="(관리자) 봇 성능 지표 확인")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
+async def bot_status_cmd(interaction: discord.Interaction):
+    embed = discord.Embed(title="🤖 봇 상태", color=discord.Color.blurple())
+    
+    # 가동 시간 / 처리한 명령어
+    uptime = int(time.time() - metrics.started_at)
+    hours, minutes = divmod(uptime // 60, 60)
+    command_counts = metrics.counters.get("bot_command_total", {})
+    total = sum(command_counts.values())
+    errors = sum(n for key, n in command_counts.items() if ("status", "error") in key)
+    shards = ", ".join(str(shard_id) for shard_id in sorted(bot.shards)) or "-"
+    embed.add_field(
+        name="⏱️ 가동 시간",
+        value=f"{hours}시간 {minutes}분\n명령어 {total:,}회 (오류 {errors:,}회)\n샤드 {shards} / {bot.shard_count or 1}",
+        inline=True
+    )
+    
+    # 이벤트 루프 지연
+    lag = metrics.histograms.get("bot_event_loop_lag_seconds", {}).get(())
+    if lag is not None:
+        lag_text = f"p50 {lag.quantile(0.5) * 1000:.1f}ms\np99 {lag.quantile(0.99) * 1000:.1f}ms\n최대 {metrics.max_loop_lag * 1000:.1f}ms"
+    else:
+        lag_text = "측정 전"
+    embed.add_field(name="🔁 이벤트 루프 지연", value=lag_text, inline=True)
+    
+    # 진행 중인 게임
+    views = metrics.active_views()
+    open_amount = sum(economy.wallet.stats()["open_amount"] for economy in economies.resident())
+    session_stats = sessions.stats()
+    embed.add_field(
+        name="🎮 진행 중인 게임",
+        value=(
+            f"화면 {sum(views.values()):,}개\n묶인 배팅금 {open_amount:,} 코인\n"
+            f"세션 {session_stats['active']:,}/{SESSION_MAX:,}개 (약 {session_stats['memory_bytes'] / 1024:.0f}KB, "
+            f"복구 {session_stats['restored']:,} · 밀려남 {session_stats['evicted']:,})\n"
+            f"연타 제한 {sum(stats['shed'] for stats in rate_limits.stats().values()):,}회"
+        ),
+        inline=True
+    )
+    
+    # 느린 명령어 (p99 기준 상위 5개)
+    histograms = metrics.histograms.get("bot_command_seconds", {})
+    slowest = sorted(histograms.items(), key=lambda item: item[1].quantile(0.99), reverse=True)[:5]
+    lines = [
+        f"/{dict(key)['command']}: p50 {h.quantile(0.5) * 1000:.0f}ms · p99 {h.quantile(0.99) * 1000:.0f}ms ({h.count:,}회)"
+        for key, h in slowest
+    ]
+    embed.add_field(name="🐢 느린 명령어 (p99)", value="\n".join(lines) or "기록 없음", inline=False)
+    
+    # 저장소 (이 서버)
+    economy = await get_economy(interaction)
+    stats = economy.backend.stats()
+    if "store" in stats:
+        store = stats["store"]
+        storage_text = (
+            f"스냅샷 {store['flushes']:,}회 (최근 {store['last_flush_ms']:.0f}ms, 최대 {store['max_flush_ms']:.0f}ms, "
+            f"{store['bytes_written'] / 2**20:.1f}MB 기록)\n"
+            f"저널 fsync 최대 {stats['journal']['max_sync_ms']:.1f}ms"
+        )
+    elif service_client is not None:
+        service = service_client.stats()
+        storage_text = (
+            f"경제 서비스 {service_client.address} (연결 {service['connections']}개)\n"
+            f"요청 {service['requests']:,}회, 평균 {service['avg_batch']:.1f}개씩 묶음, 실패 {service['failures']:,}회"
+        )
+    else:
+        storage_text = f"커밋 {stats.get('commits', 0):,}회, 대기 중 {stats.get('pending', 0):,}건"
+    guild_stats = economies.stats()
+    storage_text += (
+        f"\n메모리의 서버 경제 {guild_stats['resident']:,}개 "
+        f"(불러오기 {guild_stats['loads']:,}회, 내림 {guild_stats['evictions']:,}회)"
+    )
+    embed.add_field(name=f"💾 저장소 ({stats.get('backend', STORAGE_BACKEND)})", value=storage_text, inline=False)
+    
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="프로파일", description="(관리자) 일정 시간 동안 봇이 하는 일을 샘플링")
+@app_commands.checks.has_any_role(*ADMIN_ROLES)
+@app_commands.describe(
+    시간="샘플링할 시간 (초)",
+    임계값="루프 블로킹으로 기록할 최소 시간 (ms)"
+)
+async def profile_cmd(interaction: discord.Interaction, 시간: int = 10, 임계값: Optional[int] = None):
+    if not 1 <= 시간 <= PROFILE_MAX_SECONDS:
+        await interaction.response.send_message(f"❌ 시간은 1~{PROFILE_MAX_SECONDS}초 사이여야 합니다!", ephemeral=True)
+        return
+    
+    if 임계값 is not None and 임계값 <= 0:
+        await interaction.response.send_message("❌ 임계값은 0보다 커야 합니다!", ephemeral=True)
+        return
+    
+    if profiler.running:
+        await interaction.response.send_message("❌ 이미 프로파일링 중입니다!", ephemeral=True)
+        return
+    
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    threshold = 임계값 / 1000 if 임계값 is not None else PROFILE_BLOCK_THRESHOLD
+    result = await profiler.run(시간, threshold)
+    folded_path, summary_path = await asyncio.get_running_loop().run_in_executor(
+        None, result.write, PROFILE_DIR
+    )
+    
+    embed = discord.Embed(title="🔬 프로파일 결과", color=discord.Color.blurple())
+    embed.add_field(
+        name="🔁 이벤트 루프",
+        value=f"{result.duration:.1f}초, 샘플 {result.loop_samples:,}개\n작업 중 {result.busy_ratio:.1%}",
+        inline=True
+    )
+    embed.add_field(
+        name=f"🧱 블로킹 ({threshold * 1000:.0f}ms 이상)",
+        value="\n".join(
+            f"{block.duration * 1000:.0f}ms · `{block.culprit}`"
+            for block in sorted(result.blocks, key=lambda b: b.duration, reverse=True)[:5]
+        ) or "없음",
+        inline=True
+    )
+    top = "\n".join(f"{own:>5,} {total:>5,}  {frame}" for frame, own, total in result.top(10))
+    embed.add_field(name="📊 자체 시간 상위 프레임 (자체 / 누적 샘플)", value=f"```\n{top[:1000] or '기록 없음'}\n```", inline=False)
+    embed.set_footer(text=f"{folded_path}, {summary_path}")
+    
+    await interaction.followup.send(
+        embed=embed,
+        files=[discord.File(folded_path), discord.File(summary_path)],
+        ephemeral=True
+    )
+
 # ========================
 # 오류 처리
 # ========================
 
 @bot.tree.error
 async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
-    if isinstance(error, app_commands.MissingAnyRole):
-        await interaction.response.send_message(
-            "❌ 이 명령어를 사용할 권한이 없습니다! (관리자 전용)",
-            ephemeral=True
-        )
+    release_economy(interaction)
+    metrics.inc("bot_command_failures_total", error=type(error).__name__)
+    if not isinstance(error, app_commands.CheckFailure):
+        # 체크(연타 제한, 권한)에 걸린 명령어는 실행하지 않았으므로 처리 시간에 넣지 않음
+        metrics.command_finished(interaction, "error")
+    if isinstance(error, RateLimited):
+        message = cooldown_message(error.retry_after)
+    elif isinstance(error, app_commands.MissingAnyRole):
+        message = "❌ 이 명령어를 사용할 권한이 없습니다! (관리자 전용)"
     else:
-        await interaction.response.send_message(
-            f"❌ 오류가 발생했습니다: {error}",
-            ephemeral=True
-        )
+        message = f"❌ 오류가 발생했습니다: {error}"
+    # defer 한 명령어(/일괄지급, /프로파일 등)는 이미 응답했으므로 후속 메시지로 보냄
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True)
 
 # ========================
 # 봇 실행
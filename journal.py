@@ -0,0 +1,241 @@
+import asyncio
+import glob
+import json
+import os
+import time
+from typing import Callable, Iterator, Optional
+
+from persistence import BackgroundLoop
+
+
+class Journal:
+    """잔액/통계 변경을 한 줄씩 기록하는 추가 전용(append-only) 트랜잭션 저널
+
+    - append(): 메모리 버퍼에 기록 (즉시 반환)
+    - 백그라운드 태스크가 fsync_interval 마다 버퍼를 모아 한 번에 write + fsync
+    - rotate(): 현재 파일을 봉인하고 새 파일로 교체 (스냅샷 압축 시 사용)
+    - replay(): 스냅샷 이후의 기록을 순서대로 다시 적용
+
+    모든 기록은 변경 후의 절대값(새 잔액, 누적 played/won)을 담고 있어서
+    스냅샷에 이미 반영된 기록을 다시 적용해도 결과가 같다.
+    """
+
+    def __init__(self, path: str, fsync_interval: float = 0.2, max_buffer: int = 64 * 1024):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.max_buffer = max_buffer
+
+        self.seq = 0
+        self._buffer = bytearray()
+        self._file = None
+        self._background = BackgroundLoop(self.sync, fsync_interval, "❌ 저널 기록 실패")
+        self._lock: Optional[asyncio.Lock] = None
+
+        # 통계
+        self.entries = 0
+        self.syncs = 0
+        self.bytes_written = 0
+        self.last_sync_ms = 0.0
+        self.max_sync_ms = 0.0
+
+    # ---------- 기록 ----------
+
+    def append(self, entry: dict) -> int:
+        self.seq += 1
+        entry["s"] = self.seq
+        entry["t"] = int(time.time())
+        self._buffer += json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._buffer += b"\n"
+        self.entries += 1
+        if len(self._buffer) >= self.max_buffer:
+            self._background.wake()
+        return self.seq
+
+    def _write(self, payload: bytes) -> None:
+        if self._file is None:
+            # 잘린 마지막 줄을 지우지 않으면 이번 기록이 그 뒤에 이어 붙어 함께 읽히지 않음
+            self._trim_tail()
+            self._file = open(self.path, "ab")
+        size = self._file.tell()
+        try:
+            self._file.write(payload)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except Exception:
+            # 일부만 쓰인 줄이 다음 기록과 이어 붙지 않도록 쓰기 전 크기로 되돌림
+            try:
+                self._file.truncate(size)
+                self._file.seek(size)
+            except OSError:
+                self._file.close()
+                self._file = None
+            raise
+
+    def _take_buffer(self) -> bytes:
+        payload = bytes(self._buffer)
+        self._buffer.clear()
+        return payload
+
+    def _restore_buffer(self, payload: bytes) -> None:
+        # 기록에 실패한 내용을 버퍼 앞에 되돌려 다음 sync 때 다시 시도 (그 사이 append 된 기록보다 먼저)
+        self._buffer[:0] = payload
+
+    async def sync(self) -> None:
+        """버퍼에 쌓인 기록을 executor 에서 write + fsync"""
+        if self._lock is None:
+            self.sync_now()
+            return
+        async with self._lock:
+            await self._sync_locked()
+
+    async def _sync_locked(self) -> None:
+        if not self._buffer:
+            return
+        payload = self._take_buffer()
+        start = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, payload)
+        except BaseException:
+            self._restore_buffer(payload)
+            raise
+        self._record(start, len(payload))
+
+    def sync_now(self) -> None:
+        """이벤트 루프 밖에서 동기적으로 기록"""
+        if not self._buffer:
+            return
+        payload = self._take_buffer()
+        start = time.perf_counter()
+        try:
+            self._write(payload)
+        except BaseException:
+            self._restore_buffer(payload)
+            raise
+        self._record(start, len(payload))
+
+    def _record(self, start: float, written: int) -> None:
+        elapsed = (time.perf_counter() - start) * 1000
+        self.syncs += 1
+        self.bytes_written += written
+        self.last_sync_ms = elapsed
+        self.max_sync_ms = max(self.max_sync_ms, elapsed)
+
+    # ---------- 압축 ----------
+
+    def _sealed_path(self, seq: int) -> str:
+        return f"{self.path}.{seq:012d}"
+
+    def _sealed_segments(self) -> list[tuple[int, str]]:
+        segments = []
+        for p in glob.glob(glob.escape(self.path) + ".*"):
+            suffix = p[len(self.path) + 1:]
+            if suffix.isdigit():
+                segments.append((int(suffix), p))
+        segments.sort()
+        return segments
+
+    async def rotate(self) -> int:
+        """현재 파일을 봉인하고 새 파일을 연다. 봉인된 파일의 마지막 seq 를 반환"""
+        async with self._lock:
+            # 경계 seq 는 버퍼를 떼어내는 순간(루프 스레드)에 확정된다
+            # 기록에 실패하면 버퍼를 되돌리고 봉인하지 않음 (스냅샷도 이번에는 건너뜀)
+            boundary = self.seq
+            await self._sync_locked()
+            await asyncio.get_running_loop().run_in_executor(None, self._seal, boundary)
+            return boundary
+
+    def _seal(self, boundary: int) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.path):
+            os.replace(self.path, self._sealed_path(boundary))
+
+    def drop_sealed(self, upto_seq: int) -> None:
+        """스냅샷에 반영된 봉인 파일 삭제"""
+        for seq, p in self._sealed_segments():
+            if seq <= upto_seq:
+                try:
+                    os.unlink(p)
+                except FileNotFoundError:
+                    pass
+
+    # ---------- 복구 ----------
+
+    def _iter_entries(self) -> Iterator[dict]:
+        paths = [p for _, p in self._sealed_segments()]
+        if os.path.exists(self.path):
+            paths.append(self.path)
+        for p in paths:
+            with open(p, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # 기록 도중 종료되어 잘린 마지막 줄 (파일은 다음 기록 전에 _trim_tail 이 정리)
+                        break
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # 손상된 줄은 건너뜀
+                        continue
+
+    def _trim_tail(self) -> None:
+        """활성 파일 끝의 잘린 줄을 잘라냄 (이 저널에 기록하는 프로세스만)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                f.seek(max(0, end - 4096))
+                chunk = f.read(end - max(0, end - 4096))
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    end = end - len(chunk) + newline + 1
+                    break
+                end -= len(chunk)
+            if end < size:
+                f.truncate(end)
+                os.fsync(f.fileno())
+
+    def replay(self, apply: Callable[[dict], None], after_seq: int = 0) -> int:
+        """after_seq 이후의 기록을 순서대로 적용하고 적용한 개수를 반환
+
+        파일은 읽기만 하므로 실행 중인 봇의 저널을 변환 / 시뮬레이션 도구가 읽어도 안전하다.
+        """
+        applied = 0
+        self.seq = max(self.seq, after_seq)
+        for entry in self._iter_entries():
+            seq = entry.get("s", 0)
+            if seq <= after_seq:
+                continue
+            apply(entry)
+            applied += 1
+            self.seq = max(self.seq, seq)
+        return applied
+
+    # ---------- 수명 주기 ----------
+
+    async def start(self) -> None:
+        if self._background.running:
+            return
+        self._lock = asyncio.Lock()
+        self._background.interval = self.fsync_interval
+        self._background.start()
+
+    async def close(self) -> None:
+        await self._background.stop()
+        await self.sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict:
+        return {
+            "seq": self.seq,
+            "entries": self.entries,
+            "syncs": self.syncs,
+            "pending_bytes": len(self._buffer),
+            "bytes_written": self.bytes_written,
+            "last_sync_ms": round(self.last_sync_ms, 3),
+            "max_sync_ms": round(self.max_sync_ms, 3),
+        }
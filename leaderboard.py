@@ -0,0 +1,158 @@
+import math
+import random
+from typing import Iterable, Optional
+
+# 최대 레벨 (p=0.5 기준 약 2^32 명까지 O(log n) 유지)
+_MAX_LEVELS = 32
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next = [None] * levels
+        # width[l]: 레벨 l 링크가 건너뛰는 맨 아래 레벨 노드 수
+        self.width = [1] * levels
+
+
+class BalanceIndex:
+    """잔액 순위 인덱스 (순위 계산이 가능한 indexable skip list)
+
+    - update(): 잔액 변경 시 O(log n)
+    - top(k): 상위 k 명을 O(k)
+    - rank(): 특정 유저의 순위를 O(log n)
+
+    정렬 기준은 잔액 내림차순, 같은 잔액이면 user_id 오름차순.
+    """
+
+    def __init__(self):
+        self._nil = _Node((math.inf, 0), 0)
+        self._head = _Node(None, _MAX_LEVELS)
+        self._head.next = [self._nil] * _MAX_LEVELS
+        # 현재 사용 중인 레벨 수 (그 위의 레벨은 탐색하지 않음)
+        self._level = 1
+        self._balances: dict[int, int] = {}
+        self._rng = random.Random()
+
+    def __len__(self) -> int:
+        return len(self._balances)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._balances
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < _MAX_LEVELS and self._rng.random() < 0.5:
+            level += 1
+        return level
+
+    def _insert(self, key) -> None:
+        levels = self._random_level()
+        if levels > self._level:
+            # 새로 쓰는 레벨의 head 링크는 nil 까지의 거리로 초기화
+            for level in range(self._level, levels):
+                self._head.width[level] = len(self._balances) + 1
+            self._level = levels
+
+        chain = [None] * self._level
+        steps_at_level = [0] * self._level
+        node = self._head
+        for level in reversed(range(self._level)):
+            while node.next[level].key <= key:
+                steps_at_level[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+
+        new_node = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, self._level):
+            chain[level].width[level] += 1
+
+    def _remove(self, key) -> None:
+        chain = [None] * self._level
+        node = self._head
+        for level in reversed(range(self._level)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target.key != key:
+            raise KeyError(key)
+        levels = len(target.next)
+        for level in range(levels):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(levels, self._level):
+            chain[level].width[level] -= 1
+
+    def rebuild(self, balances: Iterable[tuple[int, int]]) -> None:
+        """(user_id, balance) 목록으로 인덱스를 한 번에 다시 만든다 (정렬 후 O(n) 연결)"""
+        self._balances = dict(balances)
+        keys = sorted((-balance, user_id) for user_id, balance in self._balances.items())
+        self._head = _Node(None, _MAX_LEVELS)
+        self._level = 1
+        last = [self._head] * _MAX_LEVELS
+        last_pos = [0] * _MAX_LEVELS
+        for pos, key in enumerate(keys, 1):
+            levels = self._random_level()
+            self._level = max(self._level, levels)
+            node = _Node(key, levels)
+            for level in range(levels):
+                prev = last[level]
+                prev.next[level] = node
+                prev.width[level] = pos - last_pos[level]
+                last[level] = node
+                last_pos[level] = pos
+        for level in range(_MAX_LEVELS):
+            last[level].next[level] = self._nil
+            last[level].width[level] = len(keys) + 1 - last_pos[level]
+
+    def update(self, user_id: int, balance: int) -> None:
+        """유저의 잔액을 인덱스에 반영"""
+        old = self._balances.get(user_id)
+        if old == balance:
+            return
+        if old is not None:
+            self._remove((-old, user_id))
+            del self._balances[user_id]
+        self._insert((-balance, user_id))
+        self._balances[user_id] = balance
+
+    def discard(self, user_id: int) -> None:
+        old = self._balances.pop(user_id, None)
+        if old is not None:
+            self._remove((-old, user_id))
+
+    def top(self, k: int) -> list[tuple[int, int]]:
+        """상위 k 명의 (user_id, balance)"""
+        result = []
+        node = self._head.next[0]
+        while node is not self._nil and len(result) < k:
+            neg_balance, user_id = node.key
+            result.append((user_id, -neg_balance))
+            node = node.next[0]
+        return result
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1부터 시작하는 순위 (인덱스에 없으면 None)"""
+        balance = self._balances.get(user_id)
+        if balance is None:
+            return None
+        key = (-balance, user_id)
+        position = 0
+        node = self._head
+        for level in reversed(range(self._level)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position + 1
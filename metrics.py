@@ -0,0 +1,288 @@
+import asyncio
+import functools
+import math
+import time
+import weakref
+from typing import Callable, Iterable, Optional
+
+import discord
+
+from persistence import BackgroundLoop
+
+# 지연시간 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 이벤트 루프 지연은 대부분 수 ms 이하이므로 더 촘촘한 구간 사용
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# collector 가 돌려주는 값: (이름, 라벨, 값)
+Sample = tuple[str, dict, float]
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: Optional[tuple] = None) -> str:
+    pairs = key + (extra,) if extra else key
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _callback_name(callback) -> str:
+    """버튼 콜백의 원래 함수 이름 (데코레이터로 정의한 콜백은 discord.py 가 한 번 감싸서 보관)"""
+    func = getattr(callback, "callback", callback)
+    func = getattr(func, "func", func)
+    return getattr(func, "__name__", "callback")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """누적 구간 히스토그램 (Prometheus histogram 과 같은 형식)"""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "max")
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """구간 안에서 선형 보간한 분위수 추정값 (관측된 최댓값을 넘지 않음)"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(self.buckets + (math.inf,), self.counts):
+            if n and seen + n >= target:
+                if bound == math.inf:
+                    return max(lower, self.max)
+                return min(lower + (bound - lower) * (target - seen) / n, self.max)
+            seen += n
+            lower = bound
+        return lower
+
+
+class Metrics:
+    """명령어 / 버튼 / 게임 결과 / 이벤트 루프 지연 계측
+
+    - inc(), observe(): 카운터와 히스토그램 (라벨별)
+    - add_collector(): 조회 시점에 값을 계산하는 게이지 (저장소 통계 등)
+    - render(): Prometheus 텍스트 형식
+    - command_started() / command_finished(): 슬래시 명령어 계측
+      (CommandTree.interaction_check / on_app_command_completion / 트리 오류 처리기에서 호출)
+    - start(): 이벤트 루프 지연 감시와 /metrics 를 응답하는 작은 HTTP 서버
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.counters: dict[str, dict[tuple, float]] = {}
+        self.histograms: dict[str, dict[tuple, Histogram]] = {}
+        self.help: dict[str, str] = {}
+        self.buckets: dict[str, tuple] = {"bot_event_loop_lag_seconds": LAG_BUCKETS}
+        self.collectors: list[Callable[[], Iterable[Sample]]] = []
+        self.views: "weakref.WeakSet[discord.ui.View]" = weakref.WeakSet()
+        self.max_loop_lag = 0.0
+        self._lag = BackgroundLoop(self._measure_lag, 1.0, "❌ 이벤트 루프 지연 측정 실패")
+        self._lag_mark = 0.0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    # ---------- 기록 ----------
+
+    def describe(self, name: str, text: str, buckets: Optional[tuple] = None) -> None:
+        self.help[name] = text
+        if buckets is not None:
+            self.buckets[name] = buckets
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        series = self.counters.setdefault(name, {})
+        key = _label_key(labels)
+        series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        series = self.histograms.setdefault(name, {})
+        key = _label_key(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram(self.buckets.get(name, DEFAULT_BUCKETS))
+        histogram.observe(value)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        self.collectors.append(collector)
+
+    def counter_total(self, name: str) -> float:
+        return sum(self.counters.get(name, {}).values())
+
+    # ---------- 계측 래퍼 ----------
+
+    def _timed(self, func, name: str, **labels):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                status = "error"
+                raise
+            finally:
+                self.observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+                self.inc(f"{name}_total", status=status, **labels)
+        return wrapper
+
+    def command_started(self, interaction: discord.Interaction) -> None:
+        """슬래시 명령어 처리 시작 시각 기록 (체크 / 콜백 실행 전)"""
+        interaction.extras["metrics_started"] = time.perf_counter()
+
+    def command_finished(self, interaction: discord.Interaction, status: str) -> None:
+        """슬래시 명령어 처리 시간과 결과 기록 (command_started 를 거치지 않았으면 무시)"""
+        started = interaction.extras.pop("metrics_started", None)
+        command = interaction.command
+        if started is None or command is None:
+            return
+        name = command.qualified_name
+        self.observe("bot_command_seconds", time.perf_counter() - started, command=name)
+        self.inc("bot_command_total", status=status, command=name)
+
+    def instrument_view(self, view: discord.ui.View, name: str) -> None:
+        """화면의 모든 버튼 콜백을 계측 래퍼로 감싼다 (View 생성 시 호출)"""
+        self.views.add(view)
+        for item in view.children:
+            callback = getattr(item, "callback", None)
+            if callback is None:
+                continue
+            item.callback = self._timed(callback, "bot_button", view=name, button=_callback_name(callback))
+
+    def active_views(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for view in list(self.views):
+            if not view.is_finished():
+                name = type(view).__name__
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    # ---------- 이벤트 루프 지연 ----------
+
+    async def _measure_lag(self) -> None:
+        # 지난 측정 직후부터 interval 만큼 기다렸으므로 그보다 늦게 깨어난 만큼이 지연
+        now = asyncio.get_running_loop().time()
+        lag = max(0.0, now - self._lag_mark - self._lag.interval)
+        self._lag_mark = now
+        self.observe("bot_event_loop_lag_seconds", lag)
+        self.max_loop_lag = max(self.max_loop_lag, lag)
+
+    # ---------- 내보내기 ----------
+
+    def render(self) -> str:
+        lines = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in sorted(self.counters.items()):
+            header(name, "counter")
+            for key, value in series.items():
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        for name, series in sorted(self.histograms.items()):
+            header(name, "histogram")
+            for key, h in series.items():
+                cumulative = 0
+                for bound, n in zip(h.buckets + (math.inf,), h.counts):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(h.sum)}")
+                lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+
+        gauges: dict[str, list[tuple[tuple, float]]] = {}
+        for collector in self.collectors:
+            try:
+                for name, labels, value in collector():
+                    gauges.setdefault(name, []).append((_label_key(labels), value))
+            except Exception as e:
+                print(f"❌ 지표 수집 실패: {e}")
+        gauges.setdefault("bot_uptime_seconds", []).append(((), time.time() - self.started_at))
+        gauges.setdefault("bot_event_loop_lag_max_seconds", []).append(((), self.max_loop_lag))
+        for view, count in self.active_views().items():
+            gauges.setdefault("bot_active_views", []).append(((("view", view),), count))
+        for name, samples in sorted(gauges.items()):
+            header(name, "gauge")
+            for key, value in samples:
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=5)
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str, port: int, lag_interval: float) -> None:
+        """루프 지연 감시 태스크와 (port 가 0 이 아니면) HTTP 엔드포인트 시작"""
+        self._lag.interval = lag_interval
+        self._lag_mark = asyncio.get_running_loop().time()
+        self._lag.start()
+        if port:
+            try:
+                self._server = await asyncio.start_server(self._handle, host, port)
+                print(f"📈 지표 엔드포인트: http://{host}:{port}/metrics")
+            except OSError as e:
+                print(f"❌ 지표 엔드포인트 시작 실패: {e}")
+
+    async def close(self) -> None:
+        await self._lag.stop()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+def flatten_stats(prefix: str, stats: dict, **labels) -> Iterable[Sample]:
+    """중첩된 stats() dict 의 숫자 값을 게이지로 펼친다 (예: economy_store_flushes)"""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            yield from flatten_stats(f"{prefix}_{key}", value, **labels)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}_{key}", labels, value
@@ -0,0 +1,51 @@
+"""경제 데이터 스냅샷 (economy_data.bin 또는 economy_data.json) + 저널을 SQLite 데이터베이스로 옮기는 일회성 도구
+
+사용법:
+    python migrate_to_sqlite.py [--json economy_data.bin] [--journal economy_journal.log] [--db economy.db]
+
+옮긴 뒤 ECONOMY_BACKEND=sqlite 로 봇을 실행하면 된다.
+"""
+import argparse
+import os
+import sys
+import time
+
+from config import DATA_FILE, DEFAULT_MULTIPLIERS, DEFAULT_START_BALANCE, JOURNAL_FILE, SNAPSHOT_FILE, SQLITE_FILE
+from storage import JsonBackend, SqliteBackend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="economy_data.json → SQLite 마이그레이션")
+    parser.add_argument("--json", default=SNAPSHOT_FILE, help="원본 스냅샷 경로 (JSON 또는 이진 형식)")
+    parser.add_argument("--journal", default=JOURNAL_FILE, help="원본 저널 경로")
+    parser.add_argument("--db", default=SQLITE_FILE, help="대상 SQLite 파일 경로")
+    parser.add_argument("--force", action="store_true", help="대상 파일이 있어도 덮어쓰기")
+    args = parser.parse_args()
+
+    if not any(os.path.exists(path) for path in (args.json, DATA_FILE, args.journal)):
+        print(f"❌ 원본 데이터가 없습니다: {args.json}")
+        sys.exit(1)
+    if os.path.exists(args.db) and not args.force:
+        print(f"❌ 대상 파일이 이미 있습니다: {args.db} (--force 로 덮어쓰기)")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    source = JsonBackend(args.json, args.journal, DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS, legacy_path=DATA_FILE)
+    source.load()
+
+    if args.force:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+    target = SqliteBackend(args.db, DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS)
+    target.load()
+    count = target.import_users(source.iter_users(), multipliers=source.get_multipliers(), escrows=source.escrows)
+    # 마지막 연결을 닫을 때 WAL 이 DB 파일로 합쳐짐
+    target.close_now()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ 유저 {count:,}명을 {args.db}로 옮겼습니다 ({elapsed:.2f}초)")
+
+
+if __name__ == "__main__":
+    main()
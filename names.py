@@ -0,0 +1,142 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+
+import discord
+
+
+class UserNameResolver:
+    """유저 ID → 이름 변환기
+
+    1. 봇의 로컬 캐시 (bot.get_user / guild.get_member)
+    2. LRU + TTL 이름 캐시
+    3. 저장소에 기록된 이름
+    4. 남은 것만 REST (bot.fetch_user) 로 동시에 조회 (동시 요청 수 제한)
+
+    조회한 이름은 저장소에도 기록해 재시작 후에도 재사용한다.
+    (저장소는 서버별이므로 load_names / store_names 에 guild 를 함께 넘긴다)
+    """
+
+    def __init__(
+        self,
+        bot: discord.Client,
+        load_names: Callable[[list[int], Optional[discord.Guild]], Awaitable[dict[int, tuple[str, int]]]],
+        store_names: Callable[[dict[int, tuple[str, int]], Optional[discord.Guild]], Awaitable[None]],
+        capacity: int = 10000,
+        ttl: float = 3600.0,
+        concurrency: int = 4,
+    ):
+        self.bot = bot
+        self.load_names = load_names
+        self.store_names = store_names
+        self.capacity = capacity
+        self.ttl = ttl
+        self._cache: OrderedDict[int, tuple[str, float]] = OrderedDict()
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+        # 통계
+        self.local_hits = 0
+        self.cache_hits = 0
+        self.stored_hits = 0
+        self.fetches = 0
+        self.fetch_failures = 0
+
+    def _remember(self, user_id: int, name: str, fetched_at: float) -> None:
+        self._cache[user_id] = (name, fetched_at)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.capacity:
+            self._cache.popitem(last=False)
+
+    def _cached(self, user_id: int, now: float) -> Optional[str]:
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+        name, fetched_at = entry
+        if now - fetched_at > self.ttl:
+            return None
+        self._cache.move_to_end(user_id)
+        return name
+
+    def _local(self, user_id: int, guild: Optional[discord.Guild]) -> Optional[str]:
+        user = self.bot.get_user(user_id)
+        if user is None and guild is not None:
+            user = guild.get_member(user_id)
+        return user.name if user is not None else None
+
+    async def _fetch(self, user_id: int) -> Optional[str]:
+        async with self._semaphore:
+            self.fetches += 1
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.HTTPException:
+                self.fetch_failures += 1
+                return None
+            return user.name
+
+    async def resolve_many(self, user_ids: Iterable[int], guild: Optional[discord.Guild] = None) -> dict[int, str]:
+        """여러 유저의 이름을 한 번에 조회 (찾지 못하면 "Unknown User (ID)")"""
+        user_ids = list(user_ids)
+        now = time.time()
+        names: dict[int, str] = {}
+        missing: list[int] = []
+
+        for user_id in user_ids:
+            name = self._local(user_id, guild)
+            if name is not None:
+                self.local_hits += 1
+                names[user_id] = name
+                self._remember(user_id, name, now)
+                continue
+            name = self._cached(user_id, now)
+            if name is not None:
+                self.cache_hits += 1
+                names[user_id] = name
+                continue
+            missing.append(user_id)
+
+        stale: dict[int, str] = {}
+        if missing:
+            stored = await self.load_names(missing, guild)
+            still_missing = []
+            for user_id in missing:
+                entry = stored.get(user_id)
+                if entry is not None and now - entry[1] <= self.ttl:
+                    self.stored_hits += 1
+                    names[user_id] = entry[0]
+                    self._remember(user_id, entry[0], entry[1])
+                else:
+                    if entry is not None:
+                        stale[user_id] = entry[0]
+                    still_missing.append(user_id)
+            missing = still_missing
+
+        if missing:
+            fetched = await asyncio.gather(*(self._fetch(user_id) for user_id in missing))
+            to_store = {}
+            for user_id, name in zip(missing, fetched):
+                if name is None:
+                    # 조회 실패 시 오래된 이름이라도 사용
+                    name = stale.get(user_id)
+                    if name is None:
+                        continue
+                else:
+                    to_store[user_id] = (name, int(now))
+                names[user_id] = name
+                self._remember(user_id, name, now)
+            if to_store:
+                await self.store_names(to_store, guild)
+
+        return {user_id: names.get(user_id, f"Unknown User ({user_id})") for user_id in user_ids}
+
+    def stats(self) -> dict:
+        lookups = self.local_hits + self.cache_hits + self.stored_hits + self.fetches
+        return {
+            "local_hits": self.local_hits,
+            "cache_hits": self.cache_hits,
+            "stored_hits": self.stored_hits,
+            "fetches": self.fetches,
+            "fetch_failures": self.fetch_failures,
+            "rest_saved": lookups - self.fetches,
+            "cached": len(self._cache),
+        }
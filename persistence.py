@@ -0,0 +1,247 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+def atomic_write(path: str, payload: bytes) -> None:
+    """임시 파일에 쓴 뒤 rename 하여 중간에 잘린 파일이 남지 않도록 저장"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class BackgroundLoop:
+    """interval 초마다 (wake() 로 깨우면 바로) step 을 실행하는 백그라운드 태스크
+
+    - stop(): 실행 중인 step 이 끝나기를 기다렸다가 멈춤. cancel() 대신 종료 플래그를 쓴다:
+      wait_for 가 깨어나는 순간 들어온 취소는 무시될 수 있어(3.11) 다음 interval 까지 종료가 늦어진다
+    - step 이 실패하면 error_message 와 함께 출력하고 다음 주기에 다시 실행
+    - 멈춘 뒤의 마무리(남은 변경 저장 등)는 호출한 쪽이 stop() 다음에 직접 한다
+    """
+
+    def __init__(self, step: Callable[[], Awaitable[Any]], interval: float, error_message: str):
+        self.step = step
+        self.interval = interval
+        self.error_message = error_message
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def wake(self) -> None:
+        """다음 interval 을 기다리지 않고 step 실행 (시작 전이면 무시)"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._stopping:
+                break
+            try:
+                await self.step()
+            except Exception as e:
+                print(f"{self.error_message}: {e}")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+            self._wake = None
+
+
+def encode_json(state: dict) -> bytes:
+    """들여쓰기 없는 compact JSON 으로 직렬화"""
+    return json.dumps(state, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class WriteBehindStore:
+    """변경 표시만 받아두고 백그라운드 태스크가 모아서 저장하는 write-behind 저장소
+
+    - mark_dirty(): 변경 발생 시 호출 (즉시 반환)
+    - interval 초마다, 또는 변경이 max_dirty 건 쌓이면 저장: get_state() 로 루프 스레드에서 상태를
+      고정해 두고(copy-on-write 캡처) executor 에서 그 고정된 상태를 직렬화 / 기록
+    - close(): 남은 변경을 모두 저장하고 종료
+    """
+
+    def __init__(
+        self,
+        path: str,
+        get_state: Callable[[], dict],
+        interval: float = 5.0,
+        max_dirty: int = 200,
+        encoder: Callable[[dict], bytes] = encode_json,
+        before_flush: Optional[Callable[[], Awaitable[Any]]] = None,
+        after_flush: Optional[Callable[[Any], None]] = None,
+        before_commit: Optional[Callable[[], Awaitable[None]]] = None,
+        before_replace: Optional[Callable[[], None]] = None,
+        release_state: Optional[Callable[[], None]] = None,
+    ):
+        self.path = path
+        self.get_state = get_state
+        self.interval = interval
+        self.max_dirty = max_dirty
+        self.encoder = encoder
+        # 저장 직전/직후 훅 (저널 압축 등에 사용)
+        self.before_flush = before_flush
+        self.after_flush = after_flush
+        # 직렬화가 끝난 뒤, 파일을 교체하기 직전에 기다릴 작업 (저널 fsync 등)
+        self.before_commit = before_commit
+        # 파일을 교체하기 직전에 루프 스레드에서 호출 (flush_sync 에서는 같은 스레드)
+        self.before_replace = before_replace
+        # get_state() 로 고정한 상태의 직렬화가 끝나면 (실패해도) 루프 스레드에서 호출
+        self.release_state = release_state
+        # 저장이 끝날 때마다 (소요 시간(초), 기록한 바이트) 로 호출 (지표 수집용)
+        self.on_flush: Optional[Callable[[float, int], None]] = None
+
+        self._dirty = 0
+        self._background = BackgroundLoop(self.flush, interval, "❌ 데이터 저장 실패")
+        self._lock: Optional[asyncio.Lock] = None
+
+        # 통계 (flush 지연 / 병합 카운터)
+        self.marks = 0            # mark_dirty 호출 수
+        self.flushes = 0          # 실제 저장 횟수
+        self.failures = 0         # 저장 실패 횟수
+        self.bytes_written = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    @property
+    def dirty(self) -> int:
+        return self._dirty
+
+    def mark_dirty(self) -> None:
+        self._dirty += 1
+        self.marks += 1
+        if self._dirty >= self.max_dirty:
+            self._background.wake()
+
+    async def start(self) -> None:
+        if self._background.running:
+            return
+        self._lock = asyncio.Lock()
+        self._background.interval = self.interval
+        self._background.start()
+
+    async def flush(self) -> None:
+        """쌓인 변경을 executor 에서 한 번에 저장"""
+        if self._lock is None:
+            self.flush_sync()
+            return
+        async with self._lock:
+            if self._dirty == 0:
+                return
+            pending = self._dirty
+            self._dirty = 0
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            try:
+                token = await self.before_flush() if self.before_flush else None
+                state = self.get_state()
+                try:
+                    payload = await loop.run_in_executor(None, self.encoder, state)
+                finally:
+                    self._release()
+                if self.before_commit:
+                    await self.before_commit()
+                if self.before_replace:
+                    self.before_replace()
+                written = await loop.run_in_executor(None, self._commit, payload)
+            except Exception:
+                self._dirty += pending
+                self.failures += 1
+                raise
+            self._record(start, written)
+            if self.after_flush:
+                self.after_flush(token)
+
+    def flush_sync(self) -> None:
+        """이벤트 루프 밖(종료 처리, 스크립트)에서 동기적으로 저장"""
+        if self._dirty == 0:
+            return
+        pending = self._dirty
+        self._dirty = 0
+        start = time.perf_counter()
+        try:
+            state = self.get_state()
+            try:
+                payload = self.encoder(state)
+            finally:
+                self._release()
+            if self.before_replace:
+                self.before_replace()
+            written = self._commit(payload)
+        except Exception:
+            self._dirty += pending
+            self.failures += 1
+            raise
+        self._record(start, written)
+
+    def _release(self) -> None:
+        if self.release_state:
+            self.release_state()
+
+    def _commit(self, payload: bytes) -> int:
+        atomic_write(self.path, payload)
+        return len(payload)
+
+    def _record(self, start: float, written: int) -> None:
+        elapsed = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.bytes_written += written
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+        self.total_flush_ms += elapsed
+        if self.on_flush is not None:
+            self.on_flush(elapsed / 1000, written)
+
+    async def close(self) -> None:
+        await self._background.stop()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "marks": self.marks,
+            "flushes": self.flushes,
+            "coalesced": self.marks - self.flushes - self._dirty,
+            "pending": self._dirty,
+            "failures": self.failures,
+            "bytes_written": self.bytes_written,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+        }
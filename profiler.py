@@ -0,0 +1,259 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# 이 파일들의 프레임은 저장 작업으로 표시한다
+SAVE_MODULES = ("persistence", "journal", "storage")
+
+# 이벤트 루프가 할 일이 없어 대기 중인 샘플
+IDLE = "[idle]"
+
+
+def _module_name(filename: str) -> str:
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+class BlockEvent:
+    """이벤트 루프를 threshold 이상 붙잡은 콜백 하나"""
+
+    __slots__ = ("started_at", "duration", "stacks")
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.duration = 0.0
+        self.stacks: Counter = Counter()
+
+    @property
+    def stack(self) -> tuple[str, ...]:
+        """막혀 있는 동안 가장 많이 잡힌 스택"""
+        return self.stacks.most_common(1)[0][0] if self.stacks else ()
+
+    @property
+    def culprit(self) -> str:
+        """스택에서 가장 안쪽의 게임 화면 / 저장 프레임 (없으면 가장 안쪽 프레임)"""
+        for frame in reversed(self.stack):
+            if frame.startswith("["):
+                return frame
+        return self.stack[-1] if self.stack else "?"
+
+
+class ProfileResult:
+    """샘플링 결과 (collapsed stack 집계 + 루프 블로킹 기록)"""
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.samples: Counter = Counter()  # (스레드, 프레임...) → 횟수
+        self.loop_samples = 0
+        self.idle_samples = 0
+        self.blocks: list[BlockEvent] = []
+
+    @property
+    def busy_ratio(self) -> float:
+        if self.loop_samples == 0:
+            return 0.0
+        return 1 - self.idle_samples / self.loop_samples
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope 에서 읽을 수 있는 collapsed stack 형식"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def _frame_counts(self) -> tuple[Counter, Counter, int]:
+        """프레임별 자체 / 누적 샘플 수와 전체 작업 샘플 수 (대기 샘플 제외)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        busy = 0
+        for stack, count in self.samples.items():
+            frames = stack[1:]
+            if not frames or frames[-1] == IDLE:
+                continue
+            busy += count
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        return own, total, busy
+
+    def top(self, n: int = 15) -> list[tuple[str, int, int]]:
+        """(프레임, 자체 샘플 수, 누적 샘플 수) 를 자체 샘플 수 순으로"""
+        own, total, _ = self._frame_counts()
+        return [(frame, count, total[frame]) for frame, count in own.most_common(n)]
+
+    def labelled(self) -> list[tuple[str, int, int]]:
+        """[view] / [save] 프레임만 누적 샘플 수 순으로"""
+        own, total, _ = self._frame_counts()
+        return sorted(
+            ((frame, own[frame], count) for frame, count in total.items() if frame.startswith("[")),
+            key=lambda row: row[2],
+            reverse=True,
+        )
+
+    def summary(self, n: int = 15) -> str:
+        busy = self.loop_samples - self.idle_samples
+        base = max(self._frame_counts()[2], 1)
+        lines = [
+            f"프로파일: {self.duration:.1f}초, 샘플 간격 {self.interval * 1000:.0f}ms",
+            f"이벤트 루프 샘플 {self.loop_samples:,}개 (작업 중 {busy:,}개, {self.busy_ratio:.1%})",
+            f"비율은 모든 스레드의 작업 샘플 {base:,}개 대비 (자체 / 누적)",
+            "",
+            f"자체 시간 상위 {n}개 프레임",
+        ]
+        for frame, own, total in self.top(n):
+            lines.append(f"{own / base:7.1%} {total / base:7.1%}  {frame}")
+        lines.append("")
+        lines.append("게임 화면 / 저장 프레임")
+        for frame, own, total in self.labelled():
+            lines.append(f"{own / base:7.1%} {total / base:7.1%}  {frame}")
+        lines.append("")
+        lines.append(f"루프 블로킹 ({self.threshold * 1000:.0f}ms 이상): {len(self.blocks)}건")
+        for block in sorted(self.blocks, key=lambda b: b.duration, reverse=True):
+            lines.append(f"- {block.duration * 1000:.0f}ms  {block.culprit}")
+            lines.extend(f"    {frame}" for frame in reversed(block.stack))
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str, n: int = 15) -> tuple[str, str]:
+        """collapsed stack 파일과 요약 파일을 저장하고 두 경로를 돌려준다"""
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, time.strftime("profile-%Y%m%d-%H%M%S", time.localtime(self.started_at)))
+        folded_path, summary_path = stem + ".folded", stem + ".txt"
+        with open(folded_path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(self.summary(n))
+        return folded_path, summary_path
+
+
+class SamplingProfiler:
+    """실행 중인 봇을 멈추지 않고 쓰는 샘플링 프로파일러
+
+    별도 스레드가 interval 마다 sys._current_frames() 로 스택을 읽는다.
+    - 이벤트 루프 스레드는 매번 기록 (selector 대기 중이면 [idle])
+    - 다른 스레드(executor)는 저장 프레임이 있을 때만 기록
+    - 게임 화면(…View) 과 저장 모듈 프레임은 [view] / [save] 로 표시
+    이벤트 루프는 heartbeat 콜백으로 마지막으로 돌았던 시각을 남기고,
+    샘플러는 그 시각이 threshold 이상 지나면 그동안의 스택을 블로킹 기록으로 모은다.
+    """
+
+    def __init__(self, interval: float = 0.005, threshold: float = 0.1, max_depth: int = 64):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_depth = max_depth
+        self._names: dict = {}  # code 객체 → 표시 이름
+        self._lock = asyncio.Lock()
+        self._stop = threading.Event()
+        self._beat = 0.0
+        self._heartbeat: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    # ---------- 스택 ----------
+
+    def _frame_name(self, code) -> str:
+        name = self._names.get(code)
+        if name is None:
+            module = _module_name(code.co_filename)
+            qualname = getattr(code, "co_qualname", code.co_name)
+            owner = qualname.rsplit(".", 1)[0] if "." in qualname else ""
+            if module in SAVE_MODULES:
+                name = f"[save] {module}:{qualname}"
+            elif owner.endswith("View") and "discord" not in code.co_filename:
+                name = f"[view] {qualname}"
+            else:
+                name = f"{module}:{qualname}"
+            self._names[code] = name
+        return name
+
+    def _stack(self, frame) -> list[str]:
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            stack.append(self._frame_name(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    # ---------- 샘플링 ----------
+
+    def _beat_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._beat = time.perf_counter()
+        self._heartbeat = loop.call_later(self.interval, self._beat_loop, loop)
+
+    def _sample(self, result: ProfileResult, loop_thread: int) -> None:
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        block: Optional[BlockEvent] = None
+        last_beat = self._beat
+
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frames = sys._current_frames()
+
+            # 이벤트 루프 스레드
+            frame = frames.get(loop_thread)
+            if frame is not None:
+                thread = names.get(loop_thread, "loop")
+                if frame.f_code.co_name == "select" and _module_name(frame.f_code.co_filename) == "selectors":
+                    stack = (thread, IDLE)
+                    result.idle_samples += 1
+                else:
+                    stack = (thread, *self._stack(frame))
+                result.samples[stack] += 1
+                result.loop_samples += 1
+
+                beat = self._beat
+                if now - beat - self.interval >= self.threshold:
+                    if block is None:
+                        block = BlockEvent(beat)
+                    block.stacks[stack] += 1
+                elif block is not None and beat != last_beat:
+                    block.duration = beat - block.started_at - self.interval
+                    if block.duration >= self.threshold:
+                        result.blocks.append(block)
+                    block = None
+                last_beat = beat
+
+            # 그 외 스레드는 저장 작업 중일 때만
+            for ident, frame in frames.items():
+                if ident in (loop_thread, me):
+                    continue
+                if ident not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = self._stack(frame)
+                if any(name.startswith("[save]") for name in stack):
+                    result.samples[(names.get(ident, str(ident)), *stack)] += 1
+
+        if block is not None:
+            block.duration = time.perf_counter() - block.started_at - self.interval
+            result.blocks.append(block)
+
+    async def run(self, seconds: float, threshold: Optional[float] = None) -> ProfileResult:
+        """seconds 초 동안 샘플링 (동시에 하나만 실행)"""
+        async with self._lock:
+            if threshold is not None:
+                self.threshold = threshold
+            loop = asyncio.get_running_loop()
+            result = ProfileResult(self.interval, self.threshold)
+            self._stop.clear()
+            self._beat_loop(loop)
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(result, threading.get_ident()),
+                name="profiler",
+                daemon=True,
+            )
+            start = time.perf_counter()
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                self._stop.set()
+                self._heartbeat.cancel()
+                sampler.join()
+                result.duration = time.perf_counter() - start
+            return result
@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import discord
+from discord import app_commands
+
+
+class RateLimited(app_commands.CheckFailure):
+    """속도 제한에 걸림 (retry_after 초 뒤에 다시 가능)"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name}: {retry_after:.1f}초 뒤에 다시 시도")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def cooldown_message(retry_after: float) -> str:
+    return f"⏳ 너무 빨라요! **{retry_after:.1f}초** 뒤에 다시 시도해 주세요."
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """키(유저)별 토큰 버킷: 초당 rate 개씩 차고 최대 burst 개까지 모임
+
+    버킷은 마지막으로 쓴 순서로 보관하고, 요청마다 앞쪽부터 오래 쉰 버킷을 지운다.
+    (가득 찰 만큼 쉰 버킷은 새 버킷과 같으므로 지워도 동작이 바뀌지 않음)
+    """
+
+    def __init__(self, rate: float, burst: int, idle_ttl: float = 300.0):
+        self.rate = rate
+        self.burst = burst
+        self.idle_ttl = max(idle_ttl, burst / rate)
+        self._buckets: OrderedDict[Hashable, TokenBucket] = OrderedDict()
+
+        # 통계
+        self.allowed = 0
+        self.shed = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: Hashable, now: Optional[float] = None) -> float:
+        """토큰 하나를 쓴다. 허용되면 0, 아니면 다시 가능해질 때까지 남은 초"""
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.burst, now)
+        else:
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            self.allowed += 1
+            return 0.0
+        self.shed += 1
+        return (1 - bucket.tokens) / self.rate
+
+    def _expire(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            key = next(iter(buckets))
+            if now - buckets[key].updated < self.idle_ttl:
+                break
+            del buckets[key]
+
+
+class RateLimits:
+    """이름(명령어 / "button")별 RateLimiter 모음
+
+    limits 에 없는 이름은 default 를 사용한다. per_guild 면 같은 유저라도 서버마다 따로 센다.
+    """
+
+    def __init__(self, limits: dict[str, tuple[float, int]], default: tuple[float, int],
+                 idle_ttl: float = 300.0, per_guild: bool = False, enabled: bool = True):
+        self.limits = limits
+        self.default = default
+        self.idle_ttl = idle_ttl
+        self.per_guild = per_guild
+        self.enabled = enabled
+        self._limiters: dict[str, RateLimiter] = {}
+
+    def limiter(self, name: str) -> RateLimiter:
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            rate, burst = self.limits.get(name, self.default)
+            limiter = self._limiters[name] = RateLimiter(rate, burst, self.idle_ttl)
+        return limiter
+
+    def acquire(self, name: str, interaction: discord.Interaction) -> float:
+        if not self.enabled:
+            return 0.0
+        key = (interaction.guild_id, interaction.user.id) if self.per_guild else interaction.user.id
+        return self.limiter(name).acquire(key)
+
+    def check(self):
+        """슬래시 명령어용 체크 (명령어 이름으로 제한, 걸리면 RateLimited)"""
+        async def predicate(interaction: discord.Interaction) -> bool:
+            name = interaction.command.name
+            retry_after = self.acquire(name, interaction)
+            if retry_after:
+                raise RateLimited(name, retry_after)
+            return True
+        return app_commands.check(predicate)
+
+    def stats(self) -> dict:
+        return {
+            name: {"active": len(limiter), "allowed": limiter.allowed, "shed": limiter.shed}
+            for name, limiter in self._limiters.items()
+        }
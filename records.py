@@ -0,0 +1,90 @@
+from typing import Optional
+
+# 통계 항목 (동전던지기는 "bet" 키로 저장)
+STAT_GAMES = ("slot", "dice", "blackjack", "bet")
+
+_PLAYED = {game: f"{game}_played" for game in STAT_GAMES}
+_WON = {game: f"{game}_won" for game in STAT_GAMES}
+
+
+def new_stats() -> dict:
+    return {game: {"played": 0, "won": 0} for game in STAT_GAMES}
+
+
+class UserRecord:
+    """메모리에 올려두는 유저 데이터 (__slots__ 로 dict 오버헤드 제거)
+
+    게임별 played/won 을 중첩 dict 대신 평평한 속성으로 보관하고,
+    표시/저장이 필요할 때만 기존 dict 형태로 변환한다.
+    """
+
+    __slots__ = (
+        "balance",
+        "slot_played", "slot_won",
+        "dice_played", "dice_won",
+        "blackjack_played", "blackjack_won",
+        "bet_played", "bet_won",
+        "name", "name_ts",
+    )
+
+    def __init__(self, balance: int):
+        self.balance = balance
+        self.slot_played = self.slot_won = 0
+        self.dice_played = self.dice_won = 0
+        self.blackjack_played = self.blackjack_won = 0
+        self.bet_played = self.bet_won = 0
+        self.name: Optional[str] = None
+        self.name_ts = 0
+
+    def played(self, game: str) -> int:
+        return getattr(self, _PLAYED[game])
+
+    def won(self, game: str) -> int:
+        return getattr(self, _WON[game])
+
+    def set_stats(self, game: str, played: int, won: int) -> None:
+        setattr(self, _PLAYED[game], played)
+        setattr(self, _WON[game], won)
+
+    def add_stats(self, game: str, played: int, won: int) -> None:
+        attr = _PLAYED[game]
+        setattr(self, attr, getattr(self, attr) + played)
+        attr = _WON[game]
+        setattr(self, attr, getattr(self, attr) + won)
+
+    def reset(self, balance: int) -> None:
+        """잔액과 통계 초기화 (이름은 유지)"""
+        self.balance = balance
+        for game in STAT_GAMES:
+            self.set_stats(game, 0, 0)
+
+    def copy(self) -> "UserRecord":
+        record = UserRecord.__new__(UserRecord)
+        for attr in self.__slots__:
+            setattr(record, attr, getattr(self, attr))
+        return record
+
+    def stats(self) -> dict:
+        return {
+            game: {"played": getattr(self, _PLAYED[game]), "won": getattr(self, _WON[game])}
+            for game in STAT_GAMES
+        }
+
+    def to_dict(self) -> dict:
+        """기존 economy_data.json 의 유저 형식으로 변환"""
+        data = {"balance": self.balance, "stats": self.stats()}
+        if self.name is not None:
+            data["name"] = self.name
+            data["name_ts"] = self.name_ts
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UserRecord":
+        record = cls(data["balance"])
+        for game, s in data.get("stats", {}).items():
+            if game in _PLAYED:
+                record.set_stats(game, s.get("played", 0), s.get("won", 0))
+        if "name" in data:
+            record.name = data["name"]
+            record.name_ts = data.get("name_ts", 0)
+        return record
@@ -0,0 +1,116 @@
+"""게임 판정 / 지급 규칙
+
+게임 화면(index.py)과 RTP 시뮬레이터(simulator.py)가 같은 함수를 쓰도록 분리한 모듈.
+지급액은 모두 배팅금 대비 순손익(delta) 으로 반환한다 (Wallet.settle 에 그대로 전달).
+"""
+from typing import Optional, Sequence
+
+SLOT_SYMBOLS = ["🍒", "🍋", "🔔", "🍀", "⭐", "💎", "🍇"]
+DICE_FACES = 6
+COIN_SIDES = ["앞면", "뒷면"]
+
+# 딜러는 이 합계 이상이 될 때까지 카드를 뽑음
+DEALER_STANDS_ON = 17
+
+# 블랙잭 결과 (버스트는 딜러 진행 없이 바로 패배)
+BJ_BLACKJACK = "blackjack"
+BJ_WIN = "win"
+BJ_PUSH = "push"
+BJ_LOSE = "lose"
+BJ_BUST = "bust"
+BLACKJACK_OUTCOMES = (BJ_BLACKJACK, BJ_WIN, BJ_PUSH, BJ_LOSE, BJ_BUST)
+
+
+# ========================
+# 🎰 슬롯머신
+# ========================
+
+def slot_outcome(reels: Sequence) -> Optional[str]:
+    """3개의 심볼 → "jackpot" / "two_match" / None(패배)"""
+    if reels[0] == reels[1] == reels[2]:
+        return "jackpot"
+    if reels[0] == reels[1] or reels[1] == reels[2] or reels[0] == reels[2]:
+        return "two_match"
+    return None
+
+
+def slot_payout(outcome: Optional[str], bet: int, multipliers: dict) -> tuple[int, bool]:
+    """(순손익, 승리 여부)"""
+    if outcome is None:
+        return -bet, False
+    return int(multipliers["slot"][outcome] * bet), True
+
+
+# ========================
+# 🎲 주사위
+# ========================
+
+def dice_outcome(player_roll: int, bot_roll: int) -> int:
+    """1: 승리, 0: 무승부, -1: 패배"""
+    return (player_roll > bot_roll) - (player_roll < bot_roll)
+
+
+def dice_payout(outcome: int, bet: int, multipliers: dict) -> tuple[int, bool]:
+    if outcome > 0:
+        winnings = int((multipliers["dice"]["win"] - 1) * bet)
+        return bet + winnings, True
+    if outcome < 0:
+        return -bet, False
+    return 0, False
+
+
+# ========================
+# 🃏 블랙잭
+# ========================
+
+def blackjack_outcome(player_total: int, dealer_total: int, natural: bool) -> str:
+    """딜러 진행이 끝난 뒤의 결과 (natural: 처음 두 장으로 21)"""
+    if player_total > 21:
+        # 더블 후 버스트한 패도 딜러와 비교하지 않고 패배
+        return BJ_BUST
+    if dealer_total > 21 or player_total > dealer_total:
+        return BJ_BLACKJACK if natural else BJ_WIN
+    if dealer_total == player_total:
+        return BJ_PUSH
+    return BJ_LOSE
+
+
+def blackjack_payout(outcome: str, bet: int, multipliers: dict) -> tuple[int, bool]:
+    """bet 은 더블 시 추가 배팅을 포함한 전체 배팅금"""
+    if outcome == BJ_BLACKJACK or outcome == BJ_WIN:
+        return int(bet * multipliers["blackjack"][outcome]), True
+    if outcome == BJ_PUSH:
+        return 0, False
+    return -bet, False
+
+
+# ========================
+# 🪙 동전던지기
+# ========================
+
+def coinflip_payout(correct: bool, bet: int, multipliers: dict) -> tuple[int, bool]:
+    if correct:
+        return int(bet * multipliers["coinflip"]["win"]), True
+    return -bet, False
+
+
+# ========================
+# 🔁 연속 플레이 (횟수)
+# ========================
+
+def batch_settlement(results: Sequence[tuple[int, bool]], balance: int, bet: int) -> tuple[int, int, int, int]:
+    """미리 뽑아 둔 판별 (순손익, 승리 여부) 를 차례로 적용
+
+    판을 시작할 때 잔액이 배팅금보다 적으면 거기서 멈춘다 (손실 한도).
+    (순손익 합계, 진행한 판 수, 승리 수, 묶어야 할 배팅금) 을 반환하며,
+    묶어야 할 배팅금은 진행 중 가장 크게 잃은 시점을 감당할 만큼으로 balance 를 넘지 않는다.
+    """
+    delta = played = won = stake = 0
+    for round_delta, round_won in results:
+        if balance + delta < bet:
+            break
+        stake = max(stake, bet - delta)
+        delta += round_delta
+        played += 1
+        won += round_won
+    return delta, played, won, stake
@@ -0,0 +1,327 @@
+"""진행 중인 게임 화면의 세션 (재시작 후 복구)
+
+게임 화면(View)은 메모리에만 있으므로 봇이 재시작하면 버튼이 더 이상 동작하지 않고 묶인 배팅금도 돌아오지 않는다.
+세션마다 메시지 / 에스크로 / 게임 상태를 작은 레코드로 sessions.bin 에 저장해 두고,
+다시 시작할 때 같은 custom_id 의 화면을 만들어 bot.add_view(view, message_id=...) 로 다시 연결한다.
+
+배팅금이 아직 묶여 있는지는 저장소의 에스크로 장부가 기준이다. 이 파일은 화면을 다시 만들기 위한
+정보만 담으며 백그라운드에서 저장하므로 장부보다 늦을 수 있다 (복구할 때 장부에 없는 세션은 버리고,
+세션이 없는 장부 항목은 환불한다).
+
+    헤더    magic "GBSESS01", 세션 수 u32
+    세션    메시지 ID u64, 채널 ID u64, 서버 ID u64 (0 = 기존 데이터), 유저 ID u64, 배팅 i64,
+            마지막 사용 시각 f64, 시간 제한 f32 (초), 게임 이름 길이 u8, 이름 UTF-8,
+            에스크로 ID 길이 u8, ID ASCII, 상태 길이 u8, 상태
+
+정수는 모두 little-endian. 상태는 게임 화면이 직접 만드는 바이트열 (블랙잭의 패 등, 255 바이트 이하).
+"""
+import asyncio
+import os
+import struct
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Container, NamedTuple, Optional
+
+from persistence import BackgroundLoop, atomic_write
+from wallet import Escrow
+
+MAGIC = b"GBSESS01"
+
+_HEADER = struct.Struct("<8sI")
+_RECORD = struct.Struct("<QQQQqdf")
+
+# 저장된 세션을 복구할 때의 처리 (restore_action)
+DROP = "drop"      # 장부에 없음 (이미 정산 / 환불된 게임)
+REFUND = "refund"  # 이어서 할 수 없음 (배팅금 환불)
+RESUME = "resume"  # 화면을 다시 만들어 같은 메시지에 연결
+
+
+class SavedSession(NamedTuple):
+    """파일에서 읽은 세션 (복구할 때 에스크로와 화면을 다시 만듦)"""
+    message_id: int
+    channel_id: int
+    guild_id: Optional[int]
+    user_id: int
+    game: str
+    escrow_id: str
+    amount: int
+    last_used: float
+    ttl: float
+    state: bytes
+
+
+class GameSession:
+    """진행 중인 게임 하나 (메시지 ID 로 구분)"""
+
+    __slots__ = ("message_id", "channel_id", "guild_id", "escrow", "ttl", "last_used", "state", "view")
+
+    def __init__(self, message_id: int, channel_id: int, guild_id: Optional[int], escrow: Escrow,
+                 ttl: float, state: bytes = b"", view: Any = None, last_used: Optional[float] = None):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.escrow = escrow
+        self.ttl = ttl
+        self.last_used = time.time() if last_used is None else last_used
+        self.state = state
+        self.view = view
+
+    @property
+    def expires_at(self) -> float:
+        return self.last_used + self.ttl
+
+    def encode(self) -> bytes:
+        escrow = self.escrow
+        game = escrow.game.encode("utf-8")
+        escrow_id = escrow.escrow_id.encode("ascii")
+        return b"".join((
+            _RECORD.pack(self.message_id, self.channel_id, self.guild_id or 0, escrow.user_id, escrow.amount,
+                         self.last_used, self.ttl),
+            struct.pack("<B", len(game)), game,
+            struct.pack("<B", len(escrow_id)), escrow_id,
+            struct.pack("<B", len(self.state)), self.state,
+        ))
+
+
+def decode_sessions(buf: bytes) -> list[SavedSession]:
+    magic, count = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("magic 불일치")
+    offset = _HEADER.size
+    saved = []
+    for _ in range(count):
+        message_id, channel_id, guild_id, user_id, amount, last_used, ttl = _RECORD.unpack_from(buf, offset)
+        offset += _RECORD.size
+        length = buf[offset]
+        game = buf[offset + 1:offset + 1 + length].decode("utf-8")
+        offset += 1 + length
+        length = buf[offset]
+        escrow_id = buf[offset + 1:offset + 1 + length].decode("ascii")
+        offset += 1 + length
+        length = buf[offset]
+        state = bytes(buf[offset + 1:offset + 1 + length])
+        offset += 1 + length
+        saved.append(SavedSession(
+            message_id, channel_id, guild_id or None, user_id, game, escrow_id, amount, last_used, ttl, state
+        ))
+    return saved
+
+
+def restore_action(saved: SavedSession, escrow: Optional[Escrow], games: Container[str]) -> str:
+    """저장된 세션과 장부의 에스크로(없으면 None)를 비교해 복구할 때의 처리를 정한다
+
+    배팅금이 세션과 다르면 (더블 직후 세션이 저장되기 전에 종료) 저장된 게임 상태가 오래된 것이므로 환불한다.
+    """
+    if escrow is None:
+        return DROP
+    if saved.game not in games or escrow.amount != saved.amount:
+        return REFUND
+    return RESUME
+
+
+class SessionRegistry:
+    """메시지 ID → GameSession (마지막으로 쓴 순서)
+
+    - add(): 등록, capacity 를 넘으면 가장 오래 쓰지 않은 세션부터 빼고 on_evict (환불) 호출
+    - touch(): 버튼을 누를 때마다 시간 제한을 다시 시작 (시각만 바뀐 것은 touch_interval 마다 모아서 저장)
+    - 백그라운드 태스크가 sweep_interval 마다 시간이 지난 세션을 빼고 on_expire 호출, 바뀐 내용을 저장
+    - sync(): 지금까지의 변경이 파일에 저장될 때까지 기다림 (동시에 부른 호출은 한 번의 저장으로 묶음)
+      버튼 처리 중에는 부르지 않는다 (종료할 때만)
+    path 가 None 이면 저장하지 않고 메모리에서 개수 제한 / 시간 초과만 처리한다.
+    """
+
+    def __init__(self, path: Optional[str], capacity: int = 5000, sweep_interval: float = 1.0,
+                 touch_interval: float = 30.0):
+        self.path = path
+        self.capacity = capacity
+        self.sweep_interval = sweep_interval
+        self.touch_interval = touch_interval
+        # 시간 초과 / 개수 제한으로 뺀 세션마다 호출 (화면 정리와 배팅금 처리)
+        self.on_expire: Optional[Callable[[GameSession], Awaitable[None]]] = None
+        self.on_evict: Optional[Callable[[GameSession], Awaitable[None]]] = None
+
+        self._sessions: OrderedDict[int, GameSession] = OrderedDict()
+        self._version = 0        # 변경할 때마다 증가
+        self._saved_version = 0  # 파일에 반영된 변경
+        self._touched = False    # 저장하지 않은 마지막 사용 시각이 있음
+        self._touch_saved = time.monotonic()
+        self._saving: Optional[asyncio.Future] = None
+        self._pending: set[asyncio.Task] = set()
+        self._background = BackgroundLoop(self._maintain, sweep_interval, "❌ 게임 세션 정리 실패")
+
+        # 통계
+        self.added = 0
+        self.restored = 0
+        self.expired = 0
+        self.evicted = 0
+        self.saves = 0
+        self.failures = 0
+        self.bytes_written = 0
+        self.max_active = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, message_id: int) -> Optional[GameSession]:
+        return self._sessions.get(message_id)
+
+    def mark_dirty(self) -> None:
+        """다음 백그라운드 저장 때 파일을 다시 씀"""
+        self._version += 1
+
+    # ---------- 등록 / 해제 ----------
+
+    def add(self, session: GameSession, restored: bool = False) -> None:
+        self._sessions[session.message_id] = session
+        self._sessions.move_to_end(session.message_id)
+        if restored:
+            self.restored += 1
+        else:
+            self.added += 1
+        # 한도를 넘으면 바로 빼서 메모리를 묶어두지 않음 (환불은 백그라운드에서)
+        while len(self._sessions) > self.capacity:
+            _, oldest = self._sessions.popitem(last=False)
+            self.evicted += 1
+            self._spawn(self.on_evict, oldest)
+        self.max_active = max(self.max_active, len(self._sessions))
+        self.mark_dirty()
+
+    def touch(self, session: GameSession) -> None:
+        if self._sessions.get(session.message_id) is session:
+            session.last_used = time.time()
+            self._sessions.move_to_end(session.message_id)
+            # 누를 때마다 파일 전체를 다시 쓰지 않도록 변경으로 치지 않음
+            # (재시작 후 시간 제한이 최대 touch_interval 만큼 일찍 끝날 수 있음)
+            self._touched = True
+
+    def update(self, session: GameSession, state: bytes) -> None:
+        """게임 상태가 바뀜 (다음 백그라운드 저장 때 반영)"""
+        session.state = state
+        if self._sessions.get(session.message_id) is session:
+            self.mark_dirty()
+
+    def remove(self, session: GameSession) -> bool:
+        if self._sessions.get(session.message_id) is not session:
+            return False
+        del self._sessions[session.message_id]
+        self.mark_dirty()
+        return True
+
+    def _spawn(self, callback: Optional[Callable[[GameSession], Awaitable[None]]], session: GameSession) -> None:
+        if callback is None:
+            return
+        task = asyncio.ensure_future(self._call(callback, session))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    @staticmethod
+    async def _call(callback: Callable[[GameSession], Awaitable[None]], session: GameSession) -> None:
+        try:
+            await callback(session)
+        except Exception as e:
+            print(f"❌ 게임 세션 정리 실패 (메시지 {session.message_id}): {e}")
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """시간이 지난 세션을 빼고 on_expire 를 호출, 뺀 수를 돌려준다"""
+        now = time.time() if now is None else now
+        expired = [session for session in self._sessions.values() if session.expires_at <= now]
+        for session in expired:
+            del self._sessions[session.message_id]
+            self.expired += 1
+            self._spawn(self.on_expire, session)
+        if expired:
+            self.mark_dirty()
+        return len(expired)
+
+    # ---------- 저장 ----------
+
+    def encode(self) -> bytes:
+        parts = [_HEADER.pack(MAGIC, len(self._sessions))]
+        parts.extend(session.encode() for session in self._sessions.values())
+        return b"".join(parts)
+
+    def load(self) -> list[SavedSession]:
+        """저장된 세션 목록 (등록은 화면을 만든 뒤 add(restored=True) 로)"""
+        if self.path is None or not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as f:
+            buf = f.read()
+        try:
+            return decode_sessions(buf)
+        except (struct.error, ValueError, IndexError) as e:
+            print(f"⚠️ 게임 세션 파일을 읽지 못했습니다 ({self.path}): {e}")
+            return []
+
+    async def _save(self) -> None:
+        version = self._version
+        self._touched = False
+        self._touch_saved = time.monotonic()
+        payload = self.encode()
+        await asyncio.get_running_loop().run_in_executor(None, atomic_write, self.path, payload)
+        self._saved_version = max(self._saved_version, version)
+        self.saves += 1
+        self.bytes_written += len(payload)
+
+    async def sync(self) -> None:
+        """지금까지의 변경이 저장될 때까지 기다림 (실패하면 기록만 남기고 다음 주기에 다시 시도)"""
+        if self.path is None:
+            return
+        target = self._version
+        while self._saved_version < target:
+            # 진행 중인 저장은 그 전의 변경만 담고 있을 수 있으므로 끝난 뒤 다시 확인
+            if self._saving is None or self._saving.done():
+                self._saving = asyncio.ensure_future(self._save())
+            try:
+                await asyncio.shield(self._saving)
+            except Exception as e:
+                self.failures += 1
+                print(f"❌ 게임 세션 저장 실패: {e}")
+                return
+
+    # ---------- 수명 주기 ----------
+
+    async def start(self) -> None:
+        self._background.interval = self.sweep_interval
+        self._background.start()
+
+    async def _maintain(self) -> None:
+        self.sweep()
+        if self._touched and time.monotonic() - self._touch_saved >= self.touch_interval:
+            self.mark_dirty()
+        await self.sync()
+
+    async def close(self) -> None:
+        """남은 세션을 저장하고 멈춤 (세션은 그대로 두어 다음 시작 때 복구)"""
+        if self._touched:
+            self.mark_dirty()
+        await self._background.stop()
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        await self.sync()
+
+    def stats(self) -> dict:
+        games: dict[str, int] = {}
+        memory = sys.getsizeof(self._sessions)
+        for session in self._sessions.values():
+            games[session.escrow.game] = games.get(session.escrow.game, 0) + 1
+            memory += sys.getsizeof(session) + sys.getsizeof(session.escrow) + sys.getsizeof(session.state)
+            view = session.view
+            if view is not None:
+                # 화면 객체와 버튼 (discord.py 내부 상태는 제외한 대략적인 크기)
+                memory += sys.getsizeof(view) + sys.getsizeof(vars(view))
+                memory += sum(sys.getsizeof(item) + sys.getsizeof(vars(item)) for item in view.children)
+        return {
+            "active": len(self._sessions),
+            "games": games,
+            "max_active": self.max_active,
+            "memory_bytes": memory,
+            "added": self.added,
+            "restored": self.restored,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "saves": self.saves,
+            "failures": self.failures,
+            "bytes_written": self.bytes_written,
+            "dirty": self._version != self._saved_version,
+        }
@@ -0,0 +1,117 @@
+import random
+from collections import OrderedDict
+from typing import Optional
+
+# 한 벌(52장)의 카드 값 (A=11, J/Q/K=10)
+DECK_VALUES = bytes([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11] * 4)
+
+
+class Shoe:
+    """여러 벌을 섞어 쓰는 블랙잭 카드 슈
+
+    카드는 bytearray 한 덩어리에 담아 한 번에 섞고(Fisher–Yates 1회),
+    뽑기는 위치 인덱스만 증가시킨다. 컷 카드를 지나면 다음 라운드 시작 시 다시 섞는다.
+    """
+
+    def __init__(self, decks: int = 6, penetration: float = 0.75, rng: Optional[random.Random] = None):
+        self.decks = decks
+        self.cards = bytearray(DECK_VALUES * decks)
+        self.cut = int(len(self.cards) * penetration)
+        self.rng = rng or random.Random()
+        self.pos = 0
+        self.shuffles = 0
+        self.draws = 0
+        self.shuffle()
+
+    def shuffle(self) -> None:
+        self.rng.shuffle(self.cards)
+        self.pos = 0
+        self.shuffles += 1
+
+    @property
+    def remaining(self) -> int:
+        return len(self.cards) - self.pos
+
+    @property
+    def past_cut(self) -> bool:
+        return self.pos >= self.cut
+
+    def begin_round(self) -> None:
+        """라운드 시작 시 호출 (컷 카드를 지났으면 다시 섞음)"""
+        if self.past_cut:
+            self.shuffle()
+
+    def draw(self) -> int:
+        if self.pos >= len(self.cards):
+            # 라운드 도중 카드가 떨어지면 즉시 다시 섞음
+            self.shuffle()
+        card = self.cards[self.pos]
+        self.pos += 1
+        self.draws += 1
+        return card
+
+
+class Hand:
+    """합계와 소프트 에이스 수를 카드를 받을 때마다 갱신하는 블랙잭 패"""
+
+    __slots__ = ("cards", "total", "soft_aces")
+
+    def __init__(self, cards=()):
+        self.cards: list[int] = []
+        self.total = 0
+        self.soft_aces = 0  # 11로 계산 중인 에이스 수
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: int) -> int:
+        self.cards.append(card)
+        self.total += card
+        if card == 11:
+            self.soft_aces += 1
+        while self.total > 21 and self.soft_aces:
+            self.total -= 10
+            self.soft_aces -= 1
+        return self.total
+
+    @property
+    def is_blackjack(self) -> bool:
+        return self.total == 21 and len(self.cards) == 2
+
+    @property
+    def is_soft(self) -> bool:
+        return self.soft_aces > 0
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __getitem__(self, index: int) -> int:
+        return self.cards[index]
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __str__(self) -> str:
+        return str(self.cards)
+
+
+class ShoeRegistry:
+    """채널(또는 서버)별 카드 슈 보관소 (오래 쓰지 않은 슈부터 정리)"""
+
+    def __init__(self, decks: int = 6, penetration: float = 0.75, capacity: int = 1000):
+        self.decks = decks
+        self.penetration = penetration
+        self.capacity = capacity
+        self._shoes: OrderedDict[int, Shoe] = OrderedDict()
+
+    def get(self, key: int) -> Shoe:
+        shoe = self._shoes.get(key)
+        if shoe is None:
+            shoe = self._shoes[key] = Shoe(self.decks, self.penetration)
+            while len(self._shoes) > self.capacity:
+                self._shoes.popitem(last=False)
+        else:
+            self._shoes.move_to_end(key)
+        return shoe
+
+    def __len__(self) -> int:
+        return len(self._shoes)
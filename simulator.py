@@ -0,0 +1,454 @@
+"""게임별 RTP(플레이어 환수율) 몬테카를로 시뮬레이터
+
+사용법:
+    python simulator.py [--game all] [--rounds 10000000] [--bet 100] [--seed 1]
+                        [--set slot.jackpot=12] [--defaults] [--json]
+
+무작위 결과는 NumPy 로 한 번에 뽑아 결과 코드로 분류하고, 코드별 지급액은
+rules.py 의 함수(게임 화면이 쓰는 것과 같은 함수)로 계산한다.
+벡터화한 판정은 첫 묶음의 일부를 rules.py 의 판정 함수와 비교해 어긋나면 중단한다.
+
+블랙잭은 6덱 슈와 같은 카드 비율에서 복원 추출(무한 덱 근사)로 뽑고,
+플레이어는 stand_on 이상에서 스탠드, double_on 에 있는 첫 두 장 합계에서만 더블한다.
+패는 (합계, 소프트 에이스 여부) 상태 번호로 두고 카드 한 장은 상태 전이표 조회 한 번으로 더하며,
+카드를 더 받는 판만 골라 처리한다. 첫 묶음의 일부는 같은 카드를 shoe.Hand 로 처음부터 다시
+진행해 (몇 장을 받는지까지) 벡터 결과와 비교한다.
+"""
+import argparse
+import functools
+import json
+import math
+import os
+import sys
+import time
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # 시뮬레이터는 선택 기능 (봇은 numpy 없이도 동작)
+    np = None
+
+import rules
+from shoe import DECK_VALUES, Hand
+
+AVAILABLE = np is not None
+
+GAMES = ("slot", "dice", "blackjack", "coinflip")
+GAME_NAMES = {"slot": "슬롯머신", "dice": "주사위", "blackjack": "블랙잭", "coinflip": "동전던지기"}
+
+# 결과 코드 → rules.py 의 결과 값
+_SLOT_OUTCOMES = (None, "two_match", "jackpot")
+_DICE_OUTCOMES = (-1, 0, 1)
+
+# 판정 비교에 쓰는 표본 수
+_VERIFY_ROWS = 1000
+
+
+class SimResult:
+    """시뮬레이션 결과 (RTP = 총 지급액 / 총 배팅액)"""
+
+    __slots__ = ("game", "rounds", "rtp", "ci95", "stdev", "hit_rate", "elapsed")
+
+    def __init__(self, game: str, rounds: int, rtp: float, ci95: float, stdev: float, hit_rate: float, elapsed: float):
+        self.game = game
+        self.rounds = rounds
+        self.rtp = rtp
+        self.ci95 = ci95          # RTP 95% 신뢰구간 반폭
+        self.stdev = stdev        # 한 판 순손익의 표준편차 (배팅금 단위)
+        self.hit_rate = hit_rate  # 이긴 판 비율
+        self.elapsed = elapsed
+
+    @property
+    def rounds_per_sec(self) -> float:
+        return self.rounds / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "game": self.game,
+            "rounds": self.rounds,
+            "rtp": self.rtp,
+            "ci95": self.ci95,
+            "stdev": self.stdev,
+            "hit_rate": self.hit_rate,
+            "elapsed": self.elapsed,
+            "rounds_per_sec": self.rounds_per_sec,
+        }
+
+
+def _drifted(game: str, index: int, expected, actual) -> RuntimeError:
+    return RuntimeError(f"{game} 벡터 판정이 rules.py 와 다릅니다 (#{index}: {actual!r} != {expected!r})")
+
+
+# ========================
+# 결과 코드 뽑기 (게임별)
+# ========================
+
+def _sample_slot(rng, n: int, verify: int):
+    reels = rng.integers(0, len(rules.SLOT_SYMBOLS), size=(n, 3), dtype=np.int8)
+    a, b, c = reels[:, 0], reels[:, 1], reels[:, 2]
+    jackpot = (a == b) & (b == c)
+    two = (a == b) | (b == c) | (a == c)
+    codes = two.astype(np.int8) + jackpot
+    for i in range(min(verify, n)):
+        expected = rules.slot_outcome(reels[i].tolist())
+        if _SLOT_OUTCOMES[codes[i]] != expected:
+            raise _drifted("slot", i, expected, _SLOT_OUTCOMES[codes[i]])
+    return codes
+
+
+def _sample_dice(rng, n: int, verify: int):
+    rolls = rng.integers(1, rules.DICE_FACES + 1, size=(2, n), dtype=np.int8)
+    codes = (rolls[0] > rolls[1]).astype(np.int8) - (rolls[0] < rolls[1]) + 1
+    for i in range(min(verify, n)):
+        expected = rules.dice_outcome(int(rolls[0, i]), int(rolls[1, i]))
+        if _DICE_OUTCOMES[codes[i]] != expected:
+            raise _drifted("dice", i, expected, _DICE_OUTCOMES[codes[i]])
+    return codes
+
+
+def _sample_coinflip(rng, n: int, verify: int):
+    sides = rng.integers(0, len(rules.COIN_SIDES), size=(2, n), dtype=np.int8)
+    return (sides[0] == sides[1]).astype(np.int8)
+
+
+# 블랙잭 카드 번호: DECK_VALUES 의 위치 (한 덱과 같은 카드 비율)
+_CARD_CODES = len(DECK_VALUES)
+
+# 패 상태 번호 = 합계 + 32 * (11로 계산 중인 에이스가 있으면 1), 0 은 빈 패.
+# 플레이어는 여기에 더블(64) / 내추럴(128) 표시를 더한다.
+# 전이표는 "상태 * _STRIDE + 카드 번호" 한 번 조회로 다음 상태(* _STRIDE)를 돌려주고,
+# 결과 코드표는 "플레이어 상태 * _STRIDE + 딜러 상태" 로 찾는다
+_HAND_STATES = 64
+_STRIDE = max(_HAND_STATES, _CARD_CODES)
+_DOUBLED = 64
+_NATURAL = 128
+
+
+def _card_codes(rng, k: int):
+    """카드 번호(DECK_VALUES 의 위치) k 개. uint16 정수 뽑기가 가장 빠름 (uint8 은 몇 배 느림)"""
+    return rng.integers(0, _CARD_CODES, k, dtype=np.uint16)
+
+
+def _hand_add(state: int, card: int) -> int:
+    """Hand.add 와 같은 규칙으로 상태 번호에 카드 한 장 추가 (전이표를 만들 때만 사용)"""
+    total, soft = state % 32 + card, state // 32 + (card == 11)
+    while total > 21 and soft:
+        total -= 10
+        soft -= 1
+    return total + 32 * min(soft, 1)
+
+
+@functools.lru_cache(maxsize=8)
+def _blackjack_tables(stand_on: int, double_on: tuple):
+    """플레이어 / 딜러 전이표와 결과 코드표 (정책별로 한 번만 만든다)"""
+    cards = DECK_VALUES
+    c = _STRIDE
+
+    def table(states: int, step) -> "np.ndarray":
+        # 카드를 받지 않는 상태는 그대로
+        out = np.zeros(states * c, dtype=np.intp)
+        for state in range(states):
+            for code, card in enumerate(cards):
+                out[state * c + code] = step(state, card) * c
+        return out
+
+    # 첫 두 장: [첫 카드 번호 * _CARD_CODES + 둘째 카드 번호]
+    player_pair = np.empty(_CARD_CODES * _CARD_CODES, dtype=np.intp)
+    dealer_pair = np.empty(_CARD_CODES * _CARD_CODES, dtype=np.intp)
+    for first, card1 in enumerate(cards):
+        for second, card2 in enumerate(cards):
+            hand = _hand_add(_hand_add(0, card1), card2)
+            player_pair[first * _CARD_CODES + second] = (hand | (_NATURAL if hand % 32 == 21 else 0)) * c
+            dealer_pair[first * _CARD_CODES + second] = hand * c
+
+    def player_double(state, card):
+        hand = state % _HAND_STATES
+        if state & (_NATURAL | _DOUBLED) or hand % 32 not in double_on:
+            return state
+        return (state - hand) | _hand_add(hand, card) | _DOUBLED
+
+    def player_hit(state, card):
+        hand = state % _HAND_STATES
+        if state & _DOUBLED or hand % 32 >= stand_on:
+            return state
+        return (state - hand) | _hand_add(hand, card)
+
+    def dealer_hit(state, card):
+        return state if state % 32 >= rules.DEALER_STANDS_ON else _hand_add(state, card)
+
+    player_states = 4 * _HAND_STATES
+    player_active = np.zeros(player_states * c, dtype=bool)
+    double_active = np.zeros(player_states * c, dtype=bool)
+    dealer_active = np.zeros(_HAND_STATES * c, dtype=bool)
+    outcome = np.zeros(player_states * c, dtype=np.int8)
+    for state in range(player_states):
+        hand = state % _HAND_STATES
+        player_active[state * c] = not state & _DOUBLED and hand % 32 < stand_on
+        double_active[state * c] = not state & (_NATURAL | _DOUBLED) and hand % 32 in double_on
+        for dealer in range(_HAND_STATES):
+            result = rules.blackjack_outcome(hand % 32, dealer % 32, bool(state & _NATURAL))
+            outcome[state * c + dealer] = rules.BLACKJACK_OUTCOMES.index(result) * 2 + bool(state & _DOUBLED)
+    for state in range(_HAND_STATES):
+        dealer_active[state * c] = state % 32 < rules.DEALER_STANDS_ON
+    return {
+        "player_pair": player_pair, "dealer_pair": dealer_pair,
+        "player_double": table(player_states, player_double),
+        "double_active": double_active,
+        "player_hit": table(player_states, player_hit), "player_active": player_active,
+        "dealer_hit": table(_HAND_STATES, dealer_hit), "dealer_active": dealer_active,
+        "outcome": outcome,
+    }
+
+
+def _sample_blackjack(rng, n: int, verify: int, stand_on: int = rules.DEALER_STANDS_ON, double_on: Iterable[int] = ()):
+    tables = _blackjack_tables(stand_on, tuple(sorted(set(double_on))))
+    verify = min(verify, n)
+    # 표본 판(앞쪽 verify 판)에 돌린 카드: [(단계, 판 번호 배열, 카드 번호 배열)]
+    log: list[tuple[str, "np.ndarray", "np.ndarray"]] = []
+
+    # 첫 두 장은 한 번에 "첫 카드 번호 * _CARD_CODES + 둘째 카드 번호" 로 뽑는다
+    pairs = rng.integers(0, _CARD_CODES * _CARD_CODES, (2, n), dtype=np.uint16).astype(np.intp)
+    player = np.take(tables["player_pair"], pairs[0])
+    dealer = np.take(tables["dealer_pair"], pairs[1])
+
+    def deal(stage: str, state, step, rows):
+        # rows 판에만 한 장씩 돌린다 (표본 판에 돌린 카드는 기록)
+        codes = _card_codes(rng, rows.size)
+        if verify:
+            sampled = rows < verify
+            log.append((stage, rows[sampled], codes[sampled]))
+        hands = np.take(step, state[rows] + codes)
+        state[rows] = hands
+        return hands
+
+    def play(stage: str, state, step, active) -> None:
+        # 카드를 더 받는 판만 골라 돌리고, 그 뒤에도 받을 판만 남긴다
+        rows = np.flatnonzero(np.take(active, state))
+        while rows.size:
+            rows = rows[np.take(active, deal(stage, state, step, rows))]
+
+    # 더블: 한 장만 받고 스탠드
+    deal("double", player, tables["player_double"], np.flatnonzero(np.take(tables["double_active"], player)))
+    play("player", player, tables["player_hit"], tables["player_active"])
+    play("dealer", dealer, tables["dealer_hit"], tables["dealer_active"])
+    result = np.take(tables["outcome"], player + dealer // _STRIDE)
+    if verify:
+        _verify_blackjack(pairs, log, result, verify, stand_on, tuple(double_on))
+    return result
+
+
+def _verify_blackjack(pairs, log, codes, rows: int, stand_on: int, double_on: tuple) -> None:
+    """표본 판을 같은 카드로 shoe.Hand 와 rules.py 만 써서 처음부터 다시 진행해 결과 코드 비교
+
+    벡터 쪽이 정책과 다른 판에 카드를 돌렸으면 받은 카드 수부터 어긋난다.
+    """
+    def value(code) -> int:
+        return DECK_VALUES[int(code)]
+
+    dealt = {stage: [[] for _ in range(rows)] for stage in ("double", "player", "dealer")}
+    for stage, sampled, cards in log:
+        for row, code in zip(sampled.tolist(), cards.tolist()):
+            dealt[stage][row].append(value(code))
+
+    for i in range(rows):
+        player = Hand([value(code) for code in divmod(int(pairs[0, i]), _CARD_CODES)])
+        dealer = Hand([value(code) for code in divmod(int(pairs[1, i]), _CARD_CODES)])
+        natural = player.is_blackjack
+        doubled = not natural and player.total in double_on
+        if doubled != bool(dealt["double"][i]) or (doubled and dealt["player"][i]):
+            raise _drifted("blackjack", i, f"더블 {doubled}", dealt["double"][i] + dealt["player"][i])
+        for card in dealt["double"][i] + dealt["player"][i]:
+            if not doubled and player.total >= stand_on:
+                raise _drifted("blackjack", i, f"{player} 에서 스탠드", f"{card} 받음")
+            player.add(card)
+        if not doubled and player.total < stand_on:
+            raise _drifted("blackjack", i, f"{player} 에서 한 장 더", "스탠드")
+        for card in dealt["dealer"][i]:
+            if dealer.total >= rules.DEALER_STANDS_ON:
+                raise _drifted("blackjack", i, f"딜러 {dealer} 에서 스탠드", f"{card} 받음")
+            dealer.add(card)
+        if dealer.total < rules.DEALER_STANDS_ON:
+            raise _drifted("blackjack", i, f"딜러 {dealer} 에서 한 장 더", "스탠드")
+        expected = (rules.blackjack_outcome(player.total, dealer.total, natural), doubled)
+        actual = (rules.BLACKJACK_OUTCOMES[codes[i] // 2], bool(codes[i] % 2))
+        if actual != expected:
+            raise _drifted("blackjack", i, expected, actual)
+
+
+# ========================
+# 결과 코드별 (지급액, 배팅액)
+# ========================
+
+def _payout_table(game: str, bet: int, multipliers: dict) -> list[tuple[int, int, bool]]:
+    """코드 → (돌려받는 금액, 배팅액, 승리 여부). 돌려받는 금액 = 배팅액 + 순손익"""
+    if game == "slot":
+        pays = [rules.slot_payout(o, bet, multipliers) for o in _SLOT_OUTCOMES]
+        return [(bet + delta, bet, won) for delta, won in pays]
+    if game == "dice":
+        pays = [rules.dice_payout(o, bet, multipliers) for o in _DICE_OUTCOMES]
+        return [(bet + delta, bet, won) for delta, won in pays]
+    if game == "coinflip":
+        pays = [rules.coinflip_payout(correct, bet, multipliers) for correct in (False, True)]
+        return [(bet + delta, bet, won) for delta, won in pays]
+    if game == "blackjack":
+        table = []
+        for outcome in rules.BLACKJACK_OUTCOMES:
+            for stake in (bet, bet * 2):
+                delta, won = rules.blackjack_payout(outcome, stake, multipliers)
+                table.append((stake + delta, stake, won))
+        return table
+    raise ValueError(f"알 수 없는 게임: {game}")
+
+
+def _summarize(game: str, counts: list[int], table: list[tuple[int, int, bool]], bet: int, elapsed: float) -> SimResult:
+    n = sum(counts)
+    paid = sum(c * x for c, (x, _, _) in zip(counts, table))
+    staked = sum(c * y for c, (_, y, _) in zip(counts, table))
+    rtp = paid / staked
+
+    # 비율 추정량의 분산 (델타 방법): Var(x - R*y) / (n * E[y]^2)
+    resid = sum(c * (x - rtp * y) ** 2 for c, (x, y, _) in zip(counts, table)) / n
+    ci95 = 1.96 * math.sqrt(resid / n) / (staked / n)
+
+    mean = sum(c * (x - y) for c, (x, y, _) in zip(counts, table)) / n / bet
+    second = sum(c * ((x - y) / bet) ** 2 for c, (x, y, _) in zip(counts, table)) / n
+    stdev = math.sqrt(max(second - mean * mean, 0.0) * n / max(n - 1, 1))
+
+    hit_rate = sum(c for c, (_, _, won) in zip(counts, table) if won) / n
+    return SimResult(game, n, rtp, ci95, stdev, hit_rate, elapsed)
+
+
+def simulate(
+    game: str,
+    multipliers: dict,
+    rounds: int = 1_000_000,
+    bet: int = 100,
+    seed: Optional[int] = None,
+    chunk: int = 1 << 20,
+    stand_on: int = rules.DEALER_STANDS_ON,
+    double_on: Iterable[int] = (),
+) -> SimResult:
+    """한 게임을 rounds 판 시뮬레이션 (지급액의 정수 절삭을 반영하려고 실제 배팅금 bet 을 사용)"""
+    if np is None:
+        raise RuntimeError("시뮬레이터를 사용하려면 numpy 가 필요합니다 (pip install numpy)")
+
+    table = _payout_table(game, bet, multipliers)
+    if game == "slot":
+        sample = _sample_slot
+    elif game == "dice":
+        sample = _sample_dice
+    elif game == "coinflip":
+        sample = _sample_coinflip
+    else:
+        double_on = tuple(double_on)
+        sample = lambda rng, n, verify: _sample_blackjack(rng, n, verify, stand_on, double_on)
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(len(table), dtype=np.int64)
+    start = time.perf_counter()
+    verify = _VERIFY_ROWS
+    remaining = rounds
+    while remaining > 0:
+        n = min(chunk, remaining)
+        counts += np.bincount(sample(rng, n, verify), minlength=len(table))
+        verify = 0
+        remaining -= n
+    elapsed = time.perf_counter() - start
+    return _summarize(game, counts.tolist(), table, bet, elapsed)
+
+
+def preview_change(game: str, current: dict, candidate: dict, rounds: int, bet: int = 100, seed: int = 0) -> tuple[SimResult, SimResult]:
+    """배율 변경 전/후 RTP (같은 시드로 뽑아 두 결과의 차이에 잡음이 덜 섞이게 함)"""
+    return (
+        simulate(game, current, rounds, bet=bet, seed=seed),
+        simulate(game, candidate, rounds, bet=bet, seed=seed),
+    )
+
+
+# ========================
+# CLI
+# ========================
+
+def _load_multipliers(guild_id: int = 0) -> dict:
+    """봇과 같은 설정의 저장소에서 현재 배율을 읽는다 (guild_id 가 0 이면 기존 데이터)"""
+    from config import (
+        DATA_FILE, DEFAULT_MULTIPLIERS, DEFAULT_START_BALANCE, GUILD_DATA_DIR, JOURNAL_FILE,
+        SNAPSHOT_FILE, SNAPSHOT_FORMAT, SQLITE_FILE, STORAGE_BACKEND,
+    )
+    from storage import JsonBackend, SqliteBackend
+
+    directory = os.path.join(GUILD_DATA_DIR, str(guild_id)) if guild_id else ""
+    if STORAGE_BACKEND == "sqlite":
+        backend = SqliteBackend(os.path.join(directory, SQLITE_FILE), DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS)
+    else:
+        backend = JsonBackend(
+            os.path.join(directory, SNAPSHOT_FILE), os.path.join(directory, JOURNAL_FILE),
+            DEFAULT_START_BALANCE, DEFAULT_MULTIPLIERS,
+            snapshot_format=SNAPSHOT_FORMAT, legacy_path=os.path.join(directory, DATA_FILE),
+        )
+    backend.load()
+    return backend.get_multipliers()
+
+
+def _apply_override(multipliers: dict, spec: str) -> None:
+    """"slot.jackpot=12" 형식의 배율 덮어쓰기"""
+    try:
+        key, value = spec.split("=", 1)
+        game, kind = key.split(".", 1)
+        if kind not in multipliers[game]:
+            raise KeyError(kind)
+        multipliers[game][kind] = float(value)
+    except (KeyError, ValueError):
+        raise SystemExit(f"❌ 잘못된 배율 지정: {spec} (예: slot.jackpot=12)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="게임별 RTP 몬테카를로 시뮬레이션")
+    parser.add_argument("--game", choices=GAMES + ("all",), default="all")
+    parser.add_argument("--rounds", type=int, default=10_000_000, help="게임당 시뮬레이션 횟수")
+    parser.add_argument("--bet", type=int, default=100, help="한 판 배팅금 (지급액 절삭 반영)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--set", action="append", default=[], metavar="GAME.KIND=VALUE", help="배율 덮어쓰기 (여러 번 가능)")
+    parser.add_argument("--defaults", action="store_true", help="저장된 배율 대신 config.py 기본 배율 사용")
+    parser.add_argument("--guild", type=int, default=0, help="이 서버 ID 에 저장된 배율 사용 (기본: 기존 데이터)")
+    parser.add_argument("--stand-on", type=int, default=rules.DEALER_STANDS_ON, help="블랙잭 플레이어 스탠드 기준")
+    parser.add_argument("--double-on", default="", help="블랙잭 더블할 첫 두 장 합계 (예: 10,11)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ numpy 가 설치되어 있지 않습니다 (pip install numpy)")
+        sys.exit(1)
+
+    if args.defaults:
+        from config import DEFAULT_MULTIPLIERS
+        multipliers = json.loads(json.dumps(DEFAULT_MULTIPLIERS))
+    else:
+        multipliers = _load_multipliers(args.guild)
+    for spec in args.set:
+        _apply_override(multipliers, spec)
+    double_on = [int(v) for v in args.double_on.split(",") if v.strip()]
+
+    games = GAMES if args.game == "all" else (args.game,)
+    results = [
+        simulate(
+            game, multipliers, args.rounds, bet=args.bet, seed=args.seed,
+            stand_on=args.stand_on, double_on=double_on,
+        )
+        for game in games
+    ]
+
+    if args.json:
+        print(json.dumps({"multipliers": multipliers, "results": [r.to_dict() for r in results]}, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'게임':<8} {'RTP':>9} {'95% CI':>9} {'표준편차':>8} {'승률':>7} {'판/초':>13}")
+    for r in results:
+        print(
+            f"{GAME_NAMES[r.game]:<8} {r.rtp * 100:8.3f}% {r.ci95 * 100:8.3f}% "
+            f"{r.stdev:8.3f} {r.hit_rate * 100:6.2f}% {r.rounds_per_sec:13,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
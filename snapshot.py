@@ -0,0 +1,337 @@
+"""이진 스냅샷 형식 (economy_data.bin)
+
+    헤더    magic "ECOSNAP1", 버전 u16, 예약 u16, 유저 수 n u64, journal_seq u64, 메타 길이 u32
+    메타    JSON (배율 설정, 열린 에스크로 장부)
+    인덱스  user_id u64 × n (오름차순) | 잔액 i64 × n | 레코드 시작 위치 u64 × (n + 1)
+    레코드  통계 u32 × 8, name_ts i64, 이름 길이 u16 (+1, 0 이면 이름 없음), 이름 UTF-8
+
+정수는 모두 little-endian. 시작 시에는 헤더와 인덱스 배열만 읽고,
+레코드는 mmap 에서 처음 접근할 때 UserRecord 로 디코딩한다.
+잔액은 인덱스에 있으므로 순위표는 레코드를 디코딩하지 않고 만들 수 있다.
+"""
+import array
+import bisect
+import json
+import mmap
+import struct
+import sys
+import threading
+from typing import Iterator, Optional
+
+from records import STAT_GAMES, UserRecord
+
+MAGIC = b"ECOSNAP1"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sHHQQI")
+_RECORD = struct.Struct(f"<{2 * len(STAT_GAMES)}IqH")
+
+
+def is_binary(path: str) -> bool:
+    """파일이 이진 스냅샷인지 (앞 8바이트로 판별)"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except FileNotFoundError:
+        return False
+
+
+def _read_array(typecode: str, buf, offset: int, count: int) -> array.array:
+    values = array.array(typecode)
+    values.frombytes(buf[offset:offset + count * values.itemsize])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _write_array(values: array.array) -> bytes:
+    if sys.byteorder != "little":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_record(record: UserRecord) -> bytes:
+    stats = []
+    for game in STAT_GAMES:
+        stats.append(record.played(game))
+        stats.append(record.won(game))
+    if record.name is None:
+        return _RECORD.pack(*stats, 0, 0)
+    name = record.name.encode("utf-8")[:0xFFFE]
+    return _RECORD.pack(*stats, record.name_ts, len(name) + 1) + name
+
+
+def decode_record(buf, offset: int, balance: int) -> UserRecord:
+    *stats, name_ts, name_len = _RECORD.unpack_from(buf, offset)
+    record = UserRecord(balance)
+    for i, game in enumerate(STAT_GAMES):
+        record.set_stats(game, stats[2 * i], stats[2 * i + 1])
+    if name_len:
+        start = offset + _RECORD.size
+        record.name = bytes(buf[start:start + name_len - 1]).decode("utf-8", "replace")
+        record.name_ts = name_ts
+    return record
+
+
+class BinarySnapshot:
+    """읽기 전용 스냅샷 (파일 mmap 또는 메모리의 bytes)
+
+    다른 스레드에서 전체를 순회하는 쪽은 acquire() / release() 로 감싼다.
+    그동안 close() 하면 매핑은 마지막 순회가 끝날 때 닫힌다.
+    """
+
+    def __init__(self, buf, source: Optional[mmap.mmap] = None):
+        magic, version, _, count, journal_seq, meta_len = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("이진 스냅샷 파일이 아닙니다")
+        if version != VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 버전: {version}")
+        self.buf = buf
+        self.source = source
+        self.count = count
+        self.journal_seq = journal_seq
+        offset = _HEADER.size
+        self.meta = json.loads(bytes(buf[offset:offset + meta_len]).decode("utf-8"))
+        offset += meta_len
+        self.ids = _read_array("Q", buf, offset, count)
+        offset += count * 8
+        self.balances = _read_array("q", buf, offset, count)
+        offset += count * 8
+        self.offsets = _read_array("Q", buf, offset, count + 1)
+        self.records_start = offset + (count + 1) * 8
+        self._readers = 0
+        self._closing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, path: str) -> "BinarySnapshot":
+        with open(path, "rb") as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(source, source)
+        except Exception:
+            source.close()
+            raise
+
+    @property
+    def multipliers(self) -> dict:
+        return self.meta.get("multipliers", {})
+
+    @property
+    def escrows(self) -> dict:
+        return self.meta.get("escrows", {})
+
+    def find(self, user_id: int) -> int:
+        """user_id 의 위치 (없으면 -1)"""
+        pos = bisect.bisect_left(self.ids, user_id)
+        if pos < self.count and self.ids[pos] == user_id:
+            return pos
+        return -1
+
+    def record(self, pos: int) -> UserRecord:
+        return decode_record(self.buf, self.records_start + self.offsets[pos], self.balances[pos])
+
+    def raw(self, start: int, end: int) -> bytes:
+        """start..end 위치 레코드들의 원본 바이트 (다시 인코딩하지 않고 복사할 때)"""
+        return self.buf[self.records_start + self.offsets[start]:self.records_start + self.offsets[end]]
+
+    def acquire(self) -> bool:
+        """순회를 시작 (이미 닫히는 중이면 False)"""
+        with self._lock:
+            if self._closing:
+                return False
+            self._readers += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._readers -= 1
+            if not self._closing or self._readers:
+                return
+        self._close_source()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closing = True
+            if self._readers:
+                return
+        self._close_source()
+
+    def _close_source(self) -> None:
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+
+class UserTable:
+    """user_id → UserRecord 매핑 (dict 와 같은 방식으로 사용)
+
+    스냅샷(base)에 있는 유저는 처음 접근할 때 디코딩해 loaded 에 올린다.
+    loaded 에 있는 레코드가 항상 우선하며, 스냅샷 저장 시에도 loaded 만 다시 인코딩하고
+    나머지는 이전 스냅샷의 바이트를 그대로 복사한다.
+    조회 / 변경 / base 교체는 루프 스레드에서만 한다. items() / balances() 는 executor 에서도
+    돌 수 있어서, 순회하는 동안 base 를 붙잡아 교체되더라도 이전 매핑이 닫히지 않게 한다.
+    스냅샷 저장은 freeze() 로 그 시점의 loaded 를 고정해 executor 에서 읽고, thaw() 전까지
+    고정된 레코드를 바꿀 때는 writable() 이 복사본으로 바꿔 끼운다 (copy-on-write).
+    """
+
+    def __init__(self, base: Optional[BinarySnapshot] = None):
+        self.base = base
+        self.loaded: dict[int, UserRecord] = {}
+        self._new = 0  # base 에 없는 loaded 유저 수
+        self._frozen: Optional[dict[int, UserRecord]] = None
+        self.decoded = 0
+        self.copied = 0
+
+    def __len__(self) -> int:
+        return (self.base.count if self.base is not None else 0) + self._new
+
+    def __contains__(self, user_id: int) -> bool:
+        return self.get(user_id) is not None
+
+    def get(self, user_id: int) -> Optional[UserRecord]:
+        record = self.loaded.get(user_id)
+        if record is not None or self.base is None:
+            return record
+        pos = self.base.find(user_id)
+        if pos < 0:
+            return None
+        record = self.base.record(pos)
+        self.loaded[user_id] = record
+        self.decoded += 1
+        return record
+
+    def writable(self, user_id: int) -> Optional[UserRecord]:
+        """바꿀 유저의 레코드 (고정된 스냅샷이 들고 있는 레코드면 복사본으로 바꿔 끼운다)"""
+        record = self.get(user_id)
+        if record is not None and self._frozen is not None and self._frozen.get(user_id) is record:
+            record = self.loaded[user_id] = record.copy()
+            self.copied += 1
+        return record
+
+    def __setitem__(self, user_id: int, record: UserRecord) -> None:
+        if user_id not in self.loaded and self._is_new(user_id):
+            self._new += 1
+        self.loaded[user_id] = record
+
+    def _is_new(self, user_id: int) -> bool:
+        return self.base is None or self.base.find(user_id) < 0
+
+    def _acquire_base(self) -> Optional[BinarySnapshot]:
+        # 읽는 사이 교체되어 닫히는 중인 base 는 건너뛰고 새 base 를 잡는다
+        while True:
+            base = self.base
+            if base is None or base.acquire():
+                return base
+
+    def items(self) -> Iterator[tuple[int, UserRecord]]:
+        """전체 유저 순회 (base 에만 있는 유저는 디코딩만 하고 올려두지 않음, 스크립트 / 내보내기용)"""
+        yield from list(self.loaded.items())
+        base = self._acquire_base()
+        if base is None:
+            return
+        try:
+            for pos, user_id in enumerate(base.ids):
+                if user_id not in self.loaded:
+                    yield user_id, base.record(pos)
+        finally:
+            base.release()
+
+    def balances(self) -> Iterator[tuple[int, int]]:
+        """전체 (user_id, 잔액) (레코드 디코딩 없음)"""
+        yield from ((user_id, record.balance) for user_id, record in list(self.loaded.items()))
+        # ids / balances 는 매핑에서 복사해 둔 배열이라 교체되어 닫힌 뒤에도 읽을 수 있다
+        base = self.base
+        if base is not None:
+            loaded = self.loaded
+            for user_id, balance in zip(base.ids, base.balances):
+                if user_id not in loaded:
+                    yield user_id, balance
+
+    def freeze(self) -> tuple[Optional[BinarySnapshot], dict[int, UserRecord]]:
+        """지금 시점의 (base, loaded) (루프 스레드에서 호출, 돌려준 dict 와 레코드는 thaw() 전까지 바뀌지 않음)"""
+        self._frozen = dict(self.loaded)
+        return self.base, self._frozen
+
+    def thaw(self) -> None:
+        self._frozen = None
+
+    def replace_base(self, base: Optional[BinarySnapshot]) -> None:
+        """새 스냅샷으로 교체 (loaded 는 유지, 이전 매핑은 순회가 모두 끝나면 닫힘)"""
+        old, self.base = self.base, base
+        self._new = sum(1 for user_id in self.loaded if self._is_new(user_id))
+        if old is not None and old is not base:
+            old.close()
+
+    def stats(self) -> dict:
+        return {
+            "snapshot_users": self.base.count if self.base is not None else 0,
+            "loaded": len(self.loaded),
+            "decoded": self.decoded,
+            "copied": self.copied,
+        }
+
+
+def frozen_items(base: Optional[BinarySnapshot], loaded: dict[int, UserRecord]) -> Iterator[tuple[int, UserRecord]]:
+    """UserTable.freeze() 결과의 전체 유저 순회 (base 에만 있는 유저는 디코딩만 함)"""
+    yield from loaded.items()
+    if base is None:
+        return
+    if not base.acquire():
+        raise RuntimeError("고정한 스냅샷이 이미 닫혔습니다")
+    try:
+        for pos, user_id in enumerate(base.ids):
+            if user_id not in loaded:
+                yield user_id, base.record(pos)
+    finally:
+        base.release()
+
+
+def encode_snapshot(base: Optional[BinarySnapshot], touched: list[tuple[int, UserRecord]],
+                    multipliers: dict, journal_seq: int, escrows: Optional[dict] = None) -> bytes:
+    """이전 스냅샷 + 바뀐 레코드로 새 스냅샷을 만든다
+
+    바뀌지 않은 유저는 연속 구간 단위로 이전 스냅샷의 바이트를 복사한다.
+    """
+    touched = sorted(touched, key=lambda item: item[0])
+    ids = array.array("Q")
+    balances = array.array("q")
+    offsets = array.array("Q")
+    bodies: list[bytes] = []
+    size = 0
+
+    def copy_run(start: int, end: int) -> None:
+        nonlocal size
+        if start >= end:
+            return
+        ids.extend(base.ids[start:end])
+        balances.extend(base.balances[start:end])
+        shift = size - base.offsets[start]
+        offsets.extend(offset + shift for offset in base.offsets[start:end])
+        body = base.raw(start, end)
+        bodies.append(body)
+        size += len(body)
+
+    pos = 0
+    total = base.count if base is not None else 0
+    for user_id, record in touched:
+        if base is not None:
+            found = bisect.bisect_left(base.ids, user_id, pos)
+            copy_run(pos, found)
+            pos = found + 1 if found < total and base.ids[found] == user_id else found
+        body = encode_record(record)
+        ids.append(user_id)
+        balances.append(record.balance)
+        offsets.append(size)
+        bodies.append(body)
+        size += len(body)
+    if base is not None:
+        copy_run(pos, total)
+    offsets.append(size)
+
+    meta = json.dumps(
+        {"multipliers": multipliers, "escrows": escrows or {}}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    header = _HEADER.pack(MAGIC, VERSION, 0, len(ids), journal_seq, len(meta))
+    return b"".join([header, meta, _write_array(ids), _write_array(balances), _write_array(offsets), *bodies])
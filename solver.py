@@ -0,0 +1,154 @@
+"""블랙잭 정답표 (동적 계획법으로 계산한 정확한 기대값)
+
+카드는 슈의 카드 비율에서 복원 추출한다고 보고(무한 덱 근사),
+딜러 최종 합계 분포와 (플레이어 합계, 소프트 에이스, 딜러 업카드) 별
+스탠드 / 히트 / 더블의 기대 손익을 한 번에 계산해둔다.
+판정과 지급액은 게임 화면과 같은 rules.py 의 함수를 사용한다.
+
+기대 손익은 처음 배팅금 1 기준 (더블은 배팅금 2 로 계산한 손익을 처음 배팅금으로 나눈 값).
+"""
+from collections import Counter
+from functools import lru_cache
+
+import rules
+from shoe import DECK_VALUES, Hand
+
+STAND = "stand"
+HIT = "hit"
+DOUBLE = "double"
+
+UPCARDS = tuple(range(2, 12))
+
+# 카드 값별 확률 (A=11, J/Q/K=10)
+CARD_PROBS = tuple((card, count / len(DECK_VALUES)) for card, count in sorted(Counter(DECK_VALUES).items()))
+
+# 딜러 최종 합계 (버스트는 22 로 모음)
+DEALER_BUST = 22
+DEALER_TOTALS = tuple(range(rules.DEALER_STANDS_ON, 22)) + (DEALER_BUST,)
+
+# 플레이어가 결정을 내릴 수 있는 합계 (2+2 부터)
+PLAYER_TOTALS = tuple(range(4, 22))
+
+
+def add_card(total: int, soft_aces: int, card: int) -> tuple[int, int]:
+    """Hand.add 와 같은 규칙으로 (합계, 소프트 에이스 수) 갱신"""
+    hand = Hand()
+    hand.total = total
+    hand.soft_aces = soft_aces
+    hand.add(card)
+    return hand.total, hand.soft_aces
+
+
+@lru_cache(maxsize=None)
+def _dealer_from(total: int, soft_aces: int) -> tuple[float, ...]:
+    """현재 딜러 패에서 시작한 최종 합계 분포 (DEALER_TOTALS 순서)"""
+    if total > 21:
+        return tuple(1.0 if t == DEALER_BUST else 0.0 for t in DEALER_TOTALS)
+    if total >= rules.DEALER_STANDS_ON:
+        return tuple(1.0 if t == total else 0.0 for t in DEALER_TOTALS)
+    dist = [0.0] * len(DEALER_TOTALS)
+    for card, p in CARD_PROBS:
+        for i, q in enumerate(_dealer_from(*add_card(total, soft_aces, card))):
+            dist[i] += p * q
+    return tuple(dist)
+
+
+@lru_cache(maxsize=None)
+def dealer_distribution(upcard: int) -> dict[int, float]:
+    """업카드별 딜러 최종 합계 확률 (배율과 무관하므로 한 번만 계산)"""
+    total, soft_aces = add_card(0, 0, upcard)
+    return dict(zip(DEALER_TOTALS, _dealer_from(total, soft_aces)))
+
+
+class BlackjackSolver:
+    """현재 배율 기준의 블랙잭 기대값 표
+
+    생성 시 모든 (합계, 소프트 여부, 업카드) 조합을 미리 계산하므로
+    이후 조회(evs / best)는 dict 조회 한 번이다.
+    """
+
+    def __init__(self, multipliers: dict, bet: int = 100):
+        self.multipliers = multipliers
+        self.bet = bet
+        self._stand: dict[tuple[int, int, bool, int], float] = {}
+        self._hit: dict[tuple[int, int, int], float] = {}
+        self.table: dict[tuple[int, int, int], dict[str, float]] = {}
+        self.natural: dict[int, float] = {}
+
+        for upcard in UPCARDS:
+            for total in PLAYER_TOTALS:
+                for soft in (0, 1):
+                    if soft and total < 12:
+                        continue
+                    self.table[(total, soft, upcard)] = {
+                        STAND: self.stand_ev(total, upcard),
+                        HIT: self.hit_ev(total, soft, upcard),
+                        DOUBLE: self.double_ev(total, soft, upcard),
+                    }
+            self.natural[upcard] = self.stand_ev(21, upcard, natural=True)
+
+    def _payout(self, outcome: str, stake: int) -> float:
+        return rules.blackjack_payout(outcome, stake, self.multipliers)[0] / self.bet
+
+    def stand_ev(self, total: int, upcard: int, natural: bool = False, stake: int = 0) -> float:
+        stake = stake or self.bet
+        key = (total, upcard, natural, stake)
+        ev = self._stand.get(key)
+        if ev is None:
+            ev = sum(
+                p * self._payout(rules.blackjack_outcome(total, dealer_total, natural), stake)
+                for dealer_total, p in dealer_distribution(upcard).items()
+            )
+            self._stand[key] = ev
+        return ev
+
+    def hit_ev(self, total: int, soft: int, upcard: int) -> float:
+        """한 장 받은 뒤 최선으로 진행했을 때의 기대 손익 (더블 불가)"""
+        key = (total, soft, upcard)
+        ev = self._hit.get(key)
+        if ev is None:
+            ev = 0.0
+            for card, p in CARD_PROBS:
+                new_total, new_soft = add_card(total, soft, card)
+                if new_total > 21:
+                    ev += p * self._payout(rules.BJ_BUST, self.bet)
+                else:
+                    ev += p * max(self.stand_ev(new_total, upcard), self.hit_ev(new_total, new_soft, upcard))
+            self._hit[key] = ev
+        return ev
+
+    def double_ev(self, total: int, soft: int, upcard: int) -> float:
+        """배팅금을 두 배로 하고 한 장만 받은 뒤 스탠드"""
+        stake = self.bet * 2
+        ev = 0.0
+        for card, p in CARD_PROBS:
+            new_total, _ = add_card(total, soft, card)
+            if new_total > 21:
+                ev += p * self._payout(rules.BJ_BUST, stake)
+            else:
+                ev += p * self.stand_ev(new_total, upcard, stake=stake)
+        return ev
+
+    def evs(self, hand: Hand, upcard: int, can_double: bool = True) -> dict[str, float]:
+        """현재 패에서 가능한 행동별 기대 손익"""
+        row = self.table[(hand.total, min(hand.soft_aces, 1), upcard)]
+        evs = {STAND: self.natural[upcard] if hand.is_blackjack else row[STAND], HIT: row[HIT]}
+        if can_double and len(hand) == 2:
+            evs[DOUBLE] = row[DOUBLE]
+        return evs
+
+    def best(self, hand: Hand, upcard: int, can_double: bool = True) -> tuple[str, float]:
+        """기대 손익이 가장 큰 행동"""
+        evs = self.evs(hand, upcard, can_double)
+        action = max(evs, key=evs.get)
+        return action, evs[action]
+
+    def expected_value(self) -> float:
+        """최적 전략으로 플레이할 때 한 판의 기대 손익 (처음 배팅금 1 기준)"""
+        ev = 0.0
+        for first, p1 in CARD_PROBS:
+            for second, p2 in CARD_PROBS:
+                hand = Hand([first, second])
+                for upcard, p3 in CARD_PROBS:
+                    ev += p1 * p2 * p3 * self.best(hand, upcard)[1]
+        return ev
@@ -0,0 +1,947 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Optional
+
+from journal import Journal
+from leaderboard import BalanceIndex
+from persistence import BackgroundLoop, WriteBehindStore
+from records import UserRecord, new_stats
+from snapshot import BinarySnapshot, UserTable, encode_snapshot, frozen_items, is_binary
+
+
+class EconomyBackend:
+    """경제 데이터 저장소 인터페이스
+
+    잔액/통계 변경은 모두 아래의 연산을 통해서만 이루어진다.
+    반환되는 유저 데이터는 {"balance": int, "stats": {게임: {"played", "won"}}} 형태.
+
+    배팅금 차감 / 정산에 에스크로 ID 를 넘기면 저장소가 열린 에스크로 장부를 잔액과 같은
+    기록(저널 / 트랜잭션)에 남긴다. 같은 ID 의 차감이나 정산을 다시 보내도 한 번만 반영되므로
+    응답을 받지 못한 요청을 다시 보낼 수 있고, 재시작 후에는 장부로 남은 배팅금을 찾는다.
+    """
+
+    def __init__(self, default_balance: int, default_multipliers: dict):
+        self.default_balance = default_balance
+        self.default_multipliers = default_multipliers
+
+    def default_user(self) -> dict:
+        return {"balance": self.default_balance, "stats": new_stats()}
+
+    # ---------- 수명 주기 ----------
+
+    def load(self) -> None:
+        """시작 시 한 번 호출 (이벤트 루프 밖이나 executor 스레드에서, start() 전에)"""
+
+    async def start(self) -> None:
+        """백그라운드 작업 시작 (setup_hook 에서 호출)"""
+
+    async def close(self) -> None:
+        """남은 변경 사항을 저장하고 종료"""
+
+    # ---------- 조회 ----------
+
+    async def get_user(self, user_id: int) -> dict:
+        raise NotImplementedError
+
+    def get_multipliers(self) -> dict:
+        raise NotImplementedError
+
+    async def top_balances(self, limit: int) -> list[tuple[int, int]]:
+        """잔액 상위 limit 명의 (user_id, balance)"""
+        raise NotImplementedError
+
+    async def rank(self, user_id: int) -> tuple[Optional[int], int]:
+        """(순위, 전체 유저 수). 기록이 없는 유저는 순위 None"""
+        raise NotImplementedError
+
+    def iter_users(self) -> Iterator[tuple[int, dict]]:
+        """전체 유저 순회 (마이그레이션/관리용)"""
+        raise NotImplementedError
+
+    async def get_names(self, user_ids: list[int]) -> dict[int, tuple[str, int]]:
+        """저장된 유저 이름 {user_id: (이름, 조회 시각)}"""
+        return {}
+
+    async def set_names(self, names: dict[int, tuple[str, int]]) -> None:
+        """조회한 유저 이름 저장 (기록이 있는 유저만)"""
+
+    # ---------- 변경 ----------
+
+    async def record_game_result(self, user_id: int, game: str, delta: int,
+                                 won: int = 0, played: int = 1, escrow: Optional[str] = None) -> dict:
+        """게임 결과를 잔액과 통계에 반영 (won / played 에 판 수를 넘기면 여러 판을 한 번에)
+
+        escrow 를 넘기면 그 에스크로를 장부에서 닫는다. 이미 닫힌 에스크로면 아무것도 바꾸지 않고
+        현재 유저 데이터를 반환한다.
+        """
+        raise NotImplementedError
+
+    async def debit_stake(self, user_id: int, game: str, amount: int,
+                          escrow: Optional[str] = None, seq: int = 0, owner: str = "") -> Optional[int]:
+        """잔액이 충분할 때만 배팅금을 차감하고 새 잔액을 반환 (부족하면 None)
+
+        escrow 를 넘기면 장부의 에스크로에 배팅금을 더한다. seq 는 그 에스크로의 몇 번째 차감인지
+        (처음 0, 더블 등 추가 배팅 1, 2, ...) 이며 이미 반영된 차감이면 현재 잔액만 반환한다.
+        owner 는 에스크로를 연 봇 프로세스로, 처음 차감할 때 장부에 함께 남는다.
+        """
+        raise NotImplementedError
+
+    async def open_escrows(self) -> list[tuple[str, int, str, int, int, str]]:
+        """장부에 열려 있는 에스크로 [(에스크로 ID, user_id, 게임, 배팅금, 차감 횟수, 연 프로세스)]"""
+        raise NotImplementedError
+
+    async def adjust_balance(self, user_id: int, delta: int) -> dict:
+        """잔액 지급/차감 (0 미만으로 내려가지 않음)"""
+        raise NotImplementedError
+
+    async def reset_user(self, user_id: int) -> dict:
+        """잔액과 통계를 초기값으로 리셋"""
+        raise NotImplementedError
+
+    async def bulk_update(self, user_ids: Optional[list[int]], delta: int = 0, reset: bool = False,
+                          dry_run: bool = False) -> list[tuple[int, int, int]]:
+        """여러 유저에게 한 번에 지급/차감 (reset 이면 잔액과 통계를 초기값으로)
+
+        user_ids 가 None 이면 기록이 있는 전체 유저. 전부 반영되거나 하나도 반영되지 않으며,
+        dry_run 이면 저장하지 않고 결과만 계산한다. [(user_id, 이전 잔액, 새 잔액)] 을 반환
+        """
+        raise NotImplementedError
+
+    async def set_multiplier(self, game: str, kind: str, value: float) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+# ========================
+# JSON 파일 저장소
+# ========================
+
+class JsonBackend(EconomyBackend):
+    """메모리 레코드 + 트랜잭션 저널 + 스냅샷 저장소
+
+    - 유저는 int ID → UserRecord (__slots__) 로 보관
+    - 한 번도 잔액이 바뀌지 않은 유저는 레코드를 만들지 않고 기본값으로 응답
+    - snapshot_format="binary" 이면 스냅샷을 이진 형식(snapshot.py)으로 저장하고,
+      시작 시 mmap 으로 열어 유저 레코드를 처음 접근할 때 디코딩한다
+    - 스냅샷 파일이 없으면 legacy_path 의 기존 JSON 을 불러온다 (다음 저장부터 새 형식)
+    - 열린 에스크로 장부는 메모리 dict 로 두고, 차감 / 정산 저널 기록과 스냅샷에 함께 남긴다
+    """
+
+    def __init__(self, path: str, journal_path: str, default_balance: int, default_multipliers: dict,
+                 save_interval: float = 300.0, save_max_dirty: int = 10000, fsync_interval: float = 0.2,
+                 snapshot_format: str = "json", legacy_path: Optional[str] = None):
+        super().__init__(default_balance, default_multipliers)
+        self.path = path
+        self.legacy_path = legacy_path
+        self.snapshot_format = snapshot_format
+        self.users = UserTable()
+        self.multipliers = copy.deepcopy(default_multipliers)
+        # 에스크로 ID → [user_id, 게임, 배팅금, 차감 횟수, 연 프로세스]
+        self.escrows: dict[str, list] = {}
+        self.journal_seq = 0
+        self.journal = Journal(journal_path, fsync_interval=fsync_interval)
+        self.store = WriteBehindStore(
+            path,
+            self._snapshot_state,
+            interval=save_interval,
+            max_dirty=save_max_dirty,
+            encoder=self._encode_binary if snapshot_format == "binary" else self._encode_snapshot,
+            before_flush=self._before_snapshot,
+            after_flush=self._after_snapshot,
+            # 스냅샷에 들어간 경계 이후의 값도 저널에 먼저 남아 있도록
+            before_commit=self.journal.sync,
+            before_replace=self._install_encoded if snapshot_format == "binary" else None,
+            release_state=self._release_capture,
+        )
+        # executor 에서 방금 인코딩한 이진 스냅샷 (파일을 교체하기 전에 루프 스레드에서 base 로 끼움)
+        self._encoded: Optional[BinarySnapshot] = None
+        self.replayed = 0
+        # 잔액 순위 인덱스 (처음 필요할 때 / 시작 후 executor 에서 만들고, 이후 잔액이 바뀔 때마다 갱신)
+        self.index = BalanceIndex()
+        self._index_ready = False
+        self._index_task: Optional[asyncio.Future] = None
+        self._index_pending: dict[int, int] = {}
+        self.load_ms = 0.0
+
+    def load(self) -> None:
+        start = time.perf_counter()
+        if is_binary(self.path):
+            # 헤더와 인덱스 배열만 읽고 레코드는 필요할 때 디코딩
+            base = BinarySnapshot.open(self.path)
+            self.users = UserTable(base)
+            if "multipliers" in base.meta:
+                self.multipliers = base.multipliers
+            self.escrows = base.escrows
+            self.journal_seq = base.journal_seq
+        else:
+            source = self.path if os.path.exists(self.path) else self.legacy_path
+            if source and os.path.exists(source):
+                self._load_json(source)
+                if source != self.path:
+                    print(f"📂 기존 JSON 데이터({source})를 불러왔습니다. 다음 저장부터 {self.path} 에 저장합니다")
+        for entry in self.escrows.values():
+            # 연 프로세스가 기록되기 전의 장부 (어느 프로세스든 정리할 수 있음)
+            if len(entry) < 5:
+                entry.append("")
+        # 마지막 스냅샷 이후의 저널 재적용
+        self.replayed = self.journal.replay(self._apply_entry, after_seq=self.journal_seq)
+        if self.replayed:
+            print(f"📜 저널 기록 {self.replayed}건 복구")
+        self.load_ms = (time.perf_counter() - start) * 1000
+
+    def _load_json(self, path: str) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.users = UserTable()
+        for uid, u in data.get("users", {}).items():
+            self.users[int(uid)] = UserRecord.from_dict(u)
+        # 배율 설정이 없으면 기본값 사용
+        if "multipliers" in data:
+            self.multipliers = data["multipliers"]
+        self.escrows = data.get("escrows", {})
+        self.journal_seq = data.get("journal_seq", 0)
+
+    async def start(self) -> None:
+        await self.journal.start()
+        await self.store.start()
+        # 순위 인덱스는 executor 에서 만들고 그동안의 잔액 변경은 따로 모아뒀다가 반영
+        if not self._index_ready and self._index_task is None:
+            self._index_task = asyncio.ensure_future(self._build_index())
+
+    async def close(self) -> None:
+        if self._index_task is not None and not self._index_task.done():
+            await self._index_task
+        # 남은 변경 사항을 스냅샷으로 압축하고 저널을 닫음
+        try:
+            await self.store.close()
+        finally:
+            await self.journal.close()
+
+    # ---------- 순위 인덱스 ----------
+
+    async def _build_index(self) -> None:
+        index = BalanceIndex()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, index.rebuild, self.users.balances())
+        except Exception as e:
+            print(f"❌ 순위 인덱스 생성 실패: {e}")
+            self._index_task = None
+            return
+        self._install_index(index)
+
+    def _install_index(self, index: BalanceIndex) -> None:
+        for user_id, balance in self._index_pending.items():
+            index.update(user_id, balance)
+        self._index_pending.clear()
+        self.index = index
+        self._index_ready = True
+
+    async def _wait_index(self) -> None:
+        if self._index_ready:
+            return
+        if self._index_task is not None:
+            await self._index_task
+        if not self._index_ready:
+            # 루프 밖(스크립트)이거나 백그라운드 생성이 실패한 경우 바로 만든다
+            index = BalanceIndex()
+            index.rebuild(self.users.balances())
+            self._install_index(index)
+
+    def _index_update(self, user_id: int, balance: int) -> None:
+        if self._index_ready:
+            self.index.update(user_id, balance)
+        else:
+            self._index_pending[user_id] = balance
+
+    # ---------- 스냅샷 ----------
+
+    def _capture(self, boundary: int) -> tuple:
+        # 루프 스레드에서 유저 테이블을 고정(copy-on-write)하고 장부 / 배율을 복사해 두면
+        # executor 는 이 시점의 값만 읽는다 (그 뒤의 변경은 복사된 레코드에 반영)
+        escrows = {escrow_id: list(entry) for escrow_id, entry in self.escrows.items()}
+        base, loaded = self.users.freeze()
+        return boundary, base, loaded, copy.deepcopy(self.multipliers), escrows
+
+    async def _before_snapshot(self) -> int:
+        # 현재 저널 파일을 봉인하고, 그 시점까지의 seq 를 스냅샷에 기록
+        boundary = await self.journal.rotate()
+        self.journal_seq = boundary
+        return boundary
+
+    def _snapshot_state(self) -> tuple:
+        return self._capture(self.journal_seq)
+
+    def _release_capture(self) -> None:
+        self.users.thaw()
+
+    def _after_snapshot(self, boundary: int) -> None:
+        self.journal.drop_sealed(boundary)
+        if self.snapshot_format == "binary":
+            # 저장 중에는 메모리의 새 스냅샷을 읽고 있었으므로 방금 쓴 파일로 다시 매핑
+            self.users.replace_base(BinarySnapshot.open(self.path))
+
+    def _encode_binary(self, state: tuple) -> bytes:
+        """이진 스냅샷으로 직렬화 (executor 에서 실행, base 교체는 _install_encoded)"""
+        # 이진 형식은 이번 실행에서 읽거나 바꾼 레코드만 다시 인코딩
+        boundary, base, loaded, multipliers, escrows = state
+        payload = encode_snapshot(base, list(loaded.items()), multipliers, boundary, escrows)
+        self._encoded = BinarySnapshot(payload)
+        return payload
+
+    def _install_encoded(self) -> None:
+        # 파일을 교체하기 전에 이전 mmap 을 닫아야 하므로(Windows) 새 스냅샷 바이트를 base 로 바꿔 끼운다.
+        # 루프 스레드에서만 base 를 바꾸고, 이전 매핑은 executor 의 순회가 끝나면 닫힌다
+        encoded, self._encoded = self._encoded, None
+        if encoded is not None:
+            self.users.replace_base(encoded)
+
+    @staticmethod
+    def _encode_snapshot(state: tuple) -> bytes:
+        """기존 economy_data.json 형식으로 직렬화 (유저 단위로 조각을 만들어 이어붙임)"""
+        boundary, base, loaded, multipliers, escrows = state
+        parts = []
+        for user_id, record in frozen_items(base, loaded):
+            part = (
+                f'"{user_id}":{{"balance":{record.balance},"stats":{{'
+                f'"slot":{{"played":{record.slot_played},"won":{record.slot_won}}},'
+                f'"dice":{{"played":{record.dice_played},"won":{record.dice_won}}},'
+                f'"blackjack":{{"played":{record.blackjack_played},"won":{record.blackjack_won}}},'
+                f'"bet":{{"played":{record.bet_played},"won":{record.bet_won}}}}}'
+            )
+            if record.name is not None:
+                part += f',"name":{json.dumps(record.name, ensure_ascii=False)},"name_ts":{record.name_ts}'
+            parts.append(part + "}")
+        payload = (
+            '{"users":{' + ",".join(parts) + '},'
+            f'"multipliers":{json.dumps(multipliers, ensure_ascii=False, separators=(",", ":"))},'
+            f'"escrows":{json.dumps(escrows, ensure_ascii=False, separators=(",", ":"))},'
+            f'"journal_seq":{boundary}}}'
+        )
+        return payload.encode("utf-8")
+
+    # ---------- 내부 ----------
+
+    def _apply_entry(self, entry: dict) -> None:
+        """저널 기록 하나를 메모리 데이터에 다시 적용 (절대값이므로 중복 적용해도 안전)"""
+        op = entry.get("op")
+        if op == "mult":
+            self.multipliers.setdefault(entry["g"], {})[entry["k"]] = entry["v"]
+            return
+        if op == "bulk":
+            kind = "reset" if entry["r"] else "bal"
+            for user_id, balance in entry["u"]:
+                self._apply_entry({"op": kind, "u": user_id, "b": balance})
+            return
+        user_id = int(entry["u"])
+        record = self._record(user_id)
+        record.balance = entry["b"]
+        self._index_update(user_id, entry["b"])
+        if op == "reset":
+            record.reset(entry["b"])
+        elif "p" in entry:
+            record.set_stats(entry["g"], entry["p"], entry["w"])
+        if "e" in entry:
+            # 에스크로 장부도 절대값 (차감 후의 배팅금 / 차감 횟수, 없으면 닫힘)
+            if "en" in entry:
+                self.escrows[entry["e"]] = [user_id, entry["g"], entry["ea"], entry["en"], entry.get("eo", "")]
+            else:
+                self.escrows.pop(entry["e"], None)
+
+    def _record(self, user_id: int) -> UserRecord:
+        """변경할 유저의 레코드 (없으면 이때 처음 만든다)"""
+        record = self.users.writable(user_id)
+        if record is None:
+            record = UserRecord(self.default_balance)
+            self.users[user_id] = record
+            self._index_update(user_id, self.default_balance)
+        return record
+
+    def _commit(self, entry: dict) -> None:
+        self.journal.append(entry)
+        self.store.mark_dirty()
+
+    # ---------- 조회 ----------
+
+    async def get_user(self, user_id: int) -> dict:
+        record = self.users.get(user_id)
+        if record is None:
+            return self.default_user()
+        return record.to_dict()
+
+    def get_multipliers(self) -> dict:
+        return self.multipliers
+
+    async def top_balances(self, limit: int) -> list[tuple[int, int]]:
+        await self._wait_index()
+        return self.index.top(limit)
+
+    async def rank(self, user_id: int) -> tuple[Optional[int], int]:
+        await self._wait_index()
+        return self.index.rank(user_id), len(self.index)
+
+    def iter_users(self) -> Iterator[tuple[int, dict]]:
+        for user_id, record in self.users.items():
+            yield user_id, record.to_dict()
+
+    async def get_names(self, user_ids: list[int]) -> dict[int, tuple[str, int]]:
+        names = {}
+        for user_id in user_ids:
+            record = self.users.get(user_id)
+            if record is not None and record.name is not None:
+                names[user_id] = (record.name, record.name_ts)
+        return names
+
+    async def set_names(self, names: dict[int, tuple[str, int]]) -> None:
+        # 이름은 캐시 성격이므로 저널 없이 다음 스냅샷에만 포함
+        for user_id, (name, fetched_at) in names.items():
+            record = self.users.writable(user_id)
+            if record is not None:
+                record.name = name
+                record.name_ts = fetched_at
+        self.store.mark_dirty()
+
+    # ---------- 변경 ----------
+
+    async def record_game_result(self, user_id: int, game: str, delta: int,
+                                 won: int = 0, played: int = 1, escrow: Optional[str] = None) -> dict:
+        if escrow is not None and self.escrows.pop(escrow, None) is None:
+            # 이미 정산 / 환불된 에스크로 (다시 보낸 요청)
+            return await self.get_user(user_id)
+        record = self._record(user_id)
+        record.balance += delta
+        record.add_stats(game, int(played), int(won))
+        self._index_update(user_id, record.balance)
+        entry = {
+            "op": "bal", "u": str(user_id), "g": game, "d": delta,
+            "b": record.balance, "p": record.played(game), "w": record.won(game)
+        }
+        if escrow is not None:
+            entry["e"] = escrow
+        self._commit(entry)
+        return record.to_dict()
+
+    async def debit_stake(self, user_id: int, game: str, amount: int,
+                          escrow: Optional[str] = None, seq: int = 0, owner: str = "") -> Optional[int]:
+        record = self.users.get(user_id)
+        balance = record.balance if record is not None else self.default_balance
+        ledger = self.escrows.get(escrow) if escrow is not None else None
+        if ledger is not None and seq < ledger[3]:
+            # 이미 반영된 차감 (다시 보낸 요청)
+            return balance
+        if escrow is not None and ledger is None and seq > 0:
+            # 이미 닫힌 에스크로에 추가 배팅
+            return None
+        if balance < amount:
+            return None
+        record = self._record(user_id)
+        record.balance -= amount
+        self._index_update(user_id, record.balance)
+        entry = {
+            "op": "bal", "u": str(user_id), "g": game, "d": -amount,
+            "b": record.balance, "p": record.played(game), "w": record.won(game)
+        }
+        if escrow is not None:
+            if ledger is None:
+                ledger = self.escrows[escrow] = [user_id, game, 0, 0, owner]
+            ledger[2] += amount
+            ledger[3] = seq + 1
+            entry.update(e=escrow, ea=ledger[2], en=ledger[3])
+            if ledger[4]:
+                entry["eo"] = ledger[4]
+        self._commit(entry)
+        return record.balance
+
+    async def open_escrows(self) -> list[tuple[str, int, str, int, int, str]]:
+        return [(escrow_id, *entry) for escrow_id, entry in self.escrows.items()]
+
+    async def adjust_balance(self, user_id: int, delta: int) -> dict:
+        record = self._record(user_id)
+        old_balance = record.balance
+        record.balance = max(old_balance + delta, 0)
+        self._index_update(user_id, record.balance)
+        self._commit({
+            "op": "bal", "u": str(user_id), "g": "admin",
+            "d": record.balance - old_balance, "b": record.balance
+        })
+        return record.to_dict()
+
+    async def reset_user(self, user_id: int) -> dict:
+        record = self._record(user_id)
+        delta = self.default_balance - record.balance
+        record.reset(self.default_balance)
+        self._index_update(user_id, self.default_balance)
+        self._commit({"op": "reset", "u": str(user_id), "d": delta, "b": self.default_balance})
+        return record.to_dict()
+
+    async def bulk_update(self, user_ids: Optional[list[int]], delta: int = 0, reset: bool = False,
+                          dry_run: bool = False) -> list[tuple[int, int, int]]:
+        if user_ids is None:
+            current = [(int(user_id), balance) for user_id, balance in self.users.balances()]
+        else:
+            current = []
+            for user_id in dict.fromkeys(user_ids):
+                record = self.users.get(user_id)
+                current.append((user_id, record.balance if record is not None else self.default_balance))
+        rows = [
+            (user_id, balance, self.default_balance if reset else max(balance + delta, 0))
+            for user_id, balance in current
+        ]
+        if dry_run or not rows:
+            return rows
+
+        for user_id, _, balance in rows:
+            record = self._record(user_id)
+            if reset:
+                record.reset(balance)
+            else:
+                record.balance = balance
+            self._index_update(user_id, balance)
+        # 저널 한 줄로 기록 (재생 시에도 전부 적용되거나 전부 빠짐)
+        self._commit({"op": "bulk", "r": int(reset), "u": [[str(user_id), balance] for user_id, _, balance in rows]})
+        return rows
+
+    async def set_multiplier(self, game: str, kind: str, value: float) -> None:
+        self.multipliers.setdefault(game, {})[kind] = value
+        self._commit({"op": "mult", "g": game, "k": kind, "v": value})
+
+    def stats(self) -> dict:
+        return {
+            "backend": "json",
+            "format": self.snapshot_format,
+            "users": len(self.users),
+            "escrows": len(self.escrows),
+            "load_ms": round(self.load_ms, 3),
+            "table": self.users.stats(),
+            "store": self.store.stats(),
+            "journal": self.journal.stats(),
+        }
+
+
+# ========================
+# SQLite 저장소
+# ========================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    balance INTEGER NOT NULL,
+    name TEXT,
+    name_ts INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_users_balance ON users(balance);
+CREATE TABLE IF NOT EXISTS stats (
+    user_id INTEGER NOT NULL,
+    game TEXT NOT NULL,
+    played INTEGER NOT NULL DEFAULT 0,
+    won INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, game)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS multipliers (
+    game TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (game, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS escrows (
+    escrow_id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    game TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    debits INTEGER NOT NULL,
+    owner TEXT NOT NULL DEFAULT ''
+) WITHOUT ROWID;
+"""
+
+# 자주 쓰는 쿼리 (sqlite3 의 statement 캐시로 재사용됨)
+_SQL_GET_BALANCE = "SELECT balance FROM users WHERE user_id = ?"
+_SQL_GET_STATS = "SELECT game, played, won FROM stats WHERE user_id = ?"
+_SQL_INSERT_USER = "INSERT OR IGNORE INTO users (user_id, balance) VALUES (?, ?)"
+_SQL_ADD_BALANCE = "UPDATE users SET balance = balance + ? WHERE user_id = ?"
+_SQL_DEBIT = "UPDATE users SET balance = balance - ? WHERE user_id = ? AND balance >= ?"
+_SQL_SET_BALANCE = "UPDATE users SET balance = ? WHERE user_id = ?"
+_SQL_ADD_STATS = """
+INSERT INTO stats (user_id, game, played, won) VALUES (?, ?, ?, ?)
+ON CONFLICT (user_id, game) DO UPDATE SET played = played + excluded.played, won = won + excluded.won
+"""
+_SQL_PUT_STATS = "INSERT OR REPLACE INTO stats (user_id, game, played, won) VALUES (?, ?, ?, ?)"
+_SQL_DELETE_STATS = "DELETE FROM stats WHERE user_id = ?"
+_SQL_GET_NAME = "SELECT name, name_ts FROM users WHERE user_id = ?"
+_SQL_SET_NAME = "UPDATE users SET name = ?, name_ts = ? WHERE user_id = ?"
+_SQL_TOP = "SELECT user_id, balance FROM users ORDER BY balance DESC, user_id LIMIT ?"
+# 순위 = 나보다 앞선 유저 수 + 1 (balance 인덱스 범위 조회)
+_SQL_RANK = "SELECT COUNT(*) FROM users WHERE balance > ? OR (balance = ? AND user_id < ?)"
+_SQL_SET_MULTIPLIER = "INSERT OR REPLACE INTO multipliers (game, kind, value) VALUES (?, ?, ?)"
+_SQL_GET_ESCROW = "SELECT amount, debits, owner FROM escrows WHERE escrow_id = ?"
+_SQL_PUT_ESCROW = (
+    "INSERT OR REPLACE INTO escrows (escrow_id, user_id, game, amount, debits, owner) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_CLOSE_ESCROW = "DELETE FROM escrows WHERE escrow_id = ?"
+
+
+class SqliteBackend(EconomyBackend):
+    """SQLite (WAL 모드) 저장소
+
+    - 조회/변경은 한 행 단위의 인덱스 조회만 사용
+    - 연결은 이 저장소 전용 스레드 하나에서만 쓴다. 연산 하나는 그 스레드에서 통째로 실행되므로
+      순서대로 하나씩 (원자적으로) 처리되고, 쿼리 / 커밋 / WAL 체크포인트의 fsync 가 루프를 막지 않는다
+    - 변경은 하나의 트랜잭션에 모았다가 commit_interval 마다 한 번에 커밋
+      (연산마다 savepoint 를 두어 실패한 연산의 변경만 되돌린다)
+    - 유저 데이터를 메모리에 올려두지 않음 (배율 표만 캐시)
+    """
+
+    def __init__(self, path: str, default_balance: int, default_multipliers: dict,
+                 commit_interval: float = 0.5, max_pending: int = 1000):
+        super().__init__(default_balance, default_multipliers)
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_pending = max_pending
+        self.conn: Optional[sqlite3.Connection] = None
+        self.multipliers = copy.deepcopy(default_multipliers)
+        # 전체 유저 수 (COUNT(*) 전체 스캔을 피하기 위해 메모리에서 관리)
+        self.user_count = 0
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._background = BackgroundLoop(self.flush, commit_interval, "❌ SQLite 커밋 실패")
+
+        # 통계
+        self.commits = 0
+        self.ops = 0
+
+    def load(self) -> None:
+        self._call_sync(self._open)
+
+    def _open(self) -> None:
+        # isolation_level=None: 트랜잭션 시작/커밋을 직접 관리
+        self.conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL 모드에서는 NORMAL 로도 손상되지 않음 (체크포인트 시에만 fsync)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        # 이름 컬럼이 없던 이전 버전 DB 업그레이드
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(users)")}
+        if "name" not in columns:
+            self.conn.execute("ALTER TABLE users ADD COLUMN name TEXT")
+            self.conn.execute("ALTER TABLE users ADD COLUMN name_ts INTEGER")
+        if "owner" not in {row[1] for row in self.conn.execute("PRAGMA table_info(escrows)")}:
+            self.conn.execute("ALTER TABLE escrows ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+        self.user_count = self.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        for game, kind, value in self.conn.execute("SELECT game, kind, value FROM multipliers"):
+            # REAL 로 저장되므로 정수 배율은 정수로 되돌림 (표시용)
+            self.multipliers.setdefault(game, {})[kind] = int(value) if value.is_integer() else value
+
+    async def start(self) -> None:
+        if self._background.running:
+            return
+        self._background.interval = self.commit_interval
+        self._background.start()
+
+    async def close(self) -> None:
+        await self._background.stop()
+        if self._executor is not None:
+            try:
+                await self._call(self._close_conn)
+            finally:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def close_now(self) -> None:
+        """루프 밖(스크립트)에서 남은 변경을 커밋하고 닫기"""
+        if self._executor is not None:
+            try:
+                self._call_sync(self._close_conn)
+            finally:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _close_conn(self) -> None:
+        if self.conn is not None:
+            self._commit()
+            self.conn.close()
+            self.conn = None
+
+    # ---------- 전용 스레드 ----------
+
+    def _thread(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        return self._executor
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._thread(), fn, *args)
+
+    def _call_sync(self, fn, *args):
+        # 루프 밖(스크립트) 또는 다른 executor 에서 전용 스레드의 결과를 기다림
+        return self._thread().submit(fn, *args).result()
+
+    # ---------- 트랜잭션 ----------
+
+    async def _write(self, fn, *args, alone: bool = False):
+        """변경 연산 fn 을 전용 스레드의 트랜잭션 안에서 실행 (커밋은 백그라운드 태스크가 모아서)
+
+        alone 이면 앞서 쌓인 변경과 분리해 fn 의 변경만으로 바로 커밋한다 (일괄 변경).
+        """
+        result = await self._call(self._transact, fn, args, alone)
+        self.ops += 1
+        if not alone:
+            self._pending += 1
+            if self._pending >= self.max_pending:
+                self._background.wake()
+        return result
+
+    def _transact(self, fn, args: tuple, alone: bool):
+        # (전용 스레드) 실패하면 이 연산의 변경만 되돌리고 앞서 쌓인 변경은 그대로 둔다
+        if alone:
+            self._commit()
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self.conn.execute("SAVEPOINT op")
+        user_count = self.user_count
+        try:
+            result = fn(*args)
+        except BaseException:
+            self.conn.execute("ROLLBACK TO op")
+            self.conn.execute("RELEASE op")
+            self.user_count = user_count
+            raise
+        self.conn.execute("RELEASE op")
+        if alone:
+            self._commit()
+        return result
+
+    def _commit(self) -> None:
+        if self.conn is not None and self.conn.in_transaction:
+            self.conn.execute("COMMIT")
+            self.commits += 1
+
+    async def flush(self) -> None:
+        """쌓인 변경을 전용 스레드에서 커밋"""
+        pending, self._pending = self._pending, 0
+        try:
+            await self._call(self._commit)
+        except BaseException:
+            self._pending += pending
+            raise
+
+    def commit(self) -> None:
+        """루프 밖(스크립트)에서 쌓인 변경을 커밋"""
+        self._call_sync(self._commit)
+        self._pending = 0
+
+    # ---------- 조회 (전용 스레드) ----------
+
+    def _read_user(self, user_id: int) -> Optional[dict]:
+        row = self.conn.execute(_SQL_GET_BALANCE, (user_id,)).fetchone()
+        if row is None:
+            return None
+        user_data = {"balance": row[0], "stats": new_stats()}
+        for game, played, won in self.conn.execute(_SQL_GET_STATS, (user_id,)):
+            user_data["stats"][game] = {"played": played, "won": won}
+        return user_data
+
+    def _ensure_user(self, user_id: int) -> None:
+        if self.conn.execute(_SQL_INSERT_USER, (user_id, self.default_balance)).rowcount == 1:
+            self.user_count += 1
+
+    def _rank(self, user_id: int) -> tuple[Optional[int], int]:
+        row = self.conn.execute(_SQL_GET_BALANCE, (user_id,)).fetchone()
+        if row is None:
+            return None, self.user_count
+        (ahead,) = self.conn.execute(_SQL_RANK, (row[0], row[0], user_id)).fetchone()
+        return ahead + 1, self.user_count
+
+    def _names(self, user_ids: list[int]) -> dict[int, tuple[str, int]]:
+        names = {}
+        for user_id in user_ids:
+            row = self.conn.execute(_SQL_GET_NAME, (user_id,)).fetchone()
+            if row is not None and row[0] is not None:
+                names[user_id] = (row[0], row[1] or 0)
+        return names
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        return self.conn.execute(sql, params).fetchall()
+
+    # ---------- 조회 ----------
+
+    async def get_user(self, user_id: int) -> dict:
+        return await self._call(self._read_user, user_id) or self.default_user()
+
+    def get_multipliers(self) -> dict:
+        return self.multipliers
+
+    async def top_balances(self, limit: int) -> list[tuple[int, int]]:
+        return await self._call(self._query, _SQL_TOP, (limit,))
+
+    async def rank(self, user_id: int) -> tuple[Optional[int], int]:
+        return await self._call(self._rank, user_id)
+
+    def iter_users(self) -> Iterator[tuple[int, dict]]:
+        for (user_id,) in self._call_sync(self._query, "SELECT user_id FROM users"):
+            yield user_id, self._call_sync(self._read_user, user_id)
+
+    async def get_names(self, user_ids: list[int]) -> dict[int, tuple[str, int]]:
+        return await self._call(self._names, user_ids)
+
+    async def set_names(self, names: dict[int, tuple[str, int]]) -> None:
+        await self._write(self._put_names, names)
+
+    async def open_escrows(self) -> list[tuple[str, int, str, int, int, str]]:
+        return await self._call(self._query, "SELECT escrow_id, user_id, game, amount, debits, owner FROM escrows")
+
+    # ---------- 변경 (전용 스레드, _transact 안에서) ----------
+
+    def _put_names(self, names: dict[int, tuple[str, int]]) -> None:
+        self.conn.executemany(
+            _SQL_SET_NAME,
+            [(name, fetched_at, user_id) for user_id, (name, fetched_at) in names.items()]
+        )
+
+    def _record(self, user_id: int, game: str, delta: int, won: int, played: int,
+                escrow: Optional[str]) -> dict:
+        if escrow is not None and self.conn.execute(_SQL_CLOSE_ESCROW, (escrow,)).rowcount == 0:
+            # 이미 정산 / 환불된 에스크로 (다시 보낸 요청)
+            return self._read_user(user_id) or self.default_user()
+        self._ensure_user(user_id)
+        self.conn.execute(_SQL_ADD_BALANCE, (delta, user_id))
+        if played or won:
+            self.conn.execute(_SQL_ADD_STATS, (user_id, game, int(played), int(won)))
+        return self._read_user(user_id)
+
+    def _debit(self, user_id: int, game: str, amount: int, escrow: Optional[str], seq: int,
+               owner: str) -> Optional[int]:
+        ledger = self.conn.execute(_SQL_GET_ESCROW, (escrow,)).fetchone() if escrow is not None else None
+        if ledger is not None and seq < ledger[1]:
+            # 이미 반영된 차감 (다시 보낸 요청)
+            return self.conn.execute(_SQL_GET_BALANCE, (user_id,)).fetchone()[0]
+        if escrow is not None and ledger is None and seq > 0:
+            # 이미 닫힌 에스크로에 추가 배팅
+            return None
+        # 실패할 배팅으로 행을 만들지 않도록 잔액을 먼저 확인 (행이 없으면 기본 잔액)
+        row = self.conn.execute(_SQL_GET_BALANCE, (user_id,)).fetchone()
+        if (row[0] if row is not None else self.default_balance) < amount:
+            return None
+        self._ensure_user(user_id)
+        if self.conn.execute(_SQL_DEBIT, (amount, user_id, amount)).rowcount == 0:
+            return None
+        if escrow is not None:
+            # 잔액 차감과 같은 트랜잭션으로 커밋됨
+            self.conn.execute(_SQL_PUT_ESCROW, (
+                escrow, user_id, game, (ledger[0] if ledger else 0) + amount, seq + 1, ledger[2] if ledger else owner
+            ))
+        return self.conn.execute(_SQL_GET_BALANCE, (user_id,)).fetchone()[0]
+
+    def _adjust(self, user_id: int, delta: int) -> dict:
+        self._ensure_user(user_id)
+        self.conn.execute("UPDATE users SET balance = MAX(balance + ?, 0) WHERE user_id = ?", (delta, user_id))
+        return self._read_user(user_id)
+
+    def _reset(self, user_id: int) -> dict:
+        self._ensure_user(user_id)
+        self.conn.execute(_SQL_SET_BALANCE, (self.default_balance, user_id))
+        self.conn.execute(_SQL_DELETE_STATS, (user_id,))
+        return self.default_user()
+
+    def _bulk_rows(self, user_ids: Optional[list[int]], delta: int, reset: bool) -> tuple[list, list]:
+        if user_ids is None:
+            current = self.conn.execute("SELECT user_id, balance FROM users").fetchall()
+            missing = []
+        else:
+            current, missing = [], []
+            for user_id in dict.fromkeys(user_ids):
+                row = self.conn.execute(_SQL_GET_BALANCE, (user_id,)).fetchone()
+                if row is None:
+                    missing.append(user_id)
+                current.append((user_id, row[0] if row is not None else self.default_balance))
+        rows = [
+            (user_id, balance, self.default_balance if reset else max(balance + delta, 0))
+            for user_id, balance in current
+        ]
+        return rows, missing
+
+    def _bulk(self, user_ids: Optional[list[int]], delta: int, reset: bool) -> list[tuple[int, int, int]]:
+        rows, missing = self._bulk_rows(user_ids, delta, reset)
+        self.conn.executemany(_SQL_INSERT_USER, [(user_id, self.default_balance) for user_id in missing])
+        self.user_count += len(missing)
+        self.conn.executemany(_SQL_SET_BALANCE, [(balance, user_id) for user_id, _, balance in rows])
+        if reset:
+            self.conn.executemany(_SQL_DELETE_STATS, [(user_id,) for user_id, _, _ in rows])
+        return rows
+
+    def _put_multiplier(self, game: str, kind: str, value: float) -> None:
+        self.conn.execute(_SQL_SET_MULTIPLIER, (game, kind, value))
+
+    # ---------- 변경 ----------
+
+    async def record_game_result(self, user_id: int, game: str, delta: int,
+                                 won: int = 0, played: int = 1, escrow: Optional[str] = None) -> dict:
+        return await self._write(self._record, user_id, game, delta, won, played, escrow)
+
+    async def debit_stake(self, user_id: int, game: str, amount: int,
+                          escrow: Optional[str] = None, seq: int = 0, owner: str = "") -> Optional[int]:
+        return await self._write(self._debit, user_id, game, amount, escrow, seq, owner)
+
+    async def adjust_balance(self, user_id: int, delta: int) -> dict:
+        return await self._write(self._adjust, user_id, delta)
+
+    async def reset_user(self, user_id: int) -> dict:
+        return await self._write(self._reset, user_id)
+
+    async def bulk_update(self, user_ids: Optional[list[int]], delta: int = 0, reset: bool = False,
+                          dry_run: bool = False) -> list[tuple[int, int, int]]:
+        if dry_run:
+            rows, _ = await self._call(self._bulk_rows, user_ids, delta, reset)
+            return rows
+        # 앞서 쌓인 변경과 분리해 이 일괄 변경만으로 커밋
+        return await self._write(self._bulk, user_ids, delta, reset, alone=True)
+
+    async def set_multiplier(self, game: str, kind: str, value: float) -> None:
+        await self._write(self._put_multiplier, game, kind, value)
+        self.multipliers.setdefault(game, {})[kind] = value
+
+    # ---------- 마이그레이션 ----------
+
+    def import_users(self, users: Iterable[tuple[int, dict]], multipliers: Optional[dict] = None,
+                     escrows: Optional[dict] = None, batch_size: int = 5000) -> int:
+        """유저 데이터를 batch_size 단위 트랜잭션으로 가져온다 (escrows: 열린 에스크로 장부)"""
+        return self._call_sync(self._import_users, users, multipliers, escrows, batch_size)
+
+    def _import_users(self, users: Iterable[tuple[int, dict]], multipliers: Optional[dict],
+                      escrows: Optional[dict], batch_size: int) -> int:
+        count = 0
+        self.conn.execute("BEGIN")
+        for user_id, data in users:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO users (user_id, balance, name, name_ts) VALUES (?, ?, ?, ?)",
+                (user_id, data["balance"], data.get("name"), data.get("name_ts"))
+            )
+            for game, s in data.get("stats", {}).items():
+                self.conn.execute(_SQL_PUT_STATS, (user_id, game, s["played"], s["won"]))
+            count += 1
+            if count % batch_size == 0:
+                self.conn.execute("COMMIT")
+                self.conn.execute("BEGIN")
+        self.user_count = self.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        for game, kinds in (multipliers or {}).items():
+            for kind, value in kinds.items():
+                self.conn.execute(_SQL_SET_MULTIPLIER, (game, kind, value))
+                self.multipliers.setdefault(game, {})[kind] = value
+        for escrow_id, (user_id, game, amount, debits, *owner) in (escrows or {}).items():
+            self.conn.execute(_SQL_PUT_ESCROW, (escrow_id, user_id, game, amount, debits, owner[0] if owner else ""))
+        self.conn.execute("COMMIT")
+        return count
+
+    def stats(self) -> dict:
+        return {
+            "backend": "sqlite",
+            "users": self.user_count,
+            "ops": self.ops,
+            "commits": self.commits,
+            "pending": self._pending,
+        }
@@ -0,0 +1,205 @@
+"""여러 명이 함께 하는 블랙잭 테이블 (채널당 하나)
+
+테이블 상태(좌석, 차례, 딜러 패)는 BlackjackTable 이 관리하고, 화면(index.py 의 BlackjackTableView)은
+클릭마다 응답을 지연(defer)한 뒤 DebouncedEditor 로 메시지 수정을 모아서 보낸다.
+(채널 메시지 수정은 채널별 속도 제한에 걸리므로 클릭 수가 아니라 시간 / 라운드 수에 비례하게)
+"""
+import asyncio
+from typing import Any, Callable, Optional
+
+from rules import BJ_BUST, DEALER_STANDS_ON, blackjack_outcome
+from shoe import Hand, Shoe
+from wallet import Escrow
+
+# 테이블 단계
+BETTING = "betting"
+PLAYING = "playing"
+CLOSED = "closed"
+
+
+class Seat:
+    __slots__ = ("player", "escrow", "hand", "doubled", "done")
+
+    def __init__(self, player: Any, escrow: Escrow):
+        self.player = player
+        self.escrow = escrow
+        self.hand = Hand()
+        self.doubled = False
+        self.done = False
+
+    @property
+    def user_id(self) -> int:
+        return self.escrow.user_id
+
+
+class BlackjackTable:
+    """좌석 seats 개, 딜러 한 명, 채널의 슈를 함께 쓰는 테이블
+
+    - BETTING: join() 으로 착석 (배팅금은 호출한 쪽에서 에스크로에 묶어서 넘김)
+    - deal(): 모두에게 2장씩, 처음 두 장으로 21 이면 자동 스탠드
+    - PLAYING: 좌석 순서대로 current 좌석만 hit / stand / double
+    - 마지막 좌석이 끝나면 finished 가 True → play_dealer() / outcomes() 로 정산 후 reset()
+    """
+
+    def __init__(self, channel_id: int, shoe: Shoe, bet: int, seats: int = 5):
+        self.channel_id = channel_id
+        self.shoe = shoe
+        self.bet = bet
+        self.max_seats = seats
+        self.seats: list[Seat] = []
+        self.dealer = Hand()
+        self.phase = BETTING
+        self.turn = 0
+        self.rounds = 0
+
+    # ---------- 착석 ----------
+
+    @property
+    def full(self) -> bool:
+        return len(self.seats) >= self.max_seats
+
+    def seat_of(self, user_id: int) -> Optional[Seat]:
+        for seat in self.seats:
+            if seat.user_id == user_id:
+                return seat
+        return None
+
+    def join(self, player: Any, escrow: Escrow) -> Seat:
+        if self.phase != BETTING:
+            raise ValueError("배팅 중인 테이블이 아닙니다")
+        if self.full:
+            raise ValueError("자리가 없습니다")
+        if self.seat_of(escrow.user_id) is not None:
+            raise ValueError("이미 앉아 있습니다")
+        seat = Seat(player, escrow)
+        self.seats.append(seat)
+        return seat
+
+    # ---------- 진행 ----------
+
+    def deal(self) -> None:
+        self.shoe.begin_round()
+        self.dealer = Hand()
+        for _ in range(2):
+            for seat in self.seats:
+                seat.hand.add(self.shoe.draw())
+            self.dealer.add(self.shoe.draw())
+        for seat in self.seats:
+            seat.done = seat.hand.is_blackjack
+        self.phase = PLAYING
+        self.turn = 0
+        self._advance()
+
+    @property
+    def current(self) -> Optional[Seat]:
+        if self.phase != PLAYING or self.turn >= len(self.seats):
+            return None
+        return self.seats[self.turn]
+
+    @property
+    def finished(self) -> bool:
+        return self.phase == PLAYING and self.turn >= len(self.seats)
+
+    def _advance(self) -> None:
+        while self.turn < len(self.seats) and self.seats[self.turn].done:
+            self.turn += 1
+
+    def hit(self) -> int:
+        seat = self.current
+        total = seat.hand.add(self.shoe.draw())
+        if total >= 21:
+            seat.done = True
+            self._advance()
+        return total
+
+    def stand(self) -> None:
+        self.current.done = True
+        self._advance()
+
+    def double(self) -> int:
+        """추가 배팅은 호출한 쪽에서 먼저 묶은 뒤 호출 (한 장 받고 스탠드)"""
+        seat = self.current
+        seat.doubled = True
+        total = seat.hand.add(self.shoe.draw())
+        seat.done = True
+        self._advance()
+        return total
+
+    def play_dealer(self) -> int:
+        # 모두 버스트했으면 딜러는 더 뽑지 않음
+        if any(seat.hand.total <= 21 for seat in self.seats):
+            while self.dealer.total < DEALER_STANDS_ON:
+                self.dealer.add(self.shoe.draw())
+        return self.dealer.total
+
+    def outcomes(self) -> list[tuple[Seat, str]]:
+        dealer_total = self.dealer.total
+        return [
+            (seat, BJ_BUST if seat.hand.total > 21
+             else blackjack_outcome(seat.hand.total, dealer_total, seat.hand.is_blackjack))
+            for seat in self.seats
+        ]
+
+    def reset(self) -> list[Seat]:
+        """다음 라운드 배팅으로 (지난 라운드 좌석 반환)"""
+        seats, self.seats = self.seats, []
+        self.phase = BETTING
+        self.turn = 0
+        self.rounds += 1
+        return seats
+
+
+class DebouncedEditor:
+    """메시지 수정 요청을 delay 초 동안 모아 한 번만 보낸다
+
+    request() 는 즉시 반환하고, 첫 요청 뒤 delay 초가 지나면 그 시점의 render() 결과로 edit 한다.
+    flush() 는 기다리지 않고 바로 보낸다 (라운드 종료 등). 수정은 한 번에 하나씩만 보낸다.
+    """
+
+    def __init__(self, render: Callable[[], dict], delay: float = 1.0):
+        self.render = render
+        self.delay = delay
+        self.message: Any = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        # 통계
+        self.requests = 0
+        self.edits = 0
+        self.failures = 0
+
+    def request(self) -> None:
+        self.requests += 1
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._delayed())
+
+    async def _delayed(self) -> None:
+        await asyncio.sleep(self.delay)
+        self._task = None
+        await self._edit()
+
+    async def flush(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._edit()
+
+    async def _edit(self) -> None:
+        if self.message is None:
+            return
+        async with self._lock:
+            try:
+                await self.message.edit(**self.render())
+                self.edits += 1
+            except Exception as e:
+                # 다음 수정 때 최신 상태로 다시 그려지므로 기록만 남김
+                self.failures += 1
+                print(f"⚠️ 테이블 메시지 수정 실패: {e}")
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "edits": self.edits, "failures": self.failures}
@@ -0,0 +1,99 @@
+"""서버 통계: 버킷 합계 / 링 버퍼 덮어쓰기, HyperLogLog 유저 수, 파일 저장 후 다시 읽기"""
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from analytics import HLL_REGISTERS, ServerAnalytics, hll_add, hll_count  # noqa: E402
+
+T0 = 1_700_000_000 // 86400 * 86400  # UTC 자정
+
+
+class HyperLogLogTest(unittest.TestCase):
+
+    def count(self, user_ids) -> int:
+        registers = bytearray(HLL_REGISTERS)
+        for user_id in user_ids:
+            hll_add(registers, user_id)
+        return hll_count(registers)
+
+    def test_small_counts_nearly_exact(self):
+        self.assertEqual(self.count([]), 0)
+        self.assertEqual(self.count([7, 7, 7]), 1)
+        self.assertAlmostEqual(self.count(range(1, 21)), 20, delta=1)
+
+    def test_large_count_within_error(self):
+        # 레지스터 256 개의 표준 오차 약 6.5% → 4σ 안
+        n = 50_000
+        self.assertAlmostEqual(self.count(range(10**17, 10**17 + n)), n, delta=n * 0.26)
+
+
+class ServerAnalyticsTest(unittest.TestCase):
+
+    def test_summary(self):
+        stats = ServerAnalytics()
+        stats.record("slot", 1, 100, 300, now=T0)
+        stats.record("slot", 2, 100, 0, now=T0 + 60)
+        stats.record("slot", 1, 50, 0, rounds=5, now=T0 + 120)
+        stats.record("dice", 3, 10, 20, now=T0 + 120)
+
+        minute = stats.summary("minute", 3, now=T0 + 120)["slot"]
+        self.assertEqual(
+            (minute["rounds"], minute["wagered"], minute["paid"], minute["house"], minute["players"]),
+            (7, 250, 300, -50, 2),
+        )
+        self.assertEqual(minute["series"], [1, 1, 5])
+        # 최근 1분만
+        self.assertEqual(stats.summary("minute", 1, now=T0 + 120)["slot"]["rounds"], 5)
+        # 유저 1, 2 는 슬롯, 3 은 주사위 (게임을 합쳐도 중복 없이)
+        self.assertEqual(stats.players("day", 1, now=T0 + 120), 3)
+
+    def test_ring_overwrites_old_buckets(self):
+        stats = ServerAnalytics()
+        stats.record("slot", 1, 100, 0, now=T0)
+        # 분 단위 버킷 60 개를 한 바퀴 돈 뒤 같은 칸
+        stats.record("slot", 2, 100, 0, now=T0 + 3600)
+        self.assertEqual(stats.summary("minute", 60, now=T0 + 3600)["slot"]["rounds"], 1)
+        self.assertEqual(stats.summary("hour", 2, now=T0 + 3600)["slot"]["series"], [1, 1])
+
+    def test_utc_offset_moves_day_boundary(self):
+        stats = ServerAnalytics(utc_offset=9 * 3600)
+        # UTC 14:59 / 15:00 은 한국 시간 23:59 / 다음 날 00:00
+        stats.record("dice", 1, 10, 0, now=T0 + 15 * 3600 - 60)
+        stats.record("dice", 1, 10, 0, now=T0 + 15 * 3600)
+        self.assertEqual(stats.summary("day", 2, now=T0 + 15 * 3600)["dice"]["series"], [1, 1])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "analytics.bin")
+            stats = ServerAnalytics(path)
+            for i in range(100):
+                stats.record("blackjack" if i % 2 else "coinflip", i % 30, 100, 150 if i % 3 else 0, now=T0 + i * 30)
+            asyncio.run(stats.save())
+            self.assertFalse(stats.dirty)
+
+            loaded = ServerAnalytics(path)
+            loaded.load()
+            now = T0 + 99 * 30
+            for resolution, count in (("minute", 60), ("hour", 48), ("day", 30)):
+                self.assertEqual(loaded.summary(resolution, count, now=now), stats.summary(resolution, count, now=now))
+
+    def test_corrupt_file_starts_fresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "analytics.bin")
+            stats = ServerAnalytics(path)
+            stats.record("slot", 1, 100, 0, now=T0)
+            asyncio.run(stats.save())
+            with open(path, "r+b") as f:
+                f.truncate(os.path.getsize(path) - 10)
+
+            loaded = ServerAnalytics(path)
+            loaded.load()
+            self.assertEqual(loaded.games, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""관리자 일괄 지급 / 초기화: 미리보기는 저장하지 않고, 반영한 변경은 재시작 후에도 남는지 (JSON / SQLite 저장소)"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from storage import JsonBackend, SqliteBackend  # noqa: E402
+
+START = 1000
+
+
+class BulkUpdateTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = await self.reopen()
+        await self.backend.adjust_balance(1, 500)
+        await self.backend.adjust_balance(2, -900)
+        await self.backend.record_game_result(2, "dice", 0, won=False)
+
+    async def asyncTearDown(self):
+        await self.backend.close()
+        self.tmp.cleanup()
+
+    def open_backend(self):
+        return JsonBackend(
+            os.path.join(self.tmp.name, "economy.json"), os.path.join(self.tmp.name, "journal.log"), START, {}
+        )
+
+    async def reopen(self):
+        backend = self.open_backend()
+        backend.load()
+        await backend.start()
+        return backend
+
+    async def restart(self):
+        await self.backend.close()
+        self.backend = await self.reopen()
+
+    async def balances(self, *user_ids: int) -> list[int]:
+        return [(await self.backend.get_user(user_id))["balance"] for user_id in user_ids]
+
+    async def test_dry_run_changes_nothing(self):
+        rows = await self.backend.bulk_update([1, 2], -200, dry_run=True)
+        self.assertEqual(rows, [(1, 1500, 1300), (2, 100, 0)])
+        self.assertEqual(await self.balances(1, 2), [1500, 100])
+
+    async def test_listed_users(self):
+        # 중복은 한 번만, 기록이 없는 유저는 시작 잔액에서, 잔액은 0 아래로 내려가지 않음
+        rows = await self.backend.bulk_update([2, 3, 2], -200)
+        self.assertEqual(rows, [(2, 100, 0), (3, START, START - 200)])
+        await self.restart()
+        self.assertEqual(await self.balances(1, 2, 3), [1500, 0, START - 200])
+
+    async def test_everyone(self):
+        rows = await self.backend.bulk_update(None, 100)
+        self.assertEqual(sorted(rows), [(1, 1500, 1600), (2, 100, 200)])
+        await self.restart()
+        self.assertEqual(await self.balances(1, 2), [1600, 200])
+
+    async def test_reset(self):
+        await self.backend.bulk_update([2], reset=True)
+        await self.restart()
+        user = await self.backend.get_user(2)
+        self.assertEqual(user["balance"], START)
+        self.assertEqual(user["stats"]["dice"], {"played": 0, "won": 0})
+        self.assertEqual(await self.balances(1), [1500])
+
+    async def test_empty(self):
+        self.assertEqual(await self.backend.bulk_update([], 100), [])
+
+
+class SqliteBulkUpdateTest(BulkUpdateTest):
+
+    def open_backend(self):
+        return SqliteBackend(os.path.join(self.tmp.name, "economy.db"), START, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""경제 서비스: 응답 전에 연결이 끊긴 차감 / 정산을 다시 보내도 한 번만 반영되는지"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from economy_service import EconomyClient, EconomyService, RemoteBackend  # noqa: E402
+from guilds import GuildRegistry  # noqa: E402
+from storage import JsonBackend  # noqa: E402
+from wallet import Wallet  # noqa: E402
+
+START = 1000
+
+
+class DroppingService(EconomyService):
+    """drop 에 있는 연산을 처음 한 번은 실행만 하고 응답하기 전에 연결을 끊는 서비스"""
+
+    def __init__(self, registry, drop: set[str]):
+        super().__init__(registry)
+        self.drop = drop
+        self.dropped = 0
+
+    async def _execute(self, method, guild_id, args):
+        result = await super()._execute(method, guild_id, args)
+        if method in self.drop:
+            self.drop.discard(method)
+            self.dropped += 1
+            raise ConnectionResetError("응답 전에 연결 끊김")
+        return result
+
+
+class RetryTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.service = DroppingService(GuildRegistry(self.open_backend), set())
+        await self.service.start("127.0.0.1", 0)
+        port = self.service._server.sockets[0].getsockname()[1]
+        self.client = EconomyClient(f"127.0.0.1:{port}", pool_size=2)
+        self.backend = RemoteBackend(self.client, None, START, {})
+        await self.backend.start()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.service.close()
+        self.tmp.cleanup()
+
+    def open_backend(self, guild_id):
+        return JsonBackend(
+            os.path.join(self.tmp.name, "economy.json"), os.path.join(self.tmp.name, "journal.log"), START, {}
+        )
+
+    async def balance(self) -> int:
+        return (await self.backend.get_user(1))["balance"]
+
+    async def test_debit_and_settle_retried_once(self):
+        self.service.drop = {"debit_stake", "record_game_result"}
+        wallet = Wallet(self.backend)
+        escrow = await wallet.escrow(1, "dice", 100)
+        self.assertEqual(await self.balance(), START - 100)
+        await wallet.settle(escrow, 100, won=True)
+        self.assertEqual(self.service.dropped, 2)
+        self.assertEqual(await self.balance(), START + 100)
+        self.assertEqual(await self.backend.open_escrows(), [])
+
+    async def test_add_stake_retried_once(self):
+        wallet = Wallet(self.backend)
+        escrow = await wallet.escrow(1, "blackjack", 100)
+        self.service.drop = {"debit_stake"}
+        await wallet.add_stake(escrow, 100)
+        self.assertEqual(self.service.dropped, 1)
+        self.assertEqual(await self.balance(), START - 200)
+        self.assertEqual(await self.backend.open_escrows(), [(escrow.escrow_id, 1, "blackjack", 200, 2, "")])
+
+
+if __name__ == "__main__":
+    unittest.main()
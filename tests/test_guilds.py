@@ -0,0 +1,90 @@
+"""서버별 경제: 오래 쓰지 않았거나 capacity 를 넘은 서버 내리기, 진행 중인 서버는 유지, 내리는 중 다시 요청"""
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from guilds import GuildRegistry  # noqa: E402
+from storage import JsonBackend  # noqa: E402
+
+START = 1000
+
+
+class SlowCloseBackend(JsonBackend):
+    """저장(close)에 시간이 걸리는 저장소"""
+
+    async def close(self) -> None:
+        await asyncio.sleep(0.05)
+        await super().close()
+
+
+class GuildRegistryTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.opened: list[int] = []
+        self.registry = GuildRegistry(self.open_backend, capacity=2, ttl=3600)
+
+    async def asyncTearDown(self):
+        await self.registry.close()
+        self.tmp.cleanup()
+
+    def open_backend(self, guild_id):
+        self.opened.append(guild_id)
+        directory = os.path.join(self.tmp.name, str(guild_id))
+        os.makedirs(directory, exist_ok=True)
+        return SlowCloseBackend(os.path.join(directory, "economy.json"), os.path.join(directory, "journal.log"), START, {})
+
+    async def test_capacity_evicts_least_recently_used(self):
+        for guild_id in (1, 2, 3):
+            economy = await self.registry.get(guild_id)
+            await economy.adjust_balance(7, guild_id * 100)
+        await self.registry.get(1)
+        self.assertEqual(await self.registry.sweep(), 1)
+        self.assertIsNone(self.registry.peek(2))
+        # 내린 서버는 저장된 데이터로 다시 불러옴
+        economy = await self.registry.get(2)
+        self.assertEqual((await economy.get_user(7))["balance"], START + 200)
+        self.assertEqual(self.opened, [1, 2, 3, 2])
+
+    async def test_idle_ttl(self):
+        await self.registry.get(1)
+        self.registry.ttl = 0
+        self.assertEqual(await self.registry.sweep(), 1)
+        self.assertEqual(len(self.registry), 0)
+
+    async def test_busy_economy_kept(self):
+        self.registry.ttl = 0
+        escrowed = await self.registry.get(1)
+        escrow = await escrowed.wallet.escrow(7, "dice", 100)
+        pinned = await self.registry.get(2)
+        pinned.pins += 1
+        self.assertEqual(await self.registry.sweep(), 0)
+
+        # 정산 / 화면 종료 후에는 내림
+        await escrowed.wallet.settle(escrow, -100)
+        pinned.pins -= 1
+        self.assertEqual(await self.registry.sweep(), 2)
+
+    async def test_concurrent_get_loads_once(self):
+        economies = await asyncio.gather(*(self.registry.get(5) for _ in range(10)))
+        self.assertTrue(all(economy is economies[0] for economy in economies))
+        self.assertEqual((self.opened, self.registry.loads, self.registry.hits), ([5], 1, 0))
+
+    async def test_get_while_closing_waits_for_save(self):
+        economy = await self.registry.get(1)
+        await economy.adjust_balance(7, 500)
+        evicting = asyncio.ensure_future(self.registry.evict(1))
+        await asyncio.sleep(0)
+        # 저장이 끝난 뒤 새로 불러오므로 방금 바꾼 잔액이 보임
+        reloaded = await self.registry.get(1)
+        self.assertTrue(await evicting)
+        self.assertIsNot(reloaded, economy)
+        self.assertEqual((await reloaded.get_user(7))["balance"], START + 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
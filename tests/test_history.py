@@ -0,0 +1,94 @@
+"""배팅 기록: 링 / 쓰기 대기열 / 파일에 나뉜 기록을 최근 순으로 빠짐없이 페이지로 읽는지"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from history import GAMES, OUTCOMES, BetHistory, BetRecord, pack, unpack  # noqa: E402
+
+
+def entry(i: int) -> BetRecord:
+    return BetRecord(1_700_000_000 + i, GAMES[i % len(GAMES)], OUTCOMES[i % len(OUTCOMES)], 1 + i % 3, 100 + i, i - 50)
+
+
+class BetHistoryTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = BetHistory(self.tmp.name, ring_size=5, max_users=2, max_entries=20)
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    def record(self, user_id: int, i: int) -> None:
+        r = entry(i)
+        self.history.record(user_id, r.game, r.stake, r.delta, r.outcome, rounds=r.rounds, timestamp=r.timestamp)
+
+    async def pages(self, user_id: int, per_page: int = 4) -> tuple[list[BetRecord], int]:
+        records, page = [], 0
+        while True:
+            chunk, total = await self.history.page(user_id, page, per_page)
+            if not chunk:
+                return records, total
+            records.extend(chunk)
+            page += 1
+
+    def test_pack_round_trip(self):
+        r = entry(7)
+        self.assertEqual(unpack(pack(r)), r)
+        self.assertEqual(BetRecord(0, "dice", "win", 1, 100, 100).multiplier, 1.0)
+        self.assertEqual(BetRecord(0, "dice", "loss", 1, 100, -100).multiplier, 0.0)
+
+    async def test_pages_across_ring_pending_and_file(self):
+        for i in range(13):
+            self.record(1, i)
+        expected = [entry(i) for i in reversed(range(13))]
+        # 링 5 개 + 대기열 8 개
+        self.assertEqual(await self.pages(1), (expected, 13))
+        await self.history.flush()
+        # 링 5 개 + 파일 8 개
+        self.assertEqual(await self.pages(1), (expected, 13))
+        for i in range(13, 16):
+            self.record(1, i)
+        # 링 + 대기열 + 파일 모두
+        expected = [entry(i) for i in reversed(range(16))]
+        self.assertEqual(await self.pages(1, per_page=3), (expected, 16))
+
+    async def test_evicted_user_spills_ring(self):
+        for user_id in (1, 2, 3):
+            self.record(user_id, user_id)
+        # 유저 1 의 링은 내려가고 기록은 대기열로
+        self.assertEqual(self.history.stats()["users"], 2)
+        await self.history.flush()
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "1.bin")))
+        self.assertEqual(await self.pages(1), ([entry(1)], 1))
+
+    async def test_file_trimmed_to_max_entries(self):
+        for i in range(60):
+            self.record(1, i)
+            await self.history.flush()
+        size = os.path.getsize(os.path.join(self.tmp.name, "1.bin"))
+        self.assertLessEqual(size, 2 * 20 * 24)
+        records, _ = await self.pages(1)
+        # 최근 기록은 빠짐없이 (잘라낸 것은 가장 오래된 쪽)
+        self.assertEqual(records[:25], [entry(i) for i in reversed(range(35, 60))])
+
+    async def test_flush_all_users_and_reload(self):
+        for i in range(3):
+            self.record(1, i)
+        await self.history.flush(all_users=True)
+        reloaded = BetHistory(self.tmp.name, ring_size=5)
+        self.assertEqual(await reloaded.page(1, 0, 10), ([entry(i) for i in reversed(range(3))], 3))
+
+    async def test_memory_only(self):
+        history = BetHistory(None, ring_size=3)
+        for i in range(5):
+            history.record(1, "slot", 100, 0, "push", timestamp=i)
+        records, total = await history.page(1, 0, 10)
+        self.assertEqual(([r.timestamp for r in records], total), ([4, 3, 2], 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
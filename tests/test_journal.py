@@ -0,0 +1,90 @@
+"""저널 재적용 (잘린 마지막 줄)"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from journal import Journal  # noqa: E402
+
+
+class JournalReplayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "journal.log")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, balances: list[int]) -> None:
+        journal = Journal(self.path)
+        for balance in balances:
+            journal.append({"u": 1, "b": balance})
+        journal.sync_now()
+        journal._file.close()
+
+    def replay(self, after_seq: int = 0) -> tuple[Journal, list[dict]]:
+        journal = Journal(self.path)
+        applied = []
+        count = journal.replay(applied.append, after_seq=after_seq)
+        self.assertEqual(count, len(applied))
+        return journal, applied
+
+    def test_truncated_tail(self):
+        self.write([10, 20, 30])
+        with open(self.path, "r+b") as f:
+            data = f.read()
+            # 마지막 기록을 쓰는 도중 종료된 것처럼 중간에서 자름
+            f.truncate(len(data) - 7)
+
+        journal, applied = self.replay()
+        self.assertEqual([entry["b"] for entry in applied], [10, 20])
+        self.assertEqual(journal.seq, 2)
+
+    def test_append_after_truncated_tail(self):
+        self.write([10, 20, 30])
+        with open(self.path, "r+b") as f:
+            f.truncate(len(f.read()) - 7)
+
+        journal, _ = self.replay()
+        journal.append({"u": 1, "b": 40})
+        journal.sync_now()
+        journal._file.close()
+
+        _, applied = self.replay()
+        self.assertEqual([(entry["s"], entry["b"]) for entry in applied], [(1, 10), (2, 20), (3, 40)])
+
+    def test_replay_is_read_only(self):
+        self.write([10, 20, 30])
+        with open(self.path, "r+b") as f:
+            # 마지막 줄은 끝까지 쓰였지만 줄바꿈 전에 종료됨
+            f.truncate(len(f.read()) - 1)
+        size = os.path.getsize(self.path)
+
+        _, applied = self.replay()
+        self.assertEqual([entry["b"] for entry in applied], [10, 20])
+        self.assertEqual(os.path.getsize(self.path), size)
+
+    def test_after_seq(self):
+        self.write([10, 20, 30])
+        journal, applied = self.replay(after_seq=2)
+        self.assertEqual([entry["b"] for entry in applied], [30])
+        self.assertEqual(journal.seq, 3)
+
+    def test_sealed_segments(self):
+        self.write([10, 20])
+        os.replace(self.path, f"{self.path}.2")
+        journal = Journal(self.path)
+        journal.seq = 2
+        journal.append({"u": 1, "b": 30})
+        journal.sync_now()
+        journal._file.close()
+
+        _, applied = self.replay()
+        self.assertEqual([entry["s"] for entry in applied], [1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""잔액 순위 인덱스를 정렬한 목록과 비교"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from leaderboard import BalanceIndex  # noqa: E402
+
+
+def expected_order(balances: dict[int, int]) -> list[tuple[int, int]]:
+    return sorted(balances.items(), key=lambda item: (-item[1], item[0]))
+
+
+class BalanceIndexTest(unittest.TestCase):
+
+    def check(self, index: BalanceIndex, balances: dict[int, int]) -> None:
+        order = expected_order(balances)
+        self.assertEqual(len(index), len(balances))
+        self.assertEqual(index.top(len(order) + 5), order)
+        self.assertEqual(index.top(3), order[:3])
+        for rank, (user_id, _) in enumerate(order, 1):
+            self.assertEqual(index.rank(user_id), rank)
+
+    def test_rebuild(self):
+        rng = random.Random(1)
+        # 같은 잔액이 많도록 좁은 범위에서 뽑음 (동점은 user_id 오름차순)
+        balances = {rng.randrange(10 ** 9): rng.randrange(50) for _ in range(500)}
+        index = BalanceIndex()
+        index.rebuild(balances.items())
+        self.check(index, balances)
+        self.assertIsNone(index.rank(-1))
+
+    def test_updates_match_sorted(self):
+        rng = random.Random(2)
+        index = BalanceIndex()
+        index.rebuild({user_id: rng.randrange(100) for user_id in range(100)}.items())
+        balances = dict(index._balances)
+        for step in range(2000):
+            user_id = rng.randrange(150)
+            if rng.random() < 0.1:
+                index.discard(user_id)
+                balances.pop(user_id, None)
+            else:
+                balance = rng.randrange(-20, 200)
+                index.update(user_id, balance)
+                balances[user_id] = balance
+            if step % 200 == 0:
+                self.check(index, balances)
+        self.check(index, balances)
+
+    def test_empty(self):
+        index = BalanceIndex()
+        self.assertEqual(index.top(10), [])
+        self.assertIsNone(index.rank(1))
+        index.update(1, 5)
+        index.discard(1)
+        self.assertEqual(index.top(10), [])
+        self.assertEqual(len(index), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""지표: 슬래시 명령어 계측 훅 / 이벤트 루프 지연 감시 종료"""
+import asyncio
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from metrics import Metrics  # noqa: E402
+
+
+def interaction(name: str) -> SimpleNamespace:
+    return SimpleNamespace(extras={}, command=SimpleNamespace(qualified_name=name))
+
+
+class CommandMetricsTest(unittest.TestCase):
+
+    def test_started_then_finished(self):
+        metrics = Metrics()
+        ok, failed = interaction("슬롯"), interaction("슬롯")
+        metrics.command_started(ok)
+        metrics.command_started(failed)
+        metrics.command_finished(ok, "ok")
+        metrics.command_finished(failed, "error")
+        counts = metrics.counters["bot_command_total"]
+        self.assertEqual(counts[(("command", "슬롯"), ("status", "ok"))], 1)
+        self.assertEqual(counts[(("command", "슬롯"), ("status", "error"))], 1)
+        self.assertEqual(metrics.histograms["bot_command_seconds"][(("command", "슬롯"),)].count, 2)
+
+    def test_finished_once(self):
+        metrics = Metrics()
+        item = interaction("잔액")
+        metrics.command_finished(item, "ok")  # 시작 기록 없음
+        metrics.command_started(item)
+        metrics.command_finished(item, "ok")
+        metrics.command_finished(item, "error")
+        self.assertEqual(metrics.counter_total("bot_command_total"), 1)
+
+
+class LoopLagTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_close_stops_watcher(self):
+        metrics = Metrics()
+        await metrics.start("127.0.0.1", 0, 0.01)
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(metrics.close(), timeout=1)
+        lag = metrics.histograms["bot_event_loop_lag_seconds"][()]
+        self.assertGreater(lag.count, 0)
+        count = lag.count
+        await asyncio.sleep(0.03)
+        self.assertEqual(lag.count, count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""이름 조회기: 로컬 캐시 → 이름 캐시 → 저장소 → REST 순서, 조회 실패 시 오래된 이름, 동시 요청 수 제한"""
+import asyncio
+import os
+import sys
+import time
+import types
+import unittest
+
+import discord
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from names import UserNameResolver  # noqa: E402
+
+
+class FakeBot:
+
+    def __init__(self, local: dict[int, str], remote: dict[int, str]):
+        self.local = local
+        self.remote = remote
+        self.fetched: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def get_user(self, user_id: int):
+        name = self.local.get(user_id)
+        return types.SimpleNamespace(name=name) if name is not None else None
+
+    async def fetch_user(self, user_id: int):
+        self.fetched.append(user_id)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        if user_id not in self.remote:
+            raise discord.HTTPException(types.SimpleNamespace(status=404, reason="Not Found"), "없는 유저")
+        return types.SimpleNamespace(name=self.remote[user_id])
+
+
+class UserNameResolverTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.stored: dict[int, tuple[str, int]] = {}
+        self.bot = FakeBot({1: "local"}, {2: "remote", 3: "renamed"})
+        self.resolver = self.make()
+
+    def make(self, **kwargs) -> UserNameResolver:
+        async def load_names(user_ids, guild):
+            return {user_id: self.stored[user_id] for user_id in user_ids if user_id in self.stored}
+
+        async def store_names(names, guild):
+            self.stored.update(names)
+
+        return UserNameResolver(self.bot, load_names, store_names, **kwargs)
+
+    async def test_lookup_order(self):
+        self.stored[4] = ("stored", int(time.time()))
+        names = await self.resolver.resolve_many([1, 2, 4, 9])
+        self.assertEqual(names, {1: "local", 2: "remote", 4: "stored", 9: "Unknown User (9)"})
+        self.assertEqual(sorted(self.bot.fetched), [2, 9])
+        # REST 로 찾은 이름은 저장소에도 기록
+        self.assertEqual(self.stored[2][0], "remote")
+
+        # 두 번째는 이름 캐시에서 (찾지 못한 유저만 다시 조회)
+        self.bot.fetched.clear()
+        await self.resolver.resolve_many([2, 4, 9])
+        self.assertEqual(self.bot.fetched, [9])
+        stats = self.resolver.stats()
+        self.assertEqual((stats["local_hits"], stats["cache_hits"], stats["stored_hits"]), (1, 2, 1))
+
+    async def test_stale_stored_name(self):
+        old = int(time.time()) - 7200
+        self.stored[3] = ("old", old)
+        self.stored[5] = ("gone", old)
+        names = await self.resolver.resolve_many([3, 5])
+        # 오래된 이름은 다시 조회하고, 조회에 실패하면 오래된 이름이라도 사용
+        self.assertEqual(names, {3: "renamed", 5: "gone"})
+        self.assertEqual(self.stored[3][0], "renamed")
+        self.assertEqual(self.stored[5], ("gone", old))
+
+    async def test_concurrency_limit(self):
+        resolver = self.make(concurrency=2)
+        self.bot.remote.update({user_id: f"u{user_id}" for user_id in range(100, 120)})
+        names = await resolver.resolve_many(range(100, 120))
+        self.assertEqual(len(names), 20)
+        self.assertEqual(self.bot.max_in_flight, 2)
+
+    async def test_cache_capacity(self):
+        resolver = self.make(capacity=2)
+        self.bot.remote.update({10: "a", 11: "b", 12: "c"})
+        await resolver.resolve_many([10, 11, 12])
+        self.assertEqual(resolver.stats()["cached"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""백그라운드 태스크: 깨우기 / 실패 후 재시도 / 실행 중인 작업을 기다리는 종료"""
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from persistence import BackgroundLoop  # noqa: E402
+
+
+class BackgroundLoopTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_wake_runs_step(self):
+        ran = asyncio.Event()
+
+        async def step():
+            ran.set()
+
+        background = BackgroundLoop(step, 60, "실패")
+        background.wake()  # 시작 전에는 무시
+        background.start()
+        background.wake()
+        await asyncio.wait_for(ran.wait(), timeout=1)
+        await background.stop()
+        self.assertFalse(background.running)
+
+    async def test_step_failure_retried(self):
+        calls = []
+
+        async def step():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError("처음 한 번 실패")
+
+        background = BackgroundLoop(step, 0.01, "실패")
+        background.start()
+        while len(calls) < 2:
+            await asyncio.sleep(0.01)
+        await background.stop()
+
+    async def test_stop_waits_for_running_step(self):
+        started = asyncio.Event()
+        finished = []
+
+        async def step():
+            started.set()
+            await asyncio.sleep(0.05)
+            finished.append(True)
+
+        background = BackgroundLoop(step, 0, "실패")
+        background.start()
+        await started.wait()
+        await background.stop()
+        self.assertEqual(finished, [True])
+
+    async def test_stop_while_waiting(self):
+        async def step():
+            raise AssertionError("멈추는 중에는 실행하지 않음")
+
+        background = BackgroundLoop(step, 60, "실패")
+        background.start()
+        await asyncio.sleep(0)
+        await asyncio.wait_for(background.stop(), timeout=1)
+        # 다시 시작할 수 있음
+        background.step = self.noop
+        background.start()
+        await background.stop()
+
+    async def noop(self):
+        pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""속도 제한: 토큰 버킷의 허용 / 거절, 오래 쉰 버킷 정리, 서버별로 따로 세기"""
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ratelimit import RateLimiter, RateLimits  # noqa: E402
+
+
+def interaction(user_id: int, guild_id: int = 1):
+    return types.SimpleNamespace(user=types.SimpleNamespace(id=user_id), guild_id=guild_id)
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_burst_then_refill(self):
+        limiter = RateLimiter(rate=2.0, burst=3)
+        self.assertEqual([limiter.acquire(1, now=0.0) for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(limiter.acquire(1, now=0.0), 0.5)
+        # 0.5초면 토큰 하나가 다시 찬다
+        self.assertEqual(limiter.acquire(1, now=0.5), 0.0)
+        self.assertAlmostEqual(limiter.acquire(1, now=0.5), 0.5)
+        self.assertEqual((limiter.allowed, limiter.shed), (4, 2))
+
+    def test_keys_are_independent(self):
+        limiter = RateLimiter(rate=1.0, burst=1)
+        self.assertEqual(limiter.acquire(1, now=0.0), 0.0)
+        self.assertEqual(limiter.acquire(2, now=0.0), 0.0)
+        self.assertGreater(limiter.acquire(1, now=0.0), 0.0)
+
+    def test_idle_buckets_expire(self):
+        limiter = RateLimiter(rate=1.0, burst=5, idle_ttl=10.0)
+        for key in range(3):
+            limiter.acquire(key, now=float(key))
+        self.assertEqual(len(limiter), 3)
+        # 키 0, 1 은 10초 넘게 쉬었으므로 다음 요청 때 지워짐
+        limiter.acquire(2, now=11.5)
+        self.assertEqual(len(limiter), 1)
+
+    def test_idle_ttl_covers_refill(self):
+        # 가득 차기 전에 지우면 제한이 풀리므로 idle_ttl 은 burst / rate 이상
+        self.assertEqual(RateLimiter(rate=0.1, burst=5, idle_ttl=1.0).idle_ttl, 50.0)
+
+
+class RateLimitsTest(unittest.TestCase):
+
+    def test_named_and_default_limits(self):
+        limits = RateLimits({"슬롯": (1.0, 1)}, default=(1.0, 2))
+        self.assertEqual(limits.acquire("슬롯", interaction(1)), 0.0)
+        self.assertGreater(limits.acquire("슬롯", interaction(1)), 0.0)
+        self.assertEqual(limits.acquire("button", interaction(1)), 0.0)
+        self.assertEqual(limits.acquire("button", interaction(1)), 0.0)
+        self.assertGreater(limits.acquire("button", interaction(1)), 0.0)
+        self.assertEqual(limits.stats()["슬롯"], {"active": 1, "allowed": 1, "shed": 1})
+
+    def test_per_guild(self):
+        shared = RateLimits({}, default=(1.0, 1))
+        separate = RateLimits({}, default=(1.0, 1), per_guild=True)
+        for limits, expected in ((shared, True), (separate, False)):
+            limits.acquire("주사위", interaction(1, guild_id=1))
+            self.assertEqual(limits.acquire("주사위", interaction(1, guild_id=2)) > 0, expected)
+
+    def test_disabled(self):
+        limits = RateLimits({}, default=(1.0, 1), enabled=False)
+        self.assertEqual([limits.acquire("잔액", interaction(1)) for _ in range(5)], [0.0] * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
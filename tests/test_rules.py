@@ -0,0 +1,51 @@
+"""여러 판 한 번에 정산: 손실 한도에서 멈추는지, 묶는 배팅금이 가장 크게 잃은 시점을 감당하는지"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import rules  # noqa: E402
+
+
+class BatchSettlementTest(unittest.TestCase):
+
+    def test_all_rounds_played(self):
+        results = [(100, True), (-100, False), (100, True)]
+        self.assertEqual(rules.batch_settlement(results, 1000, 100), (100, 3, 2, 100))
+
+    def test_stops_at_loss_limit(self):
+        # 잔액 250, 배팅 100: 두 판 잃고 나면 50 이 남아 세 번째 판은 시작하지 않음
+        results = [(-100, False)] * 5
+        self.assertEqual(rules.batch_settlement(results, 250, 100), (-200, 2, 0, 200))
+
+    def test_stake_covers_worst_point(self):
+        results = [(-100, False), (-100, False), (300, True), (-100, False)]
+        delta, played, won, stake = rules.batch_settlement(results, 1000, 100)
+        self.assertEqual((delta, played, won), (0, 4, 1))
+        # 두 판 잃은 뒤 세 번째 판을 시작할 때 300 이 필요
+        self.assertEqual(stake, 300)
+
+    def test_matches_round_by_round(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            balance, bet = rng.randrange(0, 2000), rng.choice((10, 100, 250))
+            results = [(bet if won else -bet, won) for won in (rng.random() < 0.45 for _ in range(rng.randrange(1, 30)))]
+            delta, played, won, stake = rules.batch_settlement(results, balance, bet)
+
+            # 한 판씩 배팅금을 차감 / 정산하는 것과 같은 결과, 잔액은 음수가 되지 않음
+            current, lowest, expected = balance, balance, []
+            for round_delta, round_won in results:
+                if current < bet:
+                    break
+                lowest = min(lowest, current - bet)
+                current += round_delta
+                expected.append(round_won)
+            self.assertEqual((delta, played, won), (current - balance, len(expected), sum(expected)))
+            self.assertEqual(stake, balance - lowest if expected else 0)
+            self.assertLessEqual(stake, balance)
+
+
+if __name__ == "__main__":
+    unittest.main()
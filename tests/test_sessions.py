@@ -0,0 +1,158 @@
+"""게임 세션: 파일 인코딩 / 디코딩 왕복, 개수 제한 / 시간 초과로 뺀 세션, 복구할 때의 장부 확인"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sessions import (  # noqa: E402
+    DROP, REFUND, RESUME, GameSession, SavedSession, SessionRegistry, decode_sessions, restore_action,
+)
+from wallet import Escrow, new_escrow_id  # noqa: E402
+
+
+class DecodeSessionsTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        registry = SessionRegistry(None)
+        sessions = [
+            GameSession(111, 222, 333, Escrow(new_escrow_id(), 444, "blackjack", 50), 60.0,
+                        state=bytes(range(255)), last_used=1700000000.5),
+            # 서버 ID 0 = 기존 데이터 (DM 등), 빈 상태
+            GameSession(2 ** 64 - 1, 1, None, Escrow(new_escrow_id(), 9, "슬롯", -3), 0.5, last_used=1.25),
+        ]
+        for session in sessions:
+            registry.add(session)
+
+        saved = decode_sessions(registry.encode())
+        self.assertEqual(len(saved), len(sessions))
+        for s, session in zip(saved, sessions):
+            self.assertEqual(s.message_id, session.message_id)
+            self.assertEqual(s.channel_id, session.channel_id)
+            self.assertEqual(s.guild_id, session.guild_id)
+            self.assertEqual(s.user_id, session.escrow.user_id)
+            self.assertEqual(s.game, session.escrow.game)
+            self.assertEqual(s.escrow_id, session.escrow.escrow_id)
+            self.assertEqual(s.amount, session.escrow.amount)
+            self.assertEqual(s.last_used, session.last_used)
+            self.assertEqual(s.ttl, session.ttl)
+            self.assertEqual(s.state, session.state)
+
+    def test_empty(self):
+        self.assertEqual(decode_sessions(SessionRegistry(None).encode()), [])
+
+    def test_bad_magic(self):
+        with self.assertRaises(ValueError):
+            decode_sessions(b"NOTSESS0" + bytes(4))
+
+
+def make_session(message_id: int, last_used: float = 1000.0, ttl: float = 60.0) -> GameSession:
+    return GameSession(message_id, 1, None, Escrow(f"e{message_id}", message_id, "dice", 100), ttl,
+                       last_used=last_used)
+
+
+class SessionRegistryTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.registry = SessionRegistry(None, capacity=3)
+        self.evicted = []
+        self.expired = []
+
+        async def on_evict(session):
+            self.evicted.append(session.message_id)
+
+        async def on_expire(session):
+            self.expired.append(session.message_id)
+
+        self.registry.on_evict = on_evict
+        self.registry.on_expire = on_expire
+
+    async def drain(self):
+        # 콜백은 백그라운드 태스크로 호출되므로 끝날 때까지 기다림
+        await self.registry.close()
+
+    async def test_capacity_evicts_oldest_first(self):
+        sessions = [make_session(message_id) for message_id in range(1, 6)]
+        for session in sessions:
+            self.registry.add(session)
+        await self.drain()
+
+        self.assertEqual(self.evicted, [1, 2])
+        self.assertEqual(len(self.registry), 3)
+        self.assertIsNone(self.registry.get(1))
+        self.assertIs(self.registry.get(5), sessions[4])
+        self.assertEqual(self.registry.evicted, 2)
+        self.assertEqual(self.expired, [])
+
+    async def test_touch_moves_to_end(self):
+        sessions = [make_session(message_id) for message_id in range(1, 4)]
+        for session in sessions:
+            self.registry.add(session)
+        self.registry.touch(sessions[0])
+        self.assertGreater(sessions[0].last_used, 1000.0)
+
+        self.registry.add(make_session(4))
+        await self.drain()
+        # 방금 누른 1 대신 그다음으로 오래된 2 를 뺌
+        self.assertEqual(self.evicted, [2])
+        self.assertIs(self.registry.get(1), sessions[0])
+
+    async def test_touch_ignores_removed_session(self):
+        session = make_session(1)
+        self.registry.add(session)
+        self.assertTrue(self.registry.remove(session))
+        self.registry.touch(session)
+        self.assertEqual(session.last_used, 1000.0)
+        self.assertIsNone(self.registry.get(1))
+
+    async def test_sweep_expires(self):
+        self.registry.add(make_session(1, last_used=1000.0, ttl=60.0))
+        self.registry.add(make_session(2, last_used=1030.0, ttl=60.0))
+        self.registry.add(make_session(3, last_used=1000.0, ttl=300.0))
+
+        self.assertEqual(self.registry.sweep(now=1059.0), 0)
+        self.assertEqual(self.registry.sweep(now=1060.0), 1)
+        self.assertEqual(self.registry.sweep(now=1100.0), 1)
+        await self.drain()
+
+        self.assertEqual(self.expired, [1, 2])
+        self.assertEqual(self.evicted, [])
+        self.assertEqual(len(self.registry), 1)
+        self.assertIsNotNone(self.registry.get(3))
+
+    async def test_failing_callback_does_not_stop_others(self):
+        async def broken(session):
+            raise RuntimeError("환불 실패")
+
+        self.registry.on_expire = broken
+        self.registry.add(make_session(1, ttl=1.0))
+        self.registry.add(make_session(2, ttl=1.0))
+        self.assertEqual(self.registry.sweep(now=2000.0), 2)
+        await self.drain()
+        self.assertEqual(len(self.registry), 0)
+
+
+class RestoreActionTest(unittest.TestCase):
+    games = {"slot", "dice", "blackjack", "bet"}
+
+    def saved(self, game: str = "blackjack", amount: int = 100) -> SavedSession:
+        return SavedSession(1, 2, None, 3, game, "e1", amount, 1000.0, 60.0, b"")
+
+    def test_resume(self):
+        self.assertEqual(restore_action(self.saved(), Escrow("e1", 3, "blackjack", 100), self.games), RESUME)
+
+    def test_drop_without_ledger(self):
+        # 이미 정산 / 환불된 게임
+        self.assertEqual(restore_action(self.saved(), None, self.games), DROP)
+
+    def test_refund_amount_mismatch(self):
+        # 더블 직후 세션이 저장되기 전에 종료
+        self.assertEqual(restore_action(self.saved(), Escrow("e1", 3, "blackjack", 200), self.games), REFUND)
+
+    def test_refund_unknown_game(self):
+        escrow = Escrow("e1", 3, "roulette", 100)
+        self.assertEqual(restore_action(self.saved("roulette"), escrow, self.games), REFUND)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""카드 슈 / 패: 카드 구성, 컷 카드에서 다시 섞기, 소프트 에이스 계산, 채널별 슈 정리"""
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from shoe import DECK_VALUES, Hand, Shoe, ShoeRegistry  # noqa: E402
+
+
+class ShoeTest(unittest.TestCase):
+
+    def test_composition(self):
+        shoe = Shoe(decks=6, rng=random.Random(1))
+        self.assertEqual(len(shoe.cards), 312)
+        self.assertEqual(Counter(shoe.cards), Counter(DECK_VALUES * 6))
+        self.assertEqual(Counter(shoe.cards)[10], 96)
+        # 한 바퀴 뽑으면 모든 카드가 한 번씩
+        self.assertEqual(Counter(shoe.draw() for _ in range(312)), Counter(DECK_VALUES * 6))
+
+    def test_reshuffle_at_cut(self):
+        shoe = Shoe(decks=1, penetration=0.5, rng=random.Random(2))
+        for _ in range(25):
+            shoe.draw()
+        shoe.begin_round()
+        self.assertEqual((shoe.pos, shoe.shuffles), (25, 1))
+        shoe.draw()
+        self.assertTrue(shoe.past_cut)
+        shoe.begin_round()
+        self.assertEqual((shoe.pos, shoe.shuffles, shoe.remaining), (0, 2, 52))
+
+    def test_reshuffle_when_empty(self):
+        shoe = Shoe(decks=1, penetration=1.0, rng=random.Random(3))
+        for _ in range(53):
+            shoe.draw()
+        self.assertEqual((shoe.pos, shoe.shuffles, shoe.draws), (1, 2, 53))
+
+    def test_seeded(self):
+        a, b = Shoe(rng=random.Random(4)), Shoe(rng=random.Random(4))
+        self.assertEqual([a.draw() for _ in range(50)], [b.draw() for _ in range(50)])
+
+
+class HandTest(unittest.TestCase):
+
+    def test_soft_aces(self):
+        hand = Hand([11, 6])
+        self.assertEqual((hand.total, hand.is_soft), (17, True))
+        self.assertEqual(hand.add(10), 17)
+        self.assertFalse(hand.is_soft)
+        self.assertEqual(Hand([11, 11, 11, 8]).total, 21)
+        self.assertEqual(Hand([11, 11]).total, 12)
+
+    def test_blackjack_only_with_two_cards(self):
+        self.assertTrue(Hand([11, 10]).is_blackjack)
+        self.assertFalse(Hand([7, 7, 7]).is_blackjack)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(5)
+        for _ in range(2000):
+            cards = [rng.choice(DECK_VALUES) for _ in range(rng.randrange(1, 8))]
+            # 에이스를 1 또는 11 로 놓는 모든 경우 중 21 이하 최대 (없으면 최소)
+            low = sum(1 if c == 11 else c for c in cards)
+            totals = [low + 10 * k for k in range(cards.count(11) + 1)]
+            expected = max([t for t in totals if t <= 21] or [low])
+            hand = Hand(cards)
+            self.assertEqual(hand.total, expected, cards)
+            self.assertEqual(list(hand), cards)
+
+
+class ShoeRegistryTest(unittest.TestCase):
+
+    def test_lru(self):
+        shoes = ShoeRegistry(decks=1, capacity=2)
+        first = shoes.get(1)
+        second = shoes.get(2)
+        self.assertIs(shoes.get(1), first)
+        shoes.get(3)
+        # 가장 오래전에 쓴 채널 2 의 슈가 정리됨
+        self.assertEqual(len(shoes), 2)
+        self.assertIs(shoes.get(1), first)
+        self.assertIsNot(shoes.get(2), second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+"""시뮬레이터: 블랙잭 전이표 판정을 shoe.Hand 로 다시 진행한 결과와 맞춰 보는지"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import simulator  # noqa: E402
+from config import DEFAULT_MULTIPLIERS  # noqa: E402
+
+
+@unittest.skipUnless(simulator.AVAILABLE, "numpy 없음")
+class BlackjackVerifyTest(unittest.TestCase):
+
+    def simulate(self, **policy):
+        return simulator.simulate("blackjack", DEFAULT_MULTIPLIERS, 20_000, seed=1, chunk=5_000, **policy)
+
+    def test_policies_match_hand(self):
+        for policy in ({}, {"double_on": (9, 10, 11)}, {"stand_on": 12, "double_on": (11,)}):
+            with self.subTest(**policy):
+                self.assertEqual(self.simulate(**policy).rounds, 20_000)
+
+    def test_table_drift_detected(self):
+        tables = simulator._blackjack_tables(17, (10, 11))
+        hit = tables["player_hit"]
+        original = hit.copy()
+        # 하드 12 에서는 어떤 카드를 받아도 3 을 받은 것처럼 진행
+        stride = simulator._STRIDE
+        hit[12 * stride:13 * stride] = hit[12 * stride + 1]
+        try:
+            with self.assertRaises(RuntimeError):
+                self.simulate(double_on=(10, 11))
+        finally:
+            hit[:] = original
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+"""이진 스냅샷 인코딩 / 디코딩 왕복"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from records import STAT_GAMES, UserRecord  # noqa: E402
+from snapshot import BinarySnapshot, UserTable, encode_snapshot  # noqa: E402
+from storage import JsonBackend  # noqa: E402
+
+
+def make_record(user_id: int) -> UserRecord:
+    seed = user_id % 1000
+    record = UserRecord(1000 + seed * 7 - 500)
+    for i, game in enumerate(STAT_GAMES):
+        record.set_stats(game, seed + i, seed // 2)
+    if seed % 3 == 0:
+        record.name = f"유저{seed}"
+        record.name_ts = 1700000000 + seed
+    return record
+
+
+def assert_same(case: unittest.TestCase, a: UserRecord, b: UserRecord) -> None:
+    case.assertEqual(a.to_dict(), b.to_dict())
+
+
+class EncodeSnapshotTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        records = {user_id: make_record(user_id) for user_id in (5, 1, 300, 42, 2 ** 64 - 1)}
+        escrows = {"a1b2c3d4e5f60718": [42, "blackjack", 50, 2]}
+        buf = encode_snapshot(None, list(records.items()), {"slot": 3}, 17, escrows)
+
+        snap = BinarySnapshot(buf)
+        self.assertEqual(snap.count, len(records))
+        self.assertEqual(snap.journal_seq, 17)
+        self.assertEqual(snap.multipliers, {"slot": 3})
+        self.assertEqual(snap.escrows, escrows)
+        self.assertEqual(list(snap.ids), sorted(records))
+        for user_id, record in records.items():
+            pos = snap.find(user_id)
+            self.assertGreaterEqual(pos, 0)
+            self.assertEqual(snap.balances[pos], record.balance)
+            assert_same(self, snap.record(pos), record)
+        self.assertEqual(snap.find(2), -1)
+
+    def test_empty(self):
+        snap = BinarySnapshot(encode_snapshot(None, [], {}, 0))
+        self.assertEqual(snap.count, 0)
+        self.assertEqual(snap.escrows, {})
+        self.assertEqual(snap.find(1), -1)
+
+    def test_incremental_copies_untouched(self):
+        base_records = {user_id: make_record(user_id) for user_id in range(1, 50)}
+        base = BinarySnapshot(encode_snapshot(None, list(base_records.items()), {}, 5))
+
+        changed = {user_id: make_record(user_id + 1000) for user_id in (1, 20, 49)}
+        added = {user_id: make_record(user_id) for user_id in (0, 25_000)}
+        snap = BinarySnapshot(encode_snapshot(base, [*changed.items(), *added.items()], {}, 9))
+
+        expected = {**base_records, **changed, **added}
+        self.assertEqual(list(snap.ids), sorted(expected))
+        for user_id, record in expected.items():
+            assert_same(self, snap.record(snap.find(user_id)), record)
+
+    def test_user_table_overlay(self):
+        base = BinarySnapshot(encode_snapshot(None, [(1, make_record(1)), (2, make_record(2))], {}, 0))
+        table = UserTable(base)
+        table[2] = UserRecord(5)
+        table[3] = UserRecord(7)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(dict(table.balances()), {1: make_record(1).balance, 2: 5, 3: 7})
+        self.assertIsNone(table.get(4))
+
+    def test_replace_base_waits_for_iterator(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "economy.bin")
+            with open(path, "wb") as f:
+                f.write(encode_snapshot(None, [(user_id, make_record(user_id)) for user_id in range(1, 6)], {}, 0))
+            table = UserTable(BinarySnapshot.open(path))
+            old = table.base
+            items = table.items()
+            self.assertEqual(next(items)[0], 1)
+
+            # 순회 중에 교체해도 이전 매핑은 순회가 끝날 때까지 열려 있음
+            table.replace_base(BinarySnapshot(encode_snapshot(None, [], {}, 1)))
+            self.assertIsNotNone(old.source)
+            self.assertEqual([user_id for user_id, _ in items], [2, 3, 4, 5])
+            self.assertIsNone(old.source)
+            self.assertFalse(old.acquire())
+
+
+class BinaryBackendSnapshotTest(unittest.TestCase):
+
+    def test_base_swapped_on_loop(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            async def run():
+                backend = JsonBackend(
+                    os.path.join(tmp, "economy.bin"), os.path.join(tmp, "journal.log"), 1000, {},
+                    snapshot_format="binary",
+                )
+                backend.load()
+                await backend.start()
+                await backend.adjust_balance(1, 5)
+                await backend.store.flush()
+                await backend.adjust_balance(2, 7)
+                base = backend.users.base
+
+                # 인코딩(executor)만으로는 base 가 바뀌지 않음
+                backend._encode_binary(backend._capture(backend.journal.seq))
+                backend._release_capture()
+                self.assertIs(backend.users.base, base)
+                backend._encoded = None
+
+                await backend.close()
+                reloaded = JsonBackend(
+                    os.path.join(tmp, "economy.bin"), os.path.join(tmp, "journal.log"), 1000, {},
+                    snapshot_format="binary",
+                )
+                reloaded.load()
+                self.assertEqual(dict(reloaded.users.balances()), {1: 1005, 2: 1007})
+                reloaded.users.base.close()
+
+            asyncio.run(run())
+
+
+class CopyOnWriteCaptureTest(unittest.IsolatedAsyncioTestCase):
+
+    async def check(self, snapshot_format: str):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "economy.bin" if snapshot_format == "binary" else "economy.json")
+            backend = JsonBackend(path, os.path.join(tmp, "journal.log"), 1000, {}, snapshot_format=snapshot_format)
+            backend.load()
+            await backend.adjust_balance(1, 5)
+            state = backend._capture(backend.journal.seq)
+            frozen = backend.users.get(1)
+
+            # 캡처 뒤의 변경은 복사본에 반영되고 고정된 레코드는 그대로
+            await backend.adjust_balance(1, 100)
+            await backend.adjust_balance(2, 7)
+            self.assertIsNot(backend.users.get(1), frozen)
+            self.assertEqual(frozen.balance, 1005)
+            self.assertEqual(backend.users.get(1).balance, 1105)
+            self.assertEqual(backend.users.copied, 1)
+
+            encode = backend._encode_binary if snapshot_format == "binary" else backend._encode_snapshot
+            payload = encode(state)
+            backend._release_capture()
+            backend._encoded = None
+            await backend.adjust_balance(1, 1)
+            self.assertEqual(backend.users.copied, 1)
+
+            if snapshot_format == "binary":
+                snapshot = BinarySnapshot(payload)
+                balances = dict(zip(snapshot.ids, snapshot.balances))
+            else:
+                balances = {int(uid): user["balance"] for uid, user in json.loads(payload)["users"].items()}
+            self.assertEqual(balances, {1: 1005})
+            await backend.close()
+            if backend.users.base is not None:
+                backend.users.base.close()
+
+    async def test_json(self):
+        await self.check("json")
+
+    async def test_binary(self):
+        await self.check("binary")
+
+
+if __name__ == "__main__":
+    unittest.main()
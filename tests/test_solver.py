@@ -0,0 +1,75 @@
+"""블랙잭 정답표: 딜러 분포, 기본 전략과 맞는 추천, 배율에 따른 기대값"""
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import rules  # noqa: E402
+from shoe import DECK_VALUES, Hand  # noqa: E402
+from solver import DEALER_BUST, DOUBLE, HIT, STAND, UPCARDS, BlackjackSolver, dealer_distribution  # noqa: E402
+
+# 승리 1:1, 블랙잭 3:2 (일반 카지노 규칙, 기본 전략표와 비교용)
+STANDARD = {"blackjack": {"win": 1, "blackjack": 1.5}}
+
+
+class DealerDistributionTest(unittest.TestCase):
+
+    def test_sums_to_one(self):
+        for upcard in UPCARDS:
+            self.assertAlmostEqual(sum(dealer_distribution(upcard).values()), 1.0)
+
+    def test_matches_sampled_dealer(self):
+        rng = random.Random(1)
+        n = 100_000
+        finals = Counter()
+        for _ in range(n):
+            hand = Hand([6])
+            while hand.total < rules.DEALER_STANDS_ON:
+                hand.add(rng.choice(DECK_VALUES))
+            finals[min(hand.total, DEALER_BUST)] += 1
+        for total, p in dealer_distribution(6).items():
+            self.assertAlmostEqual(finals[total] / n, p, delta=0.01)
+
+
+class BlackjackSolverTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = BlackjackSolver(STANDARD)
+
+    def test_basic_strategy(self):
+        cases = [
+            ([10, 6], 10, HIT),
+            ([10, 2], 4, STAND),
+            ([10, 7], 11, STAND),
+            ([6, 5], 6, DOUBLE),
+            ([11, 7], 3, DOUBLE),
+            ([11, 7], 9, HIT),
+            ([10, 3], 2, STAND),
+        ]
+        for cards, upcard, action in cases:
+            with self.subTest(cards=cards, upcard=upcard):
+                self.assertEqual(self.solver.best(Hand(cards), upcard)[0], action)
+
+    def test_double_only_on_first_two_cards(self):
+        self.assertNotIn(DOUBLE, self.solver.evs(Hand([2, 3, 6]), 6))
+        self.assertNotIn(DOUBLE, self.solver.evs(Hand([6, 5]), 6, can_double=False))
+
+    def test_natural_uses_blackjack_payout(self):
+        evs = self.solver.evs(Hand([11, 10]), 6)
+        # 딜러가 21 을 만들지 않으면 1.5 배 (21 이면 푸시)
+        self.assertAlmostEqual(evs[STAND], 1.5 * (1 - dealer_distribution(6)[21]))
+        self.assertLess(self.solver.evs(Hand([7, 7, 7]), 6)[STAND], evs[STAND])
+
+    def test_expected_value_follows_multipliers(self):
+        # 스플릿 / 서렌더 없는 무한 덱: 하우스 우위 1% 남짓
+        self.assertTrue(-0.03 < self.solver.expected_value() < 0)
+        generous = BlackjackSolver({"blackjack": {"win": 2, "blackjack": 2.5}})
+        self.assertGreater(generous.expected_value(), 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
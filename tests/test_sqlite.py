@@ -0,0 +1,126 @@
+"""SQLite 저장소: 실패한 연산만 되돌리기, 쿼리 / 커밋이 루프를 막지 않기, 변경 뒤에도 순위와 유저 수가 맞는지"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from storage import SqliteBackend  # noqa: E402
+
+START = 1000
+
+
+class SqliteBackendTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = await self.reopen()
+
+    async def asyncTearDown(self):
+        await self.backend.close()
+        self.tmp.cleanup()
+
+    async def reopen(self):
+        backend = SqliteBackend(os.path.join(self.tmp.name, "economy.db"), START, {}, commit_interval=60)
+        backend.load()
+        await backend.start()
+        return backend
+
+    async def expected_rank(self, user_id: int):
+        # 잔액 내림차순, 같은 잔액이면 user_id 가 작은 쪽이 앞
+        rows = await self.backend._call(self.backend._query, "SELECT user_id, balance FROM users")
+        order = [uid for uid, _ in sorted(rows, key=lambda row: (-row[1], row[0]))]
+        return order.index(user_id) + 1 if user_id in order else None
+
+    async def test_failed_operation_rolled_back_alone(self):
+        await self.backend.adjust_balance(1, 100)
+
+        def broken():
+            self.backend._adjust(1, 1000)
+            self.backend._adjust(2, 500)
+            raise RuntimeError("연산 도중 실패")
+
+        with self.assertRaises(RuntimeError):
+            await self.backend._write(broken)
+        await self.backend.adjust_balance(3, -100)
+
+        # 앞뒤 연산은 같은 트랜잭션으로 커밋되고, 실패한 연산의 변경은 DB / 유저 수 / 순위 어디에도 없음
+        await self.backend.close()
+        self.backend = await self.reopen()
+        self.assertEqual((await self.backend.get_user(1))["balance"], START + 100)
+        self.assertEqual((await self.backend.get_user(3))["balance"], START - 100)
+        self.assertEqual(self.backend.user_count, 2)
+        self.assertEqual(await self.backend.rank(2), (None, 2))
+        self.assertEqual(await self.backend.rank(1), (1, 2))
+
+    async def test_failed_debit_creates_no_user(self):
+        self.assertIsNone(await self.backend.debit_stake(42, "slot", START + 1))
+        self.assertIsNone(await self.backend.debit_stake(43, "slot", 10, escrow="closed", seq=1))
+        self.assertEqual(await self.backend._call(self.backend._query, "SELECT * FROM users"), [])
+        self.assertEqual(self.backend.user_count, 0)
+        self.assertEqual(await self.backend.rank(42), (None, 0))
+
+        self.assertEqual(await self.backend.debit_stake(42, "slot", START), 0)
+        self.assertEqual(self.backend.user_count, 1)
+
+    async def test_rollback_keeps_user_count(self):
+        await self.backend.rank(1)
+
+        def broken():
+            self.backend._ensure_user(7)
+            raise RuntimeError("연산 도중 실패")
+
+        with self.assertRaises(RuntimeError):
+            await self.backend._write(broken)
+        self.assertEqual((await self.backend.rank(7)), (None, 0))
+
+    async def test_loop_not_blocked(self):
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        try:
+            # 전용 스레드에서 0.3초 걸리는 연산 (긴 쿼리 / 체크포인트 fsync 대신)
+            started = time.perf_counter()
+            await self.backend._write(time.sleep, 0.3)
+            elapsed = time.perf_counter() - started
+        finally:
+            task.cancel()
+        self.assertGreaterEqual(elapsed, 0.3)
+        self.assertGreater(ticks, 10)
+
+    async def test_rank_matches_database(self):
+        rng = random.Random(1)
+        self.backend.import_users((user_id, {"balance": rng.randrange(0, 3000)}) for user_id in range(300))
+        for step in range(300):
+            user_id = rng.randrange(400)
+            op = rng.random()
+            if op < 0.3:
+                await self.backend.record_game_result(user_id, "dice", rng.randrange(-300, 300), won=int(op < 0.15))
+            elif op < 0.5:
+                await self.backend.debit_stake(user_id, "dice", rng.randrange(1, 2000))
+            elif op < 0.7:
+                await self.backend.adjust_balance(user_id, rng.randrange(-500, 500))
+            elif op < 0.75:
+                await self.backend.reset_user(user_id)
+            elif op < 0.8:
+                await self.backend.bulk_update([user_id, user_id + 1], delta=50)
+            if step % 25 == 0:
+                await self.backend.flush()
+            rank, total = await self.backend.rank(user_id)
+            self.assertEqual(rank, await self.expected_rank(user_id))
+        [(count,)] = await self.backend._call(self.backend._query, "SELECT COUNT(*) FROM users")
+        self.assertEqual(total, count)
+
+
+if __name__ == "__main__":
+    unittest.main()
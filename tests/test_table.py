@@ -0,0 +1,138 @@
+"""블랙잭 테이블: 좌석 순서대로 진행 / 딜러 / 정산, 메시지 수정을 모아 한 번만 보내는지"""
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from rules import BJ_BLACKJACK, BJ_BUST, BJ_LOSE, BJ_PUSH, BJ_WIN  # noqa: E402
+from table import BETTING, PLAYING, BlackjackTable, DebouncedEditor  # noqa: E402
+from wallet import Escrow  # noqa: E402
+
+
+class StackedShoe:
+    """정해 둔 순서로 카드를 주는 슈"""
+
+    def __init__(self, cards):
+        self.cards = list(cards)
+
+    def begin_round(self) -> None:
+        pass
+
+    def draw(self) -> int:
+        return self.cards.pop(0)
+
+
+def table_with(cards, players: int) -> BlackjackTable:
+    table = BlackjackTable(1, StackedShoe(cards), bet=100, seats=3)
+    for user_id in range(1, players + 1):
+        table.join(f"p{user_id}", Escrow(f"e{user_id}", user_id, "blackjack", 100))
+    return table
+
+
+class BlackjackTableTest(unittest.TestCase):
+
+    def test_join_rules(self):
+        table = table_with([], 3)
+        with self.assertRaises(ValueError):
+            table.join("p4", Escrow("e4", 4, "blackjack", 100))
+        table = table_with([10] * 6, 1)
+        with self.assertRaises(ValueError):
+            table.join("again", Escrow("e9", 1, "blackjack", 100))
+        table.deal()
+        with self.assertRaises(ValueError):
+            table.join("late", Escrow("e5", 5, "blackjack", 100))
+
+    def test_round(self):
+        # 두 장씩 좌석 1, 2, 3, 딜러 순서로: 1 = 10+6, 2 = A+K (블랙잭), 3 = 5+5, 딜러 = 9+7
+        table = table_with([10, 11, 5, 9, 6, 10, 5, 7] + [10, 2, 10, 3, 10], 3)
+        table.deal()
+        self.assertEqual(table.phase, PLAYING)
+        self.assertEqual([seat.hand.total for seat in table.seats], [16, 21, 10])
+        self.assertEqual(table.dealer.total, 16)
+
+        self.assertEqual(table.hit(), 26)  # 좌석 1 버스트 → 블랙잭인 좌석 2 는 건너뜀
+        self.assertIs(table.current, table.seats[2])
+        self.assertEqual(table.double(), 12)
+        self.assertTrue(table.seats[2].doubled)
+        self.assertTrue(table.finished)
+
+        self.assertEqual(table.play_dealer(), 26)
+        self.assertEqual([outcome for _, outcome in table.outcomes()], [BJ_BUST, BJ_BLACKJACK, BJ_WIN])
+        self.assertEqual(len(table.reset()), 3)
+        self.assertEqual((table.phase, table.seats, table.rounds), (BETTING, [], 1))
+
+    def test_dealer_skips_when_everyone_busts(self):
+        table = table_with([10, 9, 6, 8, 10], 1)
+        table.deal()
+        table.hit()
+        self.assertEqual(table.play_dealer(), 17)
+        self.assertEqual(table.outcomes()[0][1], BJ_BUST)
+
+    def test_stand_and_push(self):
+        table = table_with([10, 10, 7, 8], 1)
+        table.deal()
+        table.stand()
+        self.assertTrue(table.finished)
+        table.play_dealer()
+        self.assertEqual(table.outcomes()[0][1], BJ_LOSE)
+
+        table.reset()
+        table.shoe.cards = [10, 10, 7, 7]
+        table.join("p1", Escrow("e2", 1, "blackjack", 100))
+        table.deal()
+        table.stand()
+        table.play_dealer()
+        self.assertEqual(table.outcomes()[0][1], BJ_PUSH)
+
+
+class FakeMessage:
+
+    def __init__(self, fail: bool = False):
+        self.edits: list[dict] = []
+        self.fail = fail
+
+    async def edit(self, **kwargs) -> None:
+        if self.fail:
+            raise RuntimeError("429")
+        self.edits.append(kwargs)
+
+
+class DebouncedEditorTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.state = 0
+        self.editor = DebouncedEditor(lambda: {"content": str(self.state)}, delay=0.05)
+        self.editor.message = FakeMessage()
+
+    async def test_requests_coalesced(self):
+        for self.state in range(10):
+            self.editor.request()
+        await asyncio.sleep(0.1)
+        # 마지막 상태로 한 번만
+        self.assertEqual(self.editor.message.edits, [{"content": "9"}])
+        self.assertEqual(self.editor.stats(), {"requests": 10, "edits": 1, "failures": 0})
+
+    async def test_flush_sends_now(self):
+        self.editor.request()
+        self.state = 1
+        await self.editor.flush()
+        await asyncio.sleep(0.1)
+        # 대기 중이던 수정은 취소됨
+        self.assertEqual(self.editor.message.edits, [{"content": "1"}])
+
+    async def test_failure_counted(self):
+        self.editor.message = FakeMessage(fail=True)
+        await self.editor.flush()
+        self.assertEqual(self.editor.stats()["failures"], 1)
+
+    async def test_cancel(self):
+        self.editor.request()
+        self.editor.cancel()
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.editor.message.edits, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""에스크로 차감 / 정산 / 환불을 다시 보내도 한 번만 반영되는지 (JSON / SQLite 저장소)"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from storage import JsonBackend, SqliteBackend  # noqa: E402
+from wallet import InsufficientFunds, Wallet  # noqa: E402
+
+START = 1000
+
+
+class WalletIdempotencyTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = self.open_backend()
+        self.backend.load()
+        await self.backend.start()
+        self.wallet = Wallet(self.backend, "test")
+
+    async def asyncTearDown(self):
+        await self.backend.close()
+        self.tmp.cleanup()
+
+    def open_backend(self):
+        return JsonBackend(
+            os.path.join(self.tmp.name, "economy.json"), os.path.join(self.tmp.name, "journal.log"), START, {}
+        )
+
+    async def balance(self, user_id: int = 1) -> int:
+        return (await self.backend.get_user(user_id))["balance"]
+
+    async def test_repeated_debit(self):
+        escrow = await self.wallet.escrow(1, "dice", 100)
+        # 응답을 못 받아 같은 차감을 다시 보낸 경우
+        self.assertEqual(await self.backend.debit_stake(1, "dice", 100, escrow.escrow_id, 0), START - 100)
+        self.assertEqual(await self.balance(), START - 100)
+
+        await self.wallet.add_stake(escrow, 100)
+        self.assertEqual(await self.backend.debit_stake(1, "dice", 100, escrow.escrow_id, 1), START - 200)
+        self.assertEqual(await self.balance(), START - 200)
+        self.assertEqual(await self.backend.open_escrows(), [(escrow.escrow_id, 1, "dice", 200, 2, "test")])
+
+    async def test_repeated_settle(self):
+        escrow = await self.wallet.escrow(1, "dice", 100)
+        await self.wallet.settle(escrow, 100, won=True)
+        self.assertIsNone(await self.wallet.settle(escrow, 100, won=True))
+        self.assertFalse(await self.wallet.refund(escrow))
+        # 저장소에 같은 정산을 다시 보내도 그대로
+        await self.backend.record_game_result(1, "dice", 200, won=True, escrow=escrow.escrow_id)
+        self.assertEqual(await self.balance(), START + 100)
+        self.assertEqual((await self.backend.get_user(1))["stats"]["dice"], {"played": 1, "won": 1})
+        self.assertEqual(await self.backend.open_escrows(), [])
+
+    async def test_repeated_refund(self):
+        escrow = await self.wallet.escrow(1, "slot", 300)
+        self.assertTrue(await self.wallet.refund(escrow))
+        self.assertFalse(await self.wallet.refund(escrow))
+        await self.backend.record_game_result(1, "slot", 300, played=0, escrow=escrow.escrow_id)
+        self.assertEqual(await self.balance(), START)
+
+    async def test_stake_after_close(self):
+        escrow = await self.wallet.escrow(1, "blackjack", 100)
+        await self.wallet.settle(escrow, -100)
+        with self.assertRaises(ValueError):
+            await self.wallet.add_stake(escrow, 100)
+        # 이미 닫힌 에스크로에 늦게 도착한 추가 차감은 거절
+        self.assertIsNone(await self.backend.debit_stake(1, "blackjack", 100, escrow.escrow_id, 1))
+        self.assertEqual(await self.balance(), START - 100)
+
+    async def test_insufficient_funds(self):
+        with self.assertRaises(InsufficientFunds):
+            await self.wallet.escrow(1, "dice", START + 1)
+        self.assertEqual(await self.backend.open_escrows(), [])
+        self.assertEqual(self.wallet.opening, 0)
+
+    async def test_restore(self):
+        escrow = await self.wallet.escrow(1, "dice", 100)
+        wallet = Wallet(self.backend, "test")
+        [(escrow_id, user_id, game, amount, debits, _)] = await self.backend.open_escrows()
+        restored = wallet.restore(escrow_id, user_id, game, amount, debits)
+        self.assertIs(wallet.restore(escrow_id, user_id, game, amount, debits), restored)
+        self.assertEqual(await self.balance(), START - 100)
+        # 재시작 전의 지갑이 보낸 정산이 늦게 도착해도 한 번만 반영
+        await self.wallet.settle(escrow, 50, won=True)
+        await wallet.settle(restored, 50, won=True)
+        self.assertEqual(await self.balance(), START + 50)
+
+
+class SqliteWalletIdempotencyTest(WalletIdempotencyTest):
+
+    def open_backend(self):
+        return SqliteBackend(os.path.join(self.tmp.name, "economy.db"), START, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import secrets
+import time
+import weakref
+from typing import Optional
+
+from storage import EconomyBackend
+
+
+class InsufficientFunds(Exception):
+    """잔액이 배팅금액보다 적을 때"""
+
+
+class Escrow:
+    """게임 진행 중 묶여 있는 배팅금
+
+    escrow_id 는 재시작 / 프로세스가 달라도 겹치지 않는 임의의 문자열로, 저장소의 에스크로 장부와
+    차감 / 정산 요청의 중복 확인에 쓰인다. debits 는 지금까지 보낸 차감 수 (다음 차감의 번호).
+    """
+
+    __slots__ = ("escrow_id", "user_id", "game", "amount", "debits", "created_at", "settled")
+
+    def __init__(self, escrow_id: str, user_id: int, game: str, amount: int, debits: int = 1):
+        self.escrow_id = escrow_id
+        self.user_id = user_id
+        self.game = game
+        self.amount = amount
+        self.debits = debits
+        self.created_at = time.time()
+        self.settled = False
+
+
+def new_escrow_id() -> str:
+    return secrets.token_hex(8)
+
+
+class Wallet:
+    """배팅금 에스크로 / 정산 엔진
+
+    - escrow(): 게임 화면을 만들 때 배팅금을 먼저 차감해 묶어둠
+    - add_stake(): 더블 등 추가 배팅 (잔액을 다시 확인)
+    - settle(): 결과에 따라 배팅금 + 순이익을 돌려줌 (한 번만 가능)
+    - refund(): 시간 초과 등으로 끝나지 않은 게임의 배팅금 반환
+    - restore(): 저장소 장부에 남아 있는 배팅금을 다시 등록 (게임 세션 복구 / 재시작 후 환불)
+
+    같은 유저의 연산만 유저별 락으로 직렬화하므로 서로 다른 유저는 경합하지 않는다.
+    실제 저장은 저장소의 일괄 커밋(저널 fsync / SQLite 트랜잭션)으로 모아서 처리된다.
+    owner 는 이 봇 프로세스의 이름으로, 여는 에스크로마다 장부에 남는다 (다른 프로세스가 환불하지 않도록).
+    """
+
+    def __init__(self, backend: EconomyBackend, owner: str = ""):
+        self.backend = backend
+        self.owner = owner
+        self._locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.open: dict[str, Escrow] = {}
+        # 차감 요청을 보냈지만 아직 에스크로가 만들어지지 않은 수 (그동안 서버를 내리지 않도록)
+        self.opening = 0
+
+        # 통계
+        self.escrowed = 0
+        self.settled = 0
+        self.refunded = 0
+        self.rejected = 0
+        self.restored = 0
+
+    def _lock(self, user_id: int) -> asyncio.Lock:
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        return lock
+
+    async def escrow(self, user_id: int, game: str, amount: int) -> Escrow:
+        """배팅금을 차감해 에스크로에 묶는다 (잔액 부족 시 InsufficientFunds)"""
+        escrow_id = new_escrow_id()
+        self.opening += 1
+        try:
+            async with self._lock(user_id):
+                if await self.backend.debit_stake(user_id, game, amount, escrow_id, owner=self.owner) is None:
+                    self.rejected += 1
+                    raise InsufficientFunds()
+                escrow = Escrow(escrow_id, user_id, game, amount)
+                self.open[escrow.escrow_id] = escrow
+                self.escrowed += 1
+                return escrow
+        finally:
+            self.opening -= 1
+
+    def restore(self, escrow_id: str, user_id: int, game: str, amount: int, debits: int = 1) -> Escrow:
+        """저장소 장부에 있는 (이미 차감된) 배팅금을 에스크로로 다시 등록 (잔액은 바꾸지 않음)"""
+        escrow = self.open.get(escrow_id)
+        if escrow is None:
+            escrow = self.open[escrow_id] = Escrow(escrow_id, user_id, game, amount, debits)
+            self.restored += 1
+        return escrow
+
+    async def add_stake(self, escrow: Escrow, amount: int) -> None:
+        """진행 중인 게임에 배팅금 추가 (잔액 부족 시 InsufficientFunds)"""
+        async with self._lock(escrow.user_id):
+            if escrow.settled:
+                raise ValueError("이미 정산된 게임입니다")
+            if await self.backend.debit_stake(
+                escrow.user_id, escrow.game, amount, escrow.escrow_id, escrow.debits
+            ) is None:
+                self.rejected += 1
+                raise InsufficientFunds()
+            escrow.amount += amount
+            escrow.debits += 1
+
+    async def settle(self, escrow: Escrow, delta: int, won: int = 0, rounds: int = 1) -> Optional[dict]:
+        """게임 결과 정산. delta 는 배팅금 대비 순손익 (패배 시 -배팅금)
+
+        여러 판을 한 번에 정산할 때는 rounds 에 판 수, won 에 승리 수를 넘긴다.
+
+        이미 정산/환불된 게임이면 None 을 반환한다. 저장소 기록이 실패하면 에스크로는 그대로
+        열려 있으므로 다시 정산하거나 환불할 수 있다.
+        """
+        async with self._lock(escrow.user_id):
+            if escrow.settled:
+                return None
+            # 기록이 성공한 뒤에 정산 표시 (같은 유저의 락 안이므로 그 사이 중복 정산은 없음)
+            result = await self.backend.record_game_result(
+                escrow.user_id, escrow.game, escrow.amount + delta, won=won, played=rounds, escrow=escrow.escrow_id
+            )
+            escrow.settled = True
+            self.open.pop(escrow.escrow_id, None)
+            self.settled += 1
+            return result
+
+    async def refund(self, escrow: Escrow) -> bool:
+        """정산되지 않은 배팅금을 돌려준다 (게임 기록에는 남기지 않음)"""
+        async with self._lock(escrow.user_id):
+            if escrow.settled:
+                return False
+            await self.backend.record_game_result(
+                escrow.user_id, escrow.game, escrow.amount, played=0, escrow=escrow.escrow_id
+            )
+            escrow.settled = True
+            self.open.pop(escrow.escrow_id, None)
+            self.refunded += 1
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "open": len(self.open),
+            "open_amount": sum(e.amount for e in self.open.values()),
+            "escrowed": self.escrowed,
+            "settled": self.settled,
+            "refunded": self.refunded,
+            "rejected": self.rejected,
+            "restored": self.restored,
+        }